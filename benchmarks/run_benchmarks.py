@@ -0,0 +1,679 @@
+"""
+Benchmarks of the overhead tssc adds to running the TSSC workflow steps.
+
+The toolchain tssc orchestrates (mvn, buildah, skopeo, git) is replaced by the stub executables
+in `benchmarks/bin` so that only the time and memory spent by tssc itself is measured:
+start up, configuration merging, and reading and writing the results.
+
+The parse-results and dump-results benchmarks compare parsing and dumping results files with
+the pure python yaml implementation to libyaml, see `tssc.yaml_io`.
+
+Each operation is timed `--repeat` times and then run once more in a new process to measure
+how much it grows the peak resident memory of that process. Operations are run against a fresh
+copy of a synthetic project and results in a temporary directory.
+
+tracemalloc is not used to measure memory since sh forks to run the stub executables while its
+output threads are running, which can deadlock a forked child while tracemalloc holds its lock.
+
+Usage
+-----
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --quick
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+
+When given a `--baseline` the exit code is 1 if any operation regressed by more then the
+`--tolerance` compared to the baseline.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+from tabulate import tabulate
+
+BENCHMARKS_DIR_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR_PATH))
+
+# pylint: disable=wrong-import-position
+from tssc import TSSCFactory
+from tssc.__main__ import main
+from tssc import step_implementers # pylint: disable=unused-import
+from tssc.yaml_io import safe_dump, safe_load
+
+STUB_BIN_DIR_PATH = os.path.join(BENCHMARKS_DIR_PATH, 'bin')
+
+SUB_STEP_COUNTS = [1, 10, 100, 1000]
+QUICK_SUB_STEP_COUNTS = [1, 10, 100]
+
+RESULTS_SIZES = [1024, 1024 * 1024, 10 * 1024 * 1024, 50 * 1024 * 1024]
+QUICK_RESULTS_SIZES = [1024, 1024 * 1024]
+
+# NOTE: pure python takes minutes to parse the largest results sizes
+YAML_RESULTS_SIZES = [1024 * 1024, 10 * 1024 * 1024]
+QUICK_YAML_RESULTS_SIZES = [1024 * 1024]
+
+# yaml implementations to compare parsing and dumping results files with
+YAML_IMPLEMENTATIONS = {'python': (yaml.SafeLoader, yaml.SafeDumper)}
+if yaml.__with_libyaml__:
+    YAML_IMPLEMENTATIONS['libyaml'] = (yaml.CSafeLoader, yaml.CSafeDumper)
+
+# differences smaller then this are noise no matter the relative change
+MIN_LATENCY_REGRESSION = 0.005
+MIN_MEMORY_REGRESSION = 64 * 1024
+
+POM = '''<project>
+    <modelVersion>4.0.0</modelVersion>
+    <groupId>com.example</groupId>
+    <artifactId>benchmark-{index}</artifactId>
+    <version>1.0.{index}</version>
+</project>
+'''
+
+GLOBAL_DEFAULTS = {
+    'application-name': 'benchmark',
+    'service-name': 'service',
+    'organization': 'tssc',
+    'destination-url': 'registry.example.com'
+}
+
+class Workspace:
+    """
+    Temporary directory with a synthetic project to run tssc steps in.
+
+    Parameters
+    ----------
+    pom_count : int
+        Number of maven projects to create in the workspace.
+    results_size : int
+        Approximate size in bytes of the results of previous steps to create in the workspace.
+    """
+
+    def __init__(self, pom_count=1, results_size=0):
+        self.path = tempfile.mkdtemp(prefix='tssc-benchmark-')
+        self.results_dir_path = os.path.join(self.path, 'tssc-results')
+        self.results_file_path = os.path.join(self.results_dir_path, 'tssc-results.yml')
+        self.pom_file_paths = []
+
+        for index in range(pom_count):
+            pom_dir_path = os.path.join(self.path, 'project-' + str(index))
+            os.makedirs(pom_dir_path)
+            pom_file_path = os.path.join(pom_dir_path, 'pom.xml')
+            with open(pom_file_path, 'w') as pom_file:
+                pom_file.write(POM.format(index=index))
+            self.pom_file_paths.append(pom_file_path)
+
+        with open(os.path.join(self.path, 'Dockerfile'), 'w') as dockerfile:
+            dockerfile.write('FROM scratch\n')
+
+        os.makedirs(self.results_dir_path)
+        with open(self.results_file_path, 'w') as results_file:
+            write_results(results_file, results_size)
+
+    def remove(self):
+        """
+        Removes the workspace.
+        """
+        shutil.rmtree(self.path, ignore_errors=True)
+
+def write_results(results_file, results_size):
+    """
+    Writes the results of the steps before the benchmarked steps.
+
+    The results are written a test case at a time so that creating them does not raise the
+    peak memory of the process running the benchmark.
+
+    Parameters
+    ----------
+    results_file : file
+        File to write the results to.
+    results_size : int
+        Approximate size in bytes of the results.
+    """
+    yaml.dump(
+        {
+            'tssc-results': {
+                'generate-metadata': {
+                    'version': '1.0.0',
+                    'image-tag': '1.0.0'
+                },
+                'create-container-image': {
+                    'image-tag': 'localhost/benchmark/service:1.0.0',
+                    'image-tar-file': 'image-benchmark-service-1.0.0.tar'
+                }
+            }
+        },
+        results_file)
+
+    results_file.write('  unit-test:\n    test-cases:\n')
+    written_size = 0
+    index = 0
+    while written_size < results_size:
+        test_case = '    - {{name: test_case_{index}, result: passed, time: {time}}}\n'.format(
+            index=index,
+            time=index % 100)
+        results_file.write(test_case)
+        written_size += len(test_case)
+        index += 1
+
+def sub_steps_config(workspace):
+    """
+    Parameters
+    ----------
+    workspace : Workspace
+        Workspace to create the configuration for.
+
+    Returns
+    -------
+    dict
+        TSSC configuration with a generate-metadata sub step for each pom in the workspace.
+    """
+    return {
+        'tssc-config': {
+            'global-defaults': GLOBAL_DEFAULTS,
+            'generate-metadata': [
+                {'implementer': 'Maven', 'config': {'pom-file': pom_file_path}}
+                for pom_file_path in workspace.pom_file_paths
+            ]
+        }
+    }
+
+def workflow_config(workspace):
+    """
+    Parameters
+    ----------
+    workspace : Workspace
+        Workspace to create the configuration for.
+
+    Returns
+    -------
+    dict
+        TSSC configuration for the steps with a stub toolchain.
+    """
+    return {
+        'tssc-config': {
+            'global-defaults': GLOBAL_DEFAULTS,
+            'package': {
+                'implementer': 'Maven',
+                'config': {'pom-file': workspace.pom_file_paths[0]}
+            },
+            'tag-source': {'implementer': 'Git'},
+            'create-container-image': {'implementer': 'Buildah'},
+            'push-container-image': {'implementer': 'Skopeo'}
+        }
+    }
+
+@contextlib.contextmanager
+def in_workspace(workspace):
+    """
+    Runs the context in the given workspace with the stub toolchain on the path and the
+    output of the steps discarded.
+
+    Parameters
+    ----------
+    workspace : Workspace
+        Workspace to run the context in.
+    """
+    original_cwd = os.getcwd()
+    original_path = os.environ.get('PATH', '')
+    os.chdir(workspace.path)
+    os.environ['PATH'] = STUB_BIN_DIR_PATH + os.pathsep + original_path
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        os.environ['PATH'] = original_path
+        os.chdir(original_cwd)
+
+def measure(name, create_workspace, operation, args):
+    """
+    Measures the latency and peak memory of the given operation.
+
+    Parameters
+    ----------
+    name : str
+        Name of the benchmark of the operation.
+    create_workspace : callable
+        Function creating a fresh Workspace to run each repetition of the operation in.
+    operation : callable
+        Function running the operation given the Workspace.
+    args : argparse.Namespace
+        Parsed benchmark arguments.
+
+    Returns
+    -------
+    dict
+        Median and minimum latency in seconds and peak memory in bytes of the operation.
+    """
+    latencies = []
+    for _ in range(args.repeat):
+        workspace = create_workspace()
+        try:
+            with in_workspace(workspace):
+                start = time.perf_counter()
+                operation(workspace)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            workspace.remove()
+
+    measure_memory_args = [
+        sys.executable, os.path.abspath(__file__),
+        '--measure-memory', name,
+        '--results-format', args.results_format
+    ]
+    if args.quick:
+        measure_memory_args.append('--quick')
+    peak_memory = json.loads(subprocess.run(
+        measure_memory_args,
+        check=True,
+        stdout=subprocess.PIPE
+    ).stdout.decode('utf-8'))
+
+    return {
+        'median-latency': statistics.median(latencies),
+        'min-latency': min(latencies),
+        'peak-memory': peak_memory
+    }
+
+def measure_memory(create_workspace, operation):
+    """
+    Measures how much the given operation grows the peak resident memory of this process.
+
+    Parameters
+    ----------
+    create_workspace : callable
+        Function creating a fresh Workspace to run the operation in.
+    operation : callable
+        Function running the operation given the Workspace.
+
+    Returns
+    -------
+    int
+        Growth of the peak resident memory of this process in bytes.
+    """
+    workspace = create_workspace()
+    try:
+        with in_workspace(workspace):
+            start_peak_memory = _peak_memory()
+            operation(workspace)
+            return _peak_memory() - start_peak_memory
+    finally:
+        workspace.remove()
+
+def _peak_memory():
+    """
+    Returns
+    -------
+    int
+        Peak resident memory of this process in bytes.
+    """
+    # NOTE: on linux ru_maxrss is kept across exec so it would include the peak memory of the
+    #       benchmark process that started this one, VmHWM is reset by exec
+    try:
+        with open('/proc/self/status', 'r') as status_file:
+            for line in status_file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    # NOTE: reported in bytes on macOS and kilobytes everywhere else
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak_memory
+    return peak_memory * 1024
+
+def run_cli_startup(workspace): # pylint: disable=unused-argument
+    """
+    Starts a new tssc process that only parses its arguments.
+    """
+    subprocess.run(
+        [sys.executable, '-m', 'tssc', '--help'],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        env={**os.environ, 'PYTHONPATH': os.path.dirname(BENCHMARKS_DIR_PATH)})
+
+def create_run_sub_steps(results_format):
+    """
+    Returns
+    -------
+    callable
+        Operation running the generate-metadata step with a sub step per pom in the workspace.
+    """
+    def run_sub_steps(workspace):
+        TSSCFactory(
+            sub_steps_config(workspace),
+            workspace.results_dir_path,
+            results_format=results_format
+        ).run_step('generate-metadata')
+
+    return run_sub_steps
+
+def create_run_package(results_format):
+    """
+    Returns
+    -------
+    callable
+        Operation running the package step with the stub mvn.
+    """
+    def run_package(workspace):
+        TSSCFactory(
+            workflow_config(workspace),
+            workspace.results_dir_path,
+            results_format=results_format
+        ).run_step('package')
+
+    return run_package
+
+def create_run_cli_main(step_name, results_format):
+    """
+    Returns
+    -------
+    callable
+        Operation running the given step with the stub toolchain through the CLI entry point.
+    """
+    def run_cli_main(workspace):
+        config_file_path = os.path.join(workspace.path, 'tssc-config.yml')
+        with open(config_file_path, 'w') as config_file:
+            yaml.dump(workflow_config(workspace), config_file)
+
+        main([
+            '--step', step_name,
+            '--config-file', config_file_path,
+            '--results-dir', workspace.results_dir_path,
+            '--results-format', results_format
+        ])
+
+    return run_cli_main
+
+def create_parse_results(loader):
+    """
+    Returns
+    -------
+    callable
+        Operation parsing the results file of the workspace with the given yaml loader.
+    """
+    def parse_results(workspace):
+        with open(workspace.results_file_path, 'r') as results_file:
+            safe_load(results_file, loader=loader)
+
+    return parse_results
+
+def create_dump_results(dumper):
+    """
+    Returns
+    -------
+    callable
+        Operation dumping the parsed results file of the workspace with the given yaml dumper.
+    """
+    def dump_results(workspace):
+        with open(workspace.results_file_path, 'r') as results_file:
+            results = safe_load(results_file)
+        with open(workspace.results_file_path, 'w') as results_file:
+            safe_dump(results, results_file, dumper=dumper)
+
+    return dump_results
+
+def format_size(size):
+    """
+    Returns
+    -------
+    str
+        Given size in bytes in the largest whole unit.
+    """
+    for unit in ['B', 'KB', 'MB']:
+        if size < 1024 or unit == 'MB':
+            return str(round(size)) + unit
+        size /= 1024
+
+    return str(size)
+
+def create_benchmarks(args):
+    """
+    Returns
+    -------
+    list
+        (name, create workspace function, operation function) of each benchmark to run.
+    """
+    sub_step_counts = QUICK_SUB_STEP_COUNTS if args.quick else SUB_STEP_COUNTS
+    results_sizes = QUICK_RESULTS_SIZES if args.quick else RESULTS_SIZES
+    yaml_results_sizes = QUICK_YAML_RESULTS_SIZES if args.quick else YAML_RESULTS_SIZES
+
+    benchmarks = [('cli-startup', Workspace, run_cli_startup)]
+
+    for sub_step_count in sub_step_counts:
+        benchmarks.append((
+            'run-step-sub-steps-' + str(sub_step_count),
+            lambda sub_step_count=sub_step_count: Workspace(pom_count=sub_step_count),
+            create_run_sub_steps(args.results_format)))
+
+    for results_size in results_sizes:
+        benchmarks.append((
+            'run-step-results-' + format_size(results_size),
+            lambda results_size=results_size: Workspace(results_size=results_size),
+            create_run_package(args.results_format)))
+
+    # NOTE: dump-results also parses the results, always with the fastest loader so only the
+    #       dumpers differ between implementations
+    for results_size in yaml_results_sizes:
+        for implementation, (loader, dumper) in YAML_IMPLEMENTATIONS.items():
+            benchmarks.append((
+                'parse-results-{size}-{implementation}'.format(
+                    size=format_size(results_size),
+                    implementation=implementation),
+                lambda results_size=results_size: Workspace(results_size=results_size),
+                create_parse_results(loader)))
+            benchmarks.append((
+                'dump-results-{size}-{implementation}'.format(
+                    size=format_size(results_size),
+                    implementation=implementation),
+                lambda results_size=results_size: Workspace(results_size=results_size),
+                create_dump_results(dumper)))
+
+    for step_name in ['package', 'tag-source', 'create-container-image', 'push-container-image']:
+        benchmarks.append((
+            'cli-main-' + step_name,
+            Workspace,
+            create_run_cli_main(step_name, args.results_format)))
+
+    return benchmarks
+
+def compare_to_baseline(measurements, baseline, tolerance):
+    """
+    Compares the given measurements to the given baseline.
+
+    Parameters
+    ----------
+    measurements : dict
+        Measurements of each benchmark by name.
+    baseline : dict
+        Baseline measurements of each benchmark by name.
+    tolerance : float
+        Relative increase of the median latency or peak memory over the baseline that is
+        considered a regression.
+
+    Returns
+    -------
+    list
+        Names of the benchmarks that regressed.
+    """
+    regressions = []
+    for name, measurement in measurements.items():
+        if name not in baseline:
+            continue
+
+        baseline_measurement = baseline[name]
+        latency_increase = \
+            measurement['median-latency'] - baseline_measurement['median-latency']
+        memory_increase = measurement['peak-memory'] - baseline_measurement['peak-memory']
+        if (latency_increase > baseline_measurement['median-latency'] * tolerance and
+                latency_increase > MIN_LATENCY_REGRESSION) or \
+                (memory_increase > baseline_measurement['peak-memory'] * tolerance and
+                 memory_increase > MIN_MEMORY_REGRESSION):
+            regressions.append(name)
+
+    return regressions
+
+def print_measurements(measurements, baseline, regressions):
+    """
+    Prints a table of the given measurements compared to the given baseline.
+    """
+    rows = []
+    for name, measurement in measurements.items():
+        row = [
+            name,
+            '{:.4f}'.format(measurement['median-latency']),
+            '{:.4f}'.format(measurement['min-latency']),
+            '{:.2f}'.format(measurement['peak-memory'] / (1024 * 1024))
+        ]
+        if name in baseline:
+            row += [
+                '{:+.1%}'.format(
+                    measurement['median-latency'] / baseline[name]['median-latency'] - 1),
+                '{:+.1%}'.format(
+                    measurement['peak-memory'] / max(baseline[name]['peak-memory'], 1) - 1),
+                'REGRESSION' if name in regressions else ''
+            ]
+        rows.append(row)
+
+    headers = ['operation', 'median (s)', 'min (s)', 'peak memory (MB)']
+    if baseline:
+        headers += ['latency vs baseline', 'memory vs baseline', '']
+    print(tabulate(rows, headers=headers))
+
+def print_yaml_speedups(measurements):
+    """
+    Prints how many times faster libyaml parsed and dumped the results files then pure python.
+    """
+    rows = []
+    for name, measurement in measurements.items():
+        if not name.endswith('-python'):
+            continue
+
+        operation = name[:-len('-python')]
+        if operation + '-libyaml' in measurements:
+            rows.append([
+                operation,
+                '{:.1f}x'.format(
+                    measurement['median-latency'] /
+                    measurements[operation + '-libyaml']['median-latency'])
+            ])
+
+    if rows:
+        print()
+        print(tabulate(rows, headers=['operation', 'libyaml speedup']))
+
+def parse_args(argv):
+    """
+    Returns
+    -------
+    argparse.Namespace
+        Parsed benchmark arguments.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the overhead of tssc.')
+    parser.add_argument(
+        '--quick',
+        action='store_true',
+        help='Only run the smaller sub step counts and results sizes.'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Number of times to time each operation.'
+    )
+    parser.add_argument(
+        '--results-format',
+        default='yaml',
+        help='Format to store the TSSC workflow results in.'
+    )
+    parser.add_argument(
+        '--filter',
+        help='Only run the benchmarks whose name contains this.'
+    )
+    parser.add_argument(
+        '--baseline',
+        help='Baseline JSON file to compare the measurements to.'
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.25,
+        help='Relative increase over the baseline considered a regression.'
+    )
+    parser.add_argument(
+        '--save-baseline',
+        help='JSON file to save the measurements to as a baseline.'
+    )
+    parser.add_argument(
+        '--measure-memory',
+        metavar='BENCHMARK',
+        help=argparse.SUPPRESS
+    )
+    return parser.parse_args(argv)
+
+def run_benchmarks(argv=None):
+    """
+    Runs the benchmarks.
+
+    Returns
+    -------
+    int
+        1 if any benchmark regressed compared to the given baseline, 0 otherwise.
+    """
+    args = parse_args(argv)
+
+    measurements = {}
+    for name, create_workspace, operation in create_benchmarks(args):
+        if args.measure_memory:
+            if name == args.measure_memory:
+                print(json.dumps(measure_memory(create_workspace, operation)))
+                return 0
+        elif not args.filter or args.filter in name:
+            measurements[name] = measure(name, create_workspace, operation, args)
+
+    if args.measure_memory:
+        print('Unknown benchmark: ' + args.measure_memory, file=sys.stderr)
+        return 2
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r') as baseline_file:
+            baseline = json.load(baseline_file)['measurements']
+
+    regressions = compare_to_baseline(measurements, baseline, args.tolerance)
+    print_measurements(measurements, baseline, regressions)
+    print_yaml_speedups(measurements)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as baseline_file:
+            json.dump(
+                {
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'results-format': args.results_format,
+                    'measurements': measurements
+                },
+                baseline_file,
+                indent=2,
+                sort_keys=True)
+            baseline_file.write('\n')
+
+    if regressions:
+        print('Regressed compared to the baseline: ' + ', '.join(regressions), file=sys.stderr)
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(run_benchmarks())
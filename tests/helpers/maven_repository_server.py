@@ -0,0 +1,63 @@
+import base64
+import http.server
+import socketserver
+import threading
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+class MavenRepositoryServer:
+    """
+    Local stand in for a Maven repository recording the files PUT to it.
+
+    Use as a context manager, `url` is the url of the repository.
+    """
+
+    def __init__(self, user=None, password=None, fail_paths=None, close_connections=False):
+        self.files = {}
+        self.client_ports = set()
+        self.authorization = None
+        if user:
+            self.authorization = 'Basic ' + base64.b64encode(
+                (user + ':' + password).encode('utf-8')).decode('ascii')
+
+        server = self
+        fail_paths = fail_paths or []
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_PUT(self):
+                content = self.rfile.read(int(self.headers['Content-Length']))
+                server.client_ports.add(self.client_address[1])
+
+                if server.authorization and \
+                        self.headers.get('Authorization') != server.authorization:
+                    status = 401
+                elif self.path in fail_paths:
+                    status = 500
+                else:
+                    server.files[self.path] = content
+                    status = 201
+
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                if close_connections:
+                    self.send_header('Connection', 'close')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.__http_server = _ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{port}/repository/releases/'.format(
+            port=self.__http_server.server_address[1])
+
+    def __enter__(self):
+        threading.Thread(target=self.__http_server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__http_server.shutdown()
+        self.__http_server.server_close()
+        return False
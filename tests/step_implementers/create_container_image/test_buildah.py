@@ -1,3 +1,4 @@
+import os
 import sh
 import sys
 
@@ -5,6 +6,7 @@ import unittest
 from unittest.mock import patch
 from testfixtures import TempDirectory
 
+from tssc import TSSCFactory
 from tssc.step_implementers.create_container_image import Buildah
 
 from test_utils import *
@@ -169,6 +171,7 @@ class TestStepImplementerCreateContainerImageBuildah(unittest.TestCase):
                 '--format=oci',
                 '--tls-verify=true',
                 '--layers',
+                '--iidfile', unittest.mock.ANY,
                 '-f', file,
                 '-t', tag,
                 temp_dir.path,
@@ -243,6 +246,7 @@ class TestStepImplementerCreateContainerImageBuildah(unittest.TestCase):
                 '--format=oci',
                 '--tls-verify=true',
                 '--layers',
+                '--iidfile', unittest.mock.ANY,
                 '-f', file,
                 '-t', '{tag}'.format(tag=tag),
                 temp_dir.path,
@@ -295,6 +299,7 @@ class TestStepImplementerCreateContainerImageBuildah(unittest.TestCase):
                 '--format=oci',
                 '--tls-verify=true',
                 '--layers',
+                '--iidfile', unittest.mock.ANY,
                 '-f', file,
                 '-t', tag,
                 temp_dir.path,
@@ -389,6 +394,7 @@ class TestStepImplementerCreateContainerImageBuildah(unittest.TestCase):
                 '--format=oci',
                 '--tls-verify=true',
                 '--layers',
+                '--iidfile', unittest.mock.ANY,
                 '-f', file,
                 '-t', tag,
                 temp_dir.path,
@@ -463,9 +469,204 @@ class TestStepImplementerCreateContainerImageBuildah(unittest.TestCase):
                 '--format=oci',
                 '--tls-verify=true',
                 '--layers',
+                '--iidfile', unittest.mock.ANY,
                 '-f', file,
                 '-t', tag,
                 temp_dir.path,
                 _out=sys.stdout
             )
             buildah_mock.push.assert_called()
+
+    @patch('sh.buildah', create=True)
+    def test_create_container_image_specify_buildah_implementer_oci_export(self, buildah_mock):
+        with TempDirectory() as temp_dir:
+            application_name = 'foo'
+            service_name = 'bar'
+            tag = 'localhost/foo/bar:latest'
+            oci_layout_dir = os.path.join(temp_dir.path, 'oci-layout')
+            image_ref = 'oci:{oci_layout_dir}:foo-bar-latest'.format(oci_layout_dir=oci_layout_dir)
+            image_digest = 'sha256:' + 'a' * 64
+
+            temp_dir.write('Dockerfile',b'FROM registry.access.redhat.com/ubi8:latest')
+            config = {
+                'tssc-config': {
+                    'global-defaults': {
+                        'application-name': application_name,
+                        'service-name': service_name
+                    },
+                    'create-container-image': {
+                        'implementer': 'Buildah',
+                        'config': {
+                            'context' : temp_dir.path,
+                            'image-export': 'oci',
+                            'oci-layout-dir': oci_layout_dir
+                        }
+                    }
+                }
+            }
+
+            def buildah_push_side_effect(*args, **kwargs):
+                with open(args[1], 'w') as digest_file:
+                    digest_file.write(image_digest)
+            buildah_mock.push.side_effect = buildah_push_side_effect
+
+            expected_step_results = {'tssc-results': {
+                'create-container-image': {
+                    'image-tag': tag,
+                    'image-ref': image_ref,
+                    'image-digest': image_digest
+                }
+            }}
+            run_step_test_with_result_validation(temp_dir, 'create-container-image', config, expected_step_results)
+            buildah_mock.push.assert_called_once_with(
+                '--digestfile', unittest.mock.ANY,
+                tag,
+                image_ref,
+                _out=sys.stdout
+            )
+            self.assertFalse(os.path.exists('image-foo-bar-latest.tar'))
+
+    @patch('sh.buildah', create=True)
+    def test_create_container_image_specify_buildah_implementer_containers_storage_export(self, buildah_mock):
+        with TempDirectory() as temp_dir:
+            tag = 'localhost/foo/bar:latest'
+            image_digest = 'sha256:' + 'b' * 64
+
+            temp_dir.write('Dockerfile',b'FROM registry.access.redhat.com/ubi8:latest')
+            config = {
+                'tssc-config': {
+                    'global-defaults': {
+                        'application-name': 'foo',
+                        'service-name': 'bar'
+                    },
+                    'create-container-image': {
+                        'implementer': 'Buildah',
+                        'config': {
+                            'context' : temp_dir.path,
+                            'image-export': 'containers-storage'
+                        }
+                    }
+                }
+            }
+            buildah_mock.inspect.return_value = image_digest + '\n'
+
+            expected_step_results = {'tssc-results': {
+                'create-container-image': {
+                    'image-tag': tag,
+                    'image-ref': 'containers-storage:' + tag,
+                    'image-digest': image_digest
+                }
+            }}
+            run_step_test_with_result_validation(temp_dir, 'create-container-image', config, expected_step_results)
+            buildah_mock.push.assert_not_called()
+            buildah_mock.inspect.assert_called_once_with(
+                '--type', 'image',
+                '--format', '{{.FromImageDigest}}',
+                tag,
+                _encoding='UTF-8',
+                _decode_errors='ignore'
+            )
+
+    def test_create_container_image_specify_buildah_implementer_unknown_image_export(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('Dockerfile',b'FROM registry.access.redhat.com/ubi8:latest')
+            config = {
+                'tssc-config': {
+                    'global-defaults': {
+                        'application-name': 'foo',
+                        'service-name': 'bar'
+                    },
+                    'create-container-image': {
+                        'implementer': 'Buildah',
+                        'config': {
+                            'context' : temp_dir.path,
+                            'image-export': 'dir'
+                        }
+                    }
+                }
+            }
+
+            with self.assertRaisesRegex(
+                    AssertionError,
+                    r"Unknown image export \(dir\), expected one of: \['docker-archive', 'containers-storage', 'oci'\]"):
+                run_step_test_with_result_validation(temp_dir, 'create-container-image', config, {})
+
+    @patch('sh.buildah', create=True)
+    def test_create_container_image_specify_buildah_implementer_reuse_image(self, buildah_mock):
+        with TempDirectory() as temp_dir:
+            tag = 'localhost/foo/bar:latest'
+            image_id = 'a' * 64
+
+            temp_dir.write('Dockerfile', b'FROM registry.access.redhat.com/ubi8:latest')
+            temp_dir.write('.dockerignore', b'target\n*.log\n')
+            temp_dir.write('src/app.py', b'print("hello")')
+            temp_dir.write('target/app.jar', b'jar')
+            config = {
+                'tssc-config': {
+                    'global-defaults': {
+                        'application-name': 'foo',
+                        'service-name': 'bar'
+                    },
+                    'create-container-image': {
+                        'implementer': 'Buildah',
+                        'config': {
+                            'context' : temp_dir.path
+                        }
+                    }
+                }
+            }
+
+            def buildah_bud_side_effect(*args, **kwargs):
+                with open(args[4], 'w') as image_id_file:
+                    image_id_file.write(image_id)
+            buildah_mock.bud.side_effect = buildah_bud_side_effect
+
+            def run_step(step_config_runtime_overrides=None):
+                buildah_mock.reset_mock()
+                TSSCFactory(
+                    config,
+                    os.path.join(temp_dir.path, 'tssc-results'),
+                    work_dir_path=os.path.join(temp_dir.path, 'tssc-working')
+                ).run_step('create-container-image', step_config_runtime_overrides)
+
+            run_step()
+            buildah_mock.bud.assert_called_once()
+            buildah_mock.tag.assert_not_called()
+
+            # only ignored files and the output of the step changed
+            temp_dir.write('target/app.jar', b'new jar')
+            temp_dir.write('build.log', b'log')
+            run_step()
+            buildah_mock.bud.assert_not_called()
+            buildah_mock.inspect.assert_called_once_with(
+                '--type', 'image',
+                image_id,
+                _out=None
+            )
+            buildah_mock.tag.assert_called_once_with(image_id, tag, _out=sys.stdout)
+            buildah_mock.push.assert_called_once()
+
+            # the image is no longer in local container storage
+            buildah_mock.inspect.side_effect = sh.ErrorReturnCode('buildah inspect', b'', b'')
+            run_step()
+            buildah_mock.bud.assert_called_once()
+            buildah_mock.inspect.side_effect = None
+
+            temp_dir.write('src/app.py', b'print("hello world")')
+            run_step()
+            buildah_mock.bud.assert_called_once()
+            buildah_mock.tag.assert_not_called()
+
+            config['tssc-config']['create-container-image']['config']['reuse-image'] = False
+            run_step()
+            buildah_mock.bud.assert_called_once()
+            buildah_mock.inspect.assert_not_called()
+
+            # values given with --step-config are always strings
+            run_step({'reuse-image': 'false'})
+            buildah_mock.bud.assert_called_once()
+            buildah_mock.inspect.assert_not_called()
+
+            run_step({'reuse-image': 'true'})
+            buildah_mock.bud.assert_not_called()
+            buildah_mock.tag.assert_called_once_with(image_id, tag, _out=sys.stdout)
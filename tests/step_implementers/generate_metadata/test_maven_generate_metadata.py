@@ -79,6 +79,41 @@ class TestStepImplementerGenerateMetadataMaven(unittest.TestCase):
     
             run_step_test_with_result_validation(temp_dir, 'generate-metadata', config, expected_step_results)
     
+    def test_pom_file_ci_friendly_version(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('pom.xml',b'''<project>
+        <modelVersion>4.0.0</modelVersion>
+        <groupId>com.mycompany.app</groupId>
+        <artifactId>my-app-parent</artifactId>
+        <version>${revision}${changelist}</version>
+        <properties>
+            <revision>42.1</revision>
+            <changelist>-SNAPSHOT</changelist>
+        </properties>
+    </project>''')
+            temp_dir.write('my-app/pom.xml',b'''<project>
+        <modelVersion>4.0.0</modelVersion>
+        <parent>
+            <groupId>com.mycompany.app</groupId>
+            <artifactId>my-app-parent</artifactId>
+            <version>${revision}${changelist}</version>
+        </parent>
+        <artifactId>my-app</artifactId>
+    </project>''')
+            pom_file_path = os.path.join(temp_dir.path, 'my-app', 'pom.xml')
+            config = {
+                'tssc-config': {
+                    'generate-metadata': {
+                        'implementer': 'Maven',
+                        'config': {
+                            'pom-file': str(pom_file_path)
+                        }
+                    }
+                }
+            }
+            expected_step_results = {'tssc-results': {'generate-metadata': {'app-version': '42.1-SNAPSHOT'}}}
+            run_step_test_with_result_validation(temp_dir, 'generate-metadata', config, expected_step_results)
+
     def test_pom_file_missing_version(self):
         with TempDirectory() as temp_dir:
             temp_dir.write('pom.xml',b'''<project>
@@ -11,6 +11,12 @@ from tests.helpers.test_utils import run_step_test_with_result_validation
 from tssc import TSSCFactory
 from tssc.step_implementers.package import Maven
 
+DEFAULT_BUILD_MODE = {
+    'goals': ['clean', 'install'],
+    'threads': None,
+    'offline': False,
+    'local-repository': None
+}
 
 def create_mvn_side_effect(pom_file, artifact_parent_dir, artifact_names):
     """simulates what mvn does by touching files.
@@ -114,6 +120,7 @@ class TestStepImplementerPackageMaven(unittest.TestCase):
             expected_step_results = {
                 'tssc-results': {
                     'package': {
+                        'build-mode': DEFAULT_BUILD_MODE,
                         'artifacts': [{
                             'path': os.path.join(
                                 temp_dir.path,
@@ -132,7 +139,105 @@ class TestStepImplementerPackageMaven(unittest.TestCase):
             mvn_mock.side_effect = create_mvn_side_effect(pom_file_path, 'target', [artifact_file_name])
             run_step_test_with_result_validation(temp_dir, 'package', config, expected_step_results)
             mvn_mock.assert_called_once_with('clean', 'install', '-f', pom_file_path, _out=sys.stdout)
-    
+
+    @patch('sh.mvn', create=True)
+    def test_mvn_incremental_build_mode(self, mvn_mock):
+        with TempDirectory() as temp_dir:
+            temp_dir.write(
+                'pom.xml',
+                b'''<project>
+        <modelVersion>4.0.0</modelVersion>
+        <groupId>com.mycompany.app</groupId>
+        <artifactId>my-app</artifactId>
+        <version>1.0</version>
+    </project>'''
+            )
+            pom_file_path = os.path.join(temp_dir.path, 'pom.xml')
+            local_repository_path = os.path.join(temp_dir.path, 'm2-repository')
+            config = {
+                'tssc-config': {
+                    'package': {
+                        'implementer': 'Maven',
+                        'config': {
+                            'pom-file': str(pom_file_path),
+                            'goals': ['package'],
+                            'clean': False,
+                            'threads': '1C',
+                            'offline': True,
+                            'local-repository': local_repository_path
+                        }
+                    }
+                }
+            }
+            expected_step_results = {
+                'tssc-results': {
+                    'package': {
+                        'build-mode': {
+                            'goals': ['package'],
+                            'threads': '1C',
+                            'offline': True,
+                            'local-repository': local_repository_path
+                        },
+                        'artifacts': [{
+                            'path': os.path.join(temp_dir.path, 'target', 'my-app-1.0.jar'),
+                            'artifact-id': 'my-app',
+                            'group-id': 'com.mycompany.app',
+                            'package-type': 'jar',
+                            'pom-path': str(pom_file_path)
+                        }]
+                    }
+                }
+            }
+
+            mvn_mock.side_effect = \
+                lambda *args, **kwargs: temp_dir.write('target/my-app-1.0.jar', b'jar')
+            run_step_test_with_result_validation(temp_dir, 'package', config, expected_step_results)
+            mvn_mock.assert_called_once_with(
+                'package',
+                '-T', '1C',
+                '-o',
+                '-Dmaven.repo.local=' + local_repository_path,
+                '-f', pom_file_path,
+                _out=sys.stdout
+            )
+
+    @patch('sh.mvn', create=True)
+    def test_mvn_build_mode_step_config_strings(self, mvn_mock):
+        with TempDirectory() as temp_dir:
+            temp_dir.write(
+                'pom.xml',
+                b'''<project>
+        <modelVersion>4.0.0</modelVersion>
+        <groupId>com.mycompany.app</groupId>
+        <artifactId>my-app</artifactId>
+        <version>1.0</version>
+    </project>'''
+            )
+            pom_file_path = os.path.join(temp_dir.path, 'pom.xml')
+            config = {
+                'tssc-config': {
+                    'package': {
+                        'implementer': 'Maven',
+                        'config': {
+                            'pom-file': str(pom_file_path),
+                            'goals': ['package']
+                        }
+                    }
+                }
+            }
+            mvn_mock.side_effect = \
+                lambda *args, **kwargs: temp_dir.write('target/my-app-1.0.jar', b'jar')
+            factory = TSSCFactory(config, os.path.join(temp_dir.path, 'tssc-results'))
+
+            # values given with --step-config are always strings
+            factory.run_step('package', {'clean': 'false', 'offline': 'false'})
+            mvn_mock.assert_called_once_with('package', '-f', pom_file_path, _out=sys.stdout)
+
+            mvn_mock.reset_mock()
+            factory.run_step('package', {'clean': 'true', 'offline': 'true'})
+            mvn_mock.assert_called_once_with(
+                'clean', 'package', '-o', '-f', pom_file_path, _out=sys.stdout)
+
     @patch('sh.mvn', create=True)
     def test_mvn_quickstart_no_jar(self, mvn_mock):
         artifact_id = 'my-app'
@@ -173,6 +278,7 @@ class TestStepImplementerPackageMaven(unittest.TestCase):
             expected_step_results = {
                 'tssc-results': {
                     'package': {
+                        'build-mode': DEFAULT_BUILD_MODE,
                         'artifacts': [{
                             'path': os.path.join(
                                 temp_dir.path,
@@ -243,10 +349,9 @@ class TestStepImplementerPackageMaven(unittest.TestCase):
                                         <mainClass>com.mycompanya.app.App</mainClass>
                                     </manifest>
                                 </archive>
-                                <descriptorRefs>
-                                    <descriptorRef>jar-with-dependencies</descriptorRef>
-                                </descriptorRefs>
-                                <finalName>companya</finalName>
+                                <descriptors>
+                                    <descriptor>src/assembly/companya.xml</descriptor>
+                                </descriptors>
                             </configuration>
                         </execution>
                         <execution>
@@ -261,10 +366,9 @@ class TestStepImplementerPackageMaven(unittest.TestCase):
                                         <mainClass>com.mycompanyb.app.App</mainClass>
                                     </manifest>
                                 </archive>
-                                <descriptorRefs>
-                                    <descriptorRef>jar-with-dependencies</descriptorRef>
-                                </descriptorRefs>
-                                <finalName>companyb</finalName>
+                                <descriptors>
+                                    <descriptor>src/assembly/companyb.xml</descriptor>
+                                </descriptors>
                             </configuration>
                         </execution>
                     </executions>
@@ -284,27 +388,238 @@ class TestStepImplementerPackageMaven(unittest.TestCase):
                     }
                 }
             }
-            factory = TSSCFactory(config)
-            artifact_file_name = '{artifact_id}-{version}.{package}'.format(
-                artifact_id=artifact_id,
-                version=version,
-                package=package
+            artifact_classifiers = ['companya', 'companyb', None]
+            artifact_file_names = [
+                '{artifact_id}-{version}-companya.jar'.format(
+                    artifact_id=artifact_id, version=version),
+                '{artifact_id}-{version}-companyb.jar'.format(
+                    artifact_id=artifact_id, version=version),
+                '{artifact_id}-{version}.{package}'.format(
+                    artifact_id=artifact_id,
+                    version=version,
+                    package=package
+                )
+            ]
+            expected_artifacts = []
+            for artifact_file_name, classifier in zip(artifact_file_names, artifact_classifiers):
+                expected_artifact = {
+                    'path': os.path.join(
+                        temp_dir.path,
+                        'target',
+                        artifact_file_name
+                    ),
+                    'artifact-id': artifact_id,
+                    'group-id': 'com.mycompany.app',
+                    'package-type': package,
+                    'pom-path': str(pom_file_path)
+                }
+                if classifier:
+                    expected_artifact['classifier'] = classifier
+                expected_artifacts.append(expected_artifact)
+            expected_step_results = {
+                'tssc-results': {
+                    'package': {
+                        'build-mode': DEFAULT_BUILD_MODE,
+                        'artifacts': expected_artifacts
+                    }
+                }
+            }
+
+            mvn_mock.side_effect = create_mvn_side_effect(
+                pom_file_path,
+                'target',
+                artifact_file_names
             )
-            
+            run_step_test_with_result_validation(temp_dir, 'package', config, expected_step_results)
+
+    @patch('sh.mvn', create=True)
+    def test_mvn_sources_jar(self, mvn_mock):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('pom.xml', b'''<project>
+        <modelVersion>4.0.0</modelVersion>
+        <groupId>com.mycompany.app</groupId>
+        <artifactId>my-app</artifactId>
+        <version>1.0</version>
+    </project>''')
+            pom_file_path = os.path.join(temp_dir.path, 'pom.xml')
+            config = {
+                'tssc-config': {
+                    'package': {
+                        'implementer': 'Maven',
+                        'config': {
+                            'pom-file': str(pom_file_path)
+                        }
+                    }
+                }
+            }
+            expected_step_results = {
+                'tssc-results': {
+                    'package': {
+                        'build-mode': DEFAULT_BUILD_MODE,
+                        'artifacts': [
+                            {
+                                'path': os.path.join(temp_dir.path, 'target', 'my-app-1.0-sources.jar'),
+                                'artifact-id': 'my-app',
+                                'group-id': 'com.mycompany.app',
+                                'package-type': 'jar',
+                                'pom-path': str(pom_file_path),
+                                'classifier': 'sources'
+                            },
+                            {
+                                'path': os.path.join(temp_dir.path, 'target', 'my-app-1.0.jar'),
+                                'artifact-id': 'my-app',
+                                'group-id': 'com.mycompany.app',
+                                'package-type': 'jar',
+                                'pom-path': str(pom_file_path)
+                            }
+                        ]
+                    }
+                }
+            }
+
             mvn_mock.side_effect = create_mvn_side_effect(
                 pom_file_path,
                 'target',
-                [
-                    'companya-{version}-jar-with-dependencies.jar'.format(version=version),
-                    'companyb-{version}-jar-with-dependencies.jar'.format(version=version),
-                    artifact_file_name
-                ]
+                ['my-app-1.0.jar', 'my-app-1.0-sources.jar', 'original-my-app-1.0.jar']
+            )
+            run_step_test_with_result_validation(temp_dir, 'package', config, expected_step_results)
+
+    @patch('sh.mvn', create=True)
+    def test_mvn_artifacts_with_same_coordinates(self, mvn_mock):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('pom.xml', b'''<project>
+        <modelVersion>4.0.0</modelVersion>
+        <groupId>com.mycompany.app</groupId>
+        <artifactId>my-app</artifactId>
+        <version>1.0</version>
+    </project>''')
+            pom_file_path = os.path.join(temp_dir.path, 'pom.xml')
+            config = {
+                'tssc-config': {
+                    'package': {
+                        'implementer': 'Maven',
+                        'config': {
+                            'pom-file': str(pom_file_path)
+                        }
+                    }
+                }
+            }
+
+            mvn_mock.side_effect = create_mvn_side_effect(
+                pom_file_path,
+                'target',
+                ['companya.jar', 'companyb.jar']
             )
-            
             with self.assertRaisesRegex(
-                    ValueError, 
-                    'pom resulted in multiple artifacts with expected artifact extensions (.*), this is unsupported'):
-                factory.run_step('package')
+                    ValueError,
+                    r'built more then one artifact with the same classifier and extension'):
+                run_step_test_with_result_validation(temp_dir, 'package', config, {})
+
+    @patch('sh.mvn', create=True)
+    def test_mvn_multi_module(self, mvn_mock):
+        with TempDirectory() as temp_dir:
+            temp_dir.write(
+                'pom.xml',
+                b'''<project xmlns="http://maven.apache.org/POM/4.0.0">
+        <modelVersion>4.0.0</modelVersion>
+        <groupId>com.mycompany.app</groupId>
+        <artifactId>my-app-parent</artifactId>
+        <version>1.0</version>
+        <packaging>pom</packaging>
+        <modules>
+            <module>my-app-api</module>
+            <module>services</module>
+        </modules>
+    </project>'''
+            )
+            temp_dir.write(
+                'my-app-api/pom.xml',
+                b'''<project xmlns="http://maven.apache.org/POM/4.0.0">
+        <modelVersion>4.0.0</modelVersion>
+        <parent>
+            <groupId>com.mycompany.app</groupId>
+            <artifactId>my-app-parent</artifactId>
+            <version>1.0</version>
+        </parent>
+        <artifactId>my-app-api</artifactId>
+    </project>'''
+            )
+            temp_dir.write(
+                'services/pom.xml',
+                b'''<project xmlns="http://maven.apache.org/POM/4.0.0">
+        <modelVersion>4.0.0</modelVersion>
+        <parent>
+            <groupId>com.mycompany.app</groupId>
+            <artifactId>my-app-parent</artifactId>
+            <version>1.0</version>
+        </parent>
+        <artifactId>my-app-services</artifactId>
+        <packaging>pom</packaging>
+        <modules>
+            <module>my-app-web/pom.xml</module>
+        </modules>
+    </project>'''
+            )
+            temp_dir.write(
+                'services/my-app-web/pom.xml',
+                b'''<project xmlns="http://maven.apache.org/POM/4.0.0">
+        <modelVersion>4.0.0</modelVersion>
+        <parent>
+            <groupId>com.mycompany.app</groupId>
+            <artifactId>my-app-services</artifactId>
+            <version>1.0</version>
+        </parent>
+        <groupId>com.mycompany.app.web</groupId>
+        <artifactId>my-app-web</artifactId>
+        <packaging>war</packaging>
+    </project>'''
+            )
+            pom_file_path = os.path.join(temp_dir.path, 'pom.xml')
+            config = {
+                'tssc-config': {
+                    'package': {
+                        'implementer': 'Maven',
+                        'config': {
+                            'pom-file': str(pom_file_path)
+                        }
+                    }
+                }
+            }
+            expected_step_results = {
+                'tssc-results': {
+                    'package': {
+                        'build-mode': DEFAULT_BUILD_MODE,
+                        'artifacts': [
+                            {
+                                'path': os.path.join(
+                                    temp_dir.path, 'my-app-api', 'target', 'my-app-api-1.0.jar'),
+                                'artifact-id': 'my-app-api',
+                                'group-id': 'com.mycompany.app',
+                                'package-type': 'jar',
+                                'pom-path': os.path.join(temp_dir.path, 'my-app-api', 'pom.xml')
+                            },
+                            {
+                                'path': os.path.join(
+                                    temp_dir.path, 'services', 'my-app-web', 'target',
+                                    'my-app-web-1.0.war'),
+                                'artifact-id': 'my-app-web',
+                                'group-id': 'com.mycompany.app.web',
+                                'package-type': 'war',
+                                'pom-path': os.path.join(
+                                    temp_dir.path, 'services', 'my-app-web', 'pom.xml')
+                            }
+                        ]
+                    }
+                }
+            }
+
+            def mvn_side_effect(*args, **kwargs):
+                temp_dir.write('my-app-api/target/my-app-api-1.0.jar', b'api')
+                temp_dir.write('my-app-api/target/my-app-api-1.0.pom', b'api pom')
+                temp_dir.write('services/my-app-web/target/my-app-web-1.0.war', b'web')
+
+            mvn_mock.side_effect = mvn_side_effect
+            run_step_test_with_result_validation(temp_dir, 'package', config, expected_step_results)
     
     @patch('sh.mvn', create=True)
     def test_pom_file_valid_old_empty_jar(self, mvn_mock):
@@ -340,6 +655,7 @@ class TestStepImplementerPackageMaven(unittest.TestCase):
             expected_step_results = {
                 'tssc-results': {
                     'package': {
+                        'build-mode': DEFAULT_BUILD_MODE,
                         'artifacts': [{
                             'path': os.path.join(temp_dir.path, 'target', artifact_file_name),
                             'artifact-id': artifact_id,
@@ -393,6 +709,7 @@ class TestStepImplementerPackageMaven(unittest.TestCase):
             expected_step_results = {
                 'tssc-results': {
                     'package': {
+                        'build-mode': DEFAULT_BUILD_MODE,
                         'artifacts': [{
                             'path': os.path.join(temp_dir.path, 'target', artifact_file_name),
                             'artifact-id': artifact_id,
@@ -549,6 +866,7 @@ class TestStepImplementerPackageMaven(unittest.TestCase):
             expected_step_results = {
                 'tssc-results': {
                     'package': {
+                        'build-mode': DEFAULT_BUILD_MODE,
                         'artifacts': [{
                             'path': os.path.join(
                                 temp_dir.path,
@@ -1,5 +1,6 @@
 import sh
 import os
+import yaml
 
 import unittest 
 from unittest.mock import patch
@@ -9,6 +10,7 @@ from testfixtures import TempDirectory
 from tssc.step_implementers.push_artifacts import Maven
 
 from test_utils import *
+from maven_repository_server import MavenRepositoryServer
 
 class TestStepImplementerPushArtifact(unittest.TestCase):
 
@@ -443,3 +445,192 @@ class TestStepImplementerPushArtifact(unittest.TestCase):
 
             run_step_test_with_result_validation(temp_dir, 'push-artifacts', config, expected_step_results, runtime_args)
 
+    @patch('sh.mvn', create=True)
+    def test_push_artifact_with_classifier(self, mvn_mock):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('target/my-app-1.0.war', b'war')
+            temp_dir.write('target/my-app-1.0-sources.jar', b'sources')
+            war_file_path = os.path.join(temp_dir.path, 'target/my-app-1.0.war')
+            sources_file_path = os.path.join(temp_dir.path, 'target/my-app-1.0-sources.jar')
+            package_artifacts = [
+                {
+                    'path': war_file_path,
+                    'artifact-id': 'my-app',
+                    'group-id': 'com.mycompany.app',
+                    'package-type': 'war',
+                    'pom-path': 'pom.xml'
+                },
+                {
+                    'path': sources_file_path,
+                    'artifact-id': 'my-app',
+                    'group-id': 'com.mycompany.app',
+                    'package-type': 'war',
+                    'pom-path': 'pom.xml',
+                    'classifier': 'sources'
+                }
+            ]
+            temp_dir.write('tssc-results/tssc-results.yml', yaml.safe_dump({
+                'tssc-results': {
+                    'generate-metadata': {'version': '1.0-123abc'},
+                    'package': {'artifacts': package_artifacts}
+                }
+            }).encode())
+            config = {
+                'tssc-config': {
+                    'push-artifacts': {
+                        'implementer': 'Maven',
+                        'config': {
+                            'url': 'http://artifactory.apps.tssc.rht-set.com/artifactory/tssc',
+                        }
+                    }
+                 }
+            }
+            artifact_url = 'http://artifactory.apps.tssc.rht-set.com/artifactory/tssc/' + \
+                'com/mycompany/app/my-app/1.0-123abc/my-app-1.0-123abc'
+            expected_step_results = {
+                'tssc-results': {
+                    'generate-metadata': {'version': '1.0-123abc'},
+                    'package': {'artifacts': package_artifacts},
+                    'push-artifacts': {
+                        'artifacts': [
+                            {
+                                'artifact-id': 'my-app',
+                                'group-id': 'com.mycompany.app',
+                                'path': war_file_path,
+                                'url': artifact_url + '.war',
+                                'version': '1.0-123abc'
+                            },
+                            {
+                                'artifact-id': 'my-app',
+                                'group-id': 'com.mycompany.app',
+                                'path': sources_file_path,
+                                'url': artifact_url + '-sources.jar',
+                                'version': '1.0-123abc',
+                                'classifier': 'sources'
+                            }
+                        ]
+                    }
+                }
+            }
+
+            run_step_test_with_result_validation(temp_dir, 'push-artifacts', config, expected_step_results, {})
+
+            self.assertEqual(mvn_mock.call_count, 2)
+            main_args = mvn_mock.call_args_list[0][0]
+            self.assertIn('-Dpackaging=war', main_args)
+            self.assertFalse([arg for arg in main_args if arg.startswith('-Dclassifier')])
+            sources_args = mvn_mock.call_args_list[1][0]
+            self.assertIn('-Dfile=' + sources_file_path, sources_args)
+            self.assertIn('-Dpackaging=jar', sources_args)
+            self.assertIn('-Dclassifier=sources', sources_args)
+            self.assertIn('-DgeneratePom=false', sources_args)
+
+    @patch('sh.mvn', create=True)
+    def test_push_artifact_with_http_uploader(self, mvn_mock):
+        with TempDirectory() as temp_dir, \
+                MavenRepositoryServer('unit.test.user', 'unit.test.password') as server:
+            temp_dir.makedir('target')
+            temp_dir.write('target/my-app-1.0-SNAPSHOT.jar', b'''sandbox''')
+            jar_file_path = os.path.join(temp_dir.path, 'target/my-app-1.0-SNAPSHOT.jar')
+            tssc_results='''tssc-results:
+                generate-metadata:
+                    version: 1.0-123abc
+                package:
+                    'artifacts': [{
+                        'path':'''+ str(jar_file_path)+''',
+                        'artifact-id': 'my-app',
+                        'group-id': 'com.mycompany.app',
+                        'package-type': 'jar',
+                        'pom-path': 'pom.xml'
+                    }]
+            '''
+            temp_dir.write('tssc-results/tssc-results.yml', tssc_results.encode())
+            config = {
+                'tssc-config': {
+                    'push-artifacts': {
+                        'implementer': 'Maven',
+                        'config': {
+                            'url': server.url,
+                            'uploader': 'http'
+                        }
+                    }
+                 }
+            }
+            runtime_args = {
+                'user': 'unit.test.user',
+                'password': 'unit.test.password',
+                # values given with --step-config are always strings
+                'upload-max-connections': '2'
+            }
+            expected_step_results = {
+                'tssc-results':
+                    {
+                        'generate-metadata':
+                        {
+                            'version': '1.0-123abc'
+                        },
+                        'package':
+                        {
+                            'artifacts':
+                            [
+                                {
+                                    'artifact-id': 'my-app',
+                                    'group-id': 'com.mycompany.app',
+                                    'package-type': 'jar',
+                                    'path': str(jar_file_path),
+                                    'pom-path': 'pom.xml'
+                                }
+                             ]
+                        },
+                        'push-artifacts':
+                        {
+                            'artifacts':
+                            [
+                                {
+                                    'artifact-id': 'my-app',
+                                    'group-id': 'com.mycompany.app',
+                                    'path': str(jar_file_path),
+                                    'url': server.url + '/com/mycompany/app/my-app/1.0-123abc/my-app-1.0-123abc.jar',
+                                    'version': '1.0-123abc'
+                                }
+                            ]
+                        }
+                    }
+            }
+
+            run_step_test_with_result_validation(temp_dir, 'push-artifacts', config, expected_step_results, runtime_args)
+
+            mvn_mock.assert_not_called()
+            artifact_dir = '/repository/releases/com/mycompany/app/my-app/1.0-123abc/'
+            self.assertEqual(
+                sorted(server.files),
+                [
+                    artifact_dir + 'my-app-1.0-123abc.jar',
+                    artifact_dir + 'my-app-1.0-123abc.jar.md5',
+                    artifact_dir + 'my-app-1.0-123abc.jar.sha1',
+                    artifact_dir + 'my-app-1.0-123abc.pom',
+                    artifact_dir + 'my-app-1.0-123abc.pom.md5',
+                    artifact_dir + 'my-app-1.0-123abc.pom.sha1'
+                ]
+            )
+            self.assertEqual(server.files[artifact_dir + 'my-app-1.0-123abc.jar'], b'sandbox')
+
+    @patch('sh.mvn', create=True)
+    def test_push_artifact_with_unknown_uploader(self, mvn_mock):
+        with TempDirectory() as temp_dir:
+            config = {
+                'tssc-config': {
+                    'push-artifacts': {
+                        'implementer': 'Maven',
+                        'config': {
+                            'url': 'http://artifactory.apps.tssc.rht-set.com/artifactory/tssc/',
+                            'uploader': 'ftp'
+                        }
+                    }
+                }
+            }
+            expected_step_results = {}
+            with self.assertRaisesRegex(
+                    AssertionError,
+                    r"Unknown uploader \(ftp\), expected one of: \['mvn', 'http'\]"):
+                run_step_test_with_result_validation(temp_dir, 'push-artifacts', config, expected_step_results, {})
@@ -1,15 +1,29 @@
+import os
 import sh
 import sys
+import yaml
 
 import unittest
 from unittest.mock import patch
 from testfixtures import TempDirectory
 
+from tssc import TSSCFactory
 from tssc.step_implementers.push_container_image import Skopeo
 
 from test_utils import *
 
 class TestStepImplementerPushContainerImageSkopeo(unittest.TestCase):
+    @staticmethod
+    def __run_step_test_with_push_time_validation(temp_dir, config, expected_step_results):
+        results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+        TSSCFactory(config, results_dir_path).run_step('push-container-image')
+
+        with open(os.path.join(results_dir_path, 'tssc-results.yml'), 'r') as step_results_file:
+            actual_step_results = yaml.safe_load(step_results_file.read())
+
+        for destination in actual_step_results['tssc-results']['push-container-image']['destinations']:
+            assert destination.pop('push-time') >= 0
+        assert actual_step_results == expected_step_results
 
     def test_create_container_image_default_missing_args(self):
         with TempDirectory() as temp_dir:
@@ -120,11 +134,13 @@ class TestStepImplementerPushContainerImageSkopeo(unittest.TestCase):
                     }
                 }
             }
-            expected_step_results = {'tssc-results': { 'create-container-image': {'image-tar-file': destination}, 'generate-metadata': {'image-tag': version }, 'push-container-image': {'image-tag': "{destination}/{organization}/{application_name}-{service_name}:{version}".format(destination=destination, organization=organization, application_name=application_name, service_name=service_name, version=version)}}}
-            run_step_test_with_result_validation(temp_dir, 'push-container-image', config, expected_step_results)
+            image_tag = "{destination}/{organization}/{application_name}-{service_name}:{version}".format(destination=destination, organization=organization, application_name=application_name, service_name=service_name, version=version)
+            expected_step_results = {'tssc-results': { 'create-container-image': {'image-tar-file': destination}, 'generate-metadata': {'image-tag': version }, 'push-container-image': {'image-tag': image_tag, 'destinations': [{'destination-url': destination, 'image-tags': [image_tag], 'image-digest': None}]}}}
+            self.__run_step_test_with_push_time_validation(temp_dir, config, expected_step_results)
             skopeo_mock.copy.assert_called_once_with(
                 '--src-tls-verify=true',
                 '--dest-tls-verify=true',
+                '--digestfile', unittest.mock.ANY,
                 "docker-archive:{destination}".format(destination=destination),
                 "{destination}/{organization}/{application_name}-{service_name}:{version}".format(destination=destination, organization=organization, application_name=application_name, service_name=service_name, version=version),
                 _out=sys.stdout
@@ -180,3 +196,143 @@ class TestStepImplementerPushContainerImageSkopeo(unittest.TestCase):
                     RuntimeError,
                     r'Error invoking .*'):
                     run_step_test_with_result_validation(temp_dir, 'push-container-image', config, expected_step_results)
+
+    @patch('sh.skopeo', create=True)
+    def test_push_container_image_specify_skopeo_implementer_image_ref(self, skopeo_mock):
+        with TempDirectory() as temp_dir:
+            destination = 'quay.io'
+            version = '1.0-69442c8'
+            image_ref = 'oci:{path}/oci-layout:foo-bar-{version}'.format(
+                path=temp_dir.path, version=version)
+            image_digest = 'sha256:' + 'a' * 64
+            temp_dir.makedir('tssc-results')
+            temp_dir.write(
+                'tssc-results/tssc-results.yml',
+                bytes(
+                    '''tssc-results:
+                  generate-metadata:
+                    image-tag: {version}
+                  create-container-image:
+                    image-ref: {image_ref}
+                    image-digest: '{image_digest}'
+                '''.format(version=version, image_ref=image_ref, image_digest=image_digest),
+                    'utf-8')
+                )
+            config = {
+                'tssc-config': {
+                    'global-defaults': {
+                        'application-name': 'foo',
+                        'service-name': 'bar',
+                        'organization': 'xyzzy'
+                    },
+                    'push-container-image': {
+                        'implementer': 'Skopeo',
+                        'config': {
+                            'destination-url' : destination
+                        }
+                    }
+                }
+            }
+            expected_step_results = {'tssc-results': {
+                'create-container-image': {
+                    'image-ref': image_ref,
+                    'image-digest': image_digest
+                },
+                'generate-metadata': {'image-tag': version },
+                'push-container-image': {
+                    'image-tag': 'quay.io/xyzzy/foo-bar:' + version,
+                    'destinations': [{
+                        'destination-url': 'quay.io',
+                        'image-tags': ['quay.io/xyzzy/foo-bar:' + version],
+                        'image-digest': None
+                    }]
+                }
+            }}
+            self.__run_step_test_with_push_time_validation(temp_dir, config, expected_step_results)
+            skopeo_mock.copy.assert_called_once_with(
+                '--src-tls-verify=true',
+                '--dest-tls-verify=true',
+                '--digestfile', unittest.mock.ANY,
+                image_ref,
+                'quay.io/xyzzy/foo-bar:' + version,
+                _out=sys.stdout
+            )
+
+    @patch('sh.skopeo', create=True)
+    def test_push_container_image_specify_skopeo_implementer_multiple_destinations_and_tags(self, skopeo_mock):
+        with TempDirectory() as temp_dir:
+            version = '1.0-69442C8'
+            temp_dir.makedir('tssc-results')
+            temp_dir.write(
+                'tssc-results/tssc-results.yml',
+                bytes(
+                    '''tssc-results:
+                  generate-metadata:
+                    image-tag: {version}
+                  create-container-image:
+                    image-tar-file: image.tar
+                '''.format(version=version),
+                    'utf-8')
+                )
+            destination_urls = ['docker://quay.io', 'docker://registry.example.com', 'docker://mirror.example.com']
+            config = {
+                'tssc-config': {
+                    'global-defaults': {
+                        'application-name': 'foo',
+                        'service-name': 'bar',
+                        'organization': 'xyzzy'
+                    },
+                    'push-container-image': {
+                        'implementer': 'Skopeo',
+                        'config': {
+                            'destination-url' : destination_urls,
+                            'additional-tags': ['feature_test0'],
+                            # as given with --step-config, which are always strings
+                            'max-parallel-pushes': '2'
+                        }
+                    }
+                }
+            }
+
+            def skopeo_copy_side_effect(*args, **kwargs):
+                if args[2] == '--digestfile':
+                    with open(args[3], 'w') as digest_file:
+                        digest_file.write('sha256:' + args[5].split('//')[1].split('.')[0])
+            skopeo_mock.copy.side_effect = skopeo_copy_side_effect
+
+            expected_destinations = []
+            for destination_url in destination_urls:
+                destination = destination_url + '/xyzzy/foo-bar'
+                expected_destinations.append({
+                    'destination-url': destination_url,
+                    'image-tags': [destination + ':1.0-69442c8', destination + ':feature_test0'],
+                    'image-digest': 'sha256:' + destination_url.split('//')[1].split('.')[0]
+                })
+            expected_step_results = {'tssc-results': {
+                'create-container-image': {'image-tar-file': 'image.tar'},
+                'generate-metadata': {'image-tag': version},
+                'push-container-image': {
+                    'image-tag': 'docker://quay.io/xyzzy/foo-bar:1.0-69442c8',
+                    'destinations': expected_destinations
+                }
+            }}
+            self.__run_step_test_with_push_time_validation(temp_dir, config, expected_step_results)
+
+            self.assertEqual(skopeo_mock.copy.call_count, 6)
+            for destination_url in destination_urls:
+                destination = destination_url + '/xyzzy/foo-bar'
+                skopeo_mock.copy.assert_any_call(
+                    '--src-tls-verify=true',
+                    '--dest-tls-verify=true',
+                    '--digestfile', unittest.mock.ANY,
+                    'docker-archive:image.tar',
+                    destination + ':1.0-69442c8',
+                    _out=sys.stdout
+                )
+                skopeo_mock.copy.assert_any_call(
+                    '--src-tls-verify=true',
+                    '--dest-tls-verify=true',
+                    destination + ':1.0-69442c8',
+                    destination + ':feature_test0',
+                    _out=sys.stdout
+                )
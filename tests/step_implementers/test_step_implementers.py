@@ -0,0 +1,30 @@
+import importlib
+import subprocess
+import sys
+
+import unittest
+
+from tssc import TSSCFactory
+from tssc.step_implementers import STEP_IMPLEMENTERS
+
+class TestStepImplementers(unittest.TestCase):
+    def test_step_implementers_manifest_matches_modules(self):
+        for step_name, implementer_name, module_name, is_default in STEP_IMPLEMENTERS:
+            module = importlib.import_module('tssc.step_implementers.' + module_name)
+            implementer_class = getattr(module, implementer_name)
+
+            self.assertEqual(implementer_class.step_name(), step_name)
+            step_implementer = TSSCFactory._step_implementers[step_name][implementer_name]
+            self.assertIs(step_implementer['clazz'], implementer_class)
+            self.assertEqual(step_implementer['is_default'], is_default)
+
+    def test_step_implementer_modules_not_imported_on_startup(self):
+        output = subprocess.check_output([
+            sys.executable,
+            '-c',
+            'import sys, tssc.__main__; '
+            'print(sorted(m for m in sys.modules'
+            ' if m in ("git", "sh") or m.startswith("tssc.step_implementers.")))'
+        ])
+
+        self.assertEqual(output.strip(), b'[]')
@@ -1,6 +1,8 @@
 import os
+import sys
 
 import pytest
+from git import Repo
 from testfixtures import TempDirectory
 import yaml
 
@@ -9,16 +11,188 @@ from tssc.step_implementers.uat import Cucumber
 
 from test_utils import *
 
-def test_tag_source_specify_cucumber_implementer():
+# writes a Cucumber JSON report for the given feature files and scenario locations, in which the
+# scenarios with "flaky" in the name fail unless the given fixed file exists
+FAKE_CUCUMBER_RUNNER = '''
+import json, os, sys
+report_file, fixed_file, features = sys.argv[1], sys.argv[2], sys.argv[3:]
+report, failed = [], False
+for feature in features:
+    uri, _, only_line = feature.partition(':')
+    elements = []
+    with open(uri) as feature_file:
+        for line_number, line in enumerate(feature_file, start=1):
+            if not line.strip().startswith('Scenario:') or only_line and int(only_line) != line_number:
+                continue
+            name = line.split(':', 1)[1].strip()
+            status = 'failed' if 'flaky' in name and not os.path.exists(fixed_file) else 'passed'
+            failed = failed or status == 'failed'
+            elements.append({'type': 'scenario', 'name': name, 'line': line_number, 'steps': [
+                {'keyword': 'Then ', 'name': 'it works', 'result': {'status': status, 'duration': 1000000000}}
+            ]})
+    report.append({'uri': uri, 'name': os.path.basename(uri), 'elements': elements})
+with open(report_file, 'w') as report_content:
+    json.dump(report, report_content)
+sys.exit(1 if failed else 0)
+'''
+
+def _write_features(temp_dir):
+    temp_dir.write('features/checkout.feature', b'''Feature: Checkout
+  Scenario: Pay with a card
+  Scenario: Pay with a flaky card
+''')
+    temp_dir.write('features/search.feature', b'''Feature: Search
+  Scenario: Search for a product
+''')
+    temp_dir.write('features/account.feature', b'''Feature: Account
+  Scenario: Sign up
+  Scenario: Sign in
+''')
+
+def _config(temp_dir, **step_config):
+    step_config.update({
+        'features-dirs': os.path.join(temp_dir.path, 'features'),
+        'test-command': [
+            sys.executable, '-c', FAKE_CUCUMBER_RUNNER,
+            '{report-file}', os.path.join(temp_dir.path, 'fixed'), '{features}'
+        ]
+    })
+    return {
+        'tssc-config': {
+            'uat': {
+                'implementer': 'Cucumber',
+                'config': step_config
+            }
+        }
+    }
+
+def _run_step(temp_dir, config):
+    results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+    factory = TSSCFactory(config, results_dir_path, work_dir_path=os.path.join(temp_dir.path, 'tssc-working'))
+    factory.run_step('uat')
+
+    with open(os.path.join(results_dir_path, 'tssc-results.yml'), 'r') as step_results_file:
+        return yaml.safe_load(step_results_file.read())['tssc-results']['uat']
+
+def test_uat_specify_cucumber_implementer_missing_test_command():
     with TempDirectory() as temp_dir:
         config = {
-            'tssc-config': {    
+            'tssc-config': {
                 'uat': {
                     'implementer': 'Cucumber',
                     'config': {}
                 }
             }
         }
-        expected_step_results = {'tssc-results': {'uat': {}}}
 
-        run_step_test_with_result_validation(temp_dir, 'uat', config, expected_step_results)
+        with pytest.raises(AssertionError):
+            run_step_test_with_result_validation(temp_dir, 'uat', config, {})
+
+@pytest.mark.parametrize('partition_by, runner_feature_counts', [
+    ('feature', [1, 1, 1]),
+    ('scenario', [2, 2, 1])
+])
+def test_uat_specify_cucumber_implementer_parallel_runners(partition_by, runner_feature_counts):
+    with TempDirectory() as temp_dir:
+        _write_features(temp_dir)
+        temp_dir.write('fixed', b'')
+
+        step_results = _run_step(temp_dir, _config(temp_dir, runners=3, **{'partition-by': partition_by}))
+
+        assert step_results['report-files'] == 3
+        assert step_results['scenarios'] == 5
+        assert step_results['passed'] == 5
+        assert step_results['time'] == 5.0
+        assert step_results['failed-scenarios'] == []
+        assert step_results['rerun'] is False
+        assert [runner['runner'] for runner in step_results['runners']] == [0, 1, 2]
+        assert sorted(runner['feature-count'] for runner in step_results['runners']) == \
+            sorted(runner_feature_counts)
+
+def test_uat_specify_cucumber_implementer_runners_step_config_string():
+    with TempDirectory() as temp_dir:
+        _write_features(temp_dir)
+        temp_dir.write('fixed', b'')
+
+        # values given with --step-config are always strings
+        step_results = _run_step(temp_dir, _config(temp_dir, runners='2'))
+
+        assert step_results['passed'] == 5
+        assert [runner['runner'] for runner in step_results['runners']] == [0, 1]
+
+        with pytest.raises(AssertionError, match=r'Runners \(two\) must be a positive integer'):
+            _run_step(temp_dir, _config(temp_dir, runners='two'))
+
+def test_uat_specify_cucumber_implementer_runner_placeholder():
+    with TempDirectory() as temp_dir:
+        _write_features(temp_dir)
+        for runner in range(3):
+            temp_dir.write('runner-' + str(runner) + '/fixed', b'')
+        config = _config(temp_dir, runners=3)
+        config['tssc-config']['uat']['config']['test-command'][4] = os.path.join(
+            temp_dir.path, 'runner-{runner}', 'fixed')
+
+        step_results = _run_step(temp_dir, config)
+
+        assert step_results['passed'] == 5
+        assert step_results['failed'] == 0
+
+def test_uat_specify_cucumber_implementer_rerun_failed():
+    with TempDirectory() as temp_dir:
+        _write_features(temp_dir)
+        checkout_feature = os.path.join(temp_dir.path, 'features', 'checkout.feature')
+        config = _config(temp_dir, runners=2, **{'rerun-failed': True})
+
+        with pytest.raises(RuntimeError, match='Error running features'):
+            _run_step(temp_dir, config)
+
+        rerun_file = os.path.join(temp_dir.path, 'tssc-working', 'uat', 'rerun.txt')
+        with open(rerun_file, 'r') as rerun:
+            assert rerun.read() == checkout_feature + ':3'
+
+        temp_dir.write('fixed', b'')
+        step_results = _run_step(temp_dir, config)
+
+        assert step_results['rerun'] is True
+        assert step_results['scenarios'] == 1
+        assert step_results['passed'] == 1
+        assert step_results['runners'] == [{
+            'runner': 0,
+            'feature-count': 1,
+            'run-time': step_results['runners'][0]['run-time'],
+            'passed': True,
+            'log-file': os.path.join(temp_dir.path, 'tssc-working', 'uat', 'cucumber-runner-0.log')
+        }]
+        with open(rerun_file, 'r') as rerun:
+            assert rerun.read() == ''
+
+def test_uat_specify_cucumber_implementer_run_changed_features():
+    with TempDirectory() as temp_dir:
+        _write_features(temp_dir)
+        temp_dir.write('fixed', b'')
+        repo = Repo.init(str(temp_dir.path))
+        repo.index.add([os.path.join(temp_dir.path, 'features')])
+        repo.index.commit('initial')
+        repo.create_head('feature/test0').checkout()
+        temp_dir.write('features/search.feature', b'''Feature: Search
+  Scenario: Search for a product
+  Scenario: Search for nothing
+''')
+        temp_dir.write('README.md', b'')
+        repo.index.add([
+            os.path.join(temp_dir.path, 'features', 'search.feature'),
+            os.path.join(temp_dir.path, 'README.md')
+        ])
+        repo.index.commit('change')
+
+        step_results = _run_step(temp_dir, _config(
+            temp_dir, **{'test-impact-base-ref': 'master', 'repo-root': temp_dir.path}))
+
+        assert step_results['scenarios'] == 2
+        assert step_results['test-impact'] == {
+            'base-ref': 'master',
+            'changed-files': 2,
+            'full-run': False,
+            'full-run-reason': None,
+            'feature-count': 1
+        }
@@ -1,6 +1,10 @@
+import json
 import os
+import sys
+import time
 
 import pytest
+from git import Repo
 from testfixtures import TempDirectory
 import yaml
 
@@ -9,16 +13,383 @@ from tssc.step_implementers.unit_test import JUnit
 
 from test_utils import *
 
-def test_tag_source_specify_junit_implementer():
+TEST_APP_REPORT = b'''<?xml version="1.0" encoding="UTF-8"?>
+<testsuite name="com.example.AppTest" tests="3" failures="1" errors="0" skipped="1" time="1.7">
+  <properties>
+    <property name="java.version" value="11"/>
+  </properties>
+  <testcase name="testFast" classname="com.example.AppTest" time="0.2"/>
+  <testcase name="testSlow" classname="com.example.AppTest" time="1.5">
+    <system-out>lots of output</system-out>
+  </testcase>
+  <testcase name="testBroken" classname="com.example.AppTest" time="0">
+    <failure message="expected:&lt;1&gt; but was:&lt;2&gt;" type="java.lang.AssertionError">java.lang.AssertionError: expected:&lt;1&gt; but was:&lt;2&gt;
+	at com.example.AppTest.testBroken(AppTest.java:42)</failure>
+  </testcase>
+  <testcase name="testIgnored" classname="com.example.AppTest" time="0">
+    <skipped/>
+  </testcase>
+</testsuite>
+'''
+
+TEST_IT_REPORT = b'''<?xml version="1.0" encoding="UTF-8"?>
+<testsuites>
+  <testsuite name="com.example.AppIT" tests="1" errors="1">
+    <testcase name="testDatabase" classname="com.example.AppIT" time="0.8">
+      <error message="Connection refused" type="java.net.ConnectException"/>
+    </testcase>
+  </testsuite>
+</testsuites>
+'''
+
+def test_unit_test_specify_junit_implementer_no_reports():
     with TempDirectory() as temp_dir:
         config = {
             'tssc-config': {    
                 'unit-test': {
                     'implementer': 'JUnit',
-                    'config': {}
+                    'config': {
+                        'report-dirs': os.path.join(temp_dir.path, 'target', 'surefire-reports')
+                    }
                 }
             }
         }
-        expected_step_results = {'tssc-results': {'unit-test': {}}}
+        expected_step_results = {'tssc-results': {'unit-test': {
+            'report-files': 0,
+            'tests': 0,
+            'failures': 0,
+            'errors': 0,
+            'skipped': 0,
+            'time': 0.0,
+            'slowest-tests': [],
+            'failed-tests': []
+        }}}
 
         run_step_test_with_result_validation(temp_dir, 'unit-test', config, expected_step_results)
+
+def test_unit_test_specify_junit_implementer_surefire_and_failsafe_reports():
+    with TempDirectory() as temp_dir:
+        temp_dir.write('target/surefire-reports/TEST-com.example.AppTest.xml', TEST_APP_REPORT)
+        temp_dir.write('target/surefire-reports/com.example.AppTest.txt', b'not a report')
+        temp_dir.write('target/failsafe-reports/TEST-com.example.AppIT.xml', TEST_IT_REPORT)
+        surefire_reports_dir = os.path.join(temp_dir.path, 'target', 'surefire-reports')
+        failsafe_reports_dir = os.path.join(temp_dir.path, 'target', 'failsafe-reports')
+
+        config = {
+            'tssc-config': {
+                'unit-test': {
+                    'implementer': 'JUnit',
+                    'config': {
+                        'report-dirs': [surefire_reports_dir, failsafe_reports_dir],
+                        'max-slowest-tests': 2
+                    }
+                }
+            }
+        }
+        expected_step_results = {'tssc-results': {'unit-test': {
+            'report-files': 2,
+            'tests': 5,
+            'failures': 1,
+            'errors': 1,
+            'skipped': 1,
+            'time': 2.5,
+            'slowest-tests': [
+                {'classname': 'com.example.AppTest', 'name': 'testSlow', 'time': 1.5},
+                {'classname': 'com.example.AppIT', 'name': 'testDatabase', 'time': 0.8}
+            ],
+            'failed-tests': [
+                {
+                    'classname': 'com.example.AppIT',
+                    'name': 'testDatabase',
+                    'type': 'error',
+                    'message': 'Connection refused',
+                    'details': '',
+                    'report-file': os.path.join(failsafe_reports_dir, 'TEST-com.example.AppIT.xml')
+                },
+                {
+                    'classname': 'com.example.AppTest',
+                    'name': 'testBroken',
+                    'type': 'failure',
+                    'message': 'expected:<1> but was:<2>',
+                    'details': 'java.lang.AssertionError: expected:<1> but was:<2>\n' \
+                        '\tat com.example.AppTest.testBroken(AppTest.java:42)',
+                    'report-file': os.path.join(surefire_reports_dir, 'TEST-com.example.AppTest.xml')
+                }
+            ]
+        }}}
+
+        run_step_test_with_result_validation(temp_dir, 'unit-test', config, expected_step_results)
+
+# writes a passing JUnit XML report for each of the comma separated test classes given
+FAKE_TEST_RUNNER = '''
+import os, sys
+report_dir = sys.argv[1]
+os.makedirs(report_dir, exist_ok=True)
+for test_class in sys.argv[2].split(','):
+    with open(os.path.join(report_dir, 'TEST-' + test_class + '.xml'), 'w') as report:
+        report.write(
+            '<testsuite name="{0}" tests="1"><testcase name="test" classname="{0}" time="{1}"/>'
+            '</testsuite>'.format(test_class, len(test_class) / 10))
+'''
+
+def _write_test_sources(temp_dir):
+    for test_class in ['AppTest', 'ServiceTest', 'RepositoryTest', 'ControllerTests']:
+        temp_dir.write('src/test/java/com/example/' + test_class + '.java', b'')
+    temp_dir.write('src/test/java/com/example/Fixtures.java', b'')
+
+def test_unit_test_specify_junit_implementer_shard_plan_only():
+    with TempDirectory() as temp_dir:
+        _write_test_sources(temp_dir)
+        temp_dir.write('test-timings.json', json.dumps({
+            'com.example.AppTest': 10.0,
+            'com.example.ServiceTest': 4.0,
+            'com.example.RepositoryTest': 3.0
+        }).encode())
+
+        config = {
+            'tssc-config': {
+                'unit-test': {
+                    'implementer': 'JUnit',
+                    'config': {
+                        'report-dirs': os.path.join(temp_dir.path, 'target', 'surefire-reports'),
+                        'test-source-dirs': [os.path.join(temp_dir.path, 'src', 'test', 'java')],
+                        'timing-db-file': os.path.join(temp_dir.path, 'test-timings.json'),
+                        'shards': 2,
+                        'shard-plan-only': True
+                    }
+                }
+            }
+        }
+        # ControllerTests has no recorded duration so is assumed to take the average
+        expected_step_results = {'tssc-results': {'unit-test': {
+            'shard-plan': [
+                {
+                    'shard': 0,
+                    'test-classes': ['com.example.AppTest'],
+                    'estimated-time': 10.0
+                },
+                {
+                    'shard': 1,
+                    'test-classes': [
+                        'com.example.ControllerTests',
+                        'com.example.RepositoryTest',
+                        'com.example.ServiceTest'
+                    ],
+                    'estimated-time': 12.667
+                }
+            ]
+        }}}
+
+        run_step_test_with_result_validation(temp_dir, 'unit-test', config, expected_step_results)
+
+def test_unit_test_specify_junit_implementer_run_shards():
+    with TempDirectory() as temp_dir:
+        _write_test_sources(temp_dir)
+        report_dir = os.path.join(temp_dir.path, 'target', 'surefire-reports')
+        timing_db_file = os.path.join(temp_dir.path, 'test-timings.json')
+        results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+
+        config = {
+            'tssc-config': {
+                'unit-test': {
+                    'implementer': 'JUnit',
+                    'config': {
+                        'report-dirs': report_dir,
+                        'test-source-dirs': [os.path.join(temp_dir.path, 'src', 'test', 'java')],
+                        'timing-db-file': timing_db_file,
+                        'test-command': [sys.executable, '-c', FAKE_TEST_RUNNER, report_dir, '{tests}'],
+                        'shards': 3,
+                        'max-parallel-shards': 2
+                    }
+                }
+            }
+        }
+
+        factory = TSSCFactory(config, results_dir_path, work_dir_path=os.path.join(temp_dir.path, 'tssc-working'))
+        factory.run_step('unit-test')
+
+        with open(os.path.join(results_dir_path, 'tssc-results.yml'), 'r') as step_results_file:
+            step_results = yaml.safe_load(step_results_file.read())['tssc-results']['unit-test']
+
+        assert step_results['report-files'] == 4
+        assert step_results['tests'] == 4
+        assert [shard['shard'] for shard in step_results['shards']] == [0, 1, 2]
+        assert sum(shard['test-class-count'] for shard in step_results['shards']) == 4
+        assert all(shard['passed'] for shard in step_results['shards'])
+
+        with open(timing_db_file, 'r') as timing_db:
+            assert yaml.safe_load(timing_db) == {
+                'com.example.AppTest': 1.9,
+                'com.example.ControllerTests': 2.7,
+                'com.example.RepositoryTest': 2.6,
+                'com.example.ServiceTest': 2.3
+            }
+
+def test_unit_test_specify_junit_implementer_run_shard_step_config_strings():
+    with TempDirectory() as temp_dir:
+        _write_test_sources(temp_dir)
+        report_dir = os.path.join(temp_dir.path, 'target', 'surefire-reports')
+        results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+
+        config = {
+            'tssc-config': {
+                'unit-test': {
+                    'implementer': 'JUnit',
+                    'config': {
+                        'report-dirs': report_dir,
+                        'test-source-dirs': [os.path.join(temp_dir.path, 'src', 'test', 'java')],
+                        'timing-db-file': os.path.join(temp_dir.path, 'test-timings.json'),
+                        'test-command': [sys.executable, '-c', FAKE_TEST_RUNNER, report_dir, '{tests}']
+                    }
+                }
+            }
+        }
+
+        # values given with --step-config are always strings
+        factory = TSSCFactory(config, results_dir_path, work_dir_path=os.path.join(temp_dir.path, 'tssc-working'))
+        factory.run_step('unit-test', {
+            'shards': '4',
+            'shard-index': '1',
+            'max-parallel-shards': '2',
+            'shard-plan-only': 'false'
+        })
+
+        with open(os.path.join(results_dir_path, 'tssc-results.yml'), 'r') as step_results_file:
+            step_results = yaml.safe_load(step_results_file.read())['tssc-results']['unit-test']
+
+        assert 'shard-plan' not in step_results
+        assert [shard['shard'] for shard in step_results['shards']] == [1]
+        assert step_results['tests'] == 1
+
+        factory.run_step('unit-test', {'shards': '4', 'shard-plan-only': 'true'})
+
+        with open(os.path.join(results_dir_path, 'tssc-results.yml'), 'r') as step_results_file:
+            step_results = yaml.safe_load(step_results_file.read())['tssc-results']['unit-test']
+
+        assert [shard['shard'] for shard in step_results['shard-plan']] == [0, 1, 2, 3]
+
+        with pytest.raises(AssertionError, match=r'Shards \(four\) must be a positive integer'):
+            factory.run_step('unit-test', {'shards': 'four'})
+
+def test_unit_test_specify_junit_implementer_run_shards_own_reports_dirs():
+    with TempDirectory() as temp_dir:
+        _write_test_sources(temp_dir)
+        report_dir = os.path.join(temp_dir.path, 'target', 'surefire-reports')
+        work_dir_path = os.path.join(temp_dir.path, 'tssc-working')
+        results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+
+        # reports of previous runs
+        temp_dir.write('target/surefire-reports/TEST-com.example.StaleTest.xml', TEST_APP_REPORT)
+        temp_dir.write(
+            'tssc-working/unit-test/test-shard-0-reports/TEST-com.example.StaleTest.xml',
+            TEST_APP_REPORT)
+
+        config = {
+            'tssc-config': {
+                'unit-test': {
+                    'implementer': 'JUnit',
+                    'config': {
+                        'report-dirs': report_dir,
+                        'test-source-dirs': [os.path.join(temp_dir.path, 'src', 'test', 'java')],
+                        'timing-db-file': os.path.join(temp_dir.path, 'test-timings.json'),
+                        'test-command': [
+                            sys.executable, '-c', FAKE_TEST_RUNNER, '{reports-dir}', '{tests}'
+                        ],
+                        'shards': 2
+                    }
+                }
+            }
+        }
+
+        factory = TSSCFactory(config, results_dir_path, work_dir_path=work_dir_path)
+        factory.run_step('unit-test')
+
+        with open(os.path.join(results_dir_path, 'tssc-results.yml'), 'r') as step_results_file:
+            step_results = yaml.safe_load(step_results_file.read())['tssc-results']['unit-test']
+
+        assert step_results['report-files'] == 4
+        assert step_results['tests'] == 4
+        assert [shard['reports-dir'] for shard in step_results['shards']] == [
+            os.path.join(work_dir_path, 'unit-test', 'test-shard-0-reports'),
+            os.path.join(work_dir_path, 'unit-test', 'test-shard-1-reports')
+        ]
+        assert sorted(
+            os.listdir(step_results['shards'][0]['reports-dir']) +
+            os.listdir(step_results['shards'][1]['reports-dir'])
+        ) == [
+            'TEST-com.example.AppTest.xml',
+            'TEST-com.example.ControllerTests.xml',
+            'TEST-com.example.RepositoryTest.xml',
+            'TEST-com.example.ServiceTest.xml'
+        ]
+
+def test_unit_test_specify_junit_implementer_run_affected_tests():
+    with TempDirectory() as temp_dir:
+        temp_dir.write('src/main/java/com/example/Service.java', b'package com.example;\n')
+        temp_dir.write('src/test/java/com/example/ServiceTest.java', b'package com.example;\n')
+        temp_dir.write('src/test/java/com/other/OtherTest.java', b'package com.other;\n')
+        repo = Repo.init(str(temp_dir.path))
+        repo.index.add([os.path.join(temp_dir.path, 'src')])
+        repo.index.commit('initial')
+        repo.create_head('feature/test0').checkout()
+        temp_dir.write('src/main/java/com/example/Service.java', b'package com.example;\n// changed\n')
+        repo.index.add([os.path.join(temp_dir.path, 'src', 'main', 'java', 'com', 'example', 'Service.java')])
+        repo.index.commit('change')
+
+        report_dir = os.path.join(temp_dir.path, 'target', 'surefire-reports')
+        results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+
+        # report of a previous run of the test class not affected by the change
+        stale_report = temp_dir.write(
+            'target/surefire-reports/TEST-com.other.OtherTest.xml', TEST_APP_REPORT)
+        stale_time = time.time() - 60
+        os.utime(stale_report, (stale_time, stale_time))
+
+        config = {
+            'tssc-config': {
+                'unit-test': {
+                    'implementer': 'JUnit',
+                    'config': {
+                        'report-dirs': report_dir,
+                        'repo-root': temp_dir.path,
+                        'main-source-dirs': [os.path.join(temp_dir.path, 'src', 'main', 'java')],
+                        'test-source-dirs': [os.path.join(temp_dir.path, 'src', 'test', 'java')],
+                        'test-command': [sys.executable, '-c', FAKE_TEST_RUNNER, report_dir, '{tests}'],
+                        'test-impact-base-ref': 'master',
+                        'test-impact-full-run-interval': 1,
+                        'shards': 2
+                    }
+                }
+            }
+        }
+
+        factory = TSSCFactory(config, results_dir_path, work_dir_path=os.path.join(temp_dir.path, 'tssc-working'))
+        factory.run_step('unit-test')
+
+        with open(os.path.join(results_dir_path, 'tssc-results.yml'), 'r') as step_results_file:
+            step_results = yaml.safe_load(step_results_file.read())['tssc-results']['unit-test']
+
+        assert step_results['report-files'] == 1
+        assert step_results['tests'] == 1
+        assert step_results['failed-tests'] == []
+        assert step_results['test-impact'] == {
+            'base-ref': 'master',
+            'changed-files': 1,
+            'full-run': False,
+            'full-run-reason': None,
+            'test-class-count': 1
+        }
+        assert sorted(os.listdir(report_dir)) == [
+            'TEST-com.example.ServiceTest.xml',
+            'TEST-com.other.OtherTest.xml'
+        ]
+
+        # the run after test-impact-full-run-interval runs of only the affected tests runs all
+        factory.run_step('unit-test')
+
+        with open(os.path.join(results_dir_path, 'tssc-results.yml'), 'r') as step_results_file:
+            step_results = yaml.safe_load(step_results_file.read())['tssc-results']['unit-test']
+
+        assert step_results['report-files'] == 2
+        assert step_results['test-impact']['full-run']
+        assert step_results['test-impact']['test-class-count'] == 2
@@ -0,0 +1,89 @@
+import os
+import unittest
+
+from testfixtures import TempDirectory
+
+from tssc.step_implementers.utils.build_context import DockerIgnore, \
+    get_build_context_files, hash_build_context
+
+class TestBuildContextUtils(unittest.TestCase):
+    def test_docker_ignore_patterns(self):
+        docker_ignore = DockerIgnore([
+            '# comment',
+            '',
+            '/target',
+            '*.log',
+            '**/node_modules',
+            'docs/**/*.md',
+            '!docs/README.md',
+            'tmp?',
+            'build[0-9]'
+        ])
+
+        self.assertTrue(docker_ignore.has_negated_patterns)
+        self.assertTrue(docker_ignore.is_ignored('target'))
+        self.assertTrue(docker_ignore.is_ignored('target/classes/App.class'))
+        self.assertFalse(docker_ignore.is_ignored('src/target'))
+        self.assertTrue(docker_ignore.is_ignored('build.log'))
+        self.assertFalse(docker_ignore.is_ignored('logs/build.log'))
+        self.assertTrue(docker_ignore.is_ignored('node_modules/left-pad/index.js'))
+        self.assertTrue(docker_ignore.is_ignored('web/app/node_modules/left-pad/index.js'))
+        self.assertTrue(docker_ignore.is_ignored('docs/guide.md'))
+        self.assertTrue(docker_ignore.is_ignored('docs/api/guide.md'))
+        self.assertFalse(docker_ignore.is_ignored('docs/README.md'))
+        self.assertFalse(docker_ignore.is_ignored('docs/logo.png'))
+        self.assertTrue(docker_ignore.is_ignored('tmp1'))
+        self.assertFalse(docker_ignore.is_ignored('tmp12'))
+        self.assertTrue(docker_ignore.is_ignored('build7/out'))
+        self.assertFalse(docker_ignore.is_ignored('buildx'))
+
+    def test_docker_ignore_no_patterns(self):
+        docker_ignore = DockerIgnore([])
+
+        self.assertFalse(docker_ignore.has_negated_patterns)
+        self.assertFalse(docker_ignore.is_ignored('anything/at/all'))
+
+    def test_get_build_context_files(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('.dockerignore', b'target\n*.log\n!keep.log\n')
+            temp_dir.write('Dockerfile', b'FROM scratch')
+            temp_dir.write('src/app.py', b'app')
+            temp_dir.write('target/app.jar', b'jar')
+            temp_dir.write('build.log', b'log')
+            temp_dir.write('keep.log', b'log')
+            temp_dir.write('out/image.tar', b'tar')
+
+            self.assertEqual(
+                get_build_context_files(
+                    temp_dir.path,
+                    exclude_paths=[os.path.join(temp_dir.path, 'out')]),
+                ['.dockerignore', 'Dockerfile', 'keep.log', 'src/app.py'])
+
+    def test_hash_build_context(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('.dockerignore', b'target\n')
+            temp_dir.write('Dockerfile', b'FROM scratch')
+            temp_dir.write('src/app.py', b'app')
+            dockerfile = os.path.join(temp_dir.path, 'Dockerfile')
+
+            fingerprint = hash_build_context(temp_dir.path, dockerfile)
+            self.assertEqual(len(fingerprint), 64)
+
+            # ignored files do not change the fingerprint
+            temp_dir.write('target/app.jar', b'jar')
+            self.assertEqual(hash_build_context(temp_dir.path, dockerfile), fingerprint)
+
+            # executable bit changes the fingerprint
+            os.chmod(os.path.join(temp_dir.path, 'src', 'app.py'), 0o755)
+            executable_fingerprint = hash_build_context(temp_dir.path, dockerfile)
+            self.assertNotEqual(executable_fingerprint, fingerprint)
+
+            temp_dir.write('src/app.py', b'new app')
+            self.assertNotEqual(
+                hash_build_context(temp_dir.path, dockerfile, max_workers=1),
+                executable_fingerprint)
+
+            # changing what is ignored changes the fingerprint
+            changed_fingerprint = hash_build_context(temp_dir.path, dockerfile)
+            temp_dir.write('.dockerignore', b'target\nsrc\n')
+            self.assertNotEqual(hash_build_context(temp_dir.path, dockerfile), changed_fingerprint)
@@ -0,0 +1,148 @@
+import json
+import os
+import unittest
+
+from testfixtures import TempDirectory
+
+from tssc.step_implementers.utils import cucumber
+from tssc.step_implementers.utils.cucumber import find_feature_files, find_scenarios, \
+    iter_json_array, merge_cucumber_summaries, parse_cucumber_report
+
+CHECKOUT_FEATURE = b'''Feature: Checkout
+
+  Background:
+    Given a cart
+
+  Scenario: Pay with a card
+    When I pay
+    Then the order is placed
+
+  Scenario Outline: Pay with <method>
+    When I pay with <method>
+
+    Examples:
+      | method |
+      | cash   |
+'''
+
+def _step(name, status, duration=0, error_message=None):
+    result = {'status': status, 'duration': duration}
+    if error_message:
+        result['error_message'] = error_message
+    return {'keyword': 'When ', 'name': name, 'result': result}
+
+CHECKOUT_REPORT = [
+    {
+        'uri': 'file:features/checkout.feature',
+        'name': 'Checkout',
+        'elements': [
+            {'type': 'background', 'steps': [_step('a cart', 'passed', 500000000)]},
+            {
+                'type': 'scenario',
+                'name': 'Pay with a card',
+                'line': 6,
+                'steps': [
+                    _step('I pay', 'passed', 1000000000),
+                    _step('the order is placed', 'passed', 250000000)
+                ]
+            },
+            {'type': 'background', 'steps': [_step('a cart', 'passed', 500000000)]},
+            {
+                'type': 'scenario',
+                'name': 'Pay with cash',
+                'line': 15,
+                'steps': [
+                    _step('I pay with cash', 'failed', 1000000000, 'AssertionError: declined'),
+                    _step('the order is placed', 'skipped')
+                ]
+            }
+        ]
+    },
+    {
+        'uri': 'features/search.feature',
+        'name': 'Search',
+        'elements': [
+            {
+                'type': 'scenario',
+                'name': 'Search for nothing',
+                'line': 3,
+                'steps': [_step('I search', 'undefined')]
+            }
+        ]
+    }
+]
+
+class TestCucumberUtils(unittest.TestCase):
+    def test_find_feature_files_and_scenarios(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('features/checkout.feature', CHECKOUT_FEATURE)
+            temp_dir.write('features/search/search.feature', b'Feature: Search\n')
+            temp_dir.write('features/README.md', b'')
+            features_dir = os.path.join(temp_dir.path, 'features')
+            checkout_feature = os.path.join(features_dir, 'checkout.feature')
+
+            self.assertEqual(
+                find_feature_files([features_dir, os.path.join(temp_dir.path, 'missing')]),
+                [checkout_feature, os.path.join(features_dir, 'search', 'search.feature')])
+            self.assertEqual(
+                find_scenarios(checkout_feature),
+                [checkout_feature + ':6', checkout_feature + ':10'])
+
+    def test_iter_json_array(self):
+        with TempDirectory() as temp_dir:
+            elements = [{'name': 'feature' + str(index), 'text': 'x' * index} for index in range(50)]
+            temp_dir.write('report.json', (' \n' + json.dumps(elements, indent=2)).encode())
+            temp_dir.write('empty.json', b'[ ]')
+            temp_dir.write('truncated.json', json.dumps(elements)[:-20].encode())
+
+            # small reads so the elements span reads
+            read_size = cucumber._READ_SIZE
+            cucumber._READ_SIZE = 16
+            try:
+                self.assertEqual(
+                    list(iter_json_array(os.path.join(temp_dir.path, 'report.json'))), elements)
+                self.assertEqual(list(iter_json_array(os.path.join(temp_dir.path, 'empty.json'))), [])
+                with self.assertRaises(ValueError):
+                    list(iter_json_array(os.path.join(temp_dir.path, 'truncated.json')))
+            finally:
+                cucumber._READ_SIZE = read_size
+
+    def test_parse_cucumber_report(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('cucumber.json', json.dumps(CHECKOUT_REPORT).encode())
+
+            self.assertEqual(parse_cucumber_report(os.path.join(temp_dir.path, 'cucumber.json')), {
+                'report-files': 1,
+                'scenarios': 3,
+                'passed': 1,
+                'failed': 1,
+                'skipped': 1,
+                'time': 3.25,
+                'failed-scenarios': [{
+                    'feature': 'Checkout',
+                    'name': 'Pay with cash',
+                    'location': 'features/checkout.feature:15',
+                    'step': 'When I pay with cash',
+                    'message': 'AssertionError: declined'
+                }],
+                'failed-locations': ['features/checkout.feature:15']
+            })
+
+    def test_parse_cucumber_report_malformed(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('cucumber.json', b'{"not": "an array"}')
+
+            with self.assertRaisesRegex(ValueError, 'Error parsing Cucumber report'):
+                parse_cucumber_report(os.path.join(temp_dir.path, 'cucumber.json'))
+
+    def test_merge_cucumber_summaries(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('cucumber.json', json.dumps(CHECKOUT_REPORT).encode())
+            summary = parse_cucumber_report(os.path.join(temp_dir.path, 'cucumber.json'))
+
+            merged_summary = merge_cucumber_summaries([summary, summary], max_failed_scenarios=1)
+            self.assertEqual(merged_summary['report-files'], 2)
+            self.assertEqual(merged_summary['scenarios'], 6)
+            self.assertEqual(merged_summary['time'], 6.5)
+            self.assertEqual(len(merged_summary['failed-scenarios']), 1)
+            self.assertEqual(merged_summary['failed-locations'], ['features/checkout.feature:15'] * 2)
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+from git import GitCommandError, Repo
+from testfixtures import TempDirectory
+
+from tssc.step_implementers.utils.git import find_changed_files, read_git_head
+
+from test_utils import *
+
+
+def test_read_git_head_no_commit_history():
+    with TempDirectory() as temp_dir:
+        Repo.init(str(temp_dir.path))
+
+        assert read_git_head(temp_dir.path) == ('master', None)
+
+def test_read_git_head_loose_ref():
+    with TempDirectory() as temp_dir:
+        repo = Repo.init(str(temp_dir.path))
+        create_git_commit_with_sample_file(temp_dir, repo)
+
+        assert read_git_head(temp_dir.path) == ('master', str(repo.head.commit))
+
+def test_read_git_head_feature_branch():
+    with TempDirectory() as temp_dir:
+        repo = Repo.init(str(temp_dir.path))
+        create_git_commit_with_sample_file(temp_dir, repo)
+        repo.create_head('feature/test0').checkout()
+        create_git_commit_with_sample_file(temp_dir, repo, 'test1')
+
+        assert read_git_head(temp_dir.path) == ('feature/test0', str(repo.head.commit))
+
+def test_read_git_head_packed_refs():
+    with TempDirectory() as temp_dir:
+        repo = Repo.init(str(temp_dir.path))
+        create_git_commit_with_sample_file(temp_dir, repo)
+        repo.git.pack_refs('--all')
+
+        assert not os.path.exists(os.path.join(temp_dir.path, '.git', 'refs', 'heads', 'master'))
+        assert read_git_head(temp_dir.path) == ('master', str(repo.head.commit))
+
+def test_read_git_head_detached_head():
+    with TempDirectory() as temp_dir:
+        repo = Repo.init(str(temp_dir.path))
+        create_git_commit_with_sample_file(temp_dir, repo, 'test0')
+        create_git_commit_with_sample_file(temp_dir, repo, 'test1')
+        repo.git.checkout('master^')
+
+        assert read_git_head(temp_dir.path) == (None, str(repo.head.commit))
+
+def test_read_git_head_worktree():
+    with TempDirectory() as temp_dir:
+        repo_path = os.path.join(temp_dir.path, 'repo')
+        worktree_path = os.path.join(temp_dir.path, 'worktree')
+        repo = Repo.init(repo_path)
+        create_git_commit_with_sample_file(temp_dir, repo, 'repo/test0')
+        repo.git.worktree('add', '-b', 'feature/worktree', worktree_path)
+
+        assert os.path.isfile(os.path.join(worktree_path, '.git'))
+        assert read_git_head(worktree_path) == ('feature/worktree', str(repo.head.commit))
+
+def test_read_git_head_bare_repo():
+    with TempDirectory() as temp_dir:
+        Repo.init(str(temp_dir.path), bare=True)
+
+        assert read_git_head(temp_dir.path) is None
+
+def test_read_git_head_not_git_repo():
+    with TempDirectory() as temp_dir:
+        assert read_git_head(temp_dir.path) is None
+
+def test_find_changed_files():
+    with TempDirectory() as temp_dir:
+        repo = Repo.init(str(temp_dir.path))
+        create_git_commit_with_sample_file(temp_dir, repo, 'unchanged')
+        create_git_commit_with_sample_file(temp_dir, repo, 'renamed')
+        repo.create_head('feature/test0').checkout()
+        repo.index.move(['renamed', 'moved'])
+        repo.index.commit('rename')
+        temp_dir.write('src/new', b'new')
+        repo.index.add([os.path.join(temp_dir.path, 'src', 'new')])
+        repo.index.commit('add')
+
+        assert find_changed_files(temp_dir.path, 'master') == ['moved', 'renamed', 'src/new']
+
+def test_find_changed_files_missing_base_ref():
+    with TempDirectory() as temp_dir:
+        repo = Repo.init(str(temp_dir.path))
+        create_git_commit_with_sample_file(temp_dir, repo)
+
+        with pytest.raises(GitCommandError):
+            find_changed_files(temp_dir.path, 'origin/master')
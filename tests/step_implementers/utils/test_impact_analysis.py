@@ -0,0 +1,147 @@
+import json
+import os
+import unittest
+
+from testfixtures import TempDirectory
+
+from tssc.step_implementers.utils.impact_analysis import ImpactIndex
+
+def _write_sources(temp_dir):
+    temp_dir.write('src/main/java/com/example/repo/Repository.java', b'''
+package com.example.repo;
+
+public class Repository {}
+''')
+    temp_dir.write('src/main/java/com/example/service/Service.java', b'''
+package com.example.service;
+
+import java.util.List;
+import com.example.repo.Repository;
+
+public class Service {}
+''')
+    temp_dir.write('src/main/java/com/example/service/Helper.java', b'''
+package com.example.service;
+
+public class Helper {}
+''')
+    temp_dir.write('src/main/java/com/example/web/Controller.java', b'''
+package com.example.web;
+
+import static com.example.service.Service.create;
+
+public class Controller {}
+''')
+    temp_dir.write('src/main/java/com/example/util/Strings.java', b'''
+package com.example.util;
+
+public class Strings {}
+''')
+    temp_dir.write('src/test/java/com/example/repo/RepositoryTest.java', b'''
+package com.example.repo;
+
+import org.junit.Test;
+
+public class RepositoryTest {}
+''')
+    temp_dir.write('src/test/java/com/example/web/ControllerTest.java', b'''
+package com.example.web;
+
+public class ControllerTest {}
+''')
+    temp_dir.write('src/test/java/com/example/util/StringsTest.java', b'''
+package com.example.util;
+
+import com.example.util.*;
+
+public class StringsTest {}
+''')
+
+TEST_CLASSES = [
+    'com.example.repo.RepositoryTest',
+    'com.example.util.StringsTest',
+    'com.example.web.ControllerTest'
+]
+
+class TestImpactAnalysisUtils(unittest.TestCase):
+    def test_select_tests(self):
+        with TempDirectory() as temp_dir:
+            _write_sources(temp_dir)
+            impact_index = ImpactIndex(os.path.join(temp_dir.path, 'test-impact-index.json'))
+            impact_index.update(temp_dir.path, [
+                os.path.join(temp_dir.path, 'src', 'main', 'java'),
+                os.path.join(temp_dir.path, 'src', 'test', 'java'),
+                os.path.join(temp_dir.path, 'missing')
+            ])
+
+            self.assertEqual(
+                impact_index.sources['src/main/java/com/example/web/Controller.java']['imports'],
+                ['com.example.service.Service.create'])
+
+            # through Service and Controller
+            self.assertEqual(
+                impact_index.select_tests(
+                    TEST_CLASSES, ['src/main/java/com/example/repo/Repository.java']),
+                (['com.example.repo.RepositoryTest', 'com.example.web.ControllerTest'], None))
+
+            # through the same package
+            self.assertEqual(
+                impact_index.select_tests(
+                    TEST_CLASSES, ['src/main/java/com/example/service/Helper.java', 'README.md']),
+                (['com.example.web.ControllerTest'], None))
+
+            self.assertEqual(
+                impact_index.select_tests(
+                    TEST_CLASSES, ['src/test/java/com/example/util/StringsTest.java']),
+                (['com.example.util.StringsTest'], None))
+            self.assertEqual(impact_index.select_tests(TEST_CLASSES, ['docs/index.md']), ([], None))
+
+            self.assertEqual(
+                impact_index.select_tests(
+                    TEST_CLASSES, ['src/main/java/com/example/util/Strings.java', 'pom.xml']),
+                (None, 'changed file (pom.xml) is not an indexed source'))
+
+    def test_record_run(self):
+        with TempDirectory() as temp_dir:
+            _write_sources(temp_dir)
+            index_file = os.path.join(temp_dir.path, 'index', 'test-impact-index.json')
+            source_dirs = [os.path.join(temp_dir.path, 'src', 'main', 'java')]
+
+            impact_index = ImpactIndex(index_file)
+            self.assertEqual(impact_index.runs_since_full_run, 0)
+            impact_index.update(temp_dir.path, source_dirs)
+            impact_index.record_run(False)
+            impact_index.record_run(False)
+
+            impact_index = ImpactIndex(index_file)
+            self.assertEqual(impact_index.runs_since_full_run, 2)
+            self.assertEqual(len(impact_index.sources), 5)
+            self.assertEqual(os.listdir(os.path.dirname(index_file)), ['test-impact-index.json'])
+
+            # only changed sources are read again, removed sources are dropped
+            temp_dir.write('src/main/java/com/example/util/Strings.java', b'''
+package com.example.util;
+
+import com.example.repo.Repository;
+
+public class Strings {}
+''')
+            os.remove(os.path.join(
+                temp_dir.path, 'src', 'main', 'java', 'com', 'example', 'service', 'Helper.java'))
+            impact_index.update(temp_dir.path, source_dirs)
+            self.assertEqual(len(impact_index.sources), 4)
+            self.assertEqual(
+                impact_index.sources['src/main/java/com/example/util/Strings.java']['imports'],
+                ['com.example.repo.Repository'])
+
+            impact_index.record_run(True)
+            with open(index_file, 'r') as index_content:
+                self.assertEqual(json.load(index_content)['runs-since-full-run'], 0)
+
+    def test_corrupt_index(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('test-impact-index.json', b'[]')
+
+            impact_index = ImpactIndex(os.path.join(temp_dir.path, 'test-impact-index.json'))
+            self.assertEqual(impact_index.runs_since_full_run, 0)
+            self.assertEqual(impact_index.sources, {})
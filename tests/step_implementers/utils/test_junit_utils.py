@@ -0,0 +1,151 @@
+import concurrent.futures
+import os
+import unittest
+from unittest.mock import patch
+
+from testfixtures import TempDirectory
+
+from tssc.step_implementers.utils.junit import aggregate_junit_reports, find_junit_reports, \
+    merge_junit_summaries, parse_junit_report
+
+def junit_report(class_name, test_times, failed_tests=()):
+    test_cases = ''
+    for test_index, test_time in enumerate(test_times):
+        test_name = 'test' + str(test_index)
+        failure = ''
+        if test_name in failed_tests:
+            failure = '<failure message="{name} failed">trace</failure>'.format(name=test_name)
+        test_cases += '<testcase name="{name}" classname="{class_name}" time="{time}">' \
+            '{failure}</testcase>\n'.format(
+                name=test_name, class_name=class_name, time=test_time, failure=failure)
+
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n' \
+        '<testsuite name="{class_name}">\n{test_cases}</testsuite>\n').format(
+            class_name=class_name, test_cases=test_cases).encode('utf-8')
+
+class TestJUnitUtils(unittest.TestCase):
+    def test_find_junit_reports(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('surefire-reports/TEST-b.xml', b'')
+            temp_dir.write('surefire-reports/TEST-a.xml', b'')
+            temp_dir.write('surefire-reports/a.txt', b'')
+            temp_dir.write('surefire-reports/nested/TEST-c.xml', b'')
+
+            self.assertEqual(
+                find_junit_reports([
+                    os.path.join(temp_dir.path, 'surefire-reports'),
+                    os.path.join(temp_dir.path, 'failsafe-reports')
+                ]),
+                [
+                    os.path.join(temp_dir.path, 'surefire-reports', 'TEST-a.xml'),
+                    os.path.join(temp_dir.path, 'surefire-reports', 'TEST-b.xml')
+                ])
+
+    def test_find_junit_reports_modified_since(self):
+        with TempDirectory() as temp_dir:
+            stale_report = temp_dir.write('surefire-reports/TEST-stale.xml', b'')
+            temp_dir.write('surefire-reports/TEST-new.xml', b'')
+            os.utime(stale_report, (1000, 1000))
+
+            self.assertEqual(
+                find_junit_reports(
+                    [os.path.join(temp_dir.path, 'surefire-reports')],
+                    modified_since=2000),
+                [os.path.join(temp_dir.path, 'surefire-reports', 'TEST-new.xml')])
+
+    def test_parse_junit_report_namespaced_and_nested_suites(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('TEST-ns.xml', b'''<?xml version="1.0"?>
+<testsuites xmlns="urn:example:junit">
+  <testsuite name="outer">
+    <testsuite name="inner">
+      <testcase classname="A" name="one" time="1,5"/>
+      <testcase classname="A" name="two" time="0.25"><skipped/></testcase>
+      <testcase classname="A" name="three"><error message="boom"/></testcase>
+    </testsuite>
+  </testsuite>
+</testsuites>''')
+
+            summary = parse_junit_report(os.path.join(temp_dir.path, 'TEST-ns.xml'))
+
+            self.assertEqual(summary['report-files'], 1)
+            self.assertEqual(summary['tests'], 3)
+            self.assertEqual(summary['skipped'], 1)
+            self.assertEqual(summary['errors'], 1)
+            self.assertEqual(summary['failures'], 0)
+            self.assertEqual(summary['time'], 0.25)
+            self.assertEqual(
+                [test['name'] for test in summary['slowest-tests']],
+                ['two', 'three', 'one'])
+            self.assertEqual(summary['failed-tests'][0]['message'], 'boom')
+            self.assertEqual(summary['test-class-times'], {'A': 0.25})
+
+    def test_parse_junit_report_malformed(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('TEST-broken.xml', b'<testsuite><testcase name="a">')
+
+            with self.assertRaisesRegex(ValueError, r'Error parsing JUnit report \(.*TEST-broken.xml\)'):
+                parse_junit_report(os.path.join(temp_dir.path, 'TEST-broken.xml'))
+
+    def test_aggregate_junit_reports_parallel(self):
+        with TempDirectory() as temp_dir:
+            report_files = []
+            for report_index in range(20):
+                report_file = 'TEST-Class{index:02d}.xml'.format(index=report_index)
+                temp_dir.write(report_file, junit_report(
+                    'Class{index:02d}'.format(index=report_index),
+                    [report_index + test_index / 10 for test_index in range(5)],
+                    failed_tests=['test1'] if report_index % 2 == 0 else []))
+                report_files.append(os.path.join(temp_dir.path, report_file))
+
+            parallel_summary = aggregate_junit_reports(
+                report_files, max_workers=4, max_slowest_tests=3, max_failed_tests=4)
+            serial_summary = aggregate_junit_reports(
+                report_files, max_workers=1, max_slowest_tests=3, max_failed_tests=4)
+
+            self.assertEqual(parallel_summary, serial_summary)
+            self.assertEqual(parallel_summary['report-files'], 20)
+            self.assertEqual(parallel_summary['tests'], 100)
+            self.assertEqual(parallel_summary['failures'], 10)
+            self.assertEqual(parallel_summary['time'], 970.0)
+            self.assertEqual(parallel_summary['test-class-times']['Class03'], 16.0)
+            self.assertEqual(parallel_summary['slowest-tests'], [
+                {'classname': 'Class19', 'name': 'test4', 'time': 19.4},
+                {'classname': 'Class19', 'name': 'test3', 'time': 19.3},
+                {'classname': 'Class19', 'name': 'test2', 'time': 19.2}
+            ])
+            self.assertEqual(
+                [(test['classname'], test['name']) for test in parallel_summary['failed-tests']],
+                [('Class00', 'test1'), ('Class02', 'test1'), ('Class04', 'test1'), ('Class06', 'test1')])
+
+    def test_aggregate_junit_reports_parallel_from_thread(self):
+        with TempDirectory() as temp_dir:
+            report_files = []
+            for report_index in range(4):
+                report_file = 'TEST-Class{index}.xml'.format(index=report_index)
+                temp_dir.write(report_file, junit_report('Class' + str(report_index), [1.0]))
+                report_files.append(os.path.join(temp_dir.path, report_file))
+
+            with patch(
+                    'concurrent.futures.ProcessPoolExecutor',
+                    wraps=concurrent.futures.ProcessPoolExecutor) as executor_mock, \
+                    concurrent.futures.ThreadPoolExecutor(max_workers=1) as thread_pool:
+                summary = thread_pool.submit(
+                    aggregate_junit_reports, report_files, max_workers=2).result(timeout=60)
+
+            self.assertEqual(summary['tests'], 4)
+            self.assertEqual(
+                executor_mock.call_args[1]['mp_context'].get_start_method(), 'spawn')
+
+    def test_merge_junit_summaries_no_summaries(self):
+        self.assertEqual(merge_junit_summaries([]), {
+            'report-files': 0,
+            'tests': 0,
+            'failures': 0,
+            'errors': 0,
+            'skipped': 0,
+            'time': 0.0,
+            'slowest-tests': [],
+            'failed-tests': [],
+            'test-class-times': {}
+        })
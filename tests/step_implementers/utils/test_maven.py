@@ -0,0 +1,178 @@
+import os
+
+import pytest
+from testfixtures import TempDirectory
+
+from tssc.step_implementers.utils.maven import get_maven_modules, get_maven_pom
+
+
+def test_get_maven_modules_single_pom():
+    with TempDirectory() as temp_dir:
+        temp_dir.write('pom.xml',b'''<project>
+    <modelVersion>4.0.0</modelVersion>
+    <groupId>com.mycompany.app</groupId>
+    <artifactId>my-app</artifactId>
+    <version>42.1</version>
+</project>''')
+        pom_file_path = os.path.join(temp_dir.path, 'pom.xml')
+
+        assert get_maven_modules(pom_file_path) == [{
+            'pom-path': pom_file_path,
+            'group-id': 'com.mycompany.app',
+            'artifact-id': 'my-app',
+            'version': '42.1',
+            'package-type': 'jar'
+        }]
+
+def test_get_maven_modules_nested_modules():
+    with TempDirectory() as temp_dir:
+        temp_dir.write('pom.xml',b'''<project xmlns="http://maven.apache.org/POM/4.0.0">
+    <modelVersion>4.0.0</modelVersion>
+    <groupId>com.mycompany.app</groupId>
+    <artifactId>my-app-parent</artifactId>
+    <version>42.1</version>
+    <packaging>pom</packaging>
+    <modules>
+        <module>services</module>
+        <module>my-app-api</module>
+    </modules>
+</project>''')
+        temp_dir.write('services/pom.xml',b'''<project xmlns="http://maven.apache.org/POM/4.0.0">
+    <parent>
+        <groupId>com.mycompany.app</groupId>
+        <artifactId>my-app-parent</artifactId>
+    </parent>
+    <artifactId>my-app-services</artifactId>
+    <packaging>pom</packaging>
+    <modules>
+        <module>../my-app-api</module>
+        <module>my-app-web/pom.xml</module>
+    </modules>
+</project>''')
+        temp_dir.write('services/my-app-web/pom.xml',b'''<project xmlns="http://maven.apache.org/POM/4.0.0">
+    <parent>
+        <groupId>com.mycompany.app</groupId>
+        <artifactId>my-app-services</artifactId>
+    </parent>
+    <artifactId>my-app-web</artifactId>
+    <packaging>war</packaging>
+</project>''')
+        temp_dir.write('my-app-api/pom.xml',b'''<project xmlns="http://maven.apache.org/POM/4.0.0">
+    <groupId>com.mycompany.app.api</groupId>
+    <artifactId>my-app-api</artifactId>
+</project>''')
+
+        modules = get_maven_modules(os.path.join(temp_dir.path, 'pom.xml'))
+
+        assert [(module['artifact-id'], module['group-id'], module['package-type'])
+                for module in modules] == [
+            ('my-app-parent', 'com.mycompany.app', 'pom'),
+            ('my-app-services', 'com.mycompany.app', 'pom'),
+            ('my-app-api', 'com.mycompany.app.api', 'jar'),
+            ('my-app-web', 'com.mycompany.app', 'war')
+        ]
+        assert modules[3]['pom-path'] == \
+            os.path.join(temp_dir.path, 'services', 'my-app-web', 'pom.xml')
+
+def test_get_maven_modules_missing_module():
+    with TempDirectory() as temp_dir:
+        temp_dir.write('pom.xml',b'''<project>
+    <groupId>com.mycompany.app</groupId>
+    <artifactId>my-app-parent</artifactId>
+    <modules>
+        <module>does-not-exist</module>
+    </modules>
+</project>''')
+
+        with pytest.raises(ValueError, match=r'Given pom file does not exist: .*does-not-exist'):
+            get_maven_modules(os.path.join(temp_dir.path, 'pom.xml'))
+
+def test_get_maven_modules_missing_group_id():
+    with TempDirectory() as temp_dir:
+        temp_dir.write('pom.xml',b'''<project>
+    <artifactId>my-app</artifactId>
+</project>''')
+
+        with pytest.raises(ValueError, match=r'does not have ./artifactId and ./groupId'):
+            get_maven_modules(os.path.join(temp_dir.path, 'pom.xml'))
+
+def test_get_maven_pom_ci_friendly_version():
+    with TempDirectory() as temp_dir:
+        temp_dir.write('pom.xml',b'''<project xmlns="http://maven.apache.org/POM/4.0.0">
+    <groupId>com.mycompany.app</groupId>
+    <artifactId>my-app-parent</artifactId>
+    <version>${revision}${changelist}</version>
+    <packaging>pom</packaging>
+    <properties>
+        <revision>42.1</revision>
+        <changelist>-SNAPSHOT</changelist>
+        <app.name>my-app</app.name>
+    </properties>
+</project>''')
+        temp_dir.write('my-app/pom.xml',b'''<project xmlns="http://maven.apache.org/POM/4.0.0">
+    <parent>
+        <groupId>com.mycompany.app</groupId>
+        <artifactId>my-app-parent</artifactId>
+        <version>${revision}${changelist}</version>
+    </parent>
+    <artifactId>${app.name}</artifactId>
+    <packaging>war</packaging>
+    <properties>
+        <changelist></changelist>
+    </properties>
+</project>''')
+
+        parent_pom = get_maven_pom(os.path.join(temp_dir.path, 'pom.xml'))
+        assert parent_pom.version == '42.1-SNAPSHOT'
+        assert parent_pom.packaging == 'pom'
+        assert parent_pom.parent is None
+
+        pom = get_maven_pom(os.path.join(temp_dir.path, 'my-app', 'pom.xml'))
+        assert pom.group_id == 'com.mycompany.app'
+        assert pom.artifact_id == 'my-app'
+        assert pom.version == '42.1'
+        assert pom.packaging == 'war'
+        assert pom.parent.artifact_id == 'my-app-parent'
+        assert pom.resolve('${project.parent.version}/${undefined}') == '42.1/${undefined}'
+
+def test_get_maven_pom_parent_not_local():
+    with TempDirectory() as temp_dir:
+        temp_dir.write('pom.xml',b'''<project>
+    <groupId>com.mycompany.app</groupId>
+    <artifactId>my-app-parent</artifactId>
+    <version>1.0</version>
+    <properties>
+        <revision>42.1</revision>
+    </properties>
+</project>''')
+        temp_dir.write('my-app/pom.xml',b'''<project>
+    <parent>
+        <groupId>org.springframework.boot</groupId>
+        <artifactId>spring-boot-starter-parent</artifactId>
+        <version>2.3.4.RELEASE</version>
+    </parent>
+    <artifactId>my-app</artifactId>
+    <version>${revision}</version>
+</project>''')
+        temp_dir.write('my-other-app/pom.xml',b'''<project>
+    <parent>
+        <groupId>com.mycompany.app</groupId>
+        <artifactId>my-app-parent</artifactId>
+        <version>1.0</version>
+        <relativePath/>
+    </parent>
+    <artifactId>my-other-app</artifactId>
+</project>''')
+
+        pom = get_maven_pom(os.path.join(temp_dir.path, 'my-app', 'pom.xml'))
+        assert pom.parent is None
+        assert pom.group_id == 'org.springframework.boot'
+        assert pom.version == '${revision}'
+
+        other_pom = get_maven_pom(os.path.join(temp_dir.path, 'my-other-app', 'pom.xml'))
+        assert other_pom.parent is None
+        assert other_pom.version == '1.0'
+
+def test_get_maven_pom_none_existent_file():
+    with pytest.raises(ValueError, match='Given pom file does not exist: does_not_exist/pom.xml'):
+        get_maven_pom('does_not_exist/pom.xml')
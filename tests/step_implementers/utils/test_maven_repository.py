@@ -0,0 +1,170 @@
+import hashlib
+import os
+import xml.etree.ElementTree as ET
+
+import unittest
+from testfixtures import TempDirectory
+
+from tssc.step_implementers.utils.maven_repository import \
+    MavenRepositoryUploader, artifact_extension, generate_pom, maven_repository_path
+
+from maven_repository_server import MavenRepositoryServer
+
+ARTIFACT_DIR = '/repository/releases/com/mycompany/app/{artifact_id}/1.0/'
+
+class TestMavenRepository(unittest.TestCase):
+    def test_maven_repository_path(self):
+        self.assertEqual(
+            maven_repository_path('com.mycompany.app', 'my-app', '1.0-123abc', 'jar'),
+            'com/mycompany/app/my-app/1.0-123abc/my-app-1.0-123abc.jar'
+        )
+        self.assertEqual(
+            maven_repository_path('com.mycompany.app', 'my-app', '1.0', 'jar', 'sources'),
+            'com/mycompany/app/my-app/1.0/my-app-1.0-sources.jar'
+        )
+
+    def test_artifact_extension(self):
+        self.assertEqual(
+            artifact_extension({'path': '/target/my-app-1.0.war', 'package-type': 'war'}),
+            'war')
+        self.assertEqual(
+            artifact_extension({
+                'path': '/target/my-app-1.0-sources.jar',
+                'package-type': 'war',
+                'classifier': 'sources'
+            }),
+            'jar')
+
+    def test_generate_pom(self):
+        pom = ET.fromstring(generate_pom('com.mycompany.app', 'my-app', '1.0', 'war'))
+        namespace = '{http://maven.apache.org/POM/4.0.0}'
+
+        self.assertEqual(pom.find(namespace + 'groupId').text, 'com.mycompany.app')
+        self.assertEqual(pom.find(namespace + 'artifactId').text, 'my-app')
+        self.assertEqual(pom.find(namespace + 'version').text, '1.0')
+        self.assertEqual(pom.find(namespace + 'packaging').text, 'war')
+
+class TestMavenRepositoryUploader(unittest.TestCase):
+    @staticmethod
+    def __create_artifacts(temp_dir, count):
+        artifacts = []
+        for index in range(count):
+            artifact_id = 'my-app-' + str(index)
+            temp_dir.write(artifact_id + '.jar', ('jar ' + str(index)).encode())
+            artifacts.append({
+                'path': os.path.join(temp_dir.path, artifact_id + '.jar'),
+                'group-id': 'com.mycompany.app',
+                'artifact-id': artifact_id,
+                'version': '1.0',
+                'package-type': 'jar'
+            })
+
+        return artifacts
+
+    def test_upload_artifacts(self):
+        with TempDirectory() as temp_dir, \
+                MavenRepositoryServer('unit.test.user', 'unit.test.password') as server:
+            artifacts = self.__create_artifacts(temp_dir, 2)
+
+            MavenRepositoryUploader(
+                server.url,
+                'unit.test.user',
+                'unit.test.password'
+            ).upload_artifacts(artifacts)
+
+            self.assertEqual(len(server.files), 12)
+            artifact_dir = ARTIFACT_DIR.format(artifact_id='my-app-1')
+            self.assertEqual(server.files[artifact_dir + 'my-app-1-1.0.jar'], b'jar 1')
+            self.assertEqual(
+                server.files[artifact_dir + 'my-app-1-1.0.jar.md5'],
+                hashlib.md5(b'jar 1').hexdigest().encode())
+            self.assertEqual(
+                server.files[artifact_dir + 'my-app-1-1.0.jar.sha1'],
+                hashlib.sha1(b'jar 1').hexdigest().encode())
+            pom = server.files[artifact_dir + 'my-app-1-1.0.pom']
+            self.assertEqual(pom, generate_pom('com.mycompany.app', 'my-app-1', '1.0', 'jar'))
+            self.assertEqual(
+                server.files[artifact_dir + 'my-app-1-1.0.pom.sha1'],
+                hashlib.sha1(pom).hexdigest().encode())
+
+    def test_upload_artifacts_with_classifier(self):
+        with TempDirectory() as temp_dir, MavenRepositoryServer() as server:
+            artifacts = self.__create_artifacts(temp_dir, 1)
+            temp_dir.write('my-app-0-sources.jar', b'sources')
+            artifacts.append({
+                **artifacts[0],
+                'path': os.path.join(temp_dir.path, 'my-app-0-sources.jar'),
+                'classifier': 'sources'
+            })
+
+            MavenRepositoryUploader(server.url).upload_artifacts(artifacts)
+
+            artifact_dir = ARTIFACT_DIR.format(artifact_id='my-app-0')
+            self.assertEqual(len(server.files), 9)
+            self.assertEqual(server.files[artifact_dir + 'my-app-0-1.0.jar'], b'jar 0')
+            self.assertEqual(server.files[artifact_dir + 'my-app-0-1.0-sources.jar'], b'sources')
+            self.assertEqual(
+                server.files[artifact_dir + 'my-app-0-1.0-sources.jar.sha1'],
+                hashlib.sha1(b'sources').hexdigest().encode())
+
+    def test_upload_artifacts_reuses_connections(self):
+        with TempDirectory() as temp_dir, MavenRepositoryServer() as server:
+            artifacts = self.__create_artifacts(temp_dir, 10)
+            uploader = MavenRepositoryUploader(server.url, max_connections=2)
+
+            uploader.upload_artifacts(artifacts)
+
+            self.assertEqual(len(server.files), 60)
+            self.assertLessEqual(uploader.connection_count, 2)
+            self.assertLessEqual(len(server.client_ports), 2)
+
+    def test_upload_artifacts_server_closes_connections(self):
+        with TempDirectory() as temp_dir, MavenRepositoryServer(close_connections=True) as server:
+            artifacts = self.__create_artifacts(temp_dir, 2)
+            uploader = MavenRepositoryUploader(server.url, max_connections=2)
+
+            uploader.upload_artifacts(artifacts)
+
+            self.assertEqual(len(server.files), 12)
+            self.assertEqual(uploader.connection_count, 12)
+
+    def test_upload_artifacts_unauthorized(self):
+        with TempDirectory() as temp_dir, \
+                MavenRepositoryServer('unit.test.user', 'unit.test.password') as server:
+            artifacts = self.__create_artifacts(temp_dir, 1)
+
+            with self.assertRaisesRegex(
+                    RuntimeError,
+                    r'Error uploading to maven repository \(http://127.0.0.1:[0-9]+'
+                    r'/repository/releases/com/mycompany/app/my-app-0/1.0/my-app-0-1.0.*\): '
+                    r'401 Unauthorized'):
+                MavenRepositoryUploader(server.url).upload_artifacts(artifacts)
+
+    def test_upload_artifacts_server_error(self):
+        fail_path = ARTIFACT_DIR.format(artifact_id='my-app-0') + 'my-app-0-1.0.pom'
+        with TempDirectory() as temp_dir, \
+                MavenRepositoryServer(fail_paths=[fail_path]) as server:
+            artifacts = self.__create_artifacts(temp_dir, 1)
+
+            with self.assertRaisesRegex(
+                    RuntimeError,
+                    r'Error uploading to maven repository \(.*/my-app-0-1.0.pom\): '
+                    r'500 Internal Server Error'):
+                MavenRepositoryUploader(server.url).upload_artifacts(artifacts)
+
+    def test_upload_artifacts_unreachable(self):
+        with TempDirectory() as temp_dir:
+            artifacts = self.__create_artifacts(temp_dir, 1)
+            with MavenRepositoryServer() as server:
+                url = server.url
+
+            with self.assertRaisesRegex(
+                    RuntimeError,
+                    r'Error uploading to maven repository \(.*\): .*'):
+                MavenRepositoryUploader(url).upload_artifacts(artifacts)
+
+    def test_not_http_url(self):
+        with self.assertRaisesRegex(
+                ValueError,
+                r'Maven repository url must be a http or https url: ftp://example.com'):
+            MavenRepositoryUploader('ftp://example.com')
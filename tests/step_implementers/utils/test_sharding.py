@@ -0,0 +1,70 @@
+import json
+import os
+import unittest
+
+from testfixtures import TempDirectory
+
+from tssc.step_implementers.utils.sharding import TimingDatabase, discover_test_classes, \
+    plan_shards
+
+class TestShardingUtils(unittest.TestCase):
+    def test_timing_database(self):
+        with TempDirectory() as temp_dir:
+            timing_db_file = os.path.join(temp_dir.path, 'timings', 'test-timings.json')
+
+            timing_db = TimingDatabase(timing_db_file)
+            self.assertEqual(timing_db.durations, {})
+
+            timing_db.update({'com.example.ATest': 10.0, 'com.example.BTest': 2.0})
+            timing_db = TimingDatabase(timing_db_file, smoothing=0.25)
+            self.assertEqual(timing_db.durations, {'com.example.ATest': 10.0, 'com.example.BTest': 2.0})
+
+            timing_db.update({'com.example.ATest': 2.0})
+            self.assertEqual(timing_db.durations, {'com.example.ATest': 8.0, 'com.example.BTest': 2.0})
+            with open(timing_db_file, 'r') as timing_db_content:
+                self.assertEqual(json.load(timing_db_content), timing_db.durations)
+            self.assertEqual(os.listdir(os.path.dirname(timing_db_file)), ['test-timings.json'])
+
+    def test_timing_database_corrupt(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('test-timings.json', b'{not json')
+
+            self.assertEqual(
+                TimingDatabase(os.path.join(temp_dir.path, 'test-timings.json')).durations, {})
+
+    def test_discover_test_classes(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('src/test/java/com/example/AppTest.java', b'')
+            temp_dir.write('src/test/java/com/example/TestUtils.java', b'')
+            temp_dir.write('src/test/java/com/example/web/ControllerTests.java', b'')
+            temp_dir.write('src/test/java/com/example/Fixtures.java', b'')
+
+            self.assertEqual(
+                discover_test_classes([
+                    os.path.join(temp_dir.path, 'src', 'test', 'java'),
+                    os.path.join(temp_dir.path, 'missing')
+                ]),
+                ['com.example.AppTest', 'com.example.TestUtils', 'com.example.web.ControllerTests'])
+            self.assertEqual(
+                discover_test_classes(
+                    [os.path.join(temp_dir.path, 'src', 'test', 'java')], ['*Tests.java']),
+                ['com.example.web.ControllerTests'])
+
+    def test_plan_shards(self):
+        shard_plan = plan_shards(
+            ['A', 'B', 'C', 'D', 'E', 'New'],
+            {'A': 8.0, 'B': 5.0, 'C': 4.0, 'D': 2.0, 'E': 1.0, 'Removed': 100.0},
+            2)
+
+        # New is assumed to take the average of A to E
+        self.assertEqual(shard_plan, [
+            {'shard': 0, 'test-classes': ['A', 'New'], 'estimated-time': 12.0},
+            {'shard': 1, 'test-classes': ['B', 'C', 'D', 'E'], 'estimated-time': 12.0}
+        ])
+
+    def test_plan_shards_more_shards_then_test_classes(self):
+        self.assertEqual(plan_shards(['A'], {}, 3), [
+            {'shard': 0, 'test-classes': ['A'], 'estimated-time': 1.0},
+            {'shard': 1, 'test-classes': [], 'estimated-time': 0.0},
+            {'shard': 2, 'test-classes': [], 'estimated-time': 0.0}
+        ])
@@ -3,7 +3,7 @@ import os
 import pytest
 from testfixtures import TempDirectory
 
-from tssc.step_implementers.utils.xml import get_xml_element
+from tssc.step_implementers.utils.xml import get_xml_element, parse_xml_file
 
 from test_utils import *
 
@@ -26,7 +26,33 @@ def test_get_xml_element_from_pom_file():
         assert artifact_id == 'my-app'
         assert group_id == 'com.mycompany.app'
         
+
 def test_get_xml_element_none_existent_file():
 
     with pytest.raises(ValueError):
-        get_xml_element("does_not_exist/pom.xml", 'version').text
\ No newline at end of file
+        get_xml_element("does_not_exist/pom.xml", 'version').text
+
+
+def test_parse_xml_file_cached():
+    with TempDirectory() as temp_dir:
+        temp_dir.write('pom.xml',b'''<project xmlns="http://maven.apache.org/POM/4.0.0">
+    <version>42.1</version>
+</project>''')
+        pom_file_path = os.path.join(temp_dir.path, 'pom.xml')
+
+        pom_root, pom_namespace = parse_xml_file(pom_file_path)
+        assert pom_namespace == '{http://maven.apache.org/POM/4.0.0}'
+        assert parse_xml_file(pom_file_path)[0] is pom_root
+
+        temp_dir.write('pom.xml',b'''<project xmlns="http://maven.apache.org/POM/4.0.0">
+    <version>42.2-SNAPSHOT</version>
+</project>''')
+
+        changed_pom_root, _ = parse_xml_file(pom_file_path)
+        assert changed_pom_root is not pom_root
+        assert get_xml_element(pom_file_path, 'version').text == '42.2-SNAPSHOT'
+
+
+def test_parse_xml_file_none_existent_file():
+    with pytest.raises(ValueError, match='Given xml file does not exist: does_not_exist/pom.xml'):
+        parse_xml_file("does_not_exist/pom.xml")
@@ -0,0 +1,134 @@
+import unittest
+from unittest.mock import patch
+from testfixtures import TempDirectory
+
+import json
+import os
+
+from tssc.config_loader import config_cache_file_path, load_config_files, merge_configs, \
+    parse_yaml_or_json_file
+
+class TestConfigLoader(unittest.TestCase):
+    def test_parser_picked_from_extension(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('config.json', b'{"tssc-config": {"a": 1}}')
+            temp_dir.write('config.yml', b'{tssc-config: {a: 1}}')
+
+            with patch('tssc.config_loader.safe_load') as safe_load_mock:
+                self.assertEqual(
+                    parse_yaml_or_json_file(os.path.join(temp_dir.path, 'config.json')),
+                    {'tssc-config': {'a': 1}})
+                safe_load_mock.assert_not_called()
+
+            with patch('json.loads') as json_loads_mock:
+                self.assertEqual(
+                    parse_yaml_or_json_file(os.path.join(temp_dir.path, 'config.yml')),
+                    {'tssc-config': {'a': 1}})
+                json_loads_mock.assert_not_called()
+
+    def test_parser_picked_from_content(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('json-config', b'\xef\xbb\xbf \n {"tssc-config": {"a": 1}}')
+            temp_dir.write('yaml-config', b'---\ntssc-config:\n  a: 1\n')
+            temp_dir.write('flow-yaml-config', b'{tssc-config: {a: 1}}')
+
+            with patch('tssc.config_loader.safe_load') as safe_load_mock:
+                self.assertEqual(
+                    parse_yaml_or_json_file(os.path.join(temp_dir.path, 'json-config')),
+                    {'tssc-config': {'a': 1}})
+                safe_load_mock.assert_not_called()
+
+            with patch('json.loads') as json_loads_mock:
+                self.assertEqual(
+                    parse_yaml_or_json_file(os.path.join(temp_dir.path, 'yaml-config')),
+                    {'tssc-config': {'a': 1}})
+                json_loads_mock.assert_not_called()
+
+            self.assertEqual(
+                parse_yaml_or_json_file(os.path.join(temp_dir.path, 'flow-yaml-config')),
+                {'tssc-config': {'a': 1}})
+
+    def test_invalid_file(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('config.yml', b': blarg this: is {} bad syntax')
+            temp_dir.write('config.json', b'{"a": [}')
+
+            with self.assertRaisesRegex(ValueError, r'as YAML: '):
+                parse_yaml_or_json_file(os.path.join(temp_dir.path, 'config.yml'))
+            with self.assertRaisesRegex(ValueError, r'as YAML or JSON: \n  JSON error: '):
+                parse_yaml_or_json_file(os.path.join(temp_dir.path, 'config.json'))
+
+    def test_cache(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('config.yml', b'tssc-config: {a: 1}')
+            config_file = os.path.join(temp_dir.path, 'config.yml')
+            cache_file = os.path.join(temp_dir.path, '.config.yml.cache.json')
+            self.assertEqual(config_cache_file_path(config_file), cache_file)
+
+            self.assertEqual(parse_yaml_or_json_file(config_file, True), {'tssc-config': {'a': 1}})
+            self.assertTrue(os.path.exists(cache_file))
+
+            with patch('tssc.config_loader.safe_load') as safe_load_mock:
+                self.assertEqual(
+                    parse_yaml_or_json_file(config_file, True),
+                    {'tssc-config': {'a': 1}})
+                safe_load_mock.assert_not_called()
+
+            # changed content is parsed again
+            temp_dir.write('config.yml', b'tssc-config: {a: 2}')
+            self.assertEqual(parse_yaml_or_json_file(config_file, True), {'tssc-config': {'a': 2}})
+            with open(cache_file, 'r') as cache:
+                cache.readline()
+                self.assertEqual(json.load(cache), {'tssc-config': {'a': 2}})
+
+            # corrupt caches are ignored
+            temp_dir.write('.config.yml.cache.json', b'garbage')
+            self.assertEqual(parse_yaml_or_json_file(config_file, True), {'tssc-config': {'a': 2}})
+
+            self.assertEqual(sorted(os.listdir(temp_dir.path)), ['.config.yml.cache.json', 'config.yml'])
+
+    def test_cache_skips_values_json_can_not_hold(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('dates.yml', b'tssc-config: {released: 2020-01-01}')
+            temp_dir.write('int-keys.yml', b'tssc-config: {1: one}')
+            temp_dir.write('config.json', b'{"tssc-config": {}}')
+
+            for config_file_name in ['dates.yml', 'int-keys.yml', 'config.json']:
+                config_file = os.path.join(temp_dir.path, config_file_name)
+                parse_yaml_or_json_file(config_file, True)
+                self.assertFalse(os.path.exists(config_cache_file_path(config_file)))
+
+    def test_merge_configs(self):
+        self.assertEqual(
+            merge_configs(
+                {'tssc-config': {'a': {'b': 1, 'c': [1, 2]}, 'd': 1}},
+                {'tssc-config': {'a': {'c': [3], 'e': None}, 'f': 2}}),
+            {'tssc-config': {'a': {'b': 1, 'c': [3], 'e': None}, 'd': 1, 'f': 2}})
+        self.assertEqual(merge_configs({'a': 1}, ['b']), ['b'])
+        self.assertEqual(merge_configs(None, {'a': 1}), {'a': 1})
+
+    def test_load_config_files(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('base.yml', b'''tssc-config:
+  global-defaults:
+    organization: tssc
+    application-name: app
+  package:
+    implementer: Maven
+''')
+            temp_dir.write('override.json', b'''{"tssc-config": {
+  "global-defaults": {"application-name": "override"},
+  "package": [{"implementer": "Maven", "config": {"pom-file": "other.xml"}}]
+}}''')
+
+            self.assertEqual(
+                load_config_files([
+                    os.path.join(temp_dir.path, 'base.yml'),
+                    os.path.join(temp_dir.path, 'override.json')
+                ]),
+                {
+                    'tssc-config': {
+                        'global-defaults': {'organization': 'tssc', 'application-name': 'override'},
+                        'package': [{'implementer': 'Maven', 'config': {'pom-file': 'other.xml'}}]
+                    }
+                })
@@ -1,4 +1,5 @@
 import unittest
+from unittest.mock import patch
 
 from tssc import TSSCFactory, TSSCException, StepImplementer
 
@@ -42,6 +43,11 @@ class FooStepImplementer(StepImplementer):
     def _run_step(self, runtime_step_config):
         pass
 
+class LazyStepImplementer(FooStepImplementer):
+    @staticmethod
+    def step_name():
+        return 'lazy'
+
 class TestFactory(unittest.TestCase):
     def test_TSSCFactory_init_valid_config(self):
         config = {
@@ -170,3 +176,43 @@ class TestFactory(unittest.TestCase):
         TSSCFactory.register_step_implementer(FooStepImplementer)
     
         factory.run_step('foo')
+
+    def test_TSSCFactory_run_step_lazy_StepImplementer_imports_module(self):
+        config = {
+            'tssc-config': {
+            }
+        }
+        factory = TSSCFactory(config, 'results.yml')
+        TSSCFactory.register_lazy_step_implementer(
+            'lazy',
+            'LazyStepImplementer',
+            'tests.test_factory',
+            True)
+
+        with patch('importlib.import_module') as import_module_mock:
+            import_module_mock.side_effect = \
+                lambda name: TSSCFactory.register_step_implementer(LazyStepImplementer, True)
+            factory.run_step('lazy')
+
+            import_module_mock.assert_called_once_with('tests.test_factory')
+            factory.run_step('lazy')
+            import_module_mock.assert_called_once_with('tests.test_factory')
+
+    def test_TSSCFactory_run_step_lazy_StepImplementer_module_does_not_register(self):
+        config = {
+            'tssc-config': {
+                'lazy-does-not-register': {
+                    'implementer': 'DoesNotRegister'
+                }
+            }
+        }
+        factory = TSSCFactory(config, 'results.yml')
+        TSSCFactory.register_lazy_step_implementer(
+            'lazy-does-not-register',
+            'DoesNotRegister',
+            'tests.test_factory')
+
+        with self.assertRaisesRegex(
+                TSSCException,
+                r"Module \(tests.test_factory\) did not register StepImplementer \(DoesNotRegister\) for step \(lazy-does-not-register\)"):
+            factory.run_step('lazy-does-not-register')
@@ -1,10 +1,13 @@
 import pytest
 import mock
+import json
 import os
+import yaml
 from testfixtures import TempDirectory
 
 from tssc.__main__ import main
 from tssc import TSSCFactory, StepImplementer, TSSCException
+from tssc.results_store import SqliteResultsStore
 
 class FooStepImplementer(StepImplementer):
     @staticmethod
@@ -130,6 +133,22 @@ class RequiredRuntimeStepConfigStepImplementer(StepImplementer):
         if 'required-rutnime-config-key' not in runtime_step_config:
             raise TSSCException('Key (required-rutnime-config-key) must be in the step configuration')
 
+class WriteResultsStepImplementer(StepImplementer):
+    @staticmethod
+    def step_name():
+        return 'write-results'
+
+    @staticmethod
+    def step_implementer_config_defaults():
+        return {}
+
+    @staticmethod
+    def required_runtime_step_config_keys():
+        return []
+
+    def _run_step(self, runtime_step_config):
+        return {'foo': 'bar'}
+
 def _run_main_test(argv, expected_exit_code=None, config_file_contents=None, config_file_name='tssc-config'):
     with TempDirectory() as temp_dir:
         if config_file_contents:
@@ -235,3 +254,194 @@ def test_required_step_config_pass_via_runtime_arg_valid():
         tssc-config: {}
         '''
     )
+
+def test_config_files_merged():
+    TSSCFactory.register_step_implementer(RequiredStepConfigStepImplementer, True)
+    with TempDirectory() as temp_dir:
+        temp_dir.write('tssc-config.yml', b'''tssc-config:
+  required-step-config-test:
+    implementer: RequiredStepConfigStepImplementer
+    config: {}
+''')
+        temp_dir.write('tssc-config-override.json', b'''{"tssc-config": {
+  "required-step-config-test": {"config": {"required-config-key": "hello world"}}
+}}''')
+        argv = [
+            '--step', 'required-step-config-test',
+            '--results-dir', os.path.join(temp_dir.path, 'tssc-results'),
+            '--config-cache',
+            '--config-file', os.path.join(temp_dir.path, 'tssc-config.yml')
+        ]
+
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            main(argv)
+        assert pytest_wrapped_e.value.code == 200
+        assert os.path.exists(os.path.join(temp_dir.path, '.tssc-config.yml.cache.json'))
+
+        for _ in range(2):
+            main(argv + [os.path.join(temp_dir.path, 'tssc-config-override.json')])
+
+def test_results_format_journal_and_compact():
+    TSSCFactory.register_step_implementer(WriteResultsStepImplementer, True)
+    with TempDirectory() as temp_dir:
+        temp_dir.write('tssc-config', b'tssc-config: {}')
+        results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+        main([
+            '--step', 'write-results',
+            '--config-file', os.path.join(temp_dir.path, 'tssc-config'),
+            '--results-dir', results_dir_path,
+            '--results-format', 'journal'
+        ])
+        assert os.path.exists(os.path.join(results_dir_path, 'tssc-results.jsonl'))
+        assert not os.path.exists(os.path.join(results_dir_path, 'tssc-results.yml'))
+
+        main(['results', 'compact', '--results-dir', results_dir_path])
+        assert not os.path.exists(os.path.join(results_dir_path, 'tssc-results.jsonl'))
+        with open(os.path.join(results_dir_path, 'tssc-results.yml'), 'r') as results_file:
+            assert yaml.safe_load(results_file) == {'tssc-results': {'write-results': {'foo': 'bar'}}}
+
+def test_results_format_sharded_and_compact():
+    TSSCFactory.register_step_implementer(WriteResultsStepImplementer, True)
+    with TempDirectory() as temp_dir:
+        temp_dir.write('tssc-config', b'tssc-config: {}')
+        results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+        main([
+            '--step', 'write-results',
+            '--config-file', os.path.join(temp_dir.path, 'tssc-config'),
+            '--results-dir', results_dir_path,
+            '--results-format', 'sharded'
+        ])
+        assert os.path.exists(
+            os.path.join(results_dir_path, 'tssc-results.d', 'steps', 'write-results.yml'))
+        assert not os.path.exists(os.path.join(results_dir_path, 'tssc-results.yml'))
+
+        main([
+            'results', 'compact',
+            '--results-dir', results_dir_path,
+            '--results-format', 'sharded'
+        ])
+        with open(os.path.join(results_dir_path, 'tssc-results.yml'), 'r') as results_file:
+            assert yaml.safe_load(results_file)['tssc-results']['write-results'] == {'foo': 'bar'}
+
+def test_results_format_sqlite_and_history(capsys):
+    TSSCFactory.register_step_implementer(WriteResultsStepImplementer, True)
+    with TempDirectory() as temp_dir:
+        temp_dir.write('tssc-config', b'tssc-config: {}')
+        results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+        for run_id in ['run1', 'run2']:
+            with mock.patch.dict(os.environ, {'TSSC_RUN_ID': run_id}):
+                main([
+                    '--step', 'write-results',
+                    '--config-file', os.path.join(temp_dir.path, 'tssc-config'),
+                    '--results-dir', results_dir_path,
+                    '--results-format', 'sqlite'
+                ])
+        assert os.path.exists(os.path.join(results_dir_path, 'tssc-results.db'))
+        capsys.readouterr()
+
+        main([
+            'results', 'history', 'write-results.foo',
+            '--results-dir', results_dir_path,
+            '--limit', '1'
+        ])
+        history = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [(result['run-id'], result['value']) for result in history] == [('run2', 'bar')]
+
+def test_results_format_sqlite_steps_share_run():
+    TSSCFactory.register_step_implementer(WriteResultsStepImplementer, True)
+    TSSCFactory.register_step_implementer(FooStepImplementer, True)
+    with TempDirectory() as temp_dir:
+        temp_dir.write('tssc-config', b'tssc-config: {}')
+        results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+        with mock.patch.dict(os.environ, clear=True):
+            for step_name in ['write-results', 'foo']:
+                main([
+                    '--step', step_name,
+                    '--config-file', os.path.join(temp_dir.path, 'tssc-config'),
+                    '--results-dir', results_dir_path,
+                    '--results-format', 'sqlite'
+                ])
+
+            main(['results', 'compact', '--results-dir', results_dir_path, '--results-format', 'sqlite'])
+            with open(os.path.join(results_dir_path, 'tssc-results.yml'), 'r') as results_file:
+                assert yaml.safe_load(results_file)['tssc-results']['write-results'] == {'foo': 'bar'}
+
+            _run_main_test([
+                'results', 'compact',
+                '--results-dir', results_dir_path,
+                '--results-format', 'sqlite',
+                '--run-id', 'other-run'
+            ], 300)
+
+def test_results_format_sqlite_run_id_argument():
+    TSSCFactory.register_step_implementer(WriteResultsStepImplementer, True)
+    with TempDirectory() as temp_dir:
+        temp_dir.write('tssc-config', b'tssc-config: {}')
+        results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+        main([
+            '--step', 'write-results',
+            '--config-file', os.path.join(temp_dir.path, 'tssc-config'),
+            '--results-dir', results_dir_path,
+            '--results-format', 'sqlite',
+            '--run-id', 'run1'
+        ])
+
+        results_store = SqliteResultsStore(results_dir_path, 'tssc-results.yml', run_id='run1')
+        assert results_store.get_step_results('write-results') == {'foo': 'bar'}
+
+def test_results_history_bad_result():
+    _run_main_test(['results', 'history', 'write-results'], 301)
+
+def test_results_no_command():
+    _run_main_test(['results'], 2)
+
+def test_run_workflow():
+    TSSCFactory.register_step_implementer(WriteResultsStepImplementer, True)
+    TSSCFactory.register_step_implementer(FooStepImplementer, True)
+    with TempDirectory() as temp_dir:
+        temp_dir.write('tssc-config', b'''---
+        tssc-config:
+          global-defaults: {}
+          write-results:
+            implementer: WriteResultsStepImplementer
+          foo:
+            implementer: FooStepImplementer
+        ''')
+        results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+        main([
+            'run-workflow',
+            '--config-file', os.path.join(temp_dir.path, 'tssc-config'),
+            '--results-dir', results_dir_path,
+            '--max-workers', '2'
+        ])
+        with open(os.path.join(results_dir_path, 'tssc-results.yml'), 'r') as results_file:
+            assert yaml.safe_load(results_file) == {'tssc-results': {'write-results': {'foo': 'bar'}}}
+
+def test_run_workflow_step_error():
+    TSSCFactory.register_step_implementer(RequiredStepConfigStepImplementer, True)
+    _run_main_test(['run-workflow'], 200,
+        '''{"tssc-config":{"required-step-config-test": {"implementer": "RequiredStepConfigStepImplementer"}}}'''
+    )
+
+def test_trace_file():
+    TSSCFactory.register_step_implementer(WriteResultsStepImplementer, True)
+    with TempDirectory() as temp_dir:
+        temp_dir.write('tssc-config', b'{"tssc-config": {}}')
+        results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+        trace_file_path = os.path.join(temp_dir.path, 'tssc-trace.json')
+        for _ in range(2):
+            main([
+                '--step', 'write-results',
+                '--config-file', os.path.join(temp_dir.path, 'tssc-config'),
+                '--results-dir', results_dir_path,
+                '--trace-file', trace_file_path
+            ])
+
+        with open(trace_file_path, 'r') as trace_file:
+            events = json.loads(trace_file.read().rstrip().rstrip(',') + ']')
+        assert [event['name'] for event in events].count('run-step') == 2
+
+        with open(os.path.join(results_dir_path, 'tssc-results.yml'), 'r') as results_file:
+            results = yaml.safe_load(results_file)
+        assert list(results['tssc-results']['trace-summary']) == \
+            ['write-results.WriteResultsStepImplementer']
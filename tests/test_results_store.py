@@ -0,0 +1,469 @@
+import unittest
+from unittest.mock import patch
+from testfixtures import TempDirectory
+
+import fcntl
+import json
+import multiprocessing
+import os
+import stat
+import yaml
+
+from tssc import TSSCException
+from tssc.results_store import ResultsStore, JournalResultsStore, ShardedResultsStore, \
+    SqliteResultsStore, create_results_store
+from tssc.yaml_io import safe_load
+
+class TestResultsStore(unittest.TestCase):
+    def test_no_results_file(self):
+        with TempDirectory() as temp_dir:
+            results_store = ResultsStore(temp_dir.path, 'tssc-results.yml')
+
+            self.assertIsNone(results_store.current_results())
+            self.assertIsNone(results_store.get_step_results('foo'))
+
+    def test_write_step_results_writes_through(self):
+        with TempDirectory() as temp_dir:
+            results_dir_path = os.path.join(temp_dir.path, 'tssc-results')
+            results_store = ResultsStore(results_dir_path, 'tssc-results.yml')
+
+            results_store.write_step_results('foo', {'a': 1})
+            results_store.write_step_results('foo', {'b': 2})
+            results_store.write_step_results('bar', {'c': 3})
+
+            with open(results_store.results_file_path, 'r') as results_file:
+                self.assertEqual(
+                    yaml.safe_load(results_file),
+                    {'tssc-results': {'foo': {'a': 1, 'b': 2}, 'bar': {'c': 3}}}
+                )
+            self.assertEqual(results_store.get_step_results('foo'), {'a': 1, 'b': 2})
+
+    def test_results_file_parsed_once(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('tssc-results.yml', b'tssc-results: {foo: {a: 1}}')
+            results_store = ResultsStore(temp_dir.path, 'tssc-results.yml')
+
+            with patch('tssc.results_store.results_store.safe_load', wraps=safe_load) as safe_load_mock:
+                for _ in range(5):
+                    self.assertEqual(results_store.get_step_results('foo'), {'a': 1})
+                results_store.write_step_results('bar', {'b': 2})
+                self.assertEqual(results_store.get_step_results('bar'), {'b': 2})
+
+                self.assertEqual(safe_load_mock.call_count, 1)
+
+    def test_results_file_changed_externally_is_reloaded(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('tssc-results.yml', b'tssc-results: {foo: {a: 1}}')
+            results_store = ResultsStore(temp_dir.path, 'tssc-results.yml')
+            self.assertEqual(results_store.get_step_results('foo'), {'a': 1})
+
+            temp_dir.write('tssc-results.yml', b'tssc-results: {foo: {a: 1, bb: 22}}')
+            self.assertEqual(results_store.get_step_results('foo'), {'a': 1, 'bb': 22})
+
+    def test_returned_results_are_copies(self):
+        with TempDirectory() as temp_dir:
+            results_store = ResultsStore(temp_dir.path, 'tssc-results.yml')
+            results_store.write_step_results('foo', {'artifacts': [{'path': 'a'}]})
+
+            step_results = results_store.get_step_results('foo')
+            step_results['artifacts'].append({'path': 'b'})
+
+            self.assertEqual(
+                results_store.get_step_results('foo'),
+                {'artifacts': [{'path': 'a'}]}
+            )
+
+    def test_existing_results_file_bad_yaml(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('tssc-results.yml', b'{}bad[yaml}')
+            results_store = ResultsStore(temp_dir.path, 'tssc-results.yml')
+
+            with self.assertRaisesRegex(
+                    TSSCException,
+                    r"Existing results file \(.*\) has invalid yaml:"):
+                results_store.get_step_results('foo')
+
+    def test_concurrent_processes_do_not_lose_results(self):
+        with TempDirectory() as temp_dir:
+            writers = [
+                multiprocessing.Process(target=_write_step_results, args=(temp_dir.path, writer))
+                for writer in range(4)
+            ]
+            for writer in writers:
+                writer.start()
+            for writer in writers:
+                writer.join()
+
+            results_store = ResultsStore(temp_dir.path, 'tssc-results.yml')
+            self.assertEqual(
+                results_store.current_results(),
+                {'tssc-results': {
+                    'step' + str(writer): {'result' + str(write): write for write in range(10)}
+                    for writer in range(4)
+                }}
+            )
+
+    def test_write_replaces_results_file(self):
+        with TempDirectory() as temp_dir:
+            results_store = ResultsStore(temp_dir.path, 'tssc-results.yml')
+            results_store.write_step_results('foo', {'a': 1})
+
+            results_file_inode = os.stat(results_store.results_file_path).st_ino
+            results_store.write_step_results('foo', {'b': 2})
+
+            self.assertNotEqual(os.stat(results_store.results_file_path).st_ino, results_file_inode)
+            self.assertEqual(
+                sorted(os.listdir(temp_dir.path)),
+                ['tssc-results.yml', 'tssc-results.yml.lock'])
+
+            umask = os.umask(0)
+            os.umask(umask)
+            self.assertEqual(
+                stat.S_IMODE(os.stat(results_store.results_file_path).st_mode), 0o666 & ~umask)
+
+    def test_write_times_out_waiting_for_lock(self):
+        with TempDirectory() as temp_dir:
+            results_store = ResultsStore(temp_dir.path, 'tssc-results.yml', lock_timeout=0.1)
+
+            with open(results_store.results_file_path + '.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+                with self.assertRaisesRegex(
+                        TSSCException,
+                        r"Timed out after 0.1s waiting for another tssc process to release the "
+                        r"results file lock"):
+                    results_store.write_step_results('foo', {'a': 1})
+
+            results_store.write_step_results('foo', {'a': 1})
+            self.assertEqual(results_store.get_step_results('foo'), {'a': 1})
+
+def _write_step_results(results_dir_path, writer, results_store_class=ResultsStore):
+    results_store = results_store_class(results_dir_path, 'tssc-results.yml')
+    for write in range(10):
+        results_store.write_step_results('step' + str(writer), {'result' + str(write): write})
+
+class TestJournalResultsStore(unittest.TestCase):
+    def test_write_step_results_appends_records(self):
+        with TempDirectory() as temp_dir:
+            results_store = JournalResultsStore(temp_dir.path, 'tssc-results.yml')
+
+            results_store.write_step_results('foo', {'a': 1}, 'FooImplementer1')
+            results_store.write_step_results('foo', {'a': 2, 'b': 2}, 'FooImplementer2')
+
+            self.assertEqual(
+                results_store.results_file_path,
+                os.path.join(temp_dir.path, 'tssc-results.jsonl')
+            )
+            self.assertFalse(os.path.exists(results_store.compacted_results_file_path))
+            with open(results_store.results_file_path, 'r') as journal_file:
+                records = [json.loads(line) for line in journal_file]
+            self.assertEqual(
+                [(record['step'], record['implementer'], record['results']) for record in records],
+                [
+                    ('foo', 'FooImplementer1', {'a': 1}),
+                    ('foo', 'FooImplementer2', {'a': 2, 'b': 2})
+                ]
+            )
+            self.assertEqual(results_store.get_step_results('foo'), {'a': 2, 'b': 2})
+
+    def test_folds_journal_into_existing_results_file(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('tssc-results.yml', b'tssc-results: {foo: {a: 1}, bar: {c: 3}}')
+            results_store = JournalResultsStore(temp_dir.path, 'tssc-results.yml')
+
+            results_store.write_step_results('foo', {'b': 2})
+
+            self.assertEqual(
+                results_store.current_results(),
+                {'tssc-results': {'foo': {'a': 1, 'b': 2}, 'bar': {'c': 3}}}
+            )
+
+    def test_reads_records_written_by_other_stores(self):
+        with TempDirectory() as temp_dir:
+            results_store1 = JournalResultsStore(temp_dir.path, 'tssc-results.yml')
+            results_store2 = JournalResultsStore(temp_dir.path, 'tssc-results.yml')
+
+            results_store1.write_step_results('foo', {'a': 1})
+            self.assertEqual(results_store2.get_step_results('foo'), {'a': 1})
+            results_store2.write_step_results('bar', {'b': 2})
+            self.assertEqual(results_store1.get_step_results('bar'), {'b': 2})
+
+    def test_ignores_partially_written_record(self):
+        with TempDirectory() as temp_dir:
+            results_store = JournalResultsStore(temp_dir.path, 'tssc-results.yml')
+            results_store.write_step_results('foo', {'a': 1})
+            with open(results_store.results_file_path, 'a') as journal_file:
+                journal_file.write('{"step": "foo", "results": {"a": ')
+
+            self.assertEqual(results_store.get_step_results('foo'), {'a': 1})
+
+    def test_write_after_partially_written_record(self):
+        with TempDirectory() as temp_dir:
+            results_store = JournalResultsStore(temp_dir.path, 'tssc-results.yml')
+            results_store.write_step_results('foo', {'a': 1})
+            results_store.write_step_results('bar', {'b': 2})
+
+            # the writer of the second record crashed mid record
+            with open(results_store.results_file_path, 'rb+') as journal_file:
+                journal_file.truncate(journal_file.seek(0, os.SEEK_END) - 10)
+
+            results_store = JournalResultsStore(temp_dir.path, 'tssc-results.yml')
+            results_store.write_step_results('baz', {'c': 3})
+
+            self.assertEqual(
+                results_store.current_results(),
+                {'tssc-results': {'foo': {'a': 1}, 'baz': {'c': 3}}}
+            )
+            with open(results_store.results_file_path, 'r') as journal_file:
+                self.assertEqual(len(journal_file.readlines()), 3)
+
+    def test_compact(self):
+        with TempDirectory() as temp_dir:
+            results_store = JournalResultsStore(temp_dir.path, 'tssc-results.yml')
+            results_store.write_step_results('foo', {'a': 1})
+            results_store.write_step_results('bar', {'b': 2})
+
+            results_file_path = results_store.compact()
+
+            self.assertFalse(os.path.exists(results_store.results_file_path))
+            with open(results_file_path, 'r') as results_file:
+                self.assertEqual(
+                    yaml.safe_load(results_file),
+                    {'tssc-results': {'foo': {'a': 1}, 'bar': {'b': 2}}}
+                )
+
+            results_store.write_step_results('foo', {'c': 3})
+            self.assertEqual(results_store.get_step_results('foo'), {'a': 1, 'c': 3})
+
+class TestShardedResultsStore(unittest.TestCase):
+    def test_write_step_results_writes_shards(self):
+        with TempDirectory() as temp_dir:
+            results_store = ShardedResultsStore(temp_dir.path, 'tssc-results.yml')
+            self.assertIsNone(results_store.current_results())
+
+            results_store.write_step_results('foo', {'a': 1})
+            results_store.write_step_results('foo', {'b': 2})
+            results_store.write_step_results('bar/baz', {'c': 3})
+
+            shards_dir_path = os.path.join(temp_dir.path, 'tssc-results.d')
+            self.assertEqual(
+                results_store.results_file_path, os.path.join(shards_dir_path, 'index.yml'))
+            with open(results_store.results_file_path, 'r') as index_file:
+                self.assertEqual(
+                    yaml.safe_load(index_file),
+                    {'steps': {'foo': 'steps/foo.yml', 'bar/baz': 'steps/bar%2Fbaz.yml'}}
+                )
+            with open(os.path.join(shards_dir_path, 'steps', 'foo.yml'), 'r') as shard_file:
+                self.assertEqual(yaml.safe_load(shard_file), {'a': 1, 'b': 2})
+
+            self.assertEqual(
+                ShardedResultsStore(temp_dir.path, 'tssc-results.yml').current_results(),
+                {'tssc-results': {'foo': {'a': 1, 'b': 2}, 'bar/baz': {'c': 3}}}
+            )
+
+    def test_get_step_results_parses_only_step_shard(self):
+        with TempDirectory() as temp_dir:
+            results_store = ShardedResultsStore(temp_dir.path, 'tssc-results.yml')
+            results_store.write_step_results('foo', {'a': 1})
+            results_store.write_step_results('bar', {'b': 2})
+
+            results_store = ShardedResultsStore(temp_dir.path, 'tssc-results.yml')
+            with patch('tssc.results_store.sharded.safe_load', wraps=safe_load) as safe_load_mock:
+                for _ in range(5):
+                    self.assertEqual(results_store.get_step_results('foo'), {'a': 1})
+                self.assertIsNone(results_store.get_step_results('missing'))
+
+                self.assertEqual(safe_load_mock.call_count, 1)
+
+    def test_reads_shards_written_by_other_stores(self):
+        with TempDirectory() as temp_dir:
+            results_store1 = ShardedResultsStore(temp_dir.path, 'tssc-results.yml')
+            results_store2 = ShardedResultsStore(temp_dir.path, 'tssc-results.yml')
+
+            results_store1.write_step_results('foo', {'a': 1})
+            self.assertEqual(results_store2.get_step_results('foo'), {'a': 1})
+            results_store2.write_step_results('foo', {'b': 2})
+            results_store2.write_step_results('bar', {'c': 3})
+            self.assertEqual(
+                results_store1.current_results(),
+                {'tssc-results': {'foo': {'a': 1, 'b': 2}, 'bar': {'c': 3}}}
+            )
+
+    def test_concurrent_processes_do_not_lose_results(self):
+        with TempDirectory() as temp_dir:
+            writers = [
+                multiprocessing.Process(
+                    target=_write_step_results,
+                    args=(temp_dir.path, writer, ShardedResultsStore))
+                for writer in range(4)
+            ]
+            for writer in writers:
+                writer.start()
+            for writer in writers:
+                writer.join()
+
+            self.assertEqual(
+                ShardedResultsStore(temp_dir.path, 'tssc-results.yml').current_results(),
+                {'tssc-results': {
+                    'step' + str(writer): {'result' + str(write): write for write in range(10)}
+                    for writer in range(4)
+                }}
+            )
+
+    def test_shard_bad_yaml(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('tssc-results.d/steps/foo.yml', b'{}bad[yaml}')
+            results_store = ShardedResultsStore(temp_dir.path, 'tssc-results.yml')
+
+            with self.assertRaisesRegex(
+                    TSSCException,
+                    r"Existing results file \(.*foo.yml\) has invalid yaml:"):
+                results_store.get_step_results('foo')
+
+    def test_compact(self):
+        with TempDirectory() as temp_dir:
+            results_store = ShardedResultsStore(temp_dir.path, 'tssc-results.yml')
+            results_store.write_step_results('foo', {'a': 1})
+            results_store.write_step_results('bar', {'b': 2})
+
+            results_file_path = results_store.compact()
+
+            self.assertEqual(results_file_path, results_store.compacted_results_file_path)
+            with open(results_file_path, 'r') as results_file:
+                self.assertEqual(
+                    yaml.safe_load(results_file),
+                    {'tssc-results': {'foo': {'a': 1}, 'bar': {'b': 2}}}
+                )
+            self.assertEqual(results_store.get_step_results('foo'), {'a': 1})
+
+class TestSqliteResultsStore(unittest.TestCase):
+    def test_write_step_results_of_run(self):
+        with TempDirectory() as temp_dir:
+            results_store = SqliteResultsStore(temp_dir.path, 'tssc-results.yml', run_id='run1')
+            self.assertIsNone(results_store.current_results())
+            self.assertIsNone(results_store.get_step_results('foo'))
+            self.assertFalse(os.path.exists(results_store.results_file_path))
+
+            results_store.write_step_results('foo', {'a': 1, 'artifacts': [{'path': 'a'}]}, 'Foo')
+            results_store.write_step_results('foo', {'a': 2})
+            results_store.write_step_results('bar', {'b': 'two'})
+            SqliteResultsStore(temp_dir.path, 'tssc-results.yml', run_id='run2') \
+                .write_step_results('foo', {'a': 3})
+
+            self.assertEqual(
+                results_store.results_file_path, os.path.join(temp_dir.path, 'tssc-results.db'))
+            self.assertEqual(
+                results_store.current_results(),
+                {'tssc-results': {'foo': {'a': 2, 'artifacts': [{'path': 'a'}]}, 'bar': {'b': 'two'}}}
+            )
+            self.assertEqual(results_store.get_step_results('bar'), {'b': 'two'})
+            self.assertEqual(results_store.get_step_result('foo', 'a'), 2)
+            self.assertIsNone(results_store.get_step_result('foo', 'missing'))
+
+    def test_run_id_from_environment(self):
+        with TempDirectory() as temp_dir:
+            with patch.dict(os.environ, {'TSSC_RUN_ID': 'run1'}):
+                self.assertEqual(
+                    SqliteResultsStore(temp_dir.path, 'tssc-results.yml').run_id, 'run1')
+
+            with patch.dict(os.environ, clear=True):
+                self.assertEqual(
+                    SqliteResultsStore(temp_dir.path, 'tssc-results.yml').run_id, 'run1')
+
+    def test_run_id_saved_in_results_dir(self):
+        with TempDirectory() as temp_dir:
+            with patch.dict(os.environ, clear=True):
+                run_id = SqliteResultsStore(temp_dir.path, 'tssc-results.yml').run_id
+                self.assertEqual(
+                    SqliteResultsStore(temp_dir.path, 'tssc-results.yml').run_id, run_id)
+                with open(os.path.join(temp_dir.path, 'tssc-results.run-id'), 'r') as run_id_file:
+                    self.assertEqual(run_id_file.read(), run_id + '\n')
+                self.assertNotEqual(
+                    SqliteResultsStore(
+                        os.path.join(temp_dir.path, 'other'), 'tssc-results.yml').run_id,
+                    run_id)
+
+                # a given run ID becomes the run of the results directory
+                SqliteResultsStore(temp_dir.path, 'tssc-results.yml', run_id='run2').run_id
+                self.assertEqual(
+                    SqliteResultsStore(temp_dir.path, 'tssc-results.yml').run_id, 'run2')
+                self.assertEqual(
+                    sorted(os.listdir(temp_dir.path)), ['other', 'tssc-results.run-id'])
+
+    def test_processes_without_run_id_share_results(self):
+        with TempDirectory() as temp_dir:
+            with patch.dict(os.environ, clear=True):
+                writers = [
+                    multiprocessing.Process(
+                        target=_write_step_results,
+                        args=(temp_dir.path, writer, SqliteResultsStore))
+                    for writer in range(4)
+                ]
+                for writer in writers:
+                    writer.start()
+                for writer in writers:
+                    writer.join()
+
+                results_store = SqliteResultsStore(temp_dir.path, 'tssc-results.yml')
+                for writer in range(4):
+                    self.assertEqual(
+                        results_store.get_step_results('step' + str(writer)),
+                        {'result' + str(write): write for write in range(10)})
+
+    def test_result_history(self):
+        with TempDirectory() as temp_dir:
+            for run_id, digest in [('svc-a-1', 'a1'), ('svc-b-1', 'b1'), ('svc-a-2', 'a2')]:
+                SqliteResultsStore(temp_dir.path, 'tssc-results.yml', run_id=run_id) \
+                    .write_step_results('push', {'digest': digest}, 'Skopeo')
+
+            results_store = SqliteResultsStore(temp_dir.path, 'tssc-results.yml', run_id='x')
+            self.assertEqual(
+                [result['value'] for result in results_store.result_history('push', 'digest')],
+                ['a2', 'b1', 'a1'])
+
+            history = results_store.result_history('push', 'digest', 'svc-a-%', limit=1)
+            self.assertEqual(len(history), 1)
+            self.assertEqual(history[0]['run-id'], 'svc-a-2')
+            self.assertEqual(history[0]['implementer'], 'Skopeo')
+            self.assertEqual(history[0]['value'], 'a2')
+
+    def test_concurrent_processes_do_not_lose_results(self):
+        with TempDirectory() as temp_dir:
+            with patch.dict(os.environ, {'TSSC_RUN_ID': 'run1'}):
+                writers = [
+                    multiprocessing.Process(
+                        target=_write_step_results,
+                        args=(temp_dir.path, writer, SqliteResultsStore))
+                    for writer in range(4)
+                ]
+                for writer in writers:
+                    writer.start()
+                for writer in writers:
+                    writer.join()
+
+            self.assertEqual(
+                SqliteResultsStore(temp_dir.path, 'tssc-results.yml', run_id='run1') \
+                    .current_results(),
+                {'tssc-results': {
+                    'step' + str(writer): {'result' + str(write): write for write in range(10)}
+                    for writer in range(4)
+                }}
+            )
+
+    def test_compact(self):
+        with TempDirectory() as temp_dir:
+            results_store = SqliteResultsStore(temp_dir.path, 'tssc-results.yml', run_id='run1')
+            results_store.write_step_results('foo', {'a': 1})
+
+            with open(results_store.compact(), 'r') as results_file:
+                self.assertEqual(yaml.safe_load(results_file), {'tssc-results': {'foo': {'a': 1}}})
+
+            with self.assertRaisesRegex(TSSCException, r'No results for run \(run2\)'):
+                SqliteResultsStore(temp_dir.path, 'tssc-results.yml', run_id='run2').compact()
+
+    def test_create_results_store_unknown_format(self):
+        with self.assertRaisesRegex(
+                ValueError,
+                r"Unknown results format \(foo\), expected one of: "
+                r"\['yaml', 'journal', 'sharded', 'sqlite'\]"):
+            create_results_store('foo', 'tssc-results', 'tssc-results.yml')
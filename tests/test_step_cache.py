@@ -0,0 +1,109 @@
+import unittest
+from testfixtures import TempDirectory
+
+import os
+
+from tssc.step_cache import StepResultsCache, hash_path
+
+class TestHashPath(unittest.TestCase):
+    def test_missing_path(self):
+        with TempDirectory() as temp_dir:
+            self.assertIsNone(hash_path(os.path.join(temp_dir.path, 'missing')))
+
+    def test_dir_hash_depends_on_content_and_names(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('src/a.txt', b'a')
+            temp_dir.write('src/b/c.txt', b'c')
+            src_path = os.path.join(temp_dir.path, 'src')
+            original_hash = hash_path(src_path)
+
+            self.assertEqual(hash_path(src_path), original_hash)
+
+            temp_dir.write('src/b/c.txt', b'cc')
+            self.assertNotEqual(hash_path(src_path), original_hash)
+
+            temp_dir.write('src/b/c.txt', b'c')
+            self.assertEqual(hash_path(src_path), original_hash)
+
+            os.rename(os.path.join(src_path, 'a.txt'), os.path.join(src_path, 'aa.txt'))
+            self.assertNotEqual(hash_path(src_path), original_hash)
+
+    def test_dir_hash_ignores_excluded_and_git_paths(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('src/a.txt', b'a')
+            src_path = os.path.join(temp_dir.path, 'src')
+            original_hash = hash_path(src_path)
+
+            temp_dir.write('src/.git/HEAD', b'ref: refs/heads/master')
+            temp_dir.write('src/target/a.jar', b'jar')
+            temp_dir.write('src/image.tar', b'tar')
+
+            self.assertEqual(
+                hash_path(
+                    src_path,
+                    [os.path.join(src_path, 'target'), os.path.join(src_path, 'image.tar')]),
+                original_hash
+            )
+
+class TestStepResultsCache(unittest.TestCase):
+    def test_get_missing_key(self):
+        with TempDirectory() as temp_dir:
+            step_cache = StepResultsCache(temp_dir.path)
+
+            self.assertIsNone(step_cache.get('deadbeef'))
+
+    def test_put_and_get(self):
+        with TempDirectory() as temp_dir:
+            step_cache = StepResultsCache(temp_dir.path)
+
+            step_cache.put('deadbeef', {'artifacts': [{'path': 'a.jar'}]})
+
+            self.assertEqual(step_cache.get('deadbeef'), {'artifacts': [{'path': 'a.jar'}]})
+            self.assertTrue(os.path.isfile(os.path.join(temp_dir.path, 'de', 'deadbeef')))
+
+    def test_create_step_key(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('pom.xml', b'<project/>')
+            input_paths = [os.path.join(temp_dir.path, 'pom.xml')]
+            step_results = {
+                'generate-metadata': {'version': '1.0.0'},
+                'package': {'artifacts': []}
+            }
+
+            def create_step_key(config):
+                return StepResultsCache.create_step_key(
+                    'push-artifacts',
+                    'Maven',
+                    config,
+                    step_results.get,
+                    input_paths)
+
+            original_key = create_step_key({'url': 'a'})
+            self.assertEqual(create_step_key({'url': 'a'}), original_key)
+            self.assertNotEqual(create_step_key({'url': 'b'}), original_key)
+
+            step_results['generate-metadata']['version'] = '1.0.1'
+            self.assertNotEqual(create_step_key({'url': 'a'}), original_key)
+            step_results['generate-metadata']['version'] = '1.0.0'
+
+            # results of steps push-artifacts does not depend on are not inputs
+            step_results['unit-test'] = {'passed': True}
+            self.assertEqual(create_step_key({'url': 'a'}), original_key)
+
+            temp_dir.write('pom.xml', b'<project></project>')
+            self.assertNotEqual(create_step_key({'url': 'a'}), original_key)
+
+    def test_evicts_least_recently_used(self):
+        with TempDirectory() as temp_dir:
+            step_cache = StepResultsCache(temp_dir.path, max_cache_size=100)
+            results = {'foo': 'x' * 30}
+
+            step_cache.put('aa1', results)
+            os.utime(os.path.join(temp_dir.path, 'aa', 'aa1'), ns=(1, 1))
+            step_cache.put('bb2', results)
+            os.utime(os.path.join(temp_dir.path, 'bb', 'bb2'), ns=(2, 2))
+            step_cache.put('cc3', results)
+
+            self.assertIsNone(step_cache.get('aa1'))
+            self.assertEqual(step_cache.get('bb2'), results)
+            self.assertEqual(step_cache.get('cc3'), results)
@@ -5,6 +5,9 @@ import os
 import yaml
 
 from tssc import TSSCFactory, StepImplementer, TSSCException
+from tssc.step_cache import StepResultsCache
+from tssc.trace import Tracer
+from tssc.yaml_io import YAML_IMPLEMENTATION
 
 class dummy_context_mgr():
     def __enter__(self):
@@ -557,3 +560,137 @@ class TestStepImplementer(unittest.TestCase):
         self.assertEqual(step.step_config, {})
         self.assertEqual(step.global_config_defaults, {})
         self.assertEqual(step.global_environment_config_defaults, {})
+
+    def test_current_step_results_none_before_run(self):
+        with TempDirectory() as test_dir:
+            step = WriteConfigAsResultsStepImplementer(
+                results_dir_path=os.path.join(test_dir.path, 'tssc-results'),
+                results_file_name='tssc-results.yml',
+                work_dir_path=os.path.join(test_dir.path, 'tssc-working'),
+                step_config={'required-config-key': 'foo'}
+            )
+
+            self.assertIsNone(step.current_step_results())
+            step.run_step()
+            self.assertEqual(step.current_step_results(), {'required-config-key': 'foo'})
+
+class CountRunsCachedStepImplementer(StepImplementer):
+    runs = 0
+
+    @staticmethod
+    def step_name():
+        return 'count-runs-cached'
+
+    @staticmethod
+    def step_implementer_config_defaults():
+        return {}
+
+    @staticmethod
+    def required_runtime_step_config_keys():
+        return []
+
+    def _cache_input_paths(self, runtime_step_config):
+        return [runtime_step_config['input-dir']]
+
+    def _run_step(self, runtime_step_config):
+        CountRunsCachedStepImplementer.runs += 1
+        return {'runs': CountRunsCachedStepImplementer.runs}
+
+class TestStepImplementerStepCache(unittest.TestCase):
+    def test_unchanged_inputs_replay_cached_results(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('input/foo.txt', b'foo')
+            CountRunsCachedStepImplementer.runs = 0
+
+            def run_step():
+                step = CountRunsCachedStepImplementer(
+                    results_dir_path=os.path.join(temp_dir.path, 'tssc-results'),
+                    results_file_name='tssc-results.yml',
+                    work_dir_path=os.path.join(temp_dir.path, 'tssc-working'),
+                    step_config={'input-dir': os.path.join(temp_dir.path, 'input')},
+                    step_cache=StepResultsCache(os.path.join(temp_dir.path, 'tssc-cache'))
+                )
+                step.run_step()
+                return step.current_step_results()
+
+            self.assertEqual(run_step(), {'runs': 1})
+            self.assertEqual(run_step(), {'runs': 1})
+            self.assertEqual(CountRunsCachedStepImplementer.runs, 1)
+
+            temp_dir.write('input/foo.txt', b'bar')
+            self.assertEqual(run_step(), {'runs': 2})
+            self.assertEqual(CountRunsCachedStepImplementer.runs, 2)
+
+    def test_no_step_cache_always_runs(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('input/foo.txt', b'foo')
+            CountRunsCachedStepImplementer.runs = 0
+
+            for _ in range(2):
+                step = CountRunsCachedStepImplementer(
+                    results_dir_path=os.path.join(temp_dir.path, 'tssc-results'),
+                    results_file_name='tssc-results.yml',
+                    work_dir_path=os.path.join(temp_dir.path, 'tssc-working'),
+                    step_config={'input-dir': os.path.join(temp_dir.path, 'input')}
+                )
+                step.run_step()
+
+            self.assertEqual(CountRunsCachedStepImplementer.runs, 2)
+
+class TestStepImplementerTrace(unittest.TestCase):
+    def test_trace_summary_written_to_results(self):
+        with TempDirectory() as temp_dir:
+            tracer = Tracer()
+            step = WriteConfigAsResultsStepImplementer(
+                results_dir_path=os.path.join(temp_dir.path, 'tssc-results'),
+                results_file_name='tssc-results.yml',
+                work_dir_path=os.path.join(temp_dir.path, 'tssc-working'),
+                step_config={'required-config-key': 'foo'},
+                tracer=tracer
+            )
+
+            step.run_step()
+
+            span_names = [span.name for span in tracer.spans]
+            for span_name in [
+                    'print-step-config',
+                    'create-runtime-step-config',
+                    'validate-runtime-step-config',
+                    'run-step-implementation',
+                    'write-results',
+                    'print-step-results']:
+                self.assertIn(span_name, span_names)
+            self.assertEqual(span_names[-1], 'run-step')
+            self.assertEqual(
+                tracer.spans[-1].args,
+                {
+                    'step': 'write-config-as-results',
+                    'implementer': 'WriteConfigAsResultsStepImplementer',
+                    'yaml': YAML_IMPLEMENTATION
+                }
+            )
+
+            self.assertEqual(step.current_step_results(), {'required-config-key': 'foo'})
+            trace_summary = step.get_step_results('trace-summary')
+            self.assertEqual(
+                list(trace_summary),
+                ['write-config-as-results.WriteConfigAsResultsStepImplementer']
+            )
+            self.assertEqual(
+                trace_summary['write-config-as-results.WriteConfigAsResultsStepImplementer']\
+                    ['spans']['write-results']['count'],
+                1
+            )
+
+    def test_no_tracer_no_trace_summary(self):
+        with TempDirectory() as temp_dir:
+            step = WriteConfigAsResultsStepImplementer(
+                results_dir_path=os.path.join(temp_dir.path, 'tssc-results'),
+                results_file_name='tssc-results.yml',
+                work_dir_path=os.path.join(temp_dir.path, 'tssc-working'),
+                step_config={'required-config-key': 'foo'}
+            )
+
+            step.run_step()
+
+            self.assertIsNone(step.get_step_results('trace-summary'))
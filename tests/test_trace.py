@@ -0,0 +1,84 @@
+import unittest
+from testfixtures import TempDirectory
+
+import json
+import os
+import subprocess
+import sys
+
+from tssc.trace import Tracer, SUBPROCESS_CATEGORY
+
+class TestTracer(unittest.TestCase):
+    def test_span_times_work(self):
+        tracer = Tracer()
+
+        with tracer.span('outer', foo='bar') as outer_span:
+            with tracer.span('sleep', SUBPROCESS_CATEGORY):
+                subprocess.run([sys.executable, '-c', 'import time; time.sleep(0.05)'], check=True)
+
+        self.assertEqual([span.name for span in tracer.spans], ['sleep', 'outer'])
+        sleep_span = tracer.spans[0]
+        self.assertIs(sleep_span.parent, outer_span)
+        self.assertEqual(outer_span.args, {'foo': 'bar'})
+        self.assertGreaterEqual(sleep_span.wall_time, 0.05)
+        self.assertGreaterEqual(outer_span.wall_time, sleep_span.wall_time)
+        self.assertGreaterEqual(sleep_span.child_cpu_time, 0.0)
+        self.assertGreaterEqual(sleep_span.cpu_time, 0.0)
+
+    def test_span_finished_on_error(self):
+        tracer = Tracer()
+
+        with self.assertRaises(RuntimeError):
+            with tracer.span('fail'):
+                raise RuntimeError('fail')
+
+        self.assertEqual([span.name for span in tracer.spans], ['fail'])
+        with tracer.span('next') as next_span:
+            pass
+        self.assertIsNone(next_span.parent)
+
+    def test_summarize(self):
+        tracer = Tracer()
+
+        with tracer.span('other'):
+            pass
+        with tracer.span('run-step') as run_step_span:
+            for _ in range(3):
+                with tracer.span('read-results'):
+                    pass
+            with tracer.span('mvn clean install', SUBPROCESS_CATEGORY) as mvn_span:
+                with tracer.span('read-results'):
+                    pass
+
+        summary = tracer.summarize(run_step_span)
+
+        self.assertEqual(summary['wall-time'], run_step_span.wall_time)
+        self.assertEqual(summary['subprocess-wall-time'], mvn_span.wall_time)
+        self.assertEqual(sorted(summary['spans']), ['mvn clean install', 'read-results'])
+        self.assertEqual(summary['spans']['read-results']['count'], 4)
+        self.assertEqual(summary['spans']['read-results']['category'], 'tssc')
+        self.assertEqual(summary['spans']['mvn clean install']['count'], 1)
+        self.assertEqual(summary['spans']['mvn clean install']['category'], 'subprocess')
+
+    def test_write_trace_file_appends(self):
+        with TempDirectory() as temp_dir:
+            trace_file_path = os.path.join(temp_dir.path, 'trace', 'tssc-trace.json')
+
+            for step_name in ['package', 'unit-test']:
+                tracer = Tracer()
+                with tracer.span('run-step', step=step_name):
+                    pass
+                tracer.write_trace_file(trace_file_path)
+
+            with open(trace_file_path, 'r') as trace_file:
+                trace_file_contents = trace_file.read()
+
+            # the Chrome trace JSON array format allows the closing bracket to be left off
+            events = json.loads(trace_file_contents.rstrip().rstrip(',') + ']')
+            self.assertEqual(
+                [(event['name'], event['ph'], event['args']['step']) for event in events],
+                [('run-step', 'X', 'package'), ('run-step', 'X', 'unit-test')]
+            )
+            self.assertEqual(events[0]['pid'], os.getpid())
+            self.assertIn('cpu-time', events[0]['args'])
+            self.assertIn('child-cpu-time', events[0]['args'])
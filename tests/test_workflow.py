@@ -0,0 +1,174 @@
+import io
+import sys
+import threading
+import time
+
+import sh
+import unittest
+
+from tssc import DefaultSteps, TSSCException
+from tssc.workflow import StepOutput, create_step_dependency_graph, run_step_dependency_graph
+
+
+class TestCreateStepDependencyGraph(unittest.TestCase):
+    def test_analysis_steps_are_independent(self):
+        step_dependency_graph = create_step_dependency_graph([
+            DefaultSteps.GENERATE_METADATA,
+            DefaultSteps.SECURITY_STATIC_CODE_ANALYSIS,
+            DefaultSteps.LINTING_STATIC_CODE_ANALYSIS,
+            DefaultSteps.UNIT_TEST
+        ])
+
+        self.assertEqual(step_dependency_graph, {
+            DefaultSteps.GENERATE_METADATA: set(),
+            DefaultSteps.SECURITY_STATIC_CODE_ANALYSIS: {DefaultSteps.GENERATE_METADATA},
+            DefaultSteps.LINTING_STATIC_CODE_ANALYSIS: {DefaultSteps.GENERATE_METADATA},
+            DefaultSteps.UNIT_TEST: {DefaultSteps.GENERATE_METADATA}
+        })
+
+    def test_unit_test_after_package(self):
+        step_dependency_graph = create_step_dependency_graph([
+            DefaultSteps.GENERATE_METADATA,
+            DefaultSteps.LINTING_STATIC_CODE_ANALYSIS,
+            DefaultSteps.PACKAGE,
+            DefaultSteps.UNIT_TEST
+        ])
+
+        self.assertEqual(step_dependency_graph, {
+            DefaultSteps.GENERATE_METADATA: set(),
+            DefaultSteps.LINTING_STATIC_CODE_ANALYSIS: {DefaultSteps.GENERATE_METADATA},
+            DefaultSteps.PACKAGE: {DefaultSteps.GENERATE_METADATA},
+            DefaultSteps.UNIT_TEST: {DefaultSteps.PACKAGE}
+        })
+
+    def test_result_dependencies(self):
+        step_dependency_graph = create_step_dependency_graph([
+            DefaultSteps.PUSH_CONTAINER_IMAGE,
+            DefaultSteps.CREATE_CONTAINER_IMAGE,
+            DefaultSteps.GENERATE_METADATA
+        ])
+
+        self.assertEqual(list(step_dependency_graph), [
+            DefaultSteps.GENERATE_METADATA,
+            DefaultSteps.CREATE_CONTAINER_IMAGE,
+            DefaultSteps.PUSH_CONTAINER_IMAGE
+        ])
+        self.assertEqual(
+            step_dependency_graph[DefaultSteps.PUSH_CONTAINER_IMAGE],
+            {DefaultSteps.GENERATE_METADATA, DefaultSteps.CREATE_CONTAINER_IMAGE}
+        )
+
+    def test_dependencies_through_steps_not_in_workflow(self):
+        step_dependency_graph = create_step_dependency_graph([
+            DefaultSteps.GENERATE_METADATA,
+            DefaultSteps.CONTAINER_IMAGE_STATIC_VULNERABILITY_SCAN
+        ])
+
+        self.assertEqual(
+            step_dependency_graph[DefaultSteps.CONTAINER_IMAGE_STATIC_VULNERABILITY_SCAN],
+            {DefaultSteps.GENERATE_METADATA}
+        )
+
+    def test_non_default_steps_run_last_in_order(self):
+        step_dependency_graph = create_step_dependency_graph([
+            'foo',
+            DefaultSteps.GENERATE_METADATA,
+            'bar'
+        ])
+
+        self.assertEqual(step_dependency_graph, {
+            DefaultSteps.GENERATE_METADATA: set(),
+            'foo': {DefaultSteps.GENERATE_METADATA},
+            'bar': {DefaultSteps.GENERATE_METADATA, 'foo'}
+        })
+
+
+class TestRunStepDependencyGraph(unittest.TestCase):
+    def test_runs_independent_steps_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+        steps_run = []
+
+        def run_step(step_name):
+            if step_name in ('b', 'c', 'd'):
+                barrier.wait()
+            steps_run.append(step_name)
+
+        run_step_dependency_graph(
+            {'a': set(), 'b': {'a'}, 'c': {'a'}, 'd': {'a'}, 'e': {'b', 'c', 'd'}},
+            run_step,
+            3)
+
+        self.assertEqual(steps_run[0], 'a')
+        self.assertEqual(set(steps_run[1:4]), {'b', 'c', 'd'})
+        self.assertEqual(steps_run[4], 'e')
+
+    def test_respects_max_workers(self):
+        running = []
+        max_running = []
+        lock = threading.Lock()
+
+        def run_step(step_name):
+            with lock:
+                running.append(step_name)
+                max_running.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(step_name)
+
+        run_step_dependency_graph({str(i): set() for i in range(8)}, run_step, 2)
+
+        self.assertEqual(max(max_running), 2)
+
+    def test_stops_starting_steps_after_failure(self):
+        steps_run = []
+
+        def run_step(step_name):
+            steps_run.append(step_name)
+            if step_name == 'b':
+                raise TSSCException('b failed')
+
+        with self.assertRaisesRegex(TSSCException, 'b failed'):
+            run_step_dependency_graph({'a': set(), 'b': {'a'}, 'c': {'b'}}, run_step, 2)
+
+        self.assertEqual(steps_run, ['a', 'b'])
+
+    def test_unrunnable_dependencies(self):
+        with self.assertRaisesRegex(
+                TSSCException,
+                r"Steps \(\['a'\]\) depend on steps that can not be run"):
+            run_step_dependency_graph({'a': {'does-not-exist'}}, lambda step_name: None, 2)
+
+
+class TestStepOutput(unittest.TestCase):
+    def test_output_of_concurrent_steps_is_not_interleaved(self):
+        stdout = io.StringIO()
+        step_output = StepOutput(stdout)
+        barrier = threading.Barrier(2, timeout=5)
+
+        def run_step(step_name):
+            with step_output.buffered():
+                print(step_name + ' started', file=step_output)
+                barrier.wait()
+                sh.Command(sys.executable)(
+                    '-c', 'print("' + step_name + ' command output")',
+                    _out=step_output)
+                barrier.wait()
+                print(step_name + ' done', file=step_output)
+
+        run_step_dependency_graph({'a': set(), 'b': set()}, run_step, 2)
+
+        output = stdout.getvalue()
+        for step_name in ['a', 'b']:
+            self.assertIn(
+                step_name + ' started\n' +
+                step_name + ' command output\n' +
+                step_name + ' done\n',
+                output)
+
+    def test_output_outside_of_steps_is_written_through(self):
+        stdout = io.StringIO()
+        step_output = StepOutput(stdout)
+
+        print('not in a step', file=step_output)
+
+        self.assertEqual(stdout.getvalue(), 'not in a step\n')
@@ -0,0 +1,49 @@
+import unittest
+
+import io
+import yaml
+
+from tssc import yaml_io
+from tssc.yaml_io import YAML_IMPLEMENTATION, YAML_PARSE_ERRORS, safe_dump, safe_load
+
+RESULTS = {
+    'tssc-results': {
+        'unit-test': {
+            'test-cases': [{'name': 'test_case_' + str(index), 'time': index} for index in range(10)],
+            'report-dir': '/tmp/reports',
+            'passed': True,
+            'description': 'multi\nline: "text"'
+        }
+    }
+}
+
+class TestYamlIO(unittest.TestCase):
+    def test_implementation(self):
+        if yaml.__with_libyaml__:
+            self.assertEqual(YAML_IMPLEMENTATION, 'libyaml')
+            self.assertIs(yaml_io.SafeLoader, yaml.CSafeLoader)
+            self.assertIs(yaml_io.SafeDumper, yaml.CSafeDumper)
+        else:
+            self.assertEqual(YAML_IMPLEMENTATION, 'python')
+            self.assertIs(yaml_io.SafeLoader, yaml.SafeLoader)
+
+    def test_round_trip_matches_pure_python(self):
+        dumped = safe_dump(RESULTS)
+
+        self.assertEqual(dumped, yaml.dump(RESULTS))
+        self.assertEqual(safe_load(dumped), RESULTS)
+        self.assertEqual(safe_load(io.StringIO(dumped)), RESULTS)
+        self.assertEqual(safe_load(dumped, loader=yaml.SafeLoader), RESULTS)
+
+        stream = io.StringIO()
+        self.assertIsNone(safe_dump(RESULTS, stream, dumper=yaml.SafeDumper))
+        self.assertEqual(stream.getvalue(), dumped)
+
+    def test_safe_load_is_safe(self):
+        with self.assertRaises(yaml.constructor.ConstructorError):
+            safe_load('!!python/object/apply:os.system ["true"]')
+
+    def test_invalid_yaml(self):
+        for invalid_yaml in ['a: [1', 'a: b: c', '{a: 1}}']:
+            with self.assertRaises(YAML_PARSE_ERRORS):
+                safe_load(invalid_yaml)
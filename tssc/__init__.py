@@ -12,16 +12,74 @@ Command-Line Options
   -e ENVIRONMENT, --environment  ENVIRONMENT
         The environment to run this step against.
 
-  -c CONFIG_FILE, --config-file CONFIG_FILE
-        TSSC workflow configuration file in yml or json
+  -c CONFIG_FILE [CONFIG_FILE ...], --config-file CONFIG_FILE [CONFIG_FILE ...]
+        TSSC workflow configuration files in yml or json. Each file overrides the ones before
+        it, mappings are merged key by key and any other value is replaced.
+        See `tssc.config_loader`.
+
+  --config-cache
+        Cache the configuration parsed from each yml config file beside the file, as
+        `.{file name}.cache.json`, to read it back rather then parsing the file again while
+        its content is unchanged.
 
   -r RESULTS_DIR, --results-dir RESULTS_DIR
         TSSC workflow results file in yml or json
 
+  --results-format {yaml,journal,sharded,sqlite}
+        Format to store the TSSC workflow results in.
+        `yaml` re-writes the results file after each sub step.
+        `journal` appends the results of each sub step to a JSON lines journal file
+        that can be materialized into the results file with `results compact`.
+        `sharded` re-writes a results file of the step's own after each sub step.
+        `sqlite` writes the results of each sub step to a SQLite database of the results
+        of all runs. See `tssc.results_store`.
+
+  --run-id RUN_ID
+        ID of the run to store the results of with `--results-format sqlite`. By default the
+        TSSC_RUN_ID environment variable, or else the run ID saved in the results directory
+        by the first step of the run, so that steps run one at a time share their results.
+
+  --cache-dir CACHE_DIR
+        Directory to cache step results in. Sub steps that support caching replay their
+        results from the cache rather then running when their configuration, input files,
+        and the results of the steps they depend on are unchanged. See `tssc.step_cache`.
+
+  --cache-max-size CACHE_MAX_SIZE
+        Maximum size in bytes of the step results cache, least recently used results are
+        evicted once it is exceeded. Default 104857600 (100MB).
+
+  --trace-file TRACE_FILE
+        Record the wall, CPU, and subprocess CPU time of the work done by each step,
+        such as merging configuration, running mvn or buildah, and reading and writing
+        results. The timings are appended to the given file in the Chrome trace format,
+        viewable with chrome://tracing or https://ui.perfetto.dev, and summarized per step
+        implementer under `trace-summary` in the results. See `tssc.trace`.
+
   --step-config STEP_CONFIG_KEY=STEP_CONFIG_VALUE [STEP_CONFIG_KEY=STEP_CONFIG_VALUE ...]
         Override step config provided by the given TSSC
         config-file with these arguments.
 
+Commands
+--------
+
+  run-workflow -c CONFIG_FILE [CONFIG_FILE ...] [--config-cache] [-e ENVIRONMENT]
+               [-r RESULTS_DIR] [--results-format {yaml,journal,sharded,sqlite}] [--run-id RUN_ID]
+               [--cache-dir CACHE_DIR] [--cache-max-size CACHE_MAX_SIZE] [--trace-file TRACE_FILE]
+               [--step-config STEP_CONFIG_KEY=STEP_CONFIG_VALUE ...] [--max-workers MAX_WORKERS]
+        Run all of the steps in the given TSSC config-file. Steps are run once all of the
+        steps whose results they require, or that must come before them, have been run.
+        Steps that do not depend on each other, such as the static code analysis steps and
+        package, are run at the same time on up to MAX_WORKERS (default 4) workers.
+        See `tssc.workflow` for the dependencies between the steps.
+
+  results compact [-r RESULTS_DIR] [--results-file-name RESULTS_FILE_NAME]
+                  [--results-format {journal,sharded,sqlite}] [--run-id RUN_ID]
+        Materialize the results file from the results journal, shards, or database written
+        when using `--results-format journal`, `sharded`, or `sqlite`.
+
+  results history STEP.KEY [-r RESULTS_DIR] [--run-id-pattern RUN_ID_PATTERN] [--limit LIMIT]
+        Print a step result of each run in the results database, newest first, as JSON lines.
+
 Step Configuration
 ------------------
 
@@ -227,9 +285,20 @@ From least precedence to highest precedence.
         }
 
       unit-test:
-      # WARNING: not yet implemented
-      - implementer: Maven
-        config: {}
+      - implementer: JUnit
+        config: {
+          # Optional.
+          # Command to run the tests with, if not given the reports of tests already run are
+          # aggregated.
+          #test-command: ['mvn', 'test', '-Dtest={tests}',
+          #  '-Dsurefire.reportsDirectory={reports-dir}']
+
+          # Optional.
+          #report-dirs: ['target/surefire-reports', 'target/failsafe-reports']
+
+          # Optional.
+          #shards: 1
+        }
 
       push-artifacts:
       - implementer: Maven
@@ -289,9 +358,19 @@ From least precedence to highest precedence.
       deploy: []
 
       uat:
-      # WARNING: not yet implemented
       - implementer: Cucumber
-        config: {}
+        config: {
+          # Required.
+          # Command each runner runs its features with.
+          test-command: ['mvn', 'verify', '-Dcucumber.features={features}',
+            '-Dcucumber.plugin=json:{report-file}', '-DbuildDirectory=target/cucumber-{runner}']
+
+          # Optional.
+          #features-dirs: ['src/test/resources/features']
+
+          # Optional.
+          #runners: 4
+        }
 
       # WARNING: not yet implemented
       runtime-vulnerability-scan: []
@@ -469,9 +548,19 @@ From least precedence to highest precedence.
       deploy: []
 
       uat:
-      # WARNING: not yet implemented
       - implementer: Cucumber
-        config: {}
+        config: {
+          # Required.
+          # Command each runner runs its features with.
+          test-command: ['npx', 'cucumber-js', '{features}', '--format',
+            'json:{report-file}']
+
+          # Optional.
+          #features-dirs: ['src/test/resources/features']
+
+          # Optional.
+          #runners: 4
+        }
 
       # WARNING: not yet implemented
       runtime-vulnerability-scan: []
@@ -504,4 +593,5 @@ Example Running the 'generate-metadata' step
 import __main__
 from .factory import TSSCFactory
 from .exceptions import TSSCException
+from .results_store import ResultsStore
 from .step_implementer import DefaultSteps, StepImplementer
@@ -8,11 +8,24 @@ import sys
 import argparse
 import os.path
 import json
-import yaml
 
+# NOTE: parse_yaml_or_json_file was moved to tssc.config_loader
+from .config_loader import load_config_files, \
+    parse_yaml_or_json_file # pylint: disable=unused-import
 from .factory import TSSCFactory
 from .exceptions import TSSCException
-from .step_implementers import *
+from .results_store import RESULTS_FORMATS, JournalResultsStore, ShardedResultsStore, \
+    SqliteResultsStore
+from .step_cache import DEFAULT_MAX_CACHE_SIZE, StepResultsCache
+from .trace import Tracer
+from . import step_implementers # pylint: disable=unused-import
+
+# results formats that can be compacted into the classic results file
+_COMPACTABLE_RESULTS_FORMATS = {
+    'journal': JournalResultsStore,
+    'sharded': ShardedResultsStore,
+    'sqlite': SqliteResultsStore
+}
 
 def print_error(msg):
     """
@@ -25,50 +38,6 @@ def print_error(msg):
     """
     print(msg, file=sys.stderr)
 
-def parse_yaml_or_json_file(yaml_or_json_file):
-    """
-    Parse YAML or JSON config file.
-
-    Parameters
-    ----------
-    yaml_or_json_file : string
-        Path to YAML or JSON file to load as a dictionary.
-
-    Returns
-    -------
-    dict
-        Dictionary parsed from given YAML or JSON file
-
-    Raises
-    ------
-    ValueError
-        If the given file can not be parsed as YAML or JSON.
-    """
-    parsed_file = None
-    json_parse_error = None
-    yaml_parse_error = None
-
-    with open(yaml_or_json_file, 'r') as open_yaml_or_json_file:
-        file_contents = open_yaml_or_json_file.read()
-
-    try:
-        parsed_file = json.loads(file_contents)
-    except ValueError as err:
-        json_parse_error = err
-
-    if not parsed_file:
-        try:
-            parsed_file = yaml.safe_load(file_contents)
-        except (yaml.scanner.ScannerError, yaml.parser.ParserError, ValueError) as err:
-            yaml_parse_error = err
-
-    if json_parse_error and yaml_parse_error:
-        raise ValueError('Error parsing file (' + yaml_or_json_file + ') as YAML or JSON: '
-                         + "\n  JSON error: " + str(json_parse_error)
-                         + "\n  YAML error: " + str(yaml_parse_error))
-
-    return parsed_file
-
 class ParseKeyValueArge(argparse.Action): # pylint: disable=too-few-public-methods
     """
     https://gist.github.com/fralau/061a4f6c13251367ef1d9a9a99fb3e8d
@@ -88,17 +57,131 @@ class ParseKeyValueArge(argparse.Action): # pylint: disable=too-few-public-metho
 
         setattr(namespace, self.dest, key_value_dict)
 
-def main(argv=None):
+def results_main(argv):
     """
-    Main entry point for TSSC.
+    Entry point for the `results` TSSC command for working with the results of TSSC steps.
+
+    Parameters
+    ----------
+    argv : list
+        Arguments given after the `results` command.
+    """
+    parser = argparse.ArgumentParser(
+        prog='tssc results',
+        description='Trusted Software Supply Chain (TSSC) results')
+    subparsers = parser.add_subparsers(dest='results_command')
+    subparsers.required = True
+
+    compact_parser = subparsers.add_parser(
+        'compact',
+        help='Materialize the results file from the results journal, shards, or database'
+    )
+    _add_results_location_arguments(compact_parser)
+    compact_parser.add_argument(
+        '--results-format',
+        default='journal',
+        choices=list(_COMPACTABLE_RESULTS_FORMATS),
+        help='Format the TSSC workflow results were stored in.'
+    )
+    _add_run_id_argument(compact_parser)
+
+    history_parser = subparsers.add_parser(
+        'history',
+        help='Print a step result of each run in the results database, newest first'
+    )
+    _add_results_location_arguments(history_parser)
+    history_parser.add_argument(
+        'result',
+        help='Step result to print, as {step}.{key}, for instance generate-metadata.version'
+    )
+    history_parser.add_argument(
+        '--run-id-pattern',
+        help='SQL LIKE pattern the IDs of the runs to print the result of match'
+    )
+    history_parser.add_argument(
+        '--limit',
+        type=int,
+        help='Maximum number of runs to print the result of'
+    )
+    args = parser.parse_args(argv)
+
+    if args.results_command == 'history':
+        step_name, _, key = args.result.partition('.')
+        if not key:
+            print_error('Result (' + args.result + ') must be given as {step}.{key}')
+            sys.exit(301)
+
+        results_store = SqliteResultsStore(args.results_dir, args.results_file_name)
+        for result in results_store.result_history(
+                step_name, key, args.run_id_pattern, args.limit):
+            print(json.dumps(result, default=str))
+        return
+
+    if args.results_format == 'sqlite':
+        results_store = SqliteResultsStore(
+            args.results_dir,
+            args.results_file_name,
+            run_id=args.run_id)
+    else:
+        results_store = _COMPACTABLE_RESULTS_FORMATS[args.results_format](
+            args.results_dir,
+            args.results_file_name)
+    try:
+        results_file_path = results_store.compact()
+    except TSSCException as err:
+        print_error('Error compacting results: ' + str(err))
+        sys.exit(300)
+
+    print(results_file_path)
+
+def _add_results_location_arguments(parser):
+    """
+    Adds the arguments locating the results to work with to the given `results` command parser.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        Parser to add the arguments to.
     """
-    parser = argparse.ArgumentParser(description='Trusted Software Supply Chain (TSSC)')
     parser.add_argument(
-        '-s',
-        '--step',
-        required=True,
-        help='TSSC workflow step to run'
+        '-r',
+        '--results-dir',
+        default='tssc-results',
+        help='TSSC workflow results directory containing the results journal, shards, or database'
+    )
+    parser.add_argument(
+        '--results-file-name',
+        default='tssc-results.yml',
+        help='Name of the results file the results journal, shards, or database are named after'
     )
+
+def _add_run_id_argument(parser):
+    """
+    Adds the argument identifying the run whose results to work with to the given parser.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        Parser to add the argument to.
+    """
+    parser.add_argument(
+        '--run-id',
+        required=False,
+        help='ID of the TSSC workflow run to store the results of with `--results-format sqlite`,'
+             ' by default the TSSC_RUN_ID environment variable or else the run ID saved in the'
+             ' results directory.'
+    )
+
+def _add_tssc_arguments(parser):
+    """
+    Adds the arguments common to running one or all of the TSSC workflow steps to the given
+    parser.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        Parser to add the arguments to.
+    """
     parser.add_argument(
         '-e',
         '--environment',
@@ -109,7 +192,14 @@ def main(argv=None):
         '-c',
         '--config-file',
         required=True,
-        help='TSSC workflow configuration file in yml or json'
+        nargs='+',
+        help='TSSC workflow configuration files in yml or json, each overriding the ones before it'
+    )
+    parser.add_argument(
+        '--config-cache',
+        action='store_true',
+        help='Cache the configuration parsed from each yml config file beside the file, to read'
+             ' it back rather then parsing the file again while its content is unchanged.'
     )
     parser.add_argument(
         '-r',
@@ -117,6 +207,30 @@ def main(argv=None):
         default='tssc-results',
         help='TSSC workflow results file in yml or json'
     )
+    parser.add_argument(
+        '--results-format',
+        default='yaml',
+        choices=list(RESULTS_FORMATS),
+        help='Format to store the TSSC workflow results in.'
+    )
+    _add_run_id_argument(parser)
+    parser.add_argument(
+        '--cache-dir',
+        required=False,
+        help='Directory to cache step results in to replay them when the step inputs are'
+             ' unchanged.'
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        type=int,
+        default=DEFAULT_MAX_CACHE_SIZE,
+        help='Maximum size in bytes of the step results cache.'
+    )
+    parser.add_argument(
+        '--trace-file',
+        required=False,
+        help='Chrome trace format file to append the timing of the work done by each step to.'
+    )
     parser.add_argument(
         '--step-config',
         metavar='STEP_CONFIG_KEY=STEP_CONFIG_VALUE',
@@ -124,31 +238,136 @@ def main(argv=None):
         help='Override step config provided by the given TSSC config-file with these arguments.',
         action=ParseKeyValueArge
     )
-    args = parser.parse_args(argv)
 
+def _create_tssc_factory(args):
+    """
+    Creates the TSSCFactory for the given parsed arguments, exiting if the given configuration
+    file is not valid.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Arguments parsed by a parser given to `_add_tssc_arguments`.
+
+    Returns
+    -------
+    TSSCFactory
+        TSSCFactory for the TSSC configuration in the given config file.
+    """
     # validate args
-    if not os.path.exists(args.config_file) or os.stat(args.config_file).st_size == 0:
-        print_error('specified -c/--config-file must exist and not be empty')
-        sys.exit(101)
+    for config_file in args.config_file:
+        if not os.path.exists(config_file) or os.stat(config_file).st_size == 0:
+            print_error('specified -c/--config-file must exist and not be empty')
+            sys.exit(101)
 
-    # parse and validate config file
+    # parse, merge, and validate config files
     try:
-        tssc_config = parse_yaml_or_json_file(args.config_file)
+        tssc_config = load_config_files(args.config_file, args.config_cache)
     except ValueError as err:
         print_error(str(err))
         sys.exit(102)
 
-    if not 'tssc-config' in tssc_config:
+    if not isinstance(tssc_config, dict) or not 'tssc-config' in tssc_config:
         print_error("specified -c/--config-file must have a 'tssc-config' attribute")
         sys.exit(103)
 
-    tssc_factory = TSSCFactory(tssc_config, args.results_dir)
+    step_cache = None
+    if args.cache_dir:
+        step_cache = StepResultsCache(args.cache_dir, args.cache_max_size)
+
+    tracer = None
+    if args.trace_file:
+        tracer = Tracer()
+
+    return TSSCFactory(
+        tssc_config,
+        args.results_dir,
+        results_format=args.results_format,
+        step_cache=step_cache,
+        tracer=tracer,
+        run_id=args.run_id)
+
+def _write_trace_file(tssc_factory, args):
+    """
+    Writes the spans traced by the given TSSCFactory to the trace file, if tracing.
+
+    Parameters
+    ----------
+    tssc_factory : TSSCFactory
+        TSSCFactory created by `_create_tssc_factory` for the given arguments.
+    args : argparse.Namespace
+        Arguments parsed by a parser given to `_add_tssc_arguments`.
+    """
+    if tssc_factory.tracer is not None:
+        tssc_factory.tracer.write_trace_file(args.trace_file)
+
+def run_workflow_main(argv):
+    """
+    Entry point for the `run-workflow` TSSC command for running all of the steps of a TSSC
+    workflow, running steps that do not depend on each other at the same time.
+
+    Parameters
+    ----------
+    argv : list
+        Arguments given after the `run-workflow` command.
+    """
+    parser = argparse.ArgumentParser(
+        prog='tssc run-workflow',
+        description='Trusted Software Supply Chain (TSSC) workflow')
+    _add_tssc_arguments(parser)
+    parser.add_argument(
+        '--max-workers',
+        type=int,
+        default=4,
+        help='Maximum number of TSSC workflow steps to run at the same time.'
+    )
+    args = parser.parse_args(argv)
+
+    tssc_factory = _create_tssc_factory(args)
+
+    try:
+        tssc_factory.run_workflow(args.step_config, args.environment, args.max_workers)
+    except (ValueError, AssertionError, TSSCException) as err:
+        print_error('Error running workflow: ' + str(err))
+        sys.exit(200)
+    finally:
+        _write_trace_file(tssc_factory, args)
+
+_COMMANDS = {
+    'results': results_main,
+    'run-workflow': run_workflow_main
+}
+
+def main(argv=None):
+    """
+    Main entry point for TSSC.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv and argv[0] in _COMMANDS:
+        _COMMANDS[argv[0]](argv[1:])
+        return
+
+    parser = argparse.ArgumentParser(description='Trusted Software Supply Chain (TSSC)')
+    parser.add_argument(
+        '-s',
+        '--step',
+        required=True,
+        help='TSSC workflow step to run'
+    )
+    _add_tssc_arguments(parser)
+    args = parser.parse_args(argv)
+
+    tssc_factory = _create_tssc_factory(args)
 
     try:
         tssc_factory.run_step(args.step, args.step_config, args.environment)
     except (ValueError, AssertionError, TSSCException) as err:
         print_error('Error calling step (' + args.step + '): ' + str(err))
         sys.exit(200)
+    finally:
+        _write_trace_file(tssc_factory, args)
 
 def init():
     """
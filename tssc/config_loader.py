@@ -0,0 +1,230 @@
+"""
+Loading of TSSC configuration files.
+
+Each configuration file is parsed once, as JSON or as YAML. Which one is picked from the file
+extension, `.json`, `.yml`, or `.yaml`, or for any other extension from the first non whitespace
+character of the file, `{` or `[` for JSON. Since `{` and `[` also start YAML flow collections
+a file picked as JSON that is not valid JSON is parsed as YAML instead.
+
+Parsing large YAML files is slow even with libyaml, so the YAML configuration parsed from a file
+can be cached beside the file, as `.{file name}.cache.json`, keyed by the sha256 hash of the
+content of the file. As long as the content of the file is unchanged the configuration is read
+back from the cache rather then parsing the YAML again. Configuration that can not be written as
+JSON as is, such as YAML dates or mappings with non string keys, is not cached.
+
+Several configuration files can be loaded and merged into one configuration, with each file
+overriding the files before it. Mappings are merged key by key, any other value, including
+lists such as the sub steps of a step, replaces the value of the files before it.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from .yaml_io import YAML_PARSE_ERRORS, safe_load
+
+CONFIG_CACHE_FILE_SUFFIX = '.cache.json'
+
+_JSON_FILE_EXTENSIONS = ['.json']
+_YAML_FILE_EXTENSIONS = ['.yml', '.yaml']
+_JSON_START_CHARACTERS = [b'{', b'[']
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+def parse_yaml_or_json_file(yaml_or_json_file, use_cache=False):
+    """
+    Parse YAML or JSON config file.
+
+    Parameters
+    ----------
+    yaml_or_json_file : string
+        Path to YAML or JSON file to load as a dictionary.
+    use_cache : bool, optional
+        True to read the configuration parsed from a YAML file from, and write it to, the cache
+        beside the file.
+
+    Returns
+    -------
+    dict
+        Dictionary parsed from given YAML or JSON file
+
+    Raises
+    ------
+    ValueError
+        If the given file can not be parsed as YAML or JSON.
+    """
+    with open(yaml_or_json_file, 'rb') as open_yaml_or_json_file:
+        file_contents = open_yaml_or_json_file.read()
+
+    json_parse_error = None
+    if _is_json_file(yaml_or_json_file, file_contents):
+        try:
+            return json.loads(file_contents)
+        except ValueError as err:
+            json_parse_error = err
+
+    content_hash = None
+    if use_cache:
+        content_hash = hashlib.sha256(file_contents).hexdigest()
+        cached_config = _read_config_cache(yaml_or_json_file, content_hash)
+        if cached_config is not None:
+            return cached_config
+
+    try:
+        parsed_file = safe_load(file_contents)
+    except YAML_PARSE_ERRORS as err:
+        if json_parse_error:
+            raise ValueError('Error parsing file (' + yaml_or_json_file + ') as YAML or JSON: '
+                             + "\n  JSON error: " + str(json_parse_error)
+                             + "\n  YAML error: " + str(err))
+        raise ValueError('Error parsing file (' + yaml_or_json_file + ') as YAML: ' + str(err))
+
+    if use_cache:
+        _write_config_cache(yaml_or_json_file, content_hash, parsed_file)
+
+    return parsed_file
+
+def load_config_files(config_files, use_cache=False):
+    """
+    Parses the given config files and merges them into one configuration.
+
+    Parameters
+    ----------
+    config_files : list
+        Paths to the YAML or JSON config files to load, each overriding the ones before it.
+    use_cache : bool, optional
+        True to read the configuration parsed from YAML files from, and write it to, the cache
+        beside each file.
+
+    Returns
+    -------
+    object
+        The merged configuration of the given files.
+
+    Raises
+    ------
+    ValueError
+        If any of the given files can not be parsed as YAML or JSON.
+    """
+    config = None
+    for config_file in config_files:
+        config = merge_configs(config, parse_yaml_or_json_file(config_file, use_cache))
+
+    return config
+
+def merge_configs(config, override_config):
+    """
+    Merges the given override configuration into the given configuration.
+
+    Parameters
+    ----------
+    config : object
+        Configuration to merge into, which is left as is.
+    override_config : object
+        Configuration to override the given configuration with, which is left as is.
+
+    Returns
+    -------
+    object
+        If both configurations are dicts a new dict with the keys of both, with the values of
+        keys in both merged, otherwise the override configuration.
+    """
+    if not isinstance(config, dict) or not isinstance(override_config, dict):
+        return override_config
+
+    merged_config = dict(config)
+    for key, value in override_config.items():
+        merged_config[key] = merge_configs(config.get(key), value)
+
+    return merged_config
+
+def config_cache_file_path(config_file):
+    """
+    Parameters
+    ----------
+    config_file : str
+        Path to the config file to get the cache file path of.
+
+    Returns
+    -------
+    str
+        Path to the file the configuration parsed from the given config file is cached in.
+    """
+    config_dir_path, config_file_name = os.path.split(config_file)
+    return os.path.join(config_dir_path, '.' + config_file_name + CONFIG_CACHE_FILE_SUFFIX)
+
+def _is_json_file(config_file, file_contents):
+    """
+    Returns
+    -------
+    bool
+        True if the given config file should be parsed as JSON, False if as YAML.
+    """
+    extension = os.path.splitext(config_file)[1].lower()
+    if extension in _JSON_FILE_EXTENSIONS:
+        return True
+    if extension in _YAML_FILE_EXTENSIONS:
+        return False
+
+    if file_contents.startswith(_UTF8_BOM):
+        file_contents = file_contents[len(_UTF8_BOM):]
+    return file_contents.lstrip()[:1] in _JSON_START_CHARACTERS
+
+def _read_config_cache(config_file, content_hash):
+    """
+    Returns
+    -------
+    object
+        The configuration cached for the given config file if it was cached for the given
+        content hash, None otherwise.
+    """
+    try:
+        with open(config_cache_file_path(config_file), 'r') as cache_file:
+            if cache_file.readline().strip() != content_hash:
+                return None
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+def _write_config_cache(config_file, content_hash, config):
+    """
+    Caches the given configuration parsed from the given config file for the given content hash,
+    unless the configuration can not be written as JSON as is or the cache can not be written.
+    """
+    if not _is_json_compatible(config):
+        return
+
+    cache_file_path = config_cache_file_path(config_file)
+    try:
+        # write to a temporary file and rename so readers never see a partial cache
+        cache_file_descriptor, cache_temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(cache_file_path) or '.',
+            prefix=os.path.basename(cache_file_path) + '.')
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(cache_file_descriptor, 'w') as cache_file:
+            cache_file.write(content_hash + '\n')
+            json.dump(config, cache_file)
+        os.replace(cache_temp_path, cache_file_path)
+    except OSError:
+        os.remove(cache_temp_path)
+
+def _is_json_compatible(config):
+    """
+    Returns
+    -------
+    bool
+        True if the given configuration is read back from JSON exactly as is, False otherwise.
+    """
+    # NOTE: bool is a subclass of int
+    if config is None or isinstance(config, (str, int, float)):
+        return True
+    if isinstance(config, list):
+        return all(_is_json_compatible(value) for value in config)
+    if isinstance(config, dict):
+        return all(
+            isinstance(key, str) and _is_json_compatible(value) for key, value in config.items())
+
+    return False
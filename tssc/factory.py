@@ -1,13 +1,19 @@
 """
 Factory for creating TSSC workflow and running steps.
 """
+import contextlib
+import importlib
+import sys
 from .exceptions import TSSCException
+from .results_store import create_results_store
+from .workflow import StepOutput, create_step_dependency_graph, run_step_dependency_graph
 
 _TSSC_CONFIG_KEY = 'tssc-config'
 _TSSC_CONFIG_GLOBAL_DEFAULTS_KEY = 'global-defaults'
 _TSSC_CONFIG_GLOBAL_ENVIRONMENT_DEFAULTS_KEY = 'global-environment-defaults'
 _IS_DEFAULT_KEY = 'is_default'
 _CLAZZ_KEY = 'clazz'
+_MODULE_KEY = 'module'
 _IMPLEMENTER_KEY = 'implementer'
 _SUB_STEP_CONFIG_KEY = 'config'
 _SUB_STEP_ENV_CONFIG_KEY = 'environment-config'
@@ -29,17 +35,41 @@ class TSSCFactory:
     work_dir_path : str, optional
         Path to the working folder for step_implementers for runtime files
         Default: tssc-working
+    results_format : str, optional
+        Format to store the step results in.
+        'yaml' re-writes the results file after each sub step,
+        'journal' appends the results of each sub step to a JSON lines journal file,
+        'sharded' re-writes a results file of the step's own after each sub step,
+        'sqlite' writes the results of each sub step as rows of a SQLite database of the results
+        of all runs, see `tssc.results_store.SqliteResultsStore`.
+        Default: yaml
+    step_cache : StepResultsCache, optional
+        Cache to replay the results of sub steps from when their inputs are unchanged since
+        they were last run.
+        Default: None, sub steps are always run
+    tracer : Tracer, optional
+        Tracer to record the time spent running sub steps with.
+        Default: None, sub steps are not traced
+    run_id : str, optional
+        ID of the run the results are stored for, only used by the 'sqlite' results format.
+        Default: None, the TSSC_RUN_ID environment variable or the run ID saved in the results
+        directory
 
     Raises
     ------
     ValueError
         If given config does not contain 'tssc-config' key
+        If given results_format is not known
     """
     _step_implementers = {}
 
     def __init__(self, config, results_dir_path='tssc-results', \
             results_file_name='tssc-results.yml', \
-            work_dir_path='tssc-working'):
+            work_dir_path='tssc-working', \
+            results_format='yaml', \
+            step_cache=None, \
+            tracer=None, \
+            run_id=None):
         if _TSSC_CONFIG_KEY in config:
             self.config = config[_TSSC_CONFIG_KEY]
         else:
@@ -49,6 +79,16 @@ class TSSCFactory:
         self.results_file_name = results_file_name
         self.work_dir_path = work_dir_path
 
+        # shared by all of the step implementers run by this factory so that the results file
+        # is only parsed once rather then once per results lookup
+        self.results_store = create_results_store(
+            results_format,
+            results_dir_path,
+            results_file_name,
+            run_id)
+        self.step_cache = step_cache
+        self.tracer = tracer
+
     @staticmethod
     def register_step_implementer(implementer_class, is_default=False):
         """
@@ -80,6 +120,87 @@ class TSSCFactory:
             _IS_DEFAULT_KEY: is_default
         }
 
+    @staticmethod
+    def register_lazy_step_implementer(step_name, implementer_name, module_name, is_default=False):
+        """
+        Register a Step Implementer by name without importing the module that implements it.
+
+        The given module is only imported when the given step is run with the given implementer,
+        at which point the module is expected to register the implementer class with
+        `register_step_implementer`.
+
+        Parameters
+        ----------
+        step_name : str
+            TSSC step name implemented by the step implementer.
+        implementer_name : str
+            Name of the class implementing the step.
+        module_name : str
+            Fully qualified name of the module containing the class implementing the step.
+        is_default : bool, optional
+            True if this should be the default implementer for this step, False other wise.
+            If more then one step implementer is registered as the default for for the
+            same step then the last one to register will win and be the default.
+        """
+        if step_name not in TSSCFactory._step_implementers:
+            TSSCFactory._step_implementers[step_name] = {}
+
+        # the module has already been imported and has registered the implementer class
+        if implementer_name in TSSCFactory._step_implementers[step_name]:
+            return
+
+        if is_default:
+            for step_implementer in \
+                    TSSCFactory._step_implementers[step_name].values():
+                step_implementer[_IS_DEFAULT_KEY] = False
+
+        TSSCFactory._step_implementers[step_name][implementer_name] = {
+            _CLAZZ_KEY: None,
+            _MODULE_KEY: module_name,
+            _IS_DEFAULT_KEY: is_default
+        }
+
+    @staticmethod
+    def __get_step_implementer_class(step_name, implementer_name):
+        """
+        Gets the class implementing the given step, importing the module that implements it if
+        it was registered lazily and has not been imported yet.
+
+        Parameters
+        ----------
+        step_name : str
+            TSSC step name to get the implementer class for.
+        implementer_name : str
+            Name of the registered step implementer.
+
+        Returns
+        -------
+        class
+            Class implementing the step.
+
+        Raises
+        ------
+        TSSCException
+            If importing the module of a lazily registered step implementer does not register
+            the step implementer class.
+        """
+        step_implementer = TSSCFactory._step_implementers[step_name][implementer_name]
+        if step_implementer[_CLAZZ_KEY] is None:
+            importlib.import_module(step_implementer[_MODULE_KEY])
+
+            step_implementer = TSSCFactory._step_implementers[step_name][implementer_name]
+            if step_implementer[_CLAZZ_KEY] is None:
+                raise TSSCException(
+                    'Module'
+                    + ' (' + step_implementer[_MODULE_KEY] + ')'
+                    + ' did not register StepImplementer'
+                    + ' (' + implementer_name + ')'
+                    + ' for step'
+                    + ' (' + step_name + ')'
+                )
+
+        return step_implementer[_CLAZZ_KEY]
+
     def run_step(self, step_name, step_config_runtime_overrides=None, environment=None): # pylint: disable=too-many-branches
         """
         Call the given step.
@@ -153,14 +274,20 @@ class TSSCFactory:
                         sub_step_environment_config = {}
 
                     # create the StepImplementer instance
-                    sub_step = step_implementers[sub_step_implementer_name][_CLAZZ_KEY](
+                    sub_step_implementer_class = TSSCFactory.__get_step_implementer_class(
+                        step_name,
+                        sub_step_implementer_name)
+                    sub_step = sub_step_implementer_class(
                         results_dir_path=self.results_dir_path,
                         results_file_name=self.results_file_name,
                         work_dir_path=self.work_dir_path,
                         step_environment_config=sub_step_environment_config,
                         step_config=sub_step_config,
                         global_config_defaults=global_config_defaults,
-                        global_environment_config_defaults=global_environment_config_defaults
+                        global_environment_config_defaults=global_environment_config_defaults,
+                        results_store=self.results_store,
+                        step_cache=self.step_cache,
+                        tracer=self.tracer
                     )
 
                     # run the step
@@ -174,21 +301,27 @@ class TSSCFactory:
                     )
 
         else:
-            default_step_implementer = None
+            default_step_implementer_name = None
             for sub_step_implementer_name, step_implementer_config in step_implementers.items():
                 if step_implementer_config[_IS_DEFAULT_KEY]:
-                    default_step_implementer = step_implementer_config
+                    default_step_implementer_name = sub_step_implementer_name
 
-            if default_step_implementer:
+            if default_step_implementer_name:
                 # create the default StepImplementer instance
-                sub_step = default_step_implementer[_CLAZZ_KEY](
+                default_step_implementer_class = TSSCFactory.__get_step_implementer_class(
+                    step_name,
+                    default_step_implementer_name)
+                sub_step = default_step_implementer_class(
                     results_dir_path=self.results_dir_path,
                     results_file_name=self.results_file_name,
                     work_dir_path=self.work_dir_path,
                     step_environment_config={},
                     step_config={},
                     global_config_defaults=global_config_defaults,
-                    global_environment_config_defaults=global_environment_config_defaults
+                    global_environment_config_defaults=global_environment_config_defaults,
+                    results_store=self.results_store,
+                    step_cache=self.step_cache,
+                    tracer=self.tracer
                 )
 
                 # run the step
@@ -202,3 +335,50 @@ class TSSCFactory:
                     + ' and no default step implementer registered in step implementers'
                     + '(' + str(step_implementers) + ')'
                 )
+
+    def run_workflow(self, step_config_runtime_overrides=None, environment=None, max_workers=4):
+        """
+        Run all of the steps in the TSSC configuration.
+
+        Steps are run once all of the steps they depend on have been run, steps that do not
+        depend on each other are run at the same time. The output of each step is written to
+        stdout once the step is done, see `tssc.workflow.StepOutput`.
+
+        Parameters
+        ----------
+        step_config_runtime_overrides : dict, optional
+            Configuration for the steps passed in at runtime when the workflow was invoked that
+            will override step configuration coming from any other source.
+        environment : str, optional
+            Name of the environment the steps are being run in. Used to determine environment
+            specific global defaults and step configuration.
+        max_workers : int, optional
+            Maximum number of steps to run at the same time.
+
+        Raises
+        ------
+        TSSCException
+            If running any of the steps raises a TSSCException.
+
+        See Also
+        --------
+        tssc.workflow
+        """
+        step_names = [
+            step_name for step_name in self.config
+            if step_name not in (
+                _TSSC_CONFIG_GLOBAL_DEFAULTS_KEY,
+                _TSSC_CONFIG_GLOBAL_ENVIRONMENT_DEFAULTS_KEY)
+        ]
+
+        step_output = StepOutput(sys.stdout)
+
+        def run_step(step_name):
+            with step_output.buffered():
+                self.run_step(step_name, step_config_runtime_overrides, environment)
+
+        with contextlib.redirect_stdout(step_output):
+            run_step_dependency_graph(
+                create_step_dependency_graph(step_names),
+                run_step,
+                max_workers)
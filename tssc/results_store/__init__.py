@@ -0,0 +1,65 @@
+"""
+Stores for the results of a TSSC run shared between step implementers.
+
+| Results format | Store                 | Description
+|----------------|-----------------------|------------
+| `yaml`         | `ResultsStore`        | The whole results of the run in one YAML results file.
+| `journal`      | `JournalResultsStore` | JSON lines journal of the results of each sub step.
+| `sharded`      | `ShardedResultsStore` | One YAML shard file per step.
+| `sqlite`       | `SqliteResultsStore`  | SQLite database of the results of many runs.
+"""
+
+from .results_store import ResultsStore
+from .journal import JournalResultsStore
+from .sharded import ShardedResultsStore
+from .sqlite import SqliteResultsStore
+
+__all__ = [
+    'results_store',
+    'journal',
+    'sharded',
+    'sqlite'
+]
+
+RESULTS_FORMATS = {
+    'yaml': ResultsStore,
+    'journal': JournalResultsStore,
+    'sharded': ShardedResultsStore,
+    'sqlite': SqliteResultsStore
+}
+
+
+def create_results_store(results_format, results_dir_path, results_file_name, run_id=None):
+    """
+    Creates a store for the results of a TSSC run in the given format.
+
+    Parameters
+    ----------
+    results_format : str
+        Format to store the results in, one of the keys of `RESULTS_FORMATS`.
+    results_dir_path : str
+        Path to the directory to write the results to.
+    results_file_name : str
+        Name of the file to write the results to.
+    run_id : str, optional
+        ID of the run, only used by the `sqlite` format, see `SqliteResultsStore`.
+
+    Returns
+    -------
+    ResultsStore
+        Store for the results of a TSSC run in the given format.
+
+    Raises
+    ------
+    ValueError
+        If the given results format is not known.
+    """
+    if results_format not in RESULTS_FORMATS:
+        raise ValueError(
+            'Unknown results format (' + str(results_format) + '), expected one of: '
+            + str(list(RESULTS_FORMATS)))
+
+    if results_format == 'sqlite':
+        return SqliteResultsStore(results_dir_path, results_file_name, run_id=run_id)
+
+    return RESULTS_FORMATS[results_format](results_dir_path, results_file_name)
@@ -0,0 +1,188 @@
+"""
+Store of the results of a TSSC run as a JSON lines journal of the results written by each
+sub step.
+"""
+
+import copy
+import datetime
+import json
+import os
+from .results_store import DEFAULT_LOCK_TIMEOUT, ResultsStore, file_stat, merge_step_results
+
+
+class JournalResultsStore(ResultsStore):
+    """
+    Store of the TSSC run results that appends the results written by each sub step as a record
+    to a JSON lines journal file rather then re-writing the whole results file.
+
+    The current results are the results in the classic results file, if there is one, with all of
+    the journal records folded into them in the order they were written. Only journal records
+    written since the last read are parsed on each read.
+
+    Use `compact` to materialize the classic results file from the journal.
+
+    Parameters
+    ----------
+    results_dir_path : str
+        Path to the directory to write the results journal file to.
+    results_file_name : str
+        Name of the classic results file to compact the journal into, the journal file name is
+        derived from this name by replacing the extension with `.jsonl`.
+    lock_timeout : float, optional
+        Seconds to wait for another tssc process to release the results file lock before giving
+        up on writing.
+
+    Notes
+    -----
+    A record that was only partially written, for instance because the writing process crashed,
+    is ignored, also once later records are written after it.
+    """
+
+    JOURNAL_FILE_EXTENSION = '.jsonl'
+
+    def __init__(self, results_dir_path, results_file_name, lock_timeout=DEFAULT_LOCK_TIMEOUT):
+        super().__init__(results_dir_path, results_file_name, lock_timeout)
+
+        self.__journal_file_path = os.path.join(
+            results_dir_path,
+            os.path.splitext(results_file_name)[0] + JournalResultsStore.JOURNAL_FILE_EXTENSION)
+
+        self.__results = None
+        self.__base_results = None
+        self.__journal_file_stat = None
+        self.__journal_file_offset = 0
+
+    @property
+    def results_file_path(self):
+        """
+        Returns
+        -------
+        str
+            OS path to the results journal file.
+        """
+        return self.__journal_file_path
+
+    @property
+    def compacted_results_file_path(self):
+        """
+        Returns
+        -------
+        str
+            OS path to the classic results file the journal is compacted into.
+        """
+        return super().results_file_path
+
+    def write_step_results(self, step_name, step_results, implementer_name=None):
+        """
+        Append a record with the given step results to the results journal.
+
+        Parameters
+        ----------
+        step_name : str
+            TSSC step name to write the results for.
+        step_results : dict
+            Results to merge into any existing results for the given step.
+        implementer_name : str, optional
+            Name of the StepImplementer that produced the given step results.
+        """
+        record = {
+            'step': step_name,
+            'implementer': implementer_name,
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'results': step_results
+        }
+
+        with self._lock, self._results_file_lock():
+            if not os.path.exists(self.results_dir_path):
+                os.makedirs(self.results_dir_path)
+
+            # the record is folded into the in memory results the next time the journal is read
+            with open(self.__journal_file_path, 'a+b') as journal_file:
+                # end a record a crashed writer left partially written so that it is skipped
+                # rather then prefixed to this record
+                journal_file_size = journal_file.seek(0, os.SEEK_END)
+                if journal_file_size > 0:
+                    journal_file.seek(journal_file_size - 1)
+                    if journal_file.read(1) != b'\n':
+                        journal_file.write(b'\n')
+
+                journal_file.write((json.dumps(record, default=str) + '\n').encode('utf-8'))
+
+    def compact(self):
+        """
+        Materializes the current results into the classic results file and removes the journal.
+
+        Returns
+        -------
+        str
+            OS path to the classic results file.
+
+        Raises
+        ------
+        TSSCException
+            Existing results file has invalid yaml or existing results file does not have expected
+            element, or the results file lock could not be taken in time.
+        """
+        with self._lock, self._results_file_lock():
+            results = self._load_results()
+            if results is None:
+                results = {ResultsStore.TSSC_RESULTS_KEY: {}}
+
+            # NOTE: if interrupted between these two operations the journal records are folded
+            #       into results that already contain them which gives the same results.
+            self._write_results_file(copy.deepcopy(results))
+            if os.path.exists(self.__journal_file_path):
+                os.remove(self.__journal_file_path)
+
+            return self.compacted_results_file_path
+
+    def _load_results(self):
+        """
+        Folds any journal records written since the last read into the in memory results.
+
+        Returns
+        -------
+        dict
+            The in memory results, or None if there is no results file or journal yet.
+        """
+        base_results = super()._load_results()
+        journal_file_stat = file_stat(self.__journal_file_path)
+
+        # start over if the classic results file changed or the journal was compacted
+        journal_replaced = self.__journal_file_stat is not None and (
+            journal_file_stat is None or
+            journal_file_stat[0] < self.__journal_file_offset or
+            journal_file_stat[2] != self.__journal_file_stat[2])
+        if base_results is not self.__base_results or journal_replaced:
+            self.__base_results = base_results
+            self.__results = copy.deepcopy(base_results)
+            self.__journal_file_offset = 0
+
+        self.__journal_file_stat = journal_file_stat
+        if journal_file_stat is not None and journal_file_stat[0] > self.__journal_file_offset:
+            if self.__results is None:
+                self.__results = {ResultsStore.TSSC_RESULTS_KEY: {}}
+
+            self.__fold_journal()
+
+        return self.__results
+
+    def __fold_journal(self):
+        """
+        Folds the complete journal records after the current journal offset into the in memory
+        results and moves the offset past them.
+        """
+        with open(self.__journal_file_path, 'rb') as journal_file:
+            journal_file.seek(self.__journal_file_offset)
+            for line in journal_file:
+                # partially written record, either still being written or the writer crashed
+                if not line.endswith(b'\n'):
+                    break
+
+                self.__journal_file_offset += len(line)
+                try:
+                    record = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    continue
+
+                merge_step_results(self.__results, record['step'], record['results'])
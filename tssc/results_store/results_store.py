@@ -0,0 +1,392 @@
+"""
+Store of the results of a TSSC run as a YAML results file, and the helpers shared by the
+other stores for locking, replacing, and merging results.
+"""
+
+import contextlib
+import copy
+import os
+import random
+import tempfile
+import threading
+import time
+from ..exceptions import TSSCException
+from ..yaml_io import YAML_PARSE_ERRORS, safe_dump, safe_load
+
+try:
+    import fcntl
+except ImportError: # pragma: no cover
+    # NOTE: not available on windows, where only threads in the same process are synchronized
+    fcntl = None
+
+# seconds to wait for another tssc process to release the results file lock
+DEFAULT_LOCK_TIMEOUT = 60.0
+
+LOCK_FILE_EXTENSION = '.lock'
+
+# bounds of the randomized, exponentially growing delay between attempts to take the lock
+_LOCK_RETRY_MIN_DELAY = 0.005
+_LOCK_RETRY_MAX_DELAY = 0.5
+
+# temporary files are only readable by their owner, so the results file is given the mode it
+# would have been created with by open()
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_FILE_MODE = 0o666 & ~_UMASK
+
+
+class ResultsStore:
+    """
+    Owner of the TSSC results file for a single TSSCFactory run.
+
+    The results file is parsed at most once, the first time the results are needed, after which
+    all reads are served from memory. Writes update the in memory results and are then written
+    through to the results file so that the file is always up to date with the in memory results.
+
+    If the results file is changed by something other then this store (for instance another
+    tssc process) it is detected by its size or modification time and re-parsed on next read.
+
+    The store is safe to share between threads running steps concurrently, and between tssc
+    processes sharing the results directory. Writes hold an advisory lock on a lock file next to
+    the results file while they re-read, merge into, and replace the results file, so
+    concurrent writers do not lose each others results, and the results file is replaced by
+    renaming a fully written temporary file over it, so readers never see a partial results file.
+
+    Parameters
+    ----------
+    results_dir_path : str
+        Path to the directory to write the results file to.
+    results_file_name : str
+        Name of file to write the results to.
+    lock_timeout : float, optional
+        Seconds to wait for another tssc process to release the results file lock before giving
+        up on writing.
+    """
+
+    TSSC_RESULTS_KEY = 'tssc-results'
+
+    def __init__(self, results_dir_path, results_file_name, lock_timeout=DEFAULT_LOCK_TIMEOUT):
+        self.__results_dir_path = results_dir_path
+        self.__results_file_path = os.path.join(results_dir_path, results_file_name)
+        self.__lock_timeout = lock_timeout
+
+        self.__results = None
+        self.__results_file_stat = None
+
+        # guards the in memory results and the results file against concurrent steps
+        self._lock = threading.RLock()
+
+    @property
+    def results_dir_path(self):
+        """
+        Returns
+        -------
+        str
+            Path to the directory the results file is written to.
+        """
+        return self.__results_dir_path
+
+    @property
+    def results_file_path(self):
+        """
+        Returns
+        -------
+        str
+            OS path to the results file.
+        """
+        return self.__results_file_path
+
+    def current_results(self):
+        """
+        Get all of the results of the TSSC run so far.
+
+        Returns
+        -------
+        dict
+            Copy of the results of the TSSC run so far with the top level 'tssc-results' key,
+            or None if there is no results file yet.
+
+        Raises
+        ------
+        TSSCException
+            Existing results file has invalid yaml or existing results file does not have expected
+            element.
+        """
+        with self._lock:
+            results = self._load_results()
+            if results is None:
+                return None
+
+            return copy.deepcopy(results)
+
+    def get_step_results(self, step_name):
+        """
+        Get the results of a specific step.
+
+        Parameters
+        ----------
+        step_name : str
+            TSSC step name to get the results for
+
+        Returns
+        -------
+        dict
+            Copy of the results of the given step. None if results DNE.
+
+        Raises
+        ------
+        TSSCException
+            Existing results file has invalid yaml or existing results file does not have expected
+            element.
+        """
+        with self._lock:
+            results = self._load_results()
+            if results is None:
+                return None
+
+            return copy.deepcopy(results[ResultsStore.TSSC_RESULTS_KEY].get(step_name))
+
+    def write_step_results( # pylint: disable=unused-argument
+            self, step_name, step_results, implementer_name=None):
+        """
+        Merge the given step results into the results of the given step and write the results
+        through to the results file.
+
+        Parameters
+        ----------
+        step_name : str
+            TSSC step name to write the results for.
+        step_results : dict
+            Results to merge into any existing results for the given step.
+        implementer_name : str, optional
+            Name of the StepImplementer that produced the given step results.
+
+        Raises
+        ------
+        TSSCException
+            Existing results file has invalid yaml or existing results file does not have expected
+            element, or the results file lock could not be taken in time.
+        """
+        with self._lock, self._results_file_lock():
+            results = self._load_results()
+            if results is None:
+                results = {ResultsStore.TSSC_RESULTS_KEY: {}}
+
+            merge_step_results(results, step_name, step_results)
+            self._write_results_file(results)
+
+    def _results_file_lock(self):
+        """
+        Returns
+        -------
+        contextlib.AbstractContextManager
+            Holds the advisory lock on the results file shared by all tssc processes writing to
+            the results directory, see `results_file_lock`.
+        """
+        return results_file_lock(
+            self.__results_file_path + LOCK_FILE_EXTENSION,
+            self.__lock_timeout)
+
+    @property
+    def _lock_timeout(self):
+        """
+        Returns
+        -------
+        float
+            Seconds to wait for another tssc process to release a results file lock.
+        """
+        return self.__lock_timeout
+
+    def _write_results_file(self, results):
+        """
+        Replaces the results file with the given results which become the in memory results.
+
+        Parameters
+        ----------
+        results : dict
+            All of the results of the TSSC run with the top level 'tssc-results' key.
+        """
+        replace_yaml_file(self.__results_file_path, results)
+
+        self.__results = results
+        self.__results_file_stat = file_stat(self.__results_file_path)
+
+    def _load_results(self):
+        """
+        Loads the results file if it has not been loaded yet or has changed since last loaded.
+
+        Returns
+        -------
+        dict
+            The in memory results, or None if there is no results file yet.
+        """
+        results_file_stat = file_stat(self.__results_file_path)
+        if results_file_stat is None:
+            self.__results = None
+        elif results_file_stat != self.__results_file_stat:
+            self.__results = self.__parse_results_file()
+
+        self.__results_file_stat = results_file_stat
+        return self.__results
+
+    def __parse_results_file(self):
+        """
+        Parses the results file.
+
+        Returns
+        -------
+        dict
+            Results parsed from the results file.
+
+        Raises
+        ------
+        TSSCException
+            Existing results file has invalid yaml or existing results file does not have expected
+            element.
+        """
+        with open(self.__results_file_path, 'r') as results_file:
+            try:
+                results = safe_load(results_file)
+            except YAML_PARSE_ERRORS as err:
+                raise TSSCException(
+                    'Existing results file'
+                    +' (' + self.__results_file_path + ')'
+                    +' has invalid yaml: ' + str(err)
+                )
+
+        if not results:
+            return {ResultsStore.TSSC_RESULTS_KEY: {}}
+
+        if ResultsStore.TSSC_RESULTS_KEY not in results:
+            raise TSSCException(
+                'Existing results file'
+                +' (' + self.__results_file_path + ')'
+                +' does not have expected top level element'
+                +' (' + ResultsStore.TSSC_RESULTS_KEY + '): '
+                + str(results)
+            )
+
+        if results[ResultsStore.TSSC_RESULTS_KEY] is None:
+            results[ResultsStore.TSSC_RESULTS_KEY] = {}
+
+        return results
+
+
+@contextlib.contextmanager
+def results_file_lock(lock_file_path, lock_timeout=DEFAULT_LOCK_TIMEOUT):
+    """
+    Holds an advisory lock on the given lock file, shared by all tssc processes, retrying with a
+    randomized, exponentially growing delay while another process holds it.
+
+    Parameters
+    ----------
+    lock_file_path : str
+        Path to the lock file, created if it does not exist.
+    lock_timeout : float, optional
+        Seconds to wait for another process to release the lock.
+
+    Raises
+    ------
+    TSSCException
+        If the lock could not be taken within the lock timeout.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(os.path.abspath(lock_file_path)), exist_ok=True)
+    with open(lock_file_path, 'a') as lock_file:
+        deadline = time.monotonic() + lock_timeout
+        delay = _LOCK_RETRY_MIN_DELAY
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TSSCException(
+                        'Timed out after ' + str(lock_timeout) + 's waiting for'
+                        + ' another tssc process to release the results file lock'
+                        + ' (' + lock_file_path + ')'
+                    )
+
+                time.sleep(min(remaining, random.uniform(delay / 2, delay)))
+                delay = min(delay * 2, _LOCK_RETRY_MAX_DELAY)
+
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def replace_yaml_file(file_path, data):
+    """
+    Replaces the given file with the given data dumped as yaml.
+
+    The data is written to a temporary file in the same directory which is then renamed over the
+    given file, so readers see either the old or the new file but never a partial file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file to replace, along with any missing parent directories.
+    data : object
+        Data to dump to the file.
+    """
+    file_dir_path, file_name = os.path.split(os.path.abspath(file_path))
+    os.makedirs(file_dir_path, exist_ok=True)
+
+    file_descriptor, temp_file_path = tempfile.mkstemp(
+        dir=file_dir_path,
+        prefix='.' + file_name + '.')
+    try:
+        with os.fdopen(file_descriptor, 'w') as file:
+            safe_dump(data, file)
+        os.chmod(temp_file_path, _FILE_MODE)
+        os.replace(temp_file_path, file_path)
+    except BaseException:
+        os.remove(temp_file_path)
+        raise
+
+
+def merge_step_results(results, step_name, step_results):
+    """
+    Merges the given step results into the results of the given step in the given results.
+
+    Parameters
+    ----------
+    results : dict
+        All of the results of the TSSC run with the top level 'tssc-results' key to update.
+    step_name : str
+        TSSC step name to merge the results for.
+    step_results : dict
+        Results to merge into any existing results for the given step, these take precedence
+        over the existing results of the step.
+    """
+    all_step_results = results[ResultsStore.TSSC_RESULTS_KEY]
+    all_step_results[step_name] = {
+        **(all_step_results.get(step_name) or {}),
+        **copy.deepcopy(step_results)
+    }
+
+
+def file_stat(path):
+    """
+    Parameters
+    ----------
+    path : str
+        Path to get the identifying stat information of.
+
+    Returns
+    -------
+    tuple
+        (size, modification time in nanoseconds, inode) of the given path,
+        or None if the path does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
@@ -0,0 +1,270 @@
+"""
+Store of the results of a TSSC run as one YAML shard file per step.
+"""
+
+import copy
+import os
+import urllib.parse
+from ..exceptions import TSSCException
+from ..yaml_io import YAML_PARSE_ERRORS, safe_load
+from .results_store import DEFAULT_LOCK_TIMEOUT, LOCK_FILE_EXTENSION, ResultsStore, \
+    file_stat, merge_step_results, replace_yaml_file, results_file_lock
+
+
+class ShardedResultsStore(ResultsStore):
+    """
+    Store of the TSSC run results that keeps the results of each step in a results file of its
+    own, a shard, so reading the results of one step only parses the results of that step, and
+    writing the results of one step only re-writes the results of that step.
+
+    The shards are in a directory named after the classic results file, along with an index of
+    the steps that have results, which is only read when all of the results are needed.
+
+        tssc-results/
+            tssc-results.d/
+                index.yml
+                steps/
+                    generate-metadata.yml
+                    unit-test.yml
+
+    Each shard is locked and replaced on its own, so steps writing to different shards do not
+    wait for each other, and only adding a step to the index takes the index lock.
+
+    Use `compact` to materialize the classic results file from the shards.
+
+    Parameters
+    ----------
+    results_dir_path : str
+        Path to the directory to write the results shards directory to.
+    results_file_name : str
+        Name of the classic results file to compact the shards into, the shards directory name
+        is derived from this name by replacing the extension with `.d`.
+    lock_timeout : float, optional
+        Seconds to wait for another tssc process to release a results file lock before giving
+        up on writing.
+    """
+
+    SHARDS_DIR_EXTENSION = '.d'
+    INDEX_FILE_NAME = 'index.yml'
+    INDEX_STEPS_KEY = 'steps'
+    SHARDS_SUB_DIR_NAME = 'steps'
+    SHARD_FILE_EXTENSION = '.yml'
+
+    def __init__(self, results_dir_path, results_file_name, lock_timeout=DEFAULT_LOCK_TIMEOUT):
+        super().__init__(results_dir_path, results_file_name, lock_timeout)
+
+        self.__shards_dir_path = os.path.join(
+            results_dir_path,
+            os.path.splitext(results_file_name)[0] + ShardedResultsStore.SHARDS_DIR_EXTENSION)
+        self.__index_file_path = os.path.join(
+            self.__shards_dir_path, ShardedResultsStore.INDEX_FILE_NAME)
+
+        # (file stat, parsed content) of the index and of each shard by step name
+        self.__index = (None, None)
+        self.__shards = {}
+
+    @property
+    def results_file_path(self):
+        """
+        Returns
+        -------
+        str
+            OS path to the index of the results shards.
+        """
+        return self.__index_file_path
+
+    @property
+    def compacted_results_file_path(self):
+        """
+        Returns
+        -------
+        str
+            OS path to the classic results file the shards are compacted into.
+        """
+        return super().results_file_path
+
+    def current_results(self):
+        """
+        Get all of the results of the TSSC run so far.
+
+        Returns
+        -------
+        dict
+            Copy of the results of the TSSC run so far with the top level 'tssc-results' key,
+            or None if no step has results yet.
+
+        Raises
+        ------
+        TSSCException
+            Existing results shard or index has invalid yaml.
+        """
+        with self._lock:
+            steps = self.__load_index()
+            if steps is None:
+                return None
+
+            return {
+                ResultsStore.TSSC_RESULTS_KEY: {
+                    step_name: copy.deepcopy(self.__load_shard(step_name)) for step_name in steps
+                }
+            }
+
+    def get_step_results(self, step_name):
+        """
+        Get the results of a specific step, parsing only the shard of the given step.
+
+        Parameters
+        ----------
+        step_name : str
+            TSSC step name to get the results for
+
+        Returns
+        -------
+        dict
+            Copy of the results of the given step. None if results DNE.
+
+        Raises
+        ------
+        TSSCException
+            Existing results shard has invalid yaml.
+        """
+        with self._lock:
+            return copy.deepcopy(self.__load_shard(step_name))
+
+    def write_step_results(self, step_name, step_results, implementer_name=None):
+        """
+        Merge the given step results into the shard of the given step.
+
+        Parameters
+        ----------
+        step_name : str
+            TSSC step name to write the results for.
+        step_results : dict
+            Results to merge into any existing results for the given step.
+        implementer_name : str, optional
+            Name of the StepImplementer that produced the given step results.
+
+        Raises
+        ------
+        TSSCException
+            Existing results shard or index has invalid yaml, or a results file lock could not
+            be taken in time.
+        """
+        shard_file_path = self.__shard_file_path(step_name)
+        with self._lock:
+            with results_file_lock(shard_file_path + LOCK_FILE_EXTENSION, self._lock_timeout):
+                results = {ResultsStore.TSSC_RESULTS_KEY: {step_name: self.__load_shard(step_name)}}
+                merge_step_results(results, step_name, step_results)
+                shard = results[ResultsStore.TSSC_RESULTS_KEY][step_name]
+
+                replace_yaml_file(shard_file_path, shard)
+                self.__shards[step_name] = (file_stat(shard_file_path), shard)
+
+            steps = self.__load_index()
+            if steps is None or step_name not in steps:
+                with results_file_lock(
+                        self.__index_file_path + LOCK_FILE_EXTENSION, self._lock_timeout):
+                    steps = self.__load_index() or {}
+                    steps[step_name] = os.path.relpath(shard_file_path, self.__shards_dir_path)
+
+                    replace_yaml_file(
+                        self.__index_file_path, {ShardedResultsStore.INDEX_STEPS_KEY: steps})
+                    self.__index = (file_stat(self.__index_file_path), steps)
+
+    def compact(self):
+        """
+        Materializes the current results from the shards into the classic results file.
+
+        The shards are kept, so results written after compacting are in the shards but not in
+        the classic results file until it is compacted again.
+
+        Returns
+        -------
+        str
+            OS path to the classic results file.
+
+        Raises
+        ------
+        TSSCException
+            Existing results shard or index has invalid yaml, or the results file lock could not
+            be taken in time.
+        """
+        with self._lock, self._results_file_lock():
+            results = self.current_results()
+            if results is None:
+                results = {ResultsStore.TSSC_RESULTS_KEY: {}}
+
+            self._write_results_file(results)
+            return self.compacted_results_file_path
+
+    def __load_index(self):
+        """
+        Returns
+        -------
+        dict
+            Paths to the shards, relative to the shards directory, by the names of the steps
+            that have results, or None if no step has results yet.
+        """
+        index_file_stat = file_stat(self.__index_file_path)
+        if index_file_stat is None:
+            self.__index = (None, None)
+        elif index_file_stat != self.__index[0]:
+            index = self.__parse_yaml_file(self.__index_file_path) or {}
+            self.__index = (index_file_stat, index.get(ShardedResultsStore.INDEX_STEPS_KEY) or {})
+
+        return self.__index[1]
+
+    def __load_shard(self, step_name):
+        """
+        Returns
+        -------
+        dict
+            The in memory results of the given step, or None if the step has no results yet.
+        """
+        shard_file_path = self.__shard_file_path(step_name)
+        shard_file_stat = file_stat(shard_file_path)
+        if shard_file_stat is None:
+            self.__shards.pop(step_name, None)
+            return None
+
+        shard_file_stat_and_results = self.__shards.get(step_name)
+        if shard_file_stat_and_results is None or shard_file_stat_and_results[0] != shard_file_stat:
+            self.__shards[step_name] = (shard_file_stat, self.__parse_yaml_file(shard_file_path))
+
+        return self.__shards[step_name][1]
+
+    def __shard_file_path(self, step_name):
+        """
+        Returns
+        -------
+        str
+            OS path to the shard of the given step, with any characters of the step name that
+            are not safe in a file name escaped.
+        """
+        return os.path.join(
+            self.__shards_dir_path,
+            ShardedResultsStore.SHARDS_SUB_DIR_NAME,
+            urllib.parse.quote(step_name, safe='') + ShardedResultsStore.SHARD_FILE_EXTENSION)
+
+    @staticmethod
+    def __parse_yaml_file(file_path):
+        """
+        Returns
+        -------
+        object
+            Content parsed from the given yaml file.
+
+        Raises
+        ------
+        TSSCException
+            The given file has invalid yaml.
+        """
+        with open(file_path, 'r') as yaml_file:
+            try:
+                return safe_load(yaml_file)
+            except YAML_PARSE_ERRORS as err:
+                raise TSSCException(
+                    'Existing results file'
+                    +' (' + file_path + ')'
+                    +' has invalid yaml: ' + str(err)
+                )
@@ -0,0 +1,353 @@
+"""
+Store of the results of many TSSC runs in a SQLite database.
+"""
+
+import datetime
+import json
+import os
+import tempfile
+import uuid
+from ..exceptions import TSSCException
+from .results_store import _FILE_MODE, DEFAULT_LOCK_TIMEOUT, ResultsStore
+
+
+class SqliteResultsStore(ResultsStore):
+    """
+    Store of the results of many TSSC runs in a SQLite database, one row per result key of each
+    step of each run, indexed for point lookups of a single result and for queries of a result
+    across runs.
+
+    The results of the current run, identified by the run ID, are what `current_results`,
+    `get_step_results`, and `write_step_results` work with, `get_step_result` looks up a single
+    result of the current run, and `result_history` queries a result across all of the runs.
+
+    Use `compact` to materialize the classic results file from the results of the current run.
+
+    Parameters
+    ----------
+    results_dir_path : str
+        Path to the directory to write the results database to.
+    results_file_name : str
+        Name of the classic results file to compact the results of the current run into, the
+        database file name is derived from this name by replacing the extension with `.db`.
+    lock_timeout : float, optional
+        Seconds to wait for another tssc process to release the database before giving up.
+    run_id : str, optional
+        ID of the current run, shared by all of the tssc processes of a pipeline run, by default
+        the value of the `TSSC_RUN_ID` environment variable.
+
+    Notes
+    -----
+    The ID of the current run is saved in the results directory, in a file named after the
+    results file with the `.run-id` extension, so that the tssc processes running each step of
+    a pipeline one at a time all work with the results of the same run. When neither a run ID
+    nor the `TSSC_RUN_ID` environment variable is given the saved run ID is used, or if there
+    is none yet a new unique ID is saved.
+    """
+
+    DATABASE_FILE_EXTENSION = '.db'
+    RUN_ID_FILE_EXTENSION = '.run-id'
+    RUN_ID_ENV_VAR = 'TSSC_RUN_ID'
+
+    __SCHEMA = [
+        '''CREATE TABLE IF NOT EXISTS step_results (
+            run_id TEXT NOT NULL,
+            step TEXT NOT NULL,
+            implementer TEXT,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            PRIMARY KEY (run_id, step, key)
+        )''',
+        '''CREATE INDEX IF NOT EXISTS step_results_by_step_key
+            ON step_results (step, key, timestamp)'''
+    ]
+
+    def __init__( # pylint: disable=too-many-arguments
+            self,
+            results_dir_path,
+            results_file_name,
+            lock_timeout=DEFAULT_LOCK_TIMEOUT,
+            run_id=None):
+        super().__init__(results_dir_path, results_file_name, lock_timeout)
+
+        results_file_base_name = os.path.splitext(results_file_name)[0]
+        self.__database_file_path = os.path.join(
+            results_dir_path,
+            results_file_base_name + SqliteResultsStore.DATABASE_FILE_EXTENSION)
+        self.__run_id_file_path = os.path.join(
+            results_dir_path,
+            results_file_base_name + SqliteResultsStore.RUN_ID_FILE_EXTENSION)
+        self.__given_run_id = run_id or os.environ.get(SqliteResultsStore.RUN_ID_ENV_VAR)
+        self.__run_id = None
+        self.__connection = None
+
+    @property
+    def results_file_path(self):
+        """
+        Returns
+        -------
+        str
+            OS path to the results database.
+        """
+        return self.__database_file_path
+
+    @property
+    def compacted_results_file_path(self):
+        """
+        Returns
+        -------
+        str
+            OS path to the classic results file the results of the current run are compacted
+            into.
+        """
+        return super().results_file_path
+
+    @property
+    def run_id(self):
+        """
+        Returns
+        -------
+        str
+            ID of the current run, see the notes of `SqliteResultsStore`.
+        """
+        with self._lock:
+            if self.__run_id is None:
+                self.__run_id = self.__save_run_id()
+            return self.__run_id
+
+    def current_results(self):
+        """
+        Get all of the results of the current run so far.
+
+        Returns
+        -------
+        dict
+            The results of the current run so far with the top level 'tssc-results' key, or None
+            if no step of the current run has results yet.
+        """
+        rows = self.__query(
+            'SELECT step, key, value FROM step_results WHERE run_id = ?',
+            (self.run_id,))
+        if not rows:
+            return None
+
+        results = {ResultsStore.TSSC_RESULTS_KEY: {}}
+        for step_name, key, value in rows:
+            results[ResultsStore.TSSC_RESULTS_KEY].setdefault(step_name, {})[key] = \
+                json.loads(value)
+        return results
+
+    def get_step_results(self, step_name):
+        """
+        Get the results of a specific step of the current run.
+
+        Parameters
+        ----------
+        step_name : str
+            TSSC step name to get the results for
+
+        Returns
+        -------
+        dict
+            The results of the given step. None if results DNE.
+        """
+        rows = self.__query(
+            'SELECT key, value FROM step_results WHERE run_id = ? AND step = ?',
+            (self.run_id, step_name))
+        if not rows:
+            return None
+
+        return {key: json.loads(value) for key, value in rows}
+
+    def get_step_result(self, step_name, key):
+        """
+        Get a single result of a specific step of the current run.
+
+        Parameters
+        ----------
+        step_name : str
+            TSSC step name to get the result for.
+        key : str
+            Key of the result to get, such as `version` of `generate-metadata`.
+
+        Returns
+        -------
+        object
+            The given result of the given step. None if the result DNE.
+        """
+        rows = self.__query(
+            'SELECT value FROM step_results WHERE run_id = ? AND step = ? AND key = ?',
+            (self.run_id, step_name, key))
+        return json.loads(rows[0][0]) if rows else None
+
+    def result_history(self, step_name, key, run_id_pattern=None, limit=None):
+        """
+        Queries a result of a specific step across all of the runs, newest first.
+
+        For instance the last image digest pushed for a service whose run IDs start with the
+        service name is `result_history('push-container-image', 'image-digest', 'my-service-%',
+        limit=1)`. Steps only write results when they succeed, so these are the results of
+        successful steps.
+
+        Parameters
+        ----------
+        step_name : str
+            TSSC step name to get the result for.
+        key : str
+            Key of the result to get.
+        run_id_pattern : str, optional
+            SQL `LIKE` pattern the run IDs to get the result of match, by default all runs.
+        limit : int, optional
+            Maximum number of runs to get the result of, by default all runs.
+
+        Returns
+        -------
+        list
+            The `run-id`, `implementer`, `timestamp`, and `value` of the given result of each run.
+        """
+        sql = 'SELECT run_id, implementer, timestamp, value FROM step_results ' \
+            'WHERE step = ? AND key = ?'
+        params = [step_name, key]
+        if run_id_pattern is not None:
+            sql += ' AND run_id LIKE ?'
+            params.append(run_id_pattern)
+        sql += ' ORDER BY timestamp DESC, rowid DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        return [
+            {'run-id': run_id, 'implementer': implementer, 'timestamp': timestamp,
+             'value': json.loads(value)}
+            for run_id, implementer, timestamp, value in self.__query(sql, params)
+        ]
+
+    def write_step_results(self, step_name, step_results, implementer_name=None):
+        """
+        Merge the given step results into the results of the given step of the current run.
+
+        Parameters
+        ----------
+        step_name : str
+            TSSC step name to write the results for.
+        step_results : dict
+            Results to merge into any existing results for the given step.
+        implementer_name : str, optional
+            Name of the StepImplementer that produced the given step results.
+        """
+        timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        with self._lock:
+            connection = self.__connect()
+            with connection:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO step_results '
+                    '(run_id, step, implementer, key, value, timestamp) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [
+                        (self.run_id, step_name, implementer_name, key,
+                         json.dumps(value, default=str), timestamp)
+                        for key, value in step_results.items()
+                    ])
+
+    def compact(self):
+        """
+        Materializes the results of the current run into the classic results file.
+
+        Returns
+        -------
+        str
+            OS path to the classic results file.
+
+        Raises
+        ------
+        TSSCException
+            The current run has no results, or the results file lock could not be taken in time.
+        """
+        with self._lock, self._results_file_lock():
+            results = self.current_results()
+            if results is None:
+                raise TSSCException(
+                    'No results for run (' + self.run_id + ') in results database'
+                    + ' (' + self.__database_file_path + ')')
+
+            self._write_results_file(results)
+            return self.compacted_results_file_path
+
+    def __save_run_id(self):
+        """
+        Saves the given run ID as the current run of the results directory, or if no run ID was
+        given the saved run ID or else a new one.
+
+        Returns
+        -------
+        str
+            ID of the current run.
+        """
+        os.makedirs(self.results_dir_path, exist_ok=True)
+        run_id = self.__given_run_id or uuid.uuid4().hex
+
+        file_descriptor, temp_file_path = tempfile.mkstemp(
+            dir=self.results_dir_path,
+            prefix='.' + os.path.basename(self.__run_id_file_path) + '.')
+        try:
+            with os.fdopen(file_descriptor, 'w') as run_id_file:
+                run_id_file.write(run_id + '\n')
+            os.chmod(temp_file_path, _FILE_MODE)
+
+            if self.__given_run_id:
+                os.replace(temp_file_path, self.__run_id_file_path)
+                return run_id
+
+            # NOTE: link fails rather then replacing the run ID another process saved first
+            try:
+                os.link(temp_file_path, self.__run_id_file_path)
+                return run_id
+            except FileExistsError:
+                with open(self.__run_id_file_path, 'r') as run_id_file:
+                    return run_id_file.read().strip()
+        finally:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+    def __query(self, sql, params):
+        """
+        Returns
+        -------
+        list
+            Rows returned by the given query, or no rows if there is no results database yet.
+        """
+        with self._lock:
+            if self.__connection is None and not os.path.exists(self.__database_file_path):
+                return []
+
+            return self.__connect().execute(sql, params).fetchall()
+
+    def __connect(self):
+        """
+        Returns
+        -------
+        sqlite3.Connection
+            Connection to the results database, created along with its schema if it does not
+            exist yet.
+        """
+        if self.__connection is None:
+            # NOTE: imported here so that only the sqlite results format pays for importing it
+            import sqlite3 # pylint: disable=import-outside-toplevel
+
+            os.makedirs(self.results_dir_path, exist_ok=True)
+
+            # the connection is guarded by the store lock rather then tied to one thread
+            connection = sqlite3.connect(
+                self.__database_file_path,
+                timeout=self._lock_timeout,
+                check_same_thread=False)
+
+            # readers do not block the writer, or each other
+            connection.execute('PRAGMA journal_mode=WAL')
+            with connection:
+                for statement in SqliteResultsStore.__SCHEMA:
+                    connection.execute(statement)
+            self.__connection = connection
+
+        return self.__connection
@@ -0,0 +1,296 @@
+"""
+Local cache of step results keyed by a hash of everything that went into producing them.
+
+A StepImplementer opts into caching by returning the paths to the files and directories its
+results depend on from `_cache_input_paths`. The cache key of a sub step is the hash of
+
+    * the step and step implementer names
+    * the runtime step configuration
+    * the results of the steps the step depends on (see `tssc.workflow`)
+    * the content of the cache input paths
+
+so if none of those changed since a previous run the results of that run are replayed rather
+then running the sub step again.
+
+The results of the step itself are not part of the cache key, since they include the results of
+any previous run of the sub step, so sub steps that use the results of other sub steps of the
+same step should not opt into caching.
+
+Cache entries are stored in a content addressed directory layout, `{cache dir}/{key[:2]}/{key}`,
+and once the total size of the entries exceeds the maximum cache size the least recently used
+entries are evicted.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from .workflow import get_step_dependencies
+
+DEFAULT_MAX_CACHE_SIZE = 100 * 1024 * 1024
+
+_HASH_BUFFER_SIZE = 1024 * 1024
+_IGNORED_DIR_NAMES = ['.git']
+
+def hash_file(file_path):
+    """
+    Hashes the content of the given file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file to hash.
+
+    Returns
+    -------
+    str
+        Hex sha256 digest of the content of the given file.
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(_HASH_BUFFER_SIZE), b''):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+def hash_path(path, exclude_paths=None):
+    """
+    Hashes the given file or directory.
+
+    Directories are hashed by the relative path and content of every file in them,
+    ignoring `.git` directories.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file or directory to hash.
+    exclude_paths : list, optional
+        Paths to files or directories in the given directory to not include in the hash.
+
+    Returns
+    -------
+    str
+        Hex sha256 digest of the given path, or None if the path does not exist.
+    """
+    if os.path.isfile(path):
+        return hash_file(path)
+
+    if not os.path.isdir(path):
+        return None
+
+    exclude_paths = {os.path.abspath(exclude_path) for exclude_path in exclude_paths or []}
+
+    dir_hash = hashlib.sha256()
+    for dir_path, dir_names, file_names in os.walk(path):
+        dir_names[:] = sorted(
+            dir_name for dir_name in dir_names
+            if dir_name not in _IGNORED_DIR_NAMES and
+            os.path.abspath(os.path.join(dir_path, dir_name)) not in exclude_paths
+        )
+
+        for file_name in sorted(file_names):
+            file_path = os.path.join(dir_path, file_name)
+            if os.path.abspath(file_path) in exclude_paths or not os.path.isfile(file_path):
+                continue
+
+            dir_hash.update(os.path.relpath(file_path, path).encode('utf-8'))
+            dir_hash.update(b'\0')
+            dir_hash.update(hash_file(file_path).encode('ascii'))
+            dir_hash.update(b'\0')
+
+    return dir_hash.hexdigest()
+
+class StepResultsCache:
+    """
+    Local content addressed cache of step results with size based least recently used eviction.
+
+    Parameters
+    ----------
+    cache_dir_path : str
+        Path to the directory to store the cache entries in.
+    max_cache_size : int, optional
+        Maximum total size in bytes of the cache entries.
+    """
+
+    def __init__(self, cache_dir_path, max_cache_size=DEFAULT_MAX_CACHE_SIZE):
+        self.__cache_dir_path = cache_dir_path
+        self.__max_cache_size = max_cache_size
+
+    @property
+    def cache_dir_path(self):
+        """
+        Returns
+        -------
+        str
+            Path to the directory the cache entries are stored in.
+        """
+        return self.__cache_dir_path
+
+    @staticmethod
+    def create_key(cache_inputs, input_paths, exclude_paths=None):
+        """
+        Creates the cache key for the given inputs.
+
+        Parameters
+        ----------
+        cache_inputs : dict
+            JSON serializable inputs to the cached results, such as configuration and the results
+            of other steps.
+        input_paths : list
+            Paths to the files and directories that are inputs to the cached results.
+        exclude_paths : list, optional
+            Paths to files or directories in the input directories that are not inputs to the
+            cached results.
+
+        Returns
+        -------
+        str
+            Cache key for the given inputs.
+        """
+        key_hash = hashlib.sha256()
+        key_hash.update(json.dumps(cache_inputs, sort_keys=True, default=str).encode('utf-8'))
+        for input_path in input_paths:
+            key_hash.update(b'\0')
+            key_hash.update(str(input_path).encode('utf-8'))
+            key_hash.update(b'\0')
+            key_hash.update(str(hash_path(input_path, exclude_paths)).encode('ascii'))
+
+        return key_hash.hexdigest()
+
+    @staticmethod
+    def create_step_key( # pylint: disable=too-many-arguments
+            step_name,
+            implementer_name,
+            runtime_step_config,
+            get_step_results,
+            input_paths,
+            exclude_paths=None):
+        """
+        Creates the cache key for the results of a sub step.
+
+        Parameters
+        ----------
+        step_name : str
+            TSSC step name of the sub step.
+        implementer_name : str
+            Name of the StepImplementer of the sub step.
+        runtime_step_config : dict
+            Runtime step configuration of the sub step.
+        get_step_results : callable
+            Function to get the current results of a step given the step name.
+        input_paths : list
+            Paths to the files and directories that are inputs to the sub step.
+        exclude_paths : list, optional
+            Paths to files or directories in the input directories that are not inputs to the
+            sub step.
+
+        Returns
+        -------
+        str
+            Cache key for the results of the sub step.
+        """
+        step_results = {}
+        for step_dependency in sorted(get_step_dependencies(step_name)):
+            step_results[step_dependency] = get_step_results(step_dependency)
+
+        return StepResultsCache.create_key(
+            {
+                'step': step_name,
+                'implementer': implementer_name,
+                'runtime-step-config': runtime_step_config,
+                'step-results': step_results
+            },
+            input_paths,
+            exclude_paths)
+
+    def get(self, key):
+        """
+        Gets the results cached with the given key.
+
+        Parameters
+        ----------
+        key : str
+            Cache key to get the results of.
+
+        Returns
+        -------
+        dict
+            The results cached with the given key or None if there are none.
+        """
+        entry_path = self.__entry_path(key)
+        try:
+            with open(entry_path, 'r') as entry_file:
+                results = json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+
+        # mark as recently used
+        os.utime(entry_path)
+        return results
+
+    def put(self, key, results):
+        """
+        Caches the given results with the given key and evicts the least recently used entries
+        if the cache has grown larger then the maximum cache size.
+
+        Parameters
+        ----------
+        key : str
+            Cache key to cache the given results with.
+        results : dict
+            Results to cache.
+        """
+        entry_path = self.__entry_path(key)
+        entry_dir_path = os.path.dirname(entry_path)
+        os.makedirs(entry_dir_path, exist_ok=True)
+
+        # write to a temporary file and rename so readers never see a partial entry
+        entry_file_descriptor, entry_temp_path = tempfile.mkstemp(dir=entry_dir_path)
+        with os.fdopen(entry_file_descriptor, 'w') as entry_file:
+            json.dump(results, entry_file, default=str)
+        os.replace(entry_temp_path, entry_path)
+
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the total size of the entries is no more
+        then the maximum cache size.
+        """
+        entries = []
+        total_size = 0
+        if not os.path.isdir(self.__cache_dir_path):
+            return
+
+        for entry_dir in os.scandir(self.__cache_dir_path):
+            if not entry_dir.is_dir():
+                continue
+            for entry in os.scandir(entry_dir.path):
+                entry_stat = entry.stat()
+                entries.append((entry_stat.st_mtime_ns, entry_stat.st_size, entry.path))
+                total_size += entry_stat.st_size
+
+        for _, entry_size, entry_path in sorted(entries):
+            if total_size <= self.__max_cache_size:
+                break
+
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            total_size -= entry_size
+
+    def __entry_path(self, key):
+        """
+        Parameters
+        ----------
+        key : str
+            Cache key to get the entry path of.
+
+        Returns
+        -------
+        str
+            Path to the cache entry for the given key.
+        """
+        return os.path.join(self.__cache_dir_path, key[:2], key)
@@ -5,9 +5,10 @@ Abstract class and helper constants for StepImplementer.
 from abc import ABC, abstractmethod
 import os
 import pprint
-import yaml
 from tabulate import tabulate
-from .exceptions import TSSCException
+from .results_store import ResultsStore
+from .trace import TRACE_SUMMARY_STEP_NAME, TSSC_CATEGORY, untraced_span
+from .yaml_io import YAML_IMPLEMENTATION
 
 class DefaultSteps:  # pylint: disable=too-few-public-methods
     """
@@ -53,9 +54,18 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
         Global defaults.
     global_environment_config_defaults : dict, optional
         Global defaults specific to the current environment.
+    results_store : ResultsStore, optional
+        Store of the results of the TSSC run shared with other step implementers.
+        If not given one is created for the given results_dir_path and results_file_name.
+    step_cache : StepResultsCache, optional
+        Cache to replay the results of this step from if its inputs are unchanged since it was
+        last run. If not given the step is always run.
+    tracer : Tracer, optional
+        Tracer to record the time spent running this step with.
+        If not given the step is not traced.
     """
 
-    __TSSC_RESULTS_KEY = 'tssc-results'
+    __TSSC_RESULTS_KEY = ResultsStore.TSSC_RESULTS_KEY
     __TITLE_LENGTH = 80
 
     def __init__( # pylint: disable=too-many-arguments
@@ -66,7 +76,10 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
             step_environment_config=None,
             step_config=None,
             global_config_defaults=None,
-            global_environment_config_defaults=None):
+            global_environment_config_defaults=None,
+            results_store=None,
+            step_cache=None,
+            tracer=None):
 
         if step_environment_config is None:
             step_environment_config = {}
@@ -77,8 +90,12 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
         if global_environment_config_defaults is None:
             global_environment_config_defaults = {}
 
-        self.__results_dir_path = results_dir_path
-        self.__results_file_name = results_file_name
+        if results_store is None:
+            results_store = ResultsStore(results_dir_path, results_file_name)
+
+        self.__results_store = results_store
+        self.__step_cache = step_cache
+        self.__tracer = tracer
         self.__work_dir_path = work_dir_path
 
         self.__step_environment_config = step_environment_config
@@ -86,7 +103,6 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
         self.__global_config_defaults = global_config_defaults
         self.__global_environment_config_defaults = global_environment_config_defaults
 
-        self.__results_file_path = None
         super().__init__()
 
     @property
@@ -129,6 +145,16 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
         """
         return self.__global_environment_config_defaults
 
+    @property
+    def results_store(self):
+        """
+        Returns
+        -------
+        ResultsStore
+            Store of the results of the TSSC run shared with other step implementers.
+        """
+        return self.__results_store
+
     @property
     def results_file_path(self):
         """
@@ -139,12 +165,17 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
         str
             OS path to the results file for this step.
         """
-        if not self.__results_file_path:
-            self.__results_file_path = os.path.join(
-                self.__results_dir_path,
-                self.__results_file_name)
+        return self.__results_store.results_file_path
 
-        return self.__results_file_path
+    @property
+    def work_dir_path(self):
+        """
+        Returns
+        -------
+        str
+            OS path to the directory to write step working files to.
+        """
+        return self.__work_dir_path
 
     @staticmethod
     @abstractmethod
@@ -207,6 +238,68 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
             Results of running this step.
         """
 
+    def _cache_input_paths(self, runtime_step_config): # pylint: disable=unused-argument
+        """
+        Getter for the paths to the files and directories the results of this step depend on.
+
+        Step implementers that return paths opt into having their results replayed from the
+        step cache when the content of those paths, the runtime step configuration, and the
+        results of the steps this step depends on are unchanged since the step was last run.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+
+        Returns
+        -------
+        list
+            Paths to the files and directories the results of this step depend on,
+            or None if the results of this step should never be replayed from the step cache.
+
+        See Also
+        --------
+        tssc.step_cache
+        """
+        return None
+
+    def _cache_exclude_paths(self, runtime_step_config): # pylint: disable=unused-argument
+        """
+        Getter for the paths in the `_cache_input_paths` directories that the results of this
+        step do not depend on, such as files created by running this step.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+
+        Returns
+        -------
+        list
+            Paths in the `_cache_input_paths` directories the results of this step do not
+            depend on.
+        """
+        return []
+
+    def _cached_results_valid(self, results): # pylint: disable=unused-argument
+        """
+        Checks that results replayed from the step cache are still valid, for instance that
+        the files they refer to still exist.
+
+        Parameters
+        ----------
+        results : dict
+            Results of a previous run of this step with the same inputs.
+
+        Returns
+        -------
+        bool
+            True if the given results can be used rather then running the step, False otherwise.
+        """
+        return True
+
     def _validate_runtime_step_config(self, runtime_step_config):
         """
         Validates the given `runtime_step_config` against the required step configuration keys.
@@ -284,44 +377,151 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
         step_config_runtime_overrides = {} if step_config_runtime_overrides is None \
                                             else step_config_runtime_overrides
 
-        StepImplementer.__print_section_title("TSSC Step Start - {}".format(self.step_name()))
-
-        # print information about the static step configuration
-        StepImplementer.__print_data(
-            "Step Implementer Configuration Defaults",
-            self.step_implementer_config_defaults())
-        StepImplementer.__print_data(
-            "Global Configuration Defaults",
-            self.global_config_defaults)
-        StepImplementer.__print_data(
-            "Global Environment Configuration Defaults",
-            self.global_environment_config_defaults)
-        StepImplementer.__print_data(
-            "Step Configuration",
-            self.step_config)
-        StepImplementer.__print_data(
-            "Step Environment Configuration",
-            self.step_environment_config)
-        StepImplementer.__print_data(
-            "Step Configuration Runtime Overrides",
-            step_config_runtime_overrides)
-
-        # create the munged runtime step configuration and print
-        runtime_step_config = self.__create_runtime_step_config(step_config_runtime_overrides)
-        StepImplementer.__print_data(
-            "Runtime Step Configuration",
-            runtime_step_config)
-
-        # validate the runtime step configuration, run the step, and save the results
-        self._validate_runtime_step_config(runtime_step_config)
-        results = self._run_step(runtime_step_config)
-        self.write_results(results)
-
-        # print the step run results
-        StepImplementer.__print_section_title("TSSC Step Results - {}".format(self.step_name()))
-        StepImplementer.__print_data('Results File Path', self.results_file_path)
-        StepImplementer.__print_data('Step Results', results)
-        StepImplementer.__print_section_title("TSSC Step End - {}".format(self.step_name()))
+        with self.trace_span(
+                'run-step',
+                step=self.step_name(),
+                implementer=self.__class__.__name__,
+                yaml=YAML_IMPLEMENTATION) as run_step_span:
+            with self.trace_span('print-step-config'):
+                StepImplementer.__print_section_title(
+                    "TSSC Step Start - {}".format(self.step_name()))
+
+                # print information about the static step configuration
+                StepImplementer.__print_data(
+                    "Step Implementer Configuration Defaults",
+                    self.step_implementer_config_defaults())
+                StepImplementer.__print_data(
+                    "Global Configuration Defaults",
+                    self.global_config_defaults)
+                StepImplementer.__print_data(
+                    "Global Environment Configuration Defaults",
+                    self.global_environment_config_defaults)
+                StepImplementer.__print_data(
+                    "Step Configuration",
+                    self.step_config)
+                StepImplementer.__print_data(
+                    "Step Environment Configuration",
+                    self.step_environment_config)
+                StepImplementer.__print_data(
+                    "Step Configuration Runtime Overrides",
+                    step_config_runtime_overrides)
+
+            # create the munged runtime step configuration and print
+            with self.trace_span('create-runtime-step-config'):
+                runtime_step_config = self.__create_runtime_step_config(
+                    step_config_runtime_overrides)
+            with self.trace_span('print-runtime-step-config'):
+                StepImplementer.__print_data(
+                    "Runtime Step Configuration",
+                    runtime_step_config)
+
+            # validate the runtime step configuration, run the step, and save the results
+            with self.trace_span('validate-runtime-step-config'):
+                self._validate_runtime_step_config(runtime_step_config)
+            results = self.__run_step_with_cache(runtime_step_config)
+            self.write_results(results)
+
+            # print the step run results
+            with self.trace_span('print-step-results'):
+                StepImplementer.__print_section_title(
+                    "TSSC Step Results - {}".format(self.step_name()))
+                StepImplementer.__print_data('Results File Path', self.results_file_path)
+                StepImplementer.__print_data('Step Results', results)
+                StepImplementer.__print_section_title(
+                    "TSSC Step End - {}".format(self.step_name()))
+
+        if run_step_span is not None:
+            self.__results_store.write_step_results(
+                TRACE_SUMMARY_STEP_NAME,
+                {
+                    self.step_name() + '.' + self.__class__.__name__:
+                        self.__tracer.summarize(run_step_span)
+                })
+
+    def trace_span(self, name, category=TSSC_CATEGORY, **args):
+        """
+        Times the work done in the context if this step is being traced.
+
+        Step implementers should trace each subprocess they run with the
+        `tssc.trace.SUBPROCESS_CATEGORY` category, for example:
+
+            with self.trace_span('mvn clean install', SUBPROCESS_CATEGORY):
+                sh.mvn('clean', 'install', '-f', pom_file)
+
+        Parameters
+        ----------
+        name : str
+            Name of the work.
+        category : str, optional
+            Category of the work, 'tssc' for work done by tssc itself or 'subprocess' for work
+            done by a subprocess.
+        args
+            Additional information about the work.
+
+        Returns
+        -------
+        context manager
+            Context manager yielding the `tssc.trace.Span` timing the work,
+            or None if this step is not being traced.
+        """
+        if self.__tracer is None:
+            return untraced_span()
+
+        return self.__tracer.span(name, category, **args)
+
+    def __run_step_with_cache(self, runtime_step_config):
+        """
+        Runs the step unless the step cache has results from a previous run of the step with the
+        same inputs, in which case those results are used.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+
+        Returns
+        -------
+        dict
+            Results of running this step.
+        """
+        cache_input_paths = None
+        if self.__step_cache is not None:
+            # step implementers that opt into the step cache override the base None
+            cache_input_paths = self._cache_input_paths( # pylint: disable=assignment-from-none
+                runtime_step_config)
+
+        if cache_input_paths is None:
+            with self.trace_span('run-step-implementation'):
+                return self._run_step(runtime_step_config)
+
+        # the TSSC run's own output is never an input to a step
+        cache_exclude_paths = self._cache_exclude_paths(runtime_step_config) + [
+            self.results_store.results_dir_path,
+            self.__work_dir_path,
+            self.__step_cache.cache_dir_path
+        ]
+        with self.trace_span('get-cached-step-results'):
+            cache_key = self.__step_cache.create_step_key(
+                self.step_name(),
+                self.__class__.__name__,
+                runtime_step_config,
+                self.get_step_results,
+                cache_input_paths,
+                cache_exclude_paths)
+
+            results = self.__step_cache.get(cache_key)
+            if results is not None and self._cached_results_valid(results):
+                StepImplementer.__print_data('Step Results Replayed From Cache', cache_key)
+                return results
+
+        with self.trace_span('run-step-implementation'):
+            results = self._run_step(runtime_step_config)
+        if results is not None:
+            with self.trace_span('put-cached-step-results'):
+                self.__step_cache.put(cache_key, results)
+
+        return results
 
     def write_results(self, results):
         """
@@ -338,43 +538,12 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
             Existing results file has invalid yaml or existing results file does not have expected
             element.
         """
-        #If you are looking at this code you are going to need this:
-        # https://treyhunner.com/2018/10/asterisks-in-python-what-they-are-and-how-to-use-them/
         if results is not None:
-            current_results = self.current_results()
-            if current_results:
-                if current_results[StepImplementer.__TSSC_RESULTS_KEY].get(self.step_name()):
-                    updated_step_results = {
-                        StepImplementer.__TSSC_RESULTS_KEY: {
-                            **current_results[StepImplementer.__TSSC_RESULTS_KEY],
-                            self.step_name(): {
-                                **current_results \
-                                  [StepImplementer.__TSSC_RESULTS_KEY] \
-                                  [self.step_name()], \
-                                  **results
-                            }
-                        }
-                    }
-                else:
-                    updated_step_results = {
-                        StepImplementer.__TSSC_RESULTS_KEY: {
-                            **current_results[StepImplementer.__TSSC_RESULTS_KEY],
-                            self.step_name(): {
-                                **results
-                            }
-                        }
-                    }
-            else:
-                updated_step_results = {
-                    StepImplementer.__TSSC_RESULTS_KEY: {
-                        self.step_name(): {
-                            **results
-                        }
-                    }
-                }
-            step_results_file_path = self.results_file_path
-            with open(step_results_file_path, 'w') as step_results_file:
-                yaml.dump(updated_step_results, step_results_file)
+            with self.trace_span('write-results'):
+                self.__results_store.write_step_results(
+                    self.step_name(),
+                    results,
+                    self.__class__.__name__)
 
     def current_results(self):
         """
@@ -393,33 +562,9 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
             Existing results file has invalid yaml or existing results file does not have expected
             element.
         """
-        if not os.path.exists(self.__results_dir_path):
-            os.makedirs(self.__results_dir_path)
-
-        step_results_file_path = self.results_file_path
-
-        current_results = None
-        if os.path.exists(step_results_file_path):
-            with open(step_results_file_path, 'r') as step_results_file:
-                try:
-                    current_results = yaml.safe_load(step_results_file.read())
-                except (yaml.scanner.ScannerError, yaml.parser.ParserError, ValueError) as err:
-                    raise TSSCException(
-                        'Existing results file'
-                        +' (' + step_results_file_path + ')'
-                        +' has invalid yaml: ' + str(err)
-                    )
-
-            if current_results:
-                if StepImplementer.__TSSC_RESULTS_KEY not in current_results:
-                    raise TSSCException(
-                        'Existing results file'
-                        +' (' + step_results_file_path + ')'
-                        +' does not have expected top level element'
-                        +' (' + StepImplementer.__TSSC_RESULTS_KEY + '): '
-                        + str(current_results)
-                    )
-        else:
+        with self.trace_span('read-results'):
+            current_results = self.__results_store.current_results()
+        if current_results is None:
             current_results = {
                 StepImplementer.__TSSC_RESULTS_KEY: {
                     self.step_name(): {}
@@ -441,8 +586,15 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
         -------
         dict
             The results of a specific step. None if results DNE
+
+        Raises
+        ------
+        TSSCException
+            Existing results file has invalid yaml or existing results file does not have expected
+            element.
         """
-        return self.current_results()[StepImplementer.__TSSC_RESULTS_KEY].get(step_name)
+        with self.trace_span('read-results'):
+            return self.__results_store.get_step_results(step_name)
 
     def current_step_results(self):
         """
@@ -451,7 +603,8 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
         Returns
         -------
         dict
-            The results of this step so far from other step implementers that have already been run
+            The results of this step so far from other step implementers that have already been run,
+            None if there are none yet.
 
         Raises
         ------
@@ -460,7 +613,6 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
             element.
         """
         return self.get_step_results(self.step_name())
-        #return self.current_results()[StepImplementer.__TSSC_RESULTS_KEY][self.step_name()]
 
     def write_temp_file(self, filename, contents):
         """
@@ -471,13 +623,9 @@ class StepImplementer(ABC): # pylint: disable=too-many-instance-attributes
         str
             return a string to the absolute file path
         """
-        if not os.path.exists(self.__work_dir_path):
-            os.makedirs(self.__work_dir_path)
         step_path = os.path.join(self.__work_dir_path, self.step_name())
-        if not os.path.exists(step_path):
-            os.makedirs(step_path)
+        os.makedirs(step_path, exist_ok=True)
 
-        #file_path = os.path.join(self.__work_dir_path, self.step_name(), filename)
         file_path = os.path.join(step_path, filename)
         with open(file_path, 'wb') as file:
             file.write(contents)
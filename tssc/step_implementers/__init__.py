@@ -1,22 +1,55 @@
 """
 com.redhat.tssc.step_implementers
+
+Notes
+-----
+Importing this package only registers the step implementers with the TSSCFactory by name,
+the module implementing a step implementer is only imported when its step is run.
+When adding a step implementer it must be added to `STEP_IMPLEMENTERS`.
 """
 
-from .utils import *
+from tssc import TSSCFactory
+from tssc import DefaultSteps
+
+# (step name, implementer class name, module relative to this package, is default implementer)
+STEP_IMPLEMENTERS = [
+    (DefaultSteps.GENERATE_METADATA, 'Maven', 'generate_metadata.maven', False),
+    (DefaultSteps.GENERATE_METADATA, 'Git', 'generate_metadata.git', False),
+    (DefaultSteps.GENERATE_METADATA, 'Npm', 'generate_metadata.npm', False),
+    (DefaultSteps.GENERATE_METADATA, 'SemanticVersion', 'generate_metadata.semantic_version',
+     False),
+    (DefaultSteps.TAG_SOURCE, 'Git', 'tag_source.git', True),
+    (DefaultSteps.SECURITY_STATIC_CODE_ANALYSIS, 'SonarQube',
+     'security_static_code_analysis.sonarqube', False),
+    (DefaultSteps.LINTING_STATIC_CODE_ANALYSIS, 'SonarQube',
+     'linting_static_code_analysis.sonarqube', False),
+    (DefaultSteps.PACKAGE, 'Maven', 'package.maven', False),
+    (DefaultSteps.PACKAGE, 'NPM', 'package.npm', False),
+    (DefaultSteps.UNIT_TEST, 'JUnit', 'unit_test.junit', False),
+    (DefaultSteps.PUSH_ARTIFACTS, 'Maven', 'push_artifacts.maven', False),
+    (DefaultSteps.PUSH_ARTIFACTS, 'NPM', 'push_artifacts.npm', False),
+    (DefaultSteps.CREATE_CONTAINER_IMAGE, 'Buildah', 'create_container_image.buildah', True),
+    (DefaultSteps.PUSH_CONTAINER_IMAGE, 'Skopeo', 'push_container_image.skopeo', True),
+    (DefaultSteps.CONTAINER_IMAGE_STATIC_COMPLIANCE_SCAN, 'OpenSCAP',
+     'container_image_static_compliance_scan.openscap', False),
+    (DefaultSteps.CONTAINER_IMAGE_STATIC_VULNERABILITY_SCAN, 'OpenSCAP',
+     'container_image_static_vulnerability_scan.openscap', False),
+    (DefaultSteps.UAT, 'Cucumber', 'uat.cucumber', False),
+    (DefaultSteps.CANARY_TEST, 'Selenium', 'canary_test.selenium', False)
+]
+
+def _register_step_implementers():
+    """
+    Registers the `STEP_IMPLEMENTERS` with the TSSCFactory without importing their modules.
+    """
+    for step_name, implementer_name, module_name, is_default in STEP_IMPLEMENTERS:
+        TSSCFactory.register_lazy_step_implementer(
+            step_name,
+            implementer_name,
+            __name__ + '.' + module_name,
+            is_default)
 
-from .generate_metadata import *
-from .tag_source import *
-from .security_static_code_analysis import *
-from .linting_static_code_analysis import *
-from .package import *
-from .unit_test import *
-from .create_container_image import *
-from .push_artifacts import *
-from .push_container_image import *
-from .container_image_static_compliance_scan import *
-from .container_image_static_vulnerability_scan import *
-from .uat import *
-from .canary_test import *
+_register_step_implementers()
 
 __all__ = [
     'utils',
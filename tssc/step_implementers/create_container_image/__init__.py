@@ -19,7 +19,9 @@ minimally produce the following step results.
 | Result Key       | Description
 |------------------|------------
 | `image-tag`      | The image ID to tag the built image with when pushing it to a local file
-| `image-tar-file` | Path to the built container image as a tar file
+| `image-tar-file` | Path to the built container image as a tar file, or
+| `image-ref`      | Transport reference to the built container image, such as
+                     `containers-storage:` or `oci:`, along with its `image-digest`
 
 """
 
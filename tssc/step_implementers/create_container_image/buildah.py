@@ -7,12 +7,25 @@ Step configuration expected as input to this step.
 Could come from either configuration file or
 from runtime configuration.
 
-| Configuration Key | Required? | Default        | Description
-|-------------------|-----------|----------------|-----------
-| `imagespecfile`   | True      | `'Dockerfile'` | File defining the container image
-| `context`         | True      | `'.'`          | Context to build the container image in
-| `tlsverify`       | True      | `'true'`       | Whether to verify TLS when pulling parent images
-| `format`          | True      | `'oci'`        | format of the built image's manifest and metadata
+| Configuration Key | Required? | Default            | Description
+|-------------------|-----------|--------------------|-----------
+| `imagespecfile`   | True      | `'Dockerfile'`     | File defining the container image
+| `context`         | True      | `'.'`              | Context to build the container image in
+| `tlsverify`       | True      | `'true'`           | Whether to verify TLS when pulling parent
+                                                     images
+| `format`          | True      | `'oci'`            | format of the built image's manifest and
+                                                     metadata
+| `image-export`    | False     | `'docker-archive'` | How to hand the built image off to the
+                                                     push-container-image step, one of
+                                                     `'docker-archive'`, `'containers-storage'`,
+                                                     or `'oci'`, see Notes
+| `oci-layout-dir`  | False     | `'oci-layout'`     | OCI image layout directory to export the
+                                                     built image to when `image-export` is
+                                                     `'oci'`
+| `reuse-image`     | False     | `True`             | Whether to reuse the image built by a
+                                                     previous run of this step from the same
+                                                     build context rather then building it
+                                                     again, see Notes
 
 Expected Previous Step Results
 ------------------------------
@@ -31,7 +44,12 @@ Results output by this step.
 | Result Key       | Description
 |------------------|------------
 | `image-tag`      | The image ID to tag the built image with when pushing it to a local file
-| `image-tar-file` | Path to the built container image as a tar file
+| `image-tar-file` | Path to the built container image as a tar file, only when `image-export` is
+                     `'docker-archive'`
+| `image-ref`      | Transport reference, as understood by skopeo, to the built image, only when
+                     `image-export` is `'containers-storage'` or `'oci'`
+| `image-digest`   | Digest of the manifest of the built image, only when `image-export` is
+                     `'containers-storage'` or `'oci'`
 
 
 ** Example **
@@ -45,13 +63,40 @@ Results output by this step.
         }
     }
 
+Notes
+-----
+By default the built image is exported to a `docker-archive:` tar file, which writes the whole
+image to disk for the push-container-image step to read back. Instead the image can be handed
+off without copying it:
+
+* `containers-storage` leaves the image in the local container storage it was built in, so the
+  push-container-image step must run on the same host as the same user.
+* `oci` exports the image to an OCI image layout directory, whose content addressed blobs are
+  shared by every image exported to it, so only the layers that changed since a previous build
+  are written.
+
+In both cases the results carry the `image-ref` to push the image from and its `image-digest`
+rather than an `image-tar-file`.
+
+Unless `reuse-image` is `False` the build context is fingerprinted before building the image,
+hashing the content of every file in it that is not ignored by its `.dockerignore` file, along
+with the image specification file and `format`. The ID of each built image is recorded in the
+working directory of this step with the fingerprint of the build context it was built from, and
+if the build context is unchanged since an image that is still in local container storage was
+built from it, that image is tagged and exported rather than sending the whole build context to
+`buildah bud` again. Changes to the parent images are not part of the fingerprint, same as for
+the cached layers `buildah bud --layers` uses.
 """
+import hashlib
+import json
 import os
 import sys
 import sh
 from tssc import TSSCFactory
 from tssc import StepImplementer
 from tssc import DefaultSteps
+from tssc.step_implementers.utils.build_context import hash_build_context
+from tssc.trace import SUBPROCESS_CATEGORY
 
 DEFAULT_CONFIG = {
     # Image specification file name
@@ -67,6 +112,14 @@ DEFAULT_CONFIG = {
     'format': 'oci'
 }
 
+IMAGE_EXPORTS = ['docker-archive', 'containers-storage', 'oci']
+DEFAULT_IMAGE_EXPORT = 'docker-archive'
+DEFAULT_OCI_LAYOUT_DIR = 'oci-layout'
+OCI_REF_NAME_ANNOTATION = 'org.opencontainers.image.ref.name'
+DEFAULT_REUSE_IMAGE = True
+IMAGE_IDS_FILE_NAME = 'build-context-image-ids.json'
+MAX_RECORDED_IMAGE_IDS = 16
+
 REQUIRED_CONFIG_KEYS = [
     'imagespecfile',
     'context',
@@ -133,6 +186,104 @@ class Buildah(StepImplementer):
         """
         return REQUIRED_CONFIG_KEYS
 
+    def _validate_runtime_step_config(self, runtime_step_config):
+        """
+        Validates the given `runtime_step_config` against the required step configuration keys.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+
+        Raises
+        ------
+        AssertionError
+            If the given `runtime_step_config` is not valid with a message as to why.
+        """
+        super()._validate_runtime_step_config(runtime_step_config) #pylint: disable=protected-access
+
+        assert runtime_step_config.get('image-export', DEFAULT_IMAGE_EXPORT) in IMAGE_EXPORTS, \
+            'Unknown image export ({image_export}), expected one of: {image_exports}'.format(
+                image_export=runtime_step_config.get('image-export'),
+                image_exports=IMAGE_EXPORTS)
+
+    def _cache_input_paths(self, runtime_step_config):
+        """
+        Getter for the paths to the files and directories the results of this step depend on.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+
+        Returns
+        -------
+        list
+            The context the container image is built in, which contains the image
+            specification file.
+        """
+        return [runtime_step_config['context']]
+
+    def _cache_exclude_paths(self, runtime_step_config):
+        """
+        Getter for the paths in the `_cache_input_paths` directories that the results of this
+        step do not depend on.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+
+        Returns
+        -------
+        list
+            The container image tar file and the OCI image layout directory written by
+            this step.
+        """
+        generate_metadata_results = self.get_step_results(DefaultSteps.GENERATE_METADATA) or {}
+        image_tag_version = generate_metadata_results.get('image-tag') or 'latest'
+
+        return [
+            Buildah.__image_tar_file(runtime_step_config, image_tag_version),
+            runtime_step_config.get('oci-layout-dir', DEFAULT_OCI_LAYOUT_DIR)
+        ]
+
+    def _cached_results_valid(self, results):
+        """
+        Checks that the container image exported by a previous run of this step still exists.
+
+        Parameters
+        ----------
+        results : dict
+            Results of a previous run of this step with the same inputs.
+
+        Returns
+        -------
+        bool
+            True if the container image tar file, OCI image layout reference, or local container
+            storage image in the given results exists, False otherwise.
+        """
+        image_ref = results.get('image-ref')
+        if image_ref is None:
+            return os.path.exists(results.get('image-tar-file', ''))
+
+        if image_ref.startswith('oci:'):
+            oci_layout_dir, oci_ref_name = image_ref[len('oci:'):].rsplit(':', 1)
+            return Buildah.__oci_layout_has_ref(oci_layout_dir, oci_ref_name)
+
+        try:
+            sh.buildah.inspect( # pylint: disable=no-member
+                '--type', 'image',
+                results['image-tag'],
+                _out=None
+            )
+        except sh.ErrorReturnCode:  # pylint: disable=undefined-variable
+            return False
+        return True
+
     def _run_step(self, runtime_step_config):
         """
         Runs the TSSC step implemented by this StepImplementer.
@@ -174,24 +325,115 @@ class Buildah(StepImplementer):
             version=image_tag_version
         )
 
-        try:
-            sh.buildah.bud(  # pylint: disable=no-member
-                '--format=' + runtime_step_config['format'],
-                '--tls-verify=' + runtime_step_config['tlsverify'],
-                '--layers', '-f', image_spec_file,
-                '-t', tag,
-                context,
-                _out=sys.stdout
+        self.__build_image(runtime_step_config, tag, image_spec_file_location, image_tag_version)
+
+        return self.__export_image(runtime_step_config, tag, image_tag_version)
+
+    def __build_image(self, runtime_step_config, tag, image_spec_file_location, image_tag_version):
+        """
+        Builds the container image, or tags the image built from the same build context by a
+        previous run if there is one and `reuse-image` is `'true'`.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+        tag : str
+            Tag to give the container image.
+        image_spec_file_location : str
+            Path to the file defining the container image.
+        image_tag_version : str
+            Version the container image is tagged with.
+        """
+        build_context_fingerprint = None
+        image_id = None
+        # NOTE: values given with --step-config are always strings
+        if str(runtime_step_config.get('reuse-image', DEFAULT_REUSE_IMAGE)).lower() == 'true':
+            with self.trace_span('hash-build-context'):
+                build_context_fingerprint = self.__build_context_fingerprint(
+                    runtime_step_config, image_spec_file_location, image_tag_version)
+            image_id = self.__reusable_image_id(build_context_fingerprint)
+
+        if image_id is not None:
+            print('Build context unchanged since image ' + image_id + ' was built, tagging it')
+            try:
+                with self.trace_span('buildah tag', SUBPROCESS_CATEGORY):
+                    sh.buildah.tag( # pylint: disable=no-member
+                        image_id,
+                        tag,
+                        _out=sys.stdout
+                    )
+            except sh.ErrorReturnCode:  # pylint: disable=undefined-variable
+                raise RuntimeError('Issue invoking buildah tag of image ' + image_id)
+        else:
+            image_spec_file = runtime_step_config['imagespecfile']
+            image_id_file = self.write_temp_file('image-id', b'')
+            try:
+                with self.trace_span('buildah bud', SUBPROCESS_CATEGORY):
+                    sh.buildah.bud(  # pylint: disable=no-member
+                        '--format=' + runtime_step_config['format'],
+                        '--tls-verify=' + runtime_step_config['tlsverify'],
+                        '--layers',
+                        '--iidfile', image_id_file,
+                        '-f', image_spec_file,
+                        '-t', tag,
+                        runtime_step_config['context'],
+                        _out=sys.stdout
+                    )
+            except sh.ErrorReturnCode:  # pylint: disable=undefined-variable
+                raise RuntimeError('Issue invoking buildah bud with given image '
+                                   'specification file (' + image_spec_file + ')')
+
+            if build_context_fingerprint is not None:
+                with open(image_id_file, 'r') as image_id_file_content:
+                    image_id = image_id_file_content.read().strip()
+                if image_id:
+                    self.__record_image_id(build_context_fingerprint, image_id)
+
+    def __export_image(self, runtime_step_config, tag, image_tag_version):
+        """
+        Exports the built container image as configured by `image-export`.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+        tag : str
+            Tag of the built container image.
+        image_tag_version : str
+            Version the container image is tagged with.
+
+        Returns
+        -------
+        dict
+            Results of running this step, the image tag and the reference to the exported image.
+        """
+        image_export = runtime_step_config.get('image-export', DEFAULT_IMAGE_EXPORT)
+        if image_export == 'containers-storage':
+            return {
+                'image-tag' : tag,
+                'image-ref' : 'containers-storage:' + tag,
+                'image-digest' : self.__containers_storage_image_digest(tag)
+            }
+
+        if image_export == 'oci':
+            oci_layout_dir = os.path.abspath(
+                runtime_step_config.get('oci-layout-dir', DEFAULT_OCI_LAYOUT_DIR))
+            image_ref = "oci:{oci_layout_dir}:{application_name}-{service_name}-{version}".format(
+                oci_layout_dir=oci_layout_dir,
+                application_name=runtime_step_config['application-name'],
+                service_name=runtime_step_config['service-name'],
+                version=image_tag_version
             )
-        except sh.ErrorReturnCode:  # pylint: disable=undefined-variable
-            raise RuntimeError('Issue invoking buildah bud with given image '
-                               'specification file (' + image_spec_file + ')')
+            return {
+                'image-tag' : tag,
+                'image-ref' : image_ref,
+                'image-digest' : self.__buildah_push(tag, image_ref)
+            }
 
-        image_tar_file = "image-{application_name}-{service_name}-{version}.tar".format(
-            application_name=application_name,
-            service_name=service_name,
-            version=image_tag_version
-        )
+        image_tar_file = Buildah.__image_tar_file(runtime_step_config, image_tag_version)
 
         try:
             # Check to see if the tar docker-archive file already exists
@@ -199,11 +441,12 @@ class Buildah(StepImplementer):
             #   existing files.
             if os.path.exists(image_tar_file):
                 os.remove(image_tar_file)
-            sh.buildah.push( #pylint: disable=no-member
-                tag,
-                "docker-archive:" + image_tar_file,
-                _out=sys.stdout
-            )
+            with self.trace_span('buildah push', SUBPROCESS_CATEGORY):
+                sh.buildah.push( #pylint: disable=no-member
+                    tag,
+                    "docker-archive:" + image_tar_file,
+                    _out=sys.stdout
+                )
         except sh.ErrorReturnCode:  # pylint: disable=undefined-variable
             raise RuntimeError('Issue invoking buildah push to tar file ' + image_tar_file)
 
@@ -214,6 +457,223 @@ class Buildah(StepImplementer):
 
         return results
 
+    def __build_context_fingerprint(
+            self,
+            runtime_step_config,
+            image_spec_file_location,
+            image_tag_version):
+        """
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+        image_spec_file_location : str
+            Path to the file defining the container image.
+        image_tag_version : str
+            Version the container image is tagged with.
+
+        Returns
+        -------
+        str
+            Fingerprint of the build context, image specification file, and build
+            configuration, see `tssc.step_implementers.utils.build_context.hash_build_context`.
+        """
+        context_fingerprint = hash_build_context(
+            runtime_step_config['context'],
+            image_spec_file_location,
+            exclude_paths=[
+                Buildah.__image_tar_file(runtime_step_config, image_tag_version),
+                runtime_step_config.get('oci-layout-dir', DEFAULT_OCI_LAYOUT_DIR),
+                self.results_store.results_dir_path,
+                self.work_dir_path
+            ])
+
+        return hashlib.sha256(json.dumps({
+            'context': context_fingerprint,
+            'imagespecfile': runtime_step_config['imagespecfile'],
+            'format': runtime_step_config['format']
+        }, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def __reusable_image_id(self, build_context_fingerprint):
+        """
+        Parameters
+        ----------
+        build_context_fingerprint : str
+            Fingerprint of the build context of the image to build.
+
+        Returns
+        -------
+        str
+            ID of the image built from the build context with the given fingerprint by a previous
+            run of this step if it is still in local container storage, otherwise None.
+        """
+        image_id = self.__read_image_ids().get(build_context_fingerprint)
+        if image_id is None:
+            return None
+
+        try:
+            sh.buildah.inspect( # pylint: disable=no-member
+                '--type', 'image',
+                image_id,
+                _out=None
+            )
+        except sh.ErrorReturnCode:  # pylint: disable=undefined-variable
+            return None
+        return image_id
+
+    def __record_image_id(self, build_context_fingerprint, image_id):
+        """
+        Records the ID of the image built from the build context with the given fingerprint,
+        keeping only the most recent `MAX_RECORDED_IMAGE_IDS` images.
+
+        Parameters
+        ----------
+        build_context_fingerprint : str
+            Fingerprint of the build context the image was built from.
+        image_id : str
+            ID of the built image.
+        """
+        image_ids = self.__read_image_ids()
+        image_ids.pop(build_context_fingerprint, None)
+        image_ids[build_context_fingerprint] = image_id
+        image_ids = dict(list(image_ids.items())[-MAX_RECORDED_IMAGE_IDS:])
+
+        # write to a temporary file and rename so a concurrent run never reads a partial file
+        image_ids_temp_file = self.write_temp_file(
+            IMAGE_IDS_FILE_NAME + '.' + str(os.getpid()),
+            json.dumps(image_ids, indent=2).encode('utf-8'))
+        os.replace(image_ids_temp_file, self.__image_ids_file())
+
+    def __read_image_ids(self):
+        """
+        Returns
+        -------
+        dict
+            IDs of the images built by previous runs of this step by the fingerprint of the
+            build context they were built from, oldest first.
+        """
+        try:
+            with open(self.__image_ids_file(), 'r') as image_ids_file:
+                image_ids = json.load(image_ids_file)
+        except (OSError, ValueError):
+            return {}
+
+        return image_ids if isinstance(image_ids, dict) else {}
+
+    def __image_ids_file(self):
+        """
+        Returns
+        -------
+        str
+            Path to the file recording the IDs of the images built by previous runs of this step.
+        """
+        return os.path.join(self.work_dir_path, self.step_name(), IMAGE_IDS_FILE_NAME)
+
+    def __buildah_push(self, tag, image_ref):
+        """
+        Pushes the built image to the given transport reference.
+
+        Parameters
+        ----------
+        tag : str
+            Tag of the built image in local container storage.
+        image_ref : str
+            Transport reference to push the built image to.
+
+        Returns
+        -------
+        str
+            Digest of the manifest of the pushed image.
+        """
+        digest_file = self.write_temp_file('image-digest', b'')
+        try:
+            with self.trace_span('buildah push', SUBPROCESS_CATEGORY):
+                sh.buildah.push( #pylint: disable=no-member
+                    '--digestfile', digest_file,
+                    tag,
+                    image_ref,
+                    _out=sys.stdout
+                )
+        except sh.ErrorReturnCode:  # pylint: disable=undefined-variable
+            raise RuntimeError('Issue invoking buildah push to ' + image_ref)
+
+        with open(digest_file, 'r') as digest:
+            return digest.read().strip()
+
+    def __containers_storage_image_digest(self, tag):
+        """
+        Parameters
+        ----------
+        tag : str
+            Tag of the built image in local container storage.
+
+        Returns
+        -------
+        str
+            Digest of the manifest of the built image in local container storage.
+        """
+        try:
+            with self.trace_span('buildah inspect', SUBPROCESS_CATEGORY):
+                return str(sh.buildah.inspect( #pylint: disable=no-member
+                    '--type', 'image',
+                    '--format', '{{.FromImageDigest}}',
+                    tag,
+                    _encoding='UTF-8',
+                    _decode_errors='ignore'
+                )).strip()
+        except sh.ErrorReturnCode:  # pylint: disable=undefined-variable
+            raise RuntimeError('Issue invoking buildah inspect of built image ' + tag)
+
+    @staticmethod
+    def __oci_layout_has_ref(oci_layout_dir, oci_ref_name):
+        """
+        Parameters
+        ----------
+        oci_layout_dir : str
+            Path to an OCI image layout directory.
+        oci_ref_name : str
+            Reference name of an image in the OCI image layout.
+
+        Returns
+        -------
+        bool
+            True if the given OCI image layout has an image with the given reference name,
+            False otherwise.
+        """
+        try:
+            with open(os.path.join(oci_layout_dir, 'index.json'), 'r') as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return False
+
+        return any(
+            manifest.get('annotations', {}).get(OCI_REF_NAME_ANNOTATION) == oci_ref_name
+            for manifest in index.get('manifests', [])
+        )
+
+    @staticmethod
+    def __image_tar_file(runtime_step_config, image_tag_version):
+        """
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+        image_tag_version : str
+            Version the container image is tagged with.
+
+        Returns
+        -------
+        str
+            Path to the tar file to write the built container image to.
+        """
+        return "image-{application_name}-{service_name}-{version}.tar".format(
+            application_name=runtime_step_config['application-name'],
+            service_name=runtime_step_config['service-name'],
+            version=image_tag_version
+        )
+
 
 # register step implementer
 TSSCFactory.register_step_implementer(Buildah, True)
@@ -33,16 +33,22 @@ Results output by this step.
                     Uses the Git branch name.
 | `build`       | Value to use for `build` portion of semantic version (https://semver.org/). \
                     Uses a portion of the latest Git commit hash.
+
+Notes
+-----
+The branch and commit are read directly from the `.git` directory of the repository,
+see `tssc.step_implementers.utils.git.read_git_head`, falling back to gitpython for repository
+layouts that are not supported that way.
 """
 
 import re
-from git import Repo
-from git import InvalidGitRepositoryError
 
 from tssc import TSSCFactory
 from tssc import StepImplementer
 from tssc import DefaultSteps
 
+from tssc.step_implementers.utils.git import read_git_head
+
 DEFAULT_CONFIG = {
     'repo-root': './',
     'build-string-length': 7
@@ -52,7 +58,7 @@ REQUIRED_CONFIG_KEYS = [
     'repo-root'
 ]
 
-class Git(StepImplementer): # pylint: disable=too-few-public-methods 
+class Git(StepImplementer): # pylint: disable=too-few-public-methods
     """
     StepImplementer for the generate-metadata step for Git.
     """
@@ -119,30 +125,25 @@ class Git(StepImplementer): # pylint: disable=too-few-public-methods
         repo_root = runtime_step_config['repo-root']
         build_string_length = runtime_step_config['build-string-length']
 
-        try:
-            repo = Repo(repo_root)
-        except InvalidGitRepositoryError as err:
-            raise err
-
-        if repo.bare:
-            raise ValueError("Given directory ({0}) is a bare Git repository".format(repo_root))
+        with self.trace_span('read-git-head'):
+            git_head = read_git_head(repo_root)
+            if git_head is None:
+                git_head = Git.__read_git_head_with_gitpython(repo_root)
+        git_branch, git_commit_hash = git_head
 
-        if repo.head.is_detached:
+        if git_branch is None:
             raise ValueError(
                 "Expected a Git branch in given directory ({0}) but has a detached head."
                 .format(repo_root)
             )
 
-        git_branch = str(repo.head.reference)
-
-        try:
-            git_branch_last_commit_hash = str(repo.head.reference.commit)[:build_string_length]
-        except ValueError as err:
+        if git_commit_hash is None:
             raise ValueError(
                 "Given directory ({0}) is a Git branch ({1}) with no commit history".format(
                     repo_root, git_branch
                 )
             )
+        git_branch_last_commit_hash = git_commit_hash[:build_string_length]
 
         # make the git branch safe
         pre_release_regex = re.compile(r"/", re.IGNORECASE)
@@ -155,5 +156,48 @@ class Git(StepImplementer): # pylint: disable=too-few-public-methods
 
         return results
 
+    @staticmethod
+    def __read_git_head_with_gitpython(repo_root):
+        """
+        Reads the branch and commit checked out in the given Git repository with gitpython,
+        for repository layouts `tssc.step_implementers.utils.git.read_git_head` does not support.
+
+        Parameters
+        ----------
+        repo_root : str
+            Path to the root of the Git repository.
+
+        Raises
+        ------
+        git.InvalidGitRepositoryError
+            If the given directory is not a Git repository.
+        ValueError
+            If the given directory is a bare Git repository.
+
+        Returns
+        -------
+        tuple
+            (branch name, or None if the head is detached, commit hash, or None if the branch
+            has no commits) checked out in the given Git repository.
+        """
+        # NOTE: gitpython is slow to import, so only import it when it is needed
+        from git import Repo # pylint: disable=import-outside-toplevel
+
+        repo = Repo(repo_root)
+
+        if repo.bare:
+            raise ValueError("Given directory ({0}) is a bare Git repository".format(repo_root))
+
+        if repo.head.is_detached:
+            return None, str(repo.head.commit)
+
+        git_branch = str(repo.head.reference)
+        try:
+            git_commit_hash = str(repo.head.reference.commit)
+        except ValueError:
+            git_commit_hash = None
+
+        return git_branch, git_commit_hash
+
 # register step implementer
 TSSCFactory.register_step_implementer(Git)
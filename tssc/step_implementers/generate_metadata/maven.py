@@ -26,7 +26,8 @@ Results output by this step.
 | Result Key    | Description
 |---------------|------------
 | `app-version` | Value to use for `version` portion of semantic version (https://semver.org/). \
-                    Uses the version read out of the given pom file.
+                    Uses the version read out of the given pom file, or its parent pom, \
+                    with any `${property}` references, such as `${revision}`, resolved.
 """
 
 import os.path
@@ -35,7 +36,7 @@ from tssc import TSSCFactory
 from tssc import StepImplementer
 from tssc import DefaultSteps
 
-from tssc.step_implementers.utils.xml import get_xml_element
+from tssc.step_implementers.utils.maven import get_maven_pom
 
 DEFAULT_CONFIG = {
     'pom-file': 'pom.xml'
@@ -45,7 +46,7 @@ REQUIRED_CONFIG_KEYS = [
     'pom-file'
 ]
 
-class Maven(StepImplementer): # pylint: disable=too-few-public-methods 
+class Maven(StepImplementer): # pylint: disable=too-few-public-methods
     """
     StepImplementer for the generate-metadata step for Maven.
     """
@@ -115,8 +116,11 @@ class Maven(StepImplementer): # pylint: disable=too-few-public-methods
         if not os.path.exists(pom_file):
             raise ValueError('Given pom file does not exist: ' + pom_file)
 
-        pom_version_element = get_xml_element(pom_file, 'version')
-        pom_version = pom_version_element.text
+        pom_version = get_maven_pom(pom_file).version
+        if pom_version is None:
+            raise ValueError(
+                'Given pom file (' + pom_file + ') does not have ./version or ./parent/version' +
+                ' element')
 
         results = {
             'app-version': pom_version
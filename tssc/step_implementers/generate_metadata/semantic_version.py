@@ -195,7 +195,7 @@ class SemanticVersion(StepImplementer): # pylint: disable=too-few-public-methods
         build = None
         release_branch = runtime_step_config['release-branch']
 
-        current_step_results = self.current_step_results()
+        current_step_results = self.current_step_results() or {}
         if 'app-version' in runtime_step_config:
             app_version = runtime_step_config['app-version']
         elif 'app-version' in current_step_results:
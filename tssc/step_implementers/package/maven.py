@@ -3,15 +3,24 @@
 Notes
 -----
 
-.. WARNING::
+.. Important::
 
-    This can currently only handle POMs that generate a single artifact.
-    See https://projects.engineering.redhat.com/browse/NAPSSPO-546 for RFE
-    to handle multiple artifacts.
+    If package not specified in pom will default to jar in result.
 
 .. Important::
 
-    If package not specified in pom will default to jar in result.
+    Multi-module (reactor) builds are supported. The module tree of the given pom is parsed
+    once, and every file ending in one of the `artifact-extensions` in the
+    `artifact-parent-dir` of each module not packaged as `pom` results in an entry in
+    `artifacts`. The artifact parent directories of all of the modules are scanned in parallel.
+
+.. Important::
+
+    Artifacts named `{artifactId}-{version}-{classifier}.{extension}`, such as the
+    `-sources.jar`, `-javadoc.jar`, and `-tests.jar` of a module, are entries in `artifacts`
+    with a `classifier`, so they are pushed beside the main artifact of the module rather then
+    over it. The `original-` copies the maven-shade-plugin leaves behind are not artifacts.
+    A module building more then one artifact with the same classifier and extension is an error.
 
 Step Configuration
 ------------------
@@ -26,9 +35,29 @@ from runtime configuration.
 | `artifact-extensions` | True      | `["jar", "war", "ear"]` | Extensions to look for in the
                                                                 `artifact-parent-dir` for built
                                                                 artifacts.
-| `artifact-parent-dir` | True      | `'target'`              | Parent directory to look for built
+| `artifact-parent-dir` | True      | `'target'`              | Parent directory, relative to each
+                                                                module, to look for built
                                                                 artifacts in ending in
                                                                 `artifact-extensions`.
+| `goals`               | False     | `['install']`           | Maven goals (or phases) to run.
+                                                                `['package']` builds the artifacts
+                                                                without installing them into the
+                                                                local repository.
+| `clean`               | False     | `True`                  | Whether to run the `clean` goal
+                                                                before the `goals`. Set to `False`
+                                                                for incremental builds that reuse
+                                                                previously compiled classes.
+| `threads`             | False     |                         | Number of threads to build modules
+                                                                in parallel with, passed to
+                                                                `mvn -T`, for instance `4` or `1C`
+                                                                for one thread per CPU core.
+| `offline`             | False     | `False`                 | Whether to build offline, `mvn -o`,
+                                                                using only the dependencies already
+                                                                in the local repository.
+| `local-repository`    | False     |                         | Path to the Maven local repository
+                                                                to use, `-Dmaven.repo.local`,
+                                                                so that a cached local repository
+                                                                can be shared between runs.
 
 Expected Previous Step Results
 ------------------------------
@@ -42,9 +71,10 @@ Results
 
 Results output by this step.
 
-| Result Key  | Description
-|-------------|------------
-| `artifacts` | An array of dictionaries with information on the built artifacts.
+| Result Key   | Description
+|--------------|------------
+| `artifacts`  | An array of dictionaries with information on the built artifacts.
+| `build-mode` | Dictionary of how mvn was run.
 
 
 **artifacts**
@@ -56,7 +86,19 @@ Keys in the dictionary elements in the `artifacts` array in the step results.
 | `artifact-id`   | Maven artifact ID.
 | `group-id`      | Maven group ID.
 | `package-type`  | Package type.
-| `pom-path`      | Absolute path to the pom that built the artifact.
+| `pom-path`      | Path to the pom of the module that built the artifact.
+| `classifier`    | Maven classifier, such as `sources`, only for artifacts with a classifier.
+
+**build-mode**
+Keys in the `build-mode` dictionary in the step results.
+
+| `build-mode` Key   | Description
+|--------------------|------------
+| `goals`            | Maven goals that were run, including `clean` if it was run.
+| `threads`          | Number of threads modules were built with, or None if not parallel.
+| `offline`          | Whether the build was offline.
+| `local-repository` | Absolute path to the Maven local repository used, or None for the
+                       default local repository.
 
 Examples
 --------
@@ -120,6 +162,7 @@ Examples
         ]
     }}
 """
+import concurrent.futures
 import sys
 import os
 import sh
@@ -127,8 +170,9 @@ import sh
 from tssc import TSSCFactory
 from tssc import StepImplementer
 from tssc import DefaultSteps
+from tssc.trace import SUBPROCESS_CATEGORY
 
-from tssc.step_implementers.utils.xml import get_xml_element
+from tssc.step_implementers.utils.maven import get_maven_modules
 
 DEFAULT_CONFIG = {
     'pom-file': 'pom.xml',
@@ -140,11 +184,17 @@ REQUIRED_CONFIG_KEYS = [
     'pom-file'
 ]
 
+DEFAULT_GOALS = ['install']
+
+# maximum number of module artifact parent directories to scan at the same time
+MAX_ARTIFACT_SCAN_WORKERS = 16
+
+# prefix the maven-shade-plugin gives the unshaded artifact it replaced with the shaded one
+SHADE_ORIGINAL_ARTIFACT_PREFIX = 'original-'
+
 class Maven(StepImplementer):
     """
-    StepImplementer for the package step for Maven. It is assumed thought that there will
-    only be a single jar, ear, or war output for running mvn clean install against the given
-    pom.xml file.
+    StepImplementer for the package step for Maven.
     """
 
     @staticmethod
@@ -191,6 +241,71 @@ class Maven(StepImplementer):
         """
         return REQUIRED_CONFIG_KEYS
 
+    def _cache_input_paths(self, runtime_step_config):
+        """
+        Getter for the paths to the files and directories the results of this step depend on.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+
+        Returns
+        -------
+        list
+            The directory of the given pom file.
+        """
+        return [os.path.dirname(os.path.abspath(runtime_step_config['pom-file']))]
+
+    def _cache_exclude_paths(self, runtime_step_config):
+        """
+        Getter for the paths in the `_cache_input_paths` directories that the results of this
+        step do not depend on.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+
+        Returns
+        -------
+        list
+            The artifact parent directory of each module the build writes to,
+            and the Maven local repository if it is configured.
+        """
+        pom_file = runtime_step_config['pom-file']
+        artifact_parent_dir = runtime_step_config['artifact-parent-dir']
+
+        exclude_paths = []
+        if runtime_step_config.get('local-repository'):
+            exclude_paths.append(os.path.abspath(runtime_step_config['local-repository']))
+
+        if not os.path.exists(pom_file):
+            return exclude_paths
+
+        return exclude_paths + [
+            Maven.__module_artifact_parent_dir(module, artifact_parent_dir)
+            for module in get_maven_modules(pom_file)
+        ]
+
+    def _cached_results_valid(self, results):
+        """
+        Checks that the artifacts of a previous run of this step still exist.
+
+        Parameters
+        ----------
+        results : dict
+            Results of a previous run of this step with the same inputs.
+
+        Returns
+        -------
+        bool
+            True if all of the artifacts in the given results exist, False otherwise.
+        """
+        return all(os.path.exists(artifact['path']) for artifact in results.get('artifacts', []))
+
     def _run_step(self, runtime_step_config):
         """
         Runs the TSSC step implemented by this StepImplementer.
@@ -213,60 +328,209 @@ class Maven(StepImplementer):
         if not os.path.exists(pom_file):
             raise ValueError('Given pom file does not exist: ' + pom_file)
 
+        build_mode = Maven.__build_mode(runtime_step_config)
+        mvn_args = list(build_mode['goals'])
+        if build_mode['threads'] is not None:
+            mvn_args += ['-T', build_mode['threads']]
+        if build_mode['offline']:
+            mvn_args.append('-o')
+        if build_mode['local-repository'] is not None:
+            mvn_args.append('-Dmaven.repo.local=' + build_mode['local-repository'])
+
         try:
-            sh.mvn(  # pylint: disable=no-member,
-                'clean',
-                'install',
-                '-f', pom_file,
-                _out=sys.stdout
-            )
+            with self.trace_span('mvn ' + ' '.join(build_mode['goals']), SUBPROCESS_CATEGORY):
+                sh.mvn(  # pylint: disable=no-member,
+                    *mvn_args,
+                    '-f', pom_file,
+                    _out=sys.stdout
+                )
         except sh.ErrorReturnCode as error:
             raise RuntimeError("Error invoking mvn: {error}".format(error=error))
 
-        # find the artifacts
-        artifact_file_names = []
-        artifact_parent_dir_full_path = \
-            os.listdir(os.path.join(
-                os.path.dirname(os.path.abspath(pom_file)),
-                artifact_parent_dir))
-        for filename in artifact_parent_dir_full_path:
-            if any(filename.endswith(ext) for ext in artifact_extensions):
-                artifact_file_names.append(filename)
-
-        # error if we find more then one artifact
-        # see https://projects.engineering.redhat.com/browse/NAPSSPO-546
-        if len(artifact_file_names) > 1:
-            raise ValueError(
-                'pom resulted in multiple artifacts with expected artifact extensions ' +
-                '({artifact_extensions}), this is unsupported'.format(
-                    artifact_extensions=artifact_extensions))
+        # find the artifacts of each module
+        modules = [
+            module for module in get_maven_modules(pom_file)
+            if module['package-type'] != 'pom'
+        ]
+        with self.trace_span('find-artifacts', modules=len(modules)):
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max(1, min(len(modules), MAX_ARTIFACT_SCAN_WORKERS))) as executor:
+                module_artifact_paths = list(executor.map(
+                    lambda module: Maven.__find_module_artifacts(
+                        Maven.__module_artifact_parent_dir(module, artifact_parent_dir),
+                        artifact_extensions),
+                    modules))
 
-        if len(artifact_file_names) < 1:
+        results = {
+            'artifacts': [],
+            'build-mode': build_mode
+        }
+        for module, artifact_paths in zip(modules, module_artifact_paths):
+            results['artifacts'] += Maven.__module_artifacts(module, artifact_paths)
+
+        if not results['artifacts']:
             raise ValueError(
                 'pom resulted in 0 with expected artifact extensions ' +
                 '({artifact_extensions}), this is unsupported'.format(
                     artifact_extensions=artifact_extensions))
 
-        artifact_id = get_xml_element(pom_file, 'artifactId').text
-        group_id = get_xml_element(pom_file, 'groupId').text
-        try:
-            package_type = get_xml_element(pom_file, 'package').text
-        except ValueError:
-            package_type = 'jar'
+        return results
 
-        results = {
-            'artifacts': [{
-                'path': os.path.join(
-                    os.path.dirname(os.path.abspath(pom_file)),
-                    artifact_parent_dir, artifact_file_names[0]
-                ),
-                'artifact-id': artifact_id,
-                'group-id': group_id,
-                'package-type': package_type,
-                'pom-path': pom_file
-            }]
+    @staticmethod
+    def __build_mode(runtime_step_config):
+        """
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+
+        Returns
+        -------
+        dict
+            How to run mvn given the `goals`, `clean`, `threads`, `offline`, and
+            `local-repository` step configuration.
+        """
+        goals = runtime_step_config.get('goals', DEFAULT_GOALS)
+        if isinstance(goals, str):
+            goals = goals.split()
+        # NOTE: values given with --step-config are always strings
+        if str(runtime_step_config.get('clean', True)).lower() == 'true':
+            goals = ['clean'] + [goal for goal in goals if goal != 'clean']
+
+        threads = runtime_step_config.get('threads')
+        local_repository = runtime_step_config.get('local-repository')
+
+        return {
+            'goals': list(goals),
+            'threads': str(threads) if threads is not None else None,
+            'offline': str(runtime_step_config.get('offline', False)).lower() == 'true',
+            'local-repository':
+                os.path.abspath(local_repository) if local_repository else None
         }
-        return results
+
+    @staticmethod
+    def __module_artifact_parent_dir(module, artifact_parent_dir):
+        """
+        Parameters
+        ----------
+        module : dict
+            Maven module, see `tssc.step_implementers.utils.maven.get_maven_modules`.
+        artifact_parent_dir : str
+            Parent directory, relative to the module, of the artifacts built by the module.
+
+        Returns
+        -------
+        str
+            Absolute path to the directory the given module builds its artifacts in.
+        """
+        return os.path.join(
+            os.path.dirname(os.path.abspath(module['pom-path'])),
+            artifact_parent_dir)
+
+    @staticmethod
+    def __find_module_artifacts(module_artifact_parent_dir, artifact_extensions):
+        """
+        Parameters
+        ----------
+        module_artifact_parent_dir : str
+            Directory a module builds its artifacts in.
+        artifact_extensions : list
+            Extensions of the files that are artifacts.
+
+        Returns
+        -------
+        list
+            Sorted absolute paths to the artifacts in the given directory, empty if the
+            directory does not exist. The `original-` copies of the artifacts the
+            maven-shade-plugin replaced are not artifacts.
+        """
+        try:
+            with os.scandir(module_artifact_parent_dir) as entries:
+                return sorted(
+                    entry.path for entry in entries
+                    if entry.is_file() and
+                    not entry.name.startswith(SHADE_ORIGINAL_ARTIFACT_PREFIX) and
+                    any(entry.name.endswith(ext) for ext in artifact_extensions)
+                )
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def __module_artifacts(module, artifact_paths):
+        """
+        Parameters
+        ----------
+        module : dict
+            Maven module, see `tssc.step_implementers.utils.maven.get_maven_modules`.
+        artifact_paths : list
+            Paths to the artifacts built by the given module.
+
+        Raises
+        ------
+        ValueError
+            If more then one of the given artifacts has the same classifier and extension,
+            since they would overwrite each other when pushed.
+
+        Returns
+        -------
+        list
+            Entries in the `artifacts` step results for the given artifacts.
+        """
+        artifacts = []
+        artifact_paths_by_coordinates = {}
+        for artifact_path in artifact_paths:
+            artifact = {
+                'path': artifact_path,
+                'artifact-id': module['artifact-id'],
+                'group-id': module['group-id'],
+                'package-type': module['package-type'],
+                'pom-path': module['pom-path']
+            }
+            classifier = Maven.__artifact_classifier(module, artifact_path)
+            if classifier is not None:
+                artifact['classifier'] = classifier
+
+            coordinates = (classifier, os.path.splitext(artifact_path)[1])
+            if coordinates in artifact_paths_by_coordinates:
+                raise ValueError(
+                    'Module ({pom_path}) built more then one artifact with the same '
+                    'classifier and extension: {artifact_paths}'.format(
+                        pom_path=module['pom-path'],
+                        artifact_paths=[artifact_paths_by_coordinates[coordinates], artifact_path]))
+            artifact_paths_by_coordinates[coordinates] = artifact_path
+
+            artifacts.append(artifact)
+
+        return artifacts
+
+    @staticmethod
+    def __artifact_classifier(module, artifact_path):
+        """
+        Parameters
+        ----------
+        module : dict
+            Maven module, see `tssc.step_implementers.utils.maven.get_maven_modules`.
+        artifact_path : str
+            Path to an artifact built by the given module.
+
+        Returns
+        -------
+        str
+            Classifier of the given artifact, such as `sources`, parsed from the
+            `{artifactId}-{version}-{classifier}.{extension}` file name Maven gives artifacts
+            with a classifier, or None for the main artifact of the given module.
+        """
+        if module['version'] is None:
+            return None
+
+        artifact_name = os.path.splitext(os.path.basename(artifact_path))[0]
+        classified_prefix = module['artifact-id'] + '-' + module['version'] + '-'
+        if artifact_name.startswith(classified_prefix) and \
+                len(artifact_name) > len(classified_prefix):
+            return artifact_name[len(classified_prefix):]
+
+        return None
 
 
 # register step implementer
@@ -7,12 +7,23 @@ Step configuration expected as input to this step.
 Could come from either configuration file or
 from runtime configuration.
 
-| Configuration Key | Required? | Default | Description
-|-------------------|-----------|---------|-----------
-| `url`             | True      |         | URL to the artifact repository to push the artifact to.
-| `user`            | False     |         | User to authenticate with the artifact repository.
-| `password`        | False     |         | Password to authenticate with the artifact repository.
-
+| Configuration Key        | Required? | Default | Description
+|--------------------------|-----------|---------|-----------
+| `url`                    | True      |         | URL to the artifact repository to push the
+                                                   artifact to.
+| `user`                   | False     |         | User to authenticate with the artifact
+                                                   repository.
+| `password`               | False     |         | Password to authenticate with the artifact
+                                                   repository.
+| `uploader`               | False     | `'mvn'` | How to push the artifacts. `'mvn'` runs
+                                                   `mvn deploy:deploy-file` for each artifact.
+                                                   `'http'` PUTs each artifact, a generated
+                                                   pom, and their checksums directly to the
+                                                   artifact repository over a pool of
+                                                   keep-alive connections, see
+                                                   `tssc.step_implementers.utils.maven_repository`.
+| `upload-max-connections` | False     | `4`     | Maximum number of files the `'http'`
+                                                   uploader uploads at the same time.
 
 Expected Previous Step Results
 ------------------------------
@@ -43,14 +54,18 @@ Keys in the dictionary elements in the `artifacts` array in the step results.
 | `artifact-id`   | Maven artifact ID pushed to the artifact repository
 | `group-id`      | Maven group ID pushed to the artifact repository
 | `version`       | Version pushed to the artifact repository
+| `classifier`    | Maven classifier pushed to the artifact repository, such as `sources`, only
+                    for artifacts with a classifier
 """
-import re
 import sys
 import sh
 
 from tssc import TSSCFactory
 from tssc import StepImplementer
 from tssc import DefaultSteps
+from tssc.trace import SUBPROCESS_CATEGORY
+from tssc.step_implementers.utils.maven_repository import \
+    DEFAULT_MAX_CONNECTIONS, MavenRepositoryUploader, artifact_extension, maven_repository_path
 
 DEFAULT_CONFIG = {}
 AUTHENTICATION_CONFIG = {
@@ -60,6 +75,7 @@ AUTHENTICATION_CONFIG = {
 REQUIRED_CONFIG_KEYS = [
     'url'
 ]
+UPLOADERS = ['mvn', 'http']
 
 
 class Maven(StepImplementer):
@@ -133,6 +149,11 @@ class Maven(StepImplementer):
             not any(element in runtime_step_config for element in AUTHENTICATION_CONFIG) \
         ), 'Either username or password is not set. Neither or both must be set.'
 
+        assert runtime_step_config.get('uploader', 'mvn') in UPLOADERS, \
+            'Unknown uploader ({uploader}), expected one of: {uploaders}'.format(
+                uploader=runtime_step_config.get('uploader'),
+                uploaders=UPLOADERS)
+
     def _run_step(self, runtime_step_config):
         """
         Runs the TSSC step implemented by this StepImplementer.
@@ -175,6 +196,70 @@ class Maven(StepImplementer):
         else:
             raise ValueError('Severe error: Package does not have artifacts')
 
+        if runtime_step_config.get('uploader', 'mvn') == 'http':
+            with self.trace_span('upload-artifacts'):
+                MavenRepositoryUploader(
+                    url,
+                    user,
+                    password,
+                    int(runtime_step_config.get('upload-max-connections', DEFAULT_MAX_CONNECTIONS))
+                ).upload_artifacts([
+                    {**artifact, 'version': version} for artifact in artifacts
+                ])
+        else:
+            self.__mvn_deploy_artifacts(url, user, password, version, artifacts)
+
+        results = {
+            'artifacts': []
+        }
+
+        for artifact in artifacts:
+            pushed_artifact = {
+                'url': url + '/' + maven_repository_path(
+                    artifact['group-id'],
+                    artifact['artifact-id'],
+                    version,
+                    artifact_extension(artifact),
+                    artifact.get('classifier')),
+                'artifact-id': artifact['artifact-id'],
+                'group-id': artifact['group-id'],
+                'version': version,
+                'path': artifact['path'],
+            }
+            if artifact.get('classifier'):
+                pushed_artifact['classifier'] = artifact['classifier']
+            results['artifacts'].append(pushed_artifact)
+
+        return results
+
+    def __mvn_deploy_artifacts( # pylint: disable=too-many-arguments
+            self,
+            url,
+            user,
+            password,
+            version,
+            artifacts):
+        """
+        Pushes the given artifacts by running `mvn deploy:deploy-file` for each artifact.
+
+        Parameters
+        ----------
+        url : str
+            URL to the artifact repository to push the artifacts to.
+        user : str
+            User to authenticate with the artifact repository, or empty string for none.
+        password : str
+            Password to authenticate with the artifact repository, or empty string for none.
+        version : str
+            Version to push the artifacts as.
+        artifacts : list
+            Artifacts from the package step results to push.
+
+        Raises
+        ------
+        RuntimeError
+            If mvn failed to push an artifact.
+        """
         # Build a temporary settings.xml file for the mvn user/pass
         settings_path = self.write_temp_file('ci-settings.xml', b'''
         <settings>
@@ -187,69 +272,57 @@ class Maven(StepImplementer):
               </servers>
         </settings>''')
 
-        results = {
-            'artifacts': []
-        }
-
         for artifact in artifacts:
             artifact_path = artifact['path']
             group_id = artifact['group-id']
             artifact_id = artifact['artifact-id']
-            package_type = artifact['package-type']
+            package_type = artifact_extension(artifact)
+
+            # artifacts with a classifier are pushed beside the main artifact and its pom
+            classifier_args = []
+            if artifact.get('classifier'):
+                classifier_args = ['-Dclassifier=' + artifact['classifier'], '-DgeneratePom=false']
 
             try:
                 # Build the mvn command, settings is required even if no user/password
                 # The settings file is required, need to deal with empty userid,password
                 # https://maven.apache.org/plugins/maven-deploy-plugin/deploy-file-mojo.html
 
-                if user == '':
-                    sh.mvn(  # pylint: disable=no-member
-                        'deploy:deploy-file',
-                        '-Dversion=' + version,
-                        '-Durl=' + url,
-                        '-Dfile=' + artifact_path,
-                        '-DgroupId=' + group_id,
-                        '-DartifactId=' + artifact_id,
-                        '-Dpackaging=' + package_type,
-                        '-DrepositoryId=tssc',
-                        '-s' + settings_path,
-                        _out=sys.stdout
-                    )
-                else:
-                    sh.mvn(  # pylint: disable=no-member
-                        'deploy:deploy-file',
-                        '-Dversion=' + version,
-                        '-Durl=' + url,
-                        '-Dfile=' + artifact_path,
-                        '-DgroupId=' + group_id,
-                        '-DartifactId=' + artifact_id,
-                        '-Dpackaging=' + package_type,
-                        '-DrepositoryId=tssc',
-                        '-DrepositoryUser=' + user,
-                        '-DrepositoryPassword=' + password,
-                        '-s' + settings_path,
-                        _out=sys.stdout
-                    )
+                with self.trace_span('mvn deploy:deploy-file', SUBPROCESS_CATEGORY):
+                    if user == '':
+                        sh.mvn(  # pylint: disable=no-member
+                            'deploy:deploy-file',
+                            '-Dversion=' + version,
+                            '-Durl=' + url,
+                            '-Dfile=' + artifact_path,
+                            '-DgroupId=' + group_id,
+                            '-DartifactId=' + artifact_id,
+                            '-Dpackaging=' + package_type,
+                            *classifier_args,
+                            '-DrepositoryId=tssc',
+                            '-s' + settings_path,
+                            _out=sys.stdout
+                        )
+                    else:
+                        sh.mvn(  # pylint: disable=no-member
+                            'deploy:deploy-file',
+                            '-Dversion=' + version,
+                            '-Durl=' + url,
+                            '-Dfile=' + artifact_path,
+                            '-DgroupId=' + group_id,
+                            '-DartifactId=' + artifact_id,
+                            '-Dpackaging=' + package_type,
+                            *classifier_args,
+                            '-DrepositoryId=tssc',
+                            '-DrepositoryUser=' + user,
+                            '-DrepositoryPassword=' + password,
+                            '-s' + settings_path,
+                            _out=sys.stdout
+                        )
 
             except sh.ErrorReturnCode as error:
                 raise RuntimeError("Error invoking mvn: {all}".format(all=error))
 
-            results['artifacts'].append({
-                'url': url + '/' +
-                       re.sub(r'\.', '/', group_id) + '/' +
-                       artifact_id + '/' +
-                       version + '/' +
-                       artifact_id + '-' +
-                       version + '.' +
-                       package_type,
-                'artifact-id': artifact_id,
-                'group-id': group_id,
-                'version': version,
-                'path': artifact_path,
-            })
-
-        return results
-
 
 # register step implementer
 TSSCFactory.register_step_implementer(Maven)
@@ -7,11 +7,18 @@ Step configuration expected as input to this step.
 Could come from either configuration file or
 from runtime configuration.
 
-| Configuration Key | Required? | Default  | Description
-|-------------------|-----------|----------|-----------
-| `destination`     | True      |          | Container image repository destination to push image to
-| `src-tls-verify`  | True      | `'true'` | Whether to very TLS for source of image
-| `dest-tls-verify` | True      | `'true'` | Whether to verify TLS for destination of image
+| Configuration Key     | Required? | Default  | Description
+|-----------------------|-----------|----------|-----------
+| `destination-url`     | True      |          | Container image repository destination to push
+                                                 image to, or a list of destinations to push
+                                                 the image to each of
+| `additional-tags`     | False     | `[]`     | Tags to push the image with in addition to the
+                                                 `image-tag` from `generate-metadata`, for
+                                                 instance a branch tag
+| `max-parallel-pushes` | False     | `4`      | Maximum number of destinations to push the
+                                                 image to at the same time
+| `src-tls-verify`      | True      | `'true'` | Whether to very TLS for source of image
+| `dest-tls-verify`     | True      | `'true'` | Whether to verify TLS for destination of image
 
 Expected Previous Step Results
 ------------------------------
@@ -21,29 +28,55 @@ Results expected from previous steps that this step requires.
 | Step Name                | Result Key       | Description
 |--------------------------|------------------|------------
 | `generate-metadata`      | `image-tag`      | Tag to push image with
-| `create-container-image` | `image-tar-file` | Local tar file of image to push
+| `create-container-image` | `image-ref`      | Transport reference to the local image to push,
+                                                such as `containers-storage:` or `oci:`
+| `create-container-image` | `image-tar-file` | Local tar file of image to push, if there is no
+                                                `image-ref`
 
 Results
 -------
 
 Results output by this step.
 
-| Result Key  | Description
-|-------------|------------
-| `image-tag` | Pushed destination image tag
+| Result Key     | Description
+|----------------|------------
+| `image-tag`    | Pushed destination image tag, of the first destination and tag
+| `destinations` | An array of dictionaries with information on the push to each destination
 
+**destinations**
+Keys in the dictionary elements in the `destinations` array in the step results.
+
+| `destinations` Key | Description
+|--------------------|------------
+| `destination-url`  | Destination the image was pushed to
+| `image-tags`       | Pushed destination image tags
+| `image-digest`     | Digest of the manifest pushed to the destination
+| `push-time`        | Seconds it took to push the image to the destination with all of its tags
+
+Notes
+-----
+The image is pushed to each destination at the same time, up to `max-parallel-pushes`. At each
+destination the image is copied from the local image once, with the first tag, and every other
+tag is copied from that first tag on the destination, which only uploads the manifest since
+the destination already has all of the layers.
 """
+import concurrent.futures
+import os
 import sys
+import time
 import sh
 from tssc import TSSCFactory
 from tssc import StepImplementer
 from tssc import DefaultSteps
+from tssc.trace import SUBPROCESS_CATEGORY
 
 DEFAULT_CONFIG = {
     'src-tls-verify': 'true',
     'dest-tls-verify': 'true',
 }
 
+DEFAULT_MAX_PARALLEL_PUSHES = 4
+
 REQUIRED_CONFIG_KEYS = [
     'destination-url',
     'src-tls-verify',
@@ -128,32 +161,134 @@ class Skopeo(StepImplementer):
         service_name = runtime_step_config['service-name']
         organization = runtime_step_config['organization']
 
-        image_tar_file = ''
-        if(self.get_step_results(DefaultSteps.CREATE_CONTAINER_IMAGE) and \
-          self.get_step_results(DefaultSteps.CREATE_CONTAINER_IMAGE).get('image-tar-file')):
-            image_tar_file = self.\
-            get_step_results(DefaultSteps.CREATE_CONTAINER_IMAGE)['image-tar-file']
+        create_container_image_results = \
+            self.get_step_results(DefaultSteps.CREATE_CONTAINER_IMAGE) or {}
+        if create_container_image_results.get('image-ref'):
+            image_ref = create_container_image_results['image-ref']
+        elif create_container_image_results.get('image-tar-file'):
+            image_ref = 'docker-archive:' + create_container_image_results['image-tar-file']
         else:
             raise RuntimeError('Missing image tar file from ' + DefaultSteps.CREATE_CONTAINER_IMAGE)
 
-        destination_with_version = runtime_step_config['destination-url'] + '/' + organization + \
-         '/' + application_name + '-' + service_name + ':' + (version).lower()
+        destination_urls = runtime_step_config['destination-url']
+        if isinstance(destination_urls, str):
+            destination_urls = [destination_urls]
+        image_tags = [version] + [
+            image_tag for image_tag in runtime_step_config.get('additional-tags', [])
+            if image_tag != version
+        ]
+        destinations = [
+            destination_url + '/' + organization + '/' + application_name + '-' + service_name
+            for destination_url in destination_urls
+        ]
+        # NOTE: values given with --step-config are always strings
+        max_parallel_pushes = int(runtime_step_config.get(
+            'max-parallel-pushes', DEFAULT_MAX_PARALLEL_PUSHES))
+
+        with self.trace_span(
+                'skopeo copy',
+                SUBPROCESS_CATEGORY,
+                destinations=len(destinations),
+                tags=len(image_tags)):
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max(1, min(len(destinations), max_parallel_pushes))) as executor:
+                pushes = [
+                    executor.submit(
+                        self.__push_to_destination,
+                        runtime_step_config,
+                        image_ref,
+                        destination,
+                        image_tags,
+                        index)
+                    for index, destination in enumerate(destinations)
+                ]
+                destination_results = [push.result() for push in pushes]
+
+        results = {
+            'image-tag' : destination_results[0]['image-tags'][0],
+            'destinations': [
+                {
+                    'destination-url': destination_url,
+                    **destination_result
+                }
+                for destination_url, destination_result in zip(
+                    destination_urls, destination_results)
+            ]
+        }
+
+        return results
+
+    def __push_to_destination( # pylint: disable=too-many-arguments
+            self,
+            runtime_step_config,
+            image_ref,
+            destination,
+            image_tags,
+            index):
+        """
+        Pushes the given local image to the given destination with each of the given tags.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+        image_ref : str
+            Transport reference to the local image to push.
+        destination : str
+            Destination repository to push the image to, without a tag.
+        image_tags : list
+            Tags to push the image with.
+        index : int
+            Index of the given destination, to keep the digest files of concurrent pushes
+            separate.
+
+        Returns
+        -------
+        dict
+            The `image-tags`, `image-digest`, and `push-time` of the push.
+
+        Raises
+        ------
+        RuntimeError
+            If skopeo failed to push the image.
+        """
+        start_time = time.perf_counter()
+        digest_file = self.write_temp_file('image-digest-' + str(index), b'')
+
+        destinations_with_tag = [destination + ':' + image_tag.lower() for image_tag in image_tags]
         try:
             sh.skopeo.copy( # pylint: disable=no-member
                 '--src-tls-verify=' + runtime_step_config['src-tls-verify'],
                 '--dest-tls-verify=' + runtime_step_config['dest-tls-verify'],
-                'docker-archive:' + image_tar_file,
-                destination_with_version,
+                '--digestfile', digest_file,
+                image_ref,
+                destinations_with_tag[0],
                 _out=sys.stdout
             )
+
+            # the destination has all of the layers now, so only the manifest is copied
+            for destination_with_tag in destinations_with_tag[1:]:
+                sh.skopeo.copy( # pylint: disable=no-member
+                    '--src-tls-verify=' + runtime_step_config['dest-tls-verify'],
+                    '--dest-tls-verify=' + runtime_step_config['dest-tls-verify'],
+                    destinations_with_tag[0],
+                    destination_with_tag,
+                    _out=sys.stdout
+                )
         except sh.ErrorReturnCode as error:  # pylint: disable=undefined-variable
             raise RuntimeError('Error invoking skopeo: {error}'.format(error=error))
 
-        results = {
-            'image-tag' : destination_with_version
-        }
+        image_digest = None
+        if os.path.getsize(digest_file) > 0:
+            with open(digest_file, 'r') as digest:
+                image_digest = digest.read().strip()
 
-        return results
+        return {
+            'image-tags': destinations_with_tag,
+            'image-digest': image_digest,
+            'push-time': time.perf_counter() - start_time
+        }
 
 # register step implementer
 TSSCFactory.register_step_implementer(Skopeo, True)
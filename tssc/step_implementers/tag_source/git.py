@@ -39,24 +39,34 @@ Results
 
 Results output by this step.
 
-| Result Key | Description
-|------------|------------
-| `tag`      | This is the value that was used to tag the source.
+| Result Key   | Description
+|--------------|------------
+| `tag`        | This is the value that was used to tag the source.
+| `tag-pushed` | True if the tag was pushed, False if the push was skipped because the remote
+                 already has the tag at the same commit.
 
 
 **Example**
 
     'tssc-results': {
         'tag-source': {
-            'git-tag': 'latest'
+            'tag': 'latest',
+            'tag-pushed': True
         }
     }
+
+Notes
+-----
+Only the created tag, `refs/tags/{tag}`, is pushed rather than all of the local tags, and only
+after checking with `git ls-remote` that the remote does not already have the tag at the same
+commit.
 """
 import sys
 import sh
 from tssc import TSSCFactory
 from tssc import StepImplementer
 from tssc import DefaultSteps
+from tssc.trace import SUBPROCESS_CATEGORY
 
 DEFAULT_CONFIG = {}
 
@@ -172,11 +182,14 @@ class Git(StepImplementer):
         else:
             print('No username/password found, assuming ssh')
         tag = self._get_tag()
-        self._git_tag(tag)
-        git_url = self._git_url(runtime_step_config)
+        with self.trace_span('git tag', SUBPROCESS_CATEGORY):
+            self._git_tag(tag)
+        with self.trace_span('git remote url', SUBPROCESS_CATEGORY):
+            git_url = self._git_url(runtime_step_config)
+
         if git_url.startswith('http://'):
             if username and password:
-                self._git_push('http://' + username + ':' + password + '@' + git_url[7:])
+                git_push_url = 'http://' + username + ':' + password + '@' + git_url[7:]
             else:
                 raise ValueError(
                     'For a http:// git url, you need to also provide ' \
@@ -184,16 +197,28 @@ class Git(StepImplementer):
                 )
         elif git_url.startswith('https://'):
             if username and password:
-                self._git_push('https://' + username + ':' + password + '@' + git_url[8:])
+                git_push_url = 'https://' + username + ':' + password + '@' + git_url[8:]
             else:
                 raise ValueError(
                     'For a https:// git url, you need to also provide ' \
                     'username/password pair'
                 )
         else:
-            self._git_push(None)
+            git_push_url = git_url
+
+        with self.trace_span('git ls-remote', SUBPROCESS_CATEGORY):
+            tag_on_remote = self._git_tag_on_remote(git_push_url, tag)
+
+        if tag_on_remote:
+            print('Tag ({0}) is already on the remote at the same commit, skipping push'.format(
+                tag))
+        else:
+            with self.trace_span('git push', SUBPROCESS_CATEGORY):
+                self._git_push(git_push_url, tag)
+
         results = {
-            'tag' : tag
+            'tag' : tag,
+            'tag-pushed': not tag_on_remote
         }
         return results
 
@@ -244,19 +269,63 @@ class Git(StepImplementer):
             raise RuntimeError('Error invoking git tag ' + git_tag_value)
 
     @staticmethod
-    def _git_push(url=None):  # pragma: no cover
+    def _git_tag_on_remote(url, git_tag_value):
+        """
+        Checks whether the remote already has the given tag at the commit the local tag is at,
+        listing only the given tag on the remote rather than all of the remote refs.
+
+        Parameters
+        ----------
+        url : str
+            URL of the remote to check.
+        git_tag_value : str
+            Tag to check.
+
+        Returns
+        -------
+        bool
+            True if the remote has the given tag at the same commit as the local tag,
+            False if it does not or that could not be determined.
+        """
+        tag_ref = 'refs/tags/' + git_tag_value
         try:
-            if url:
-                sh.git.push(
-                    url,
-                    '--tag',
-                    _out=sys.stdout
-                )
-            else:
-                sh.git.push(
-                    '--tag',
-                    _out=sys.stdout
-                )
+            local_commit = str(sh.git(  # pylint: disable=no-member,too-many-function-args,unexpected-keyword-arg
+                'rev-parse',
+                '--verify',
+                '--quiet',
+                tag_ref + '^{commit}',
+                _encoding='UTF-8',
+                _decode_errors='ignore'
+            )).strip()
+            remote_refs_output = str(sh.git(  # pylint: disable=no-member,too-many-function-args,unexpected-keyword-arg
+                'ls-remote',
+                url,
+                tag_ref,
+                _encoding='UTF-8',
+                _decode_errors='ignore'
+            ))
+        except sh.ErrorReturnCode:  # pylint: disable=undefined-variable
+            # let the push report any actual problem with the remote
+            return False
+
+        remote_refs = {}
+        for line in remote_refs_output.splitlines():
+            remote_ref = line.split()
+            if len(remote_ref) == 2:
+                remote_refs[remote_ref[1]] = remote_ref[0]
+
+        # annotated tags are listed with the commit they point to as the peeled `^{}` ref
+        remote_commit = remote_refs.get(tag_ref + '^{}', remote_refs.get(tag_ref))
+        return remote_commit is not None and remote_commit == local_commit
+
+    @staticmethod
+    def _git_push(url, git_tag_value):  # pragma: no cover
+        try:
+            sh.git.push(
+                url,
+                'refs/tags/' + git_tag_value,
+                _out=sys.stdout
+            )
         except sh.ErrorReturnCode:  # pylint: disable=undefined-variable
             raise RuntimeError('Error invoking git push')
 
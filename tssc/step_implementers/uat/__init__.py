@@ -5,9 +5,7 @@ Step Configuration
 All tssc.StepImplementers for this step should
 accept minimally the following configuration options.
 
-| Parameter       | Description
-|-----------------|------------
-| `TODO`          | TODO
+None.
 
 Results
 -------
@@ -16,7 +14,10 @@ minimally produce the following step results.
 
 | Result Key       | Description
 |------------------|------------
-| `TODO`           | TODO
+| `scenarios`      | Number of scenarios
+| `passed`         | Number of scenarios that passed
+| `failed`         | Number of scenarios that failed
+| `skipped`        | Number of scenarios that neither passed nor failed
 """
 
 from .cucumber import Cucumber
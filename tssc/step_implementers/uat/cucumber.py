@@ -1,4 +1,7 @@
-"""Step Implementer for the cucumber step for Cucumber.
+"""Step Implementer for the uat step for Cucumber.
+
+Runs the Cucumber features, partitioned across a number of runner processes running at the same
+time, and merges the Cucumber JSON reports of the runners into the step results.
 
 Step Configuration
 ------------------
@@ -7,45 +10,165 @@ Step configuration expected as input to this step.
 Could come from either configuration file or
 from runtime configuration.
 
-| Configuration Key | Required? | Default | Description
-|-------------------|-----------|---------|-----------
-| `TODO`            | True      |         |
+| Configuration Key       | Required? | Default        | Description
+|-------------------------|-----------|----------------|-----------
+| `test-command`          | True      |                | Command to run the features with, as a
+                                                         list of arguments, see Notes, for
+                                                         instance `['mvn', 'verify',
+                                                         '-Dcucumber.features={features}',
+                                                         '-Dcucumber.plugin=json:{report-file}',
+                                                         '-DbuildDirectory=target/cucumber-
+                                                         {runner}']`
+| `features-dirs`         | True      | `['src/test/   | Directories to find the feature files in
+                                        resources/
+                                        features']`
+| `runners`               | False     | number of CPUs | Number of runner processes to partition
+                                                         the features across
+| `partition-by`          | False     | `'feature'`    | Whether to partition whole feature files,
+                                                         `feature`, or single scenarios,
+                                                         `scenario`, across the runners
+| `rerun-failed`          | False     | `False`        | Whether to run only the scenarios that
+                                                         failed in the previous run, if any did
+| `max-failed-scenarios`  | False     | `100`          | Maximum number of failed scenarios to
+                                                         include the details of in the results
+| `test-impact-base-ref`  | False     |                | Branch, tag, or commit to find the
+                                                         changed files since, such as
+                                                         `origin/master`, to run only the changed
+                                                         features, see Notes
+| `repo-root`             | False     | `./`           | Directory path to the Git repo to find
+                                                         the changed files in
+| `test-impact-ignore-    | False     | see            | Glob patterns of changed files that do
+   patterns`                            Description      not affect any features, by default
+                                                         `['*.md', '*.adoc', '*.txt', 'docs/*',
+                                                         'LICENSE', '.gitignore']`
 
 Expected Previous Step Results
 ------------------------------
 
 Results expected from previous steps that this step requires.
 
-| Step Name | Result Key | Description
-|-----------|------------|------------
-| `TODO`    | `TODO`     | TODO
+None.
 
 Results
 -------
 
 Results output by this step.
 
-| Result Key | Description
-|------------|------------
-| `TODO`     | TODO
+| Result Key         | Description
+|--------------------|------------
+| `report-files`     | Number of Cucumber JSON reports merged
+| `scenarios`        | Number of scenarios
+| `passed`           | Number of scenarios that passed
+| `failed`           | Number of scenarios that failed
+| `skipped`          | Number of scenarios that neither passed nor failed, such as scenarios
+                       with pending or undefined steps
+| `time`             | Total seconds spent running the scenarios
+| `failed-scenarios` | An array of dictionaries with the `feature`, `name`, `location`, failed
+                       `step`, and error `message` of the scenarios that failed
+| `runners`          | An array of dictionaries with the `runner` index, `feature-count` of
+                       feature files or scenarios, `run-time`, `passed`, and `log-file` of each
+                       runner
+| `rerun`            | Whether only the scenarios that failed in the previous run were run
+| `test-impact`      | A dictionary with the `base-ref`, the number of `changed-files`, whether it
+                       was a `full-run`, the `full-run-reason`, and the `feature-count` of
+                       feature files run, only when `test-impact-base-ref` is given
 
 
 **Example**
 
     'tssc-results': {
-        'TODO': {
-            'TODO': ''
+        'uat': {
+            'report-files': 2,
+            'scenarios': 3,
+            'passed': 2,
+            'failed': 1,
+            'skipped': 0,
+            'time': 12.5,
+            'failed-scenarios': [
+                {
+                    'feature': 'Checkout',
+                    'name': 'Pay with an expired card',
+                    'location': 'src/test/resources/features/checkout.feature:12',
+                    'step': 'Then the payment is declined',
+                    'message': 'java.lang.AssertionError: expected declined ...'
+                }
+            ],
+            'runners': [
+                {
+                    'runner': 0,
+                    'feature-count': 1,
+                    'run-time': 8.1,
+                    'passed': False,
+                    'log-file': 'tssc-working/uat/cucumber-runner-0.log'
+                },
+                ...
+            ],
+            'rerun': False
         }
     }
+
+Notes
+-----
+The feature files, or with `partition-by` `scenario` the scenarios of the feature files, are
+split across the `runners` so each runner has about the same number of scenarios, and every
+runner runs the `test-command` at the same time. Each argument of the `test-command` that is
+exactly `{features}` is replaced with the feature files or scenarios of the runner, as separate
+arguments, other arguments containing `{features}` have it replaced with them comma separated,
+and `{report-file}` is replaced with the path to the Cucumber JSON report the runner is to
+write. Each report is parsed as soon as its runner finishes, one feature at a time, and merged
+into the results, see `tssc.step_implementers.utils.cucumber`.
+
+Since the runners run at the same time they must not share a build output directory, such as
+Maven's `target`, or they overwrite each other's classes and reports while they run. The
+`{runner}` argument of the `test-command` is replaced with the runner index for giving each
+runner a directory of its own, for instance with a pom whose `<build><directory>` is
+`${buildDirectory}`, `'-DbuildDirectory=target/cucumber-{runner}'`. With more then one runner
+a `test-command` without `{runner}` must otherwise keep the runners apart itself.
+
+The locations of the scenarios that failed are recorded in the working directory, so with
+`rerun-failed` the next run runs only those scenarios, or all of the features if none failed.
+
+When `test-impact-base-ref` is given and only feature files, or changed files ignored by the
+`test-impact-ignore-patterns`, changed since the merge base of that ref and the head, only the
+changed feature files are run. Any other change, such as to the step definitions or the
+application, runs all of the features.
 """
 
+import concurrent.futures
+import fnmatch
+import os
+import time
+import sh
 from tssc import TSSCFactory
 from tssc import StepImplementer
 from tssc import DefaultSteps
+from tssc.trace import SUBPROCESS_CATEGORY
+from tssc.step_implementers.utils.cucumber import DEFAULT_MAX_FAILED_SCENARIOS, \
+    FEATURE_FILE_EXTENSION, empty_cucumber_summary, find_feature_files, find_scenarios, \
+    merge_cucumber_summaries, parse_cucumber_report
+from tssc.step_implementers.utils.git import find_changed_files
+from tssc.step_implementers.utils.impact_analysis import DEFAULT_IGNORE_PATTERNS
+from tssc.step_implementers.utils.sharding import plan_shards
+
+DEFAULT_CONFIG = {
+    'features-dirs': ['src/test/resources/features']
+}
+
+REQUIRED_CONFIG_KEYS = [
+    'test-command',
+    'features-dirs'
+]
+
+PARTITION_BY_FEATURE = 'feature'
+PARTITION_BY_SCENARIO = 'scenario'
+FEATURES_PLACEHOLDER = '{features}'
+REPORT_FILE_PLACEHOLDER = '{report-file}'
+RUNNER_PLACEHOLDER = '{runner}'
+RERUN_FILE_NAME = 'rerun.txt'
 
 class Cucumber(StepImplementer):
     """
-    StepImplementer for the cucumber step for Cucumber.
+    StepImplementer for the uat step for Cucumber.
     """
 
     @staticmethod
@@ -74,7 +197,7 @@ class Cucumber(StepImplementer):
         dict
             Default values to use for step configuration values.
         """
-        return {}
+        return DEFAULT_CONFIG
 
     @staticmethod
     def required_runtime_step_config_keys():
@@ -90,7 +213,42 @@ class Cucumber(StepImplementer):
         array_list
             Array of configuration keys that are required before running the step.
         """
-        return []
+        return REQUIRED_CONFIG_KEYS
+
+    def _validate_runtime_step_config(self, runtime_step_config):
+        """
+        Validates the given `runtime_step_config` against the required step configuration keys.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+
+        Raises
+        ------
+        AssertionError
+            If the given `runtime_step_config` is not valid with a message as to why.
+        """
+        super()._validate_runtime_step_config(runtime_step_config) #pylint: disable=protected-access
+
+        # NOTE: values given with --step-config are always strings
+        runners = runtime_step_config.get('runners')
+        assert runners is None or (str(runners).isdigit() and int(runners) >= 1), \
+            'Runners ({runners}) must be a positive integer'.format(runners=runners)
+
+        partition_by = runtime_step_config.get('partition-by', PARTITION_BY_FEATURE)
+        assert partition_by in (PARTITION_BY_FEATURE, PARTITION_BY_SCENARIO), \
+            'Partition by ({partition_by}) must be one of: {partition_bys}'.format(
+                partition_by=partition_by,
+                partition_bys=', '.join([PARTITION_BY_FEATURE, PARTITION_BY_SCENARIO]))
+
+        test_command = Cucumber.__test_command(runtime_step_config)
+        for placeholder in [FEATURES_PLACEHOLDER, REPORT_FILE_PLACEHOLDER]:
+            assert any(placeholder in arg for arg in test_command), \
+                'Test command ({test_command}) must have a {placeholder} argument'.format(
+                    test_command=test_command,
+                    placeholder=placeholder)
 
     def _run_step(self, runtime_step_config):
         """
@@ -107,8 +265,285 @@ class Cucumber(StepImplementer):
         dict
             Results of running this step.
         """
-        results = {}
+        features_dirs = runtime_step_config['features-dirs']
+        if isinstance(features_dirs, str):
+            features_dirs = [features_dirs]
+        rerun_file = os.path.join(self.work_dir_path, self.step_name(), RERUN_FILE_NAME)
+
+        impact_results = None
+        rerun_locations = []
+        with self.trace_span('find-features'):
+            if runtime_step_config.get('rerun-failed', False):
+                rerun_locations = Cucumber.__read_rerun_locations(rerun_file)
+
+            if rerun_locations:
+                features = rerun_locations
+            else:
+                feature_files = find_feature_files(features_dirs)
+                if runtime_step_config.get('test-impact-base-ref'):
+                    feature_files, impact_results = Cucumber.__select_changed_features(
+                        runtime_step_config, features_dirs, feature_files)
+
+                if runtime_step_config.get('partition-by') == PARTITION_BY_SCENARIO:
+                    features = [
+                        scenario
+                        for feature_file in feature_files
+                        for scenario in find_scenarios(feature_file)
+                    ]
+                else:
+                    features = feature_files
+
+        # features are weighed by their number of scenarios, so each runner runs about as many
+        runners = int(runtime_step_config.get('runners') or os.cpu_count() or 1)
+        with self.trace_span('partition-features'):
+            runner_plan = plan_shards(
+                features,
+                {feature: Cucumber.__scenario_count(feature) for feature in features},
+                max(1, min(len(features), runners)))
+
+        max_failed_scenarios = runtime_step_config.get(
+            'max-failed-scenarios', DEFAULT_MAX_FAILED_SCENARIOS)
+        summary, runner_results = self.__run_runners(
+            Cucumber.__test_command(runtime_step_config),
+            runner_plan,
+            max_failed_scenarios)
+
+        failed_locations = summary.pop('failed-locations')
+        self.write_temp_file(RERUN_FILE_NAME, '\n'.join(failed_locations).encode())
+
+        results = summary
+        results['runners'] = runner_results
+        results['rerun'] = bool(rerun_locations)
+        if impact_results is not None:
+            results['test-impact'] = impact_results
+
+        failed_runners = [
+            runner_result for runner_result in runner_results if not runner_result['passed']
+        ]
+        if failed_runners:
+            raise RuntimeError('Error running features, see: ' + ', '.join(
+                runner_result['log-file'] for runner_result in failed_runners))
+
         return results
 
+    def __run_runners(self, test_command, runner_plan, max_failed_scenarios):
+        """
+        Runs the test command for each of the given runners at the same time, merging the report
+        of each runner into the results as soon as it finishes.
+
+        Parameters
+        ----------
+        test_command : list
+            Arguments of the command to run the features with.
+        runner_plan : list
+            Runners to run, see `tssc.step_implementers.utils.sharding.plan_shards`, with the
+            feature files or scenarios to run as the `test-classes`.
+        max_failed_scenarios : int
+            Maximum number of failed scenarios to include the failure details of.
+
+        Returns
+        -------
+        tuple
+            (merged summary of the reports of the runners, see
+            `tssc.step_implementers.utils.cucumber.parse_cucumber_report`, the `runner` index,
+            `feature-count`, `run-time`, `passed`, and `log-file` of each runner)
+        """
+        summary = empty_cucumber_summary()
+        runner_results = [None] * len(runner_plan)
+        with self.trace_span('run-cucumber-runners', runners=len(runner_plan)):
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max(1, len(runner_plan))) as executor:
+                runner_runs = [
+                    executor.submit(
+                        self.__run_runner, test_command, runner, max_failed_scenarios)
+                    for runner in runner_plan
+                ]
+                for runner_run in concurrent.futures.as_completed(runner_runs):
+                    runner_result, runner_summary = runner_run.result()
+                    runner_results[runner_result['runner']] = runner_result
+                    summary = merge_cucumber_summaries(
+                        [summary, runner_summary], max_failed_scenarios)
+
+        return summary, runner_results
+
+    def __run_runner(self, test_command, runner, max_failed_scenarios):
+        """
+        Runs the test command for the given runner, writing its output to a log file in the
+        working directory of this step, and parses the report it writes.
+
+        Parameters
+        ----------
+        test_command : list
+            Arguments of the command to run the features with.
+        runner : dict
+            Runner to run, see `tssc.step_implementers.utils.sharding.plan_shards`.
+        max_failed_scenarios : int
+            Maximum number of failed scenarios to include the failure details of.
+
+        Returns
+        -------
+        tuple
+            (the `runner` index, `feature-count`, `run-time`, `passed`, and `log-file` of the
+            given runner, summary of its report)
+        """
+        features = runner['test-classes']
+        runner_result = {
+            'runner': runner['shard'],
+            'feature-count': len(features),
+            'run-time': 0.0,
+            'passed': True,
+            'log-file': self.write_temp_file(
+                'cucumber-runner-' + str(runner['shard']) + '.log', b'')
+        }
+        report_file = self.write_temp_file(
+            'cucumber-runner-' + str(runner['shard']) + '.json', b'')
+
+        # no features to run, rather then running all of them
+        if not features:
+            return runner_result, empty_cucumber_summary()
+
+        args = []
+        for arg in test_command:
+            if arg == FEATURES_PLACEHOLDER:
+                args += features
+            else:
+                args.append(arg.replace(FEATURES_PLACEHOLDER, ','.join(features))
+                            .replace(REPORT_FILE_PLACEHOLDER, report_file)
+                            .replace(RUNNER_PLACEHOLDER, str(runner['shard'])))
+
+        start_time = time.perf_counter()
+        with open(runner_result['log-file'], 'w') as log_file:
+            try:
+                with self.trace_span(
+                        'cucumber runner ' + str(runner['shard']), SUBPROCESS_CATEGORY):
+                    sh.Command(args[0])(
+                        *args[1:],
+                        _out=log_file,
+                        _err_to_out=True
+                    )
+            except sh.ErrorReturnCode:  # pylint: disable=undefined-variable
+                runner_result['passed'] = False
+        runner_result['run-time'] = round(time.perf_counter() - start_time, 3)
+
+        print('Cucumber runner {runner} {status} in {run_time}s, see: {log_file}'.format(
+            runner=runner['shard'],
+            status='passed' if runner_result['passed'] else 'failed',
+            run_time=runner_result['run-time'],
+            log_file=runner_result['log-file']))
+
+        # a runner that failed to start may not have written a report
+        if os.path.getsize(report_file) == 0:
+            return runner_result, empty_cucumber_summary()
+
+        return runner_result, parse_cucumber_report(report_file, max_failed_scenarios)
+
+    @staticmethod
+    def __select_changed_features(runtime_step_config, features_dirs, feature_files):
+        """
+        Selects the given feature files that changed since the `test-impact-base-ref`.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+        features_dirs : list
+            Paths to the directories the feature files are in.
+        feature_files : list
+            Paths to all of the feature files.
+
+        Returns
+        -------
+        tuple
+            (paths to the feature files to run, the `test-impact` results)
+        """
+        base_ref = runtime_step_config['test-impact-base-ref']
+        repo_root = runtime_step_config.get('repo-root', './')
+        ignore_patterns = runtime_step_config.get(
+            'test-impact-ignore-patterns', DEFAULT_IGNORE_PATTERNS)
+
+        changed_files = None
+        full_run_reason = None
+        try:
+            changed_files = find_changed_files(repo_root, base_ref)
+        except Exception as error: # pylint: disable=broad-except
+            full_run_reason = 'could not find the files changed since {base_ref}: {error}'.format(
+                base_ref=base_ref,
+                error=str(error).strip())
+        else:
+            features_paths = [
+                os.path.relpath(features_dir, repo_root).replace(os.sep, '/') + '/'
+                for features_dir in features_dirs
+            ]
+            for changed_file in changed_files:
+                is_feature_file = changed_file.endswith(FEATURE_FILE_EXTENSION) and \
+                    any(changed_file.startswith(features_path) for features_path in features_paths)
+                is_ignored = any(
+                    fnmatch.fnmatch(changed_file, pattern) for pattern in ignore_patterns)
+                if not is_feature_file and not is_ignored:
+                    full_run_reason = 'changed file ({changed_file}) is not a feature'.format(
+                        changed_file=changed_file)
+                    break
+
+        if full_run_reason is None:
+            changed_paths = set(changed_files)
+            feature_files = [
+                feature_file for feature_file in feature_files
+                if os.path.relpath(feature_file, repo_root).replace(os.sep, '/') in changed_paths
+            ]
+
+        print('Running {count} feature files{reason}'.format(
+            count=len(feature_files),
+            reason='' if full_run_reason is None else ', ' + full_run_reason))
+
+        return feature_files, {
+            'base-ref': base_ref,
+            'changed-files': None if changed_files is None else len(changed_files),
+            'full-run': full_run_reason is not None,
+            'full-run-reason': full_run_reason,
+            'feature-count': len(feature_files)
+        }
+
+    @staticmethod
+    def __read_rerun_locations(rerun_file):
+        """
+        Returns
+        -------
+        list
+            Locations of the scenarios that failed in the previous run, empty if none failed or
+            there was no previous run.
+        """
+        try:
+            with open(rerun_file, 'r') as rerun:
+                return [location.strip() for location in rerun if location.strip()]
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def __scenario_count(feature):
+        """
+        Returns
+        -------
+        int
+            Number of scenarios of the given feature file, or 1 for the location of a single
+            scenario.
+        """
+        if feature.endswith(FEATURE_FILE_EXTENSION):
+            return max(1, len(find_scenarios(feature)))
+        return 1
+
+    @staticmethod
+    def __test_command(runtime_step_config):
+        """
+        Returns
+        -------
+        list
+            Arguments of the configured command to run the features with.
+        """
+        test_command = runtime_step_config['test-command']
+        if isinstance(test_command, str):
+            test_command = test_command.split()
+        return test_command
+
 # register step implementer
 TSSCFactory.register_step_implementer(Cucumber)
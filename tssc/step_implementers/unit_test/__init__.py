@@ -5,9 +5,7 @@ Step Configuration
 All tssc.StepImplementers for this step should
 accept minimally the following configuration options.
 
-| Parameter       | Description
-|-----------------|------------
-| `TODO`          | TODO
+None.
 
 Results
 -------
@@ -16,7 +14,10 @@ minimally produce the following step results.
 
 | Result Key       | Description
 |------------------|------------
-| `TODO`           | TODO
+| `tests`          | Number of tests
+| `failures`       | Number of tests that failed
+| `errors`         | Number of tests that errored
+| `skipped`        | Number of tests that were skipped
 """
 
 from .junit import JUnit
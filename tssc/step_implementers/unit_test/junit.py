@@ -1,5 +1,10 @@
 """Step Implementer for the unit-test step for JUnit.
 
+Optionally runs the tests, only those affected by the files changed since a base ref and split
+into shards balanced by how long each test class took in previous runs, and aggregates the JUnit
+XML reports written by the tests, such as the reports of the Maven surefire and failsafe plugins,
+into the step results.
+
 Step Configuration
 ------------------
 
@@ -7,41 +12,204 @@ Step configuration expected as input to this step.
 Could come from either configuration file or
 from runtime configuration.
 
-| Configuration Key | Required? | Default | Description
-|-------------------|-----------|---------|-----------
-| `TODO`            | True      |         |
+| Configuration Key     | Required? | Default        | Description
+|-----------------------|-----------|----------------|-----------
+| `report-dirs`         | True      | see            | Directories to aggregate the JUnit XML
+                                      Description      reports in, those that do not exist are
+                                                       skipped, by default
+                                                       `['target/surefire-reports',
+                                                       'target/failsafe-reports']`
+| `report-file-pattern` | True      | `'TEST-*.xml'` | Glob pattern the names of the JUnit XML
+                                                       reports match
+| `max-parse-workers`   | False     | number of CPUs | Maximum number of processes to parse
+                                                       reports with
+| `max-slowest-tests`   | False     | `10`           | Number of the slowest tests to include in
+                                                       the results
+| `max-failed-tests`    | False     | `100`          | Maximum number of failed tests to include
+                                                       the details of in the results
+| `test-command`        | False     |                | Command to run the tests with, as a list
+                                                       of arguments, for instance `['mvn', 'test',
+                                                       '-Dtest={tests}']`, if not given the tests
+                                                       are expected to already have been run, see
+                                                       Notes for the `{reports-dir}` and `{shard}`
+                                                       placeholders
+| `shards`              | False     | `1`            | Number of shards to split the test classes
+                                                       into, see Notes
+| `shard-index`         | False     |                | Index of the only shard to run, for running
+                                                       each shard on a separate CI agent
+| `shard-plan-only`     | False     | `False`        | Whether to only plan the shards rather then
+                                                       run them
+| `max-parallel-shards` | False     | number of CPUs | Maximum number of shards to run at the
+                                                       same time
+| `test-source-dirs`    | False     | `['src/test/   | Test source roots to find the test classes
+                                      java']`          to shard in
+| `test-class-patterns` | False     | see            | Glob patterns the names of the test class
+                                      Description      source files match, by default the same as
+                                                       the surefire default includes
+| `timing-db-file`      | False     | see            | File to record how long each test class
+                                      Description      took to run in, see Notes, by default
+                                                       `unit-test/test-timings.json` in the
+                                                       working directory
+| `test-impact-base-ref`| False     |                | Branch, tag, or commit to find the changed
+                                                       files since, such as `origin/master`, to run
+                                                       only the affected test classes, see Notes
+| `repo-root`           | False     | `./`           | Directory path to the Git repo to find the
+                                                       changed files in
+| `main-source-dirs`    | False     | `['src/main/   | Source roots of the classes under test
+                                      java']`
+| `test-impact-ignore-  | False     | see            | Glob patterns of changed files that do not
+   patterns`                          Description      affect any tests, by default
+                                                       `['*.md', '*.adoc', '*.txt', 'docs/*',
+                                                       'LICENSE', '.gitignore']`
+| `test-impact-full-    | False     | `10`           | Number of runs of only the affected test
+   run-interval`                                       classes after which all of them are run
+| `test-impact-index-   | False     | see            | File to index the imports of the sources
+   file`                              Description      in, by default
+                                                       `unit-test/test-impact-index.json` in the
+                                                       working directory
 
 Expected Previous Step Results
 ------------------------------
 
 Results expected from previous steps that this step requires.
 
-| Step Name | Result Key | Description
-|-----------|------------|------------
-| `TODO`    | `TODO`     | TODO
+None.
 
 Results
 -------
 
 Results output by this step.
 
-| Result Key | Description
-|------------|------------
-| `TODO`     | TODO
+| Result Key      | Description
+|-----------------|------------
+| `report-files`  | Number of JUnit XML reports aggregated
+| `tests`         | Number of tests
+| `failures`      | Number of tests that failed
+| `errors`        | Number of tests that errored
+| `skipped`       | Number of tests that were skipped
+| `time`          | Total seconds spent running the tests
+| `slowest-tests` | An array of dictionaries with the `classname`, `name`, and `time` of the
+                    slowest tests, slowest first
+| `failed-tests`  | An array of dictionaries with the `classname`, `name`, `type` (`failure` or
+                    `error`), `message`, `details`, and `report-file` of the tests that failed
+                    or errored
+| `shards`        | An array of dictionaries with the `shard` index, `test-class-count`,
+                    `estimated-time`, `run-time`, `passed`, `log-file`, and `reports-dir`, or
+                    None if the `test-command` has no `{reports-dir}`, of each shard run, only
+                    when `test-command` is given
+| `shard-plan`    | An array of dictionaries with the `shard` index, `test-classes`, and
+                    `estimated-time` of each shard, only when `shard-plan-only` is `True`, in
+                    which case it is the only result other then `test-impact`
+| `test-impact`   | A dictionary with the `base-ref`, the number of `changed-files`, whether it
+                    was a `full-run`, the `full-run-reason`, and the `test-class-count` of test
+                    classes run, only when `test-impact-base-ref` is given
 
 
 **Example**
 
     'tssc-results': {
-        'TODO': {
-            'TODO': ''
+        'unit-test': {
+            'report-files': 2,
+            'tests': 3,
+            'failures': 1,
+            'errors': 0,
+            'skipped': 0,
+            'time': 1.5,
+            'slowest-tests': [
+                {'classname': 'com.example.AppTest', 'name': 'testSlow', 'time': 1.2},
+                ...
+            ],
+            'failed-tests': [
+                {
+                    'classname': 'com.example.AppTest',
+                    'name': 'testBroken',
+                    'type': 'failure',
+                    'message': 'expected:<1> but was:<2>',
+                    'details': 'java.lang.AssertionError: expected:<1> but was:<2> ...',
+                    'report-file': 'target/surefire-reports/TEST-com.example.AppTest.xml'
+                }
+            ]
         }
     }
+
+Notes
+-----
+Reports are parsed incrementally rather then loaded whole, so the memory used to parse a report
+does not grow with the size of the report, and reports are parsed in parallel across a pool of
+processes, see `tssc.step_implementers.utils.junit`.
+
+Every run records how long each test class in the JUnit XML reports took to run in the
+`timing-db-file`. When `shards` is more then `1` the test classes found in the `test-source-dirs`
+are split into that many shards with about the same total recorded duration, and the
+`{tests}` argument of the `test-command` is replaced with the comma separated names of the test
+classes of each shard. The shards are run at the same time, up to `max-parallel-shards`, and the
+reports they all write are aggregated into the results. To instead run the shards on separate
+CI agents, run this step with `shard-plan-only` to get the plan, and then on each agent with the
+`shard-index` of the shard to run. The `timing-db-file` must be the same on each agent for the
+plans to match.
+
+Shards run at the same time must not share a build output directory, such as Maven's `target`,
+or write their reports to the same directory. The `{reports-dir}` argument of the `test-command`
+is replaced with a directory of each shard's own in the working directory of this step, which is
+emptied before the shard is run, for instance
+`['mvn', 'test', '-Dtest={tests}', '-Dsurefire.reportsDirectory={reports-dir}']`, and when the
+`test-command` has a `{reports-dir}` argument only the reports in those directories are
+aggregated rather then those in the `report-dirs`. The `{shard}` argument of the `test-command`
+is replaced with the shard index, for giving each shard a build output directory of its own.
+
+When the tests are run by this step only the reports written since the `test-command` was first
+run are aggregated, so the reports left in the `report-dirs` by previous runs, such as the
+reports of test classes not affected by the changed files, are not.
+
+When `test-impact-base-ref` is given only the test classes affected by the files changed since
+the merge base of that ref and the head are run, see
+`tssc.step_implementers.utils.impact_analysis`. A test class is affected by a change to any
+source in the `main-source-dirs` or `test-source-dirs` it depends on, directly or through other
+sources, going by the imports of the sources. All of the test classes are run when a changed file
+is not such a source and not ignored by the `test-impact-ignore-patterns`, when the changed files
+can not be found, and every `test-impact-full-run-interval` runs, to catch what the imports do
+not show, such as reflection.
+
+When all of the tests are run without sharding, arguments of the `test-command` containing
+`{tests}` are left out so the whole test suite is run.
 """
 
+import concurrent.futures
+import math
+import os
+import shutil
+import time
+import sh
 from tssc import TSSCFactory
 from tssc import StepImplementer
 from tssc import DefaultSteps
+from tssc.step_implementers.utils.git import find_changed_files
+from tssc.step_implementers.utils.impact_analysis import DEFAULT_FULL_RUN_INTERVAL, \
+    DEFAULT_IGNORE_PATTERNS, ImpactIndex
+from tssc.step_implementers.utils.sharding import DEFAULT_TEST_CLASS_PATTERNS, TimingDatabase, \
+    discover_test_classes, plan_shards
+from tssc.trace import SUBPROCESS_CATEGORY
+from tssc.step_implementers.utils.junit import DEFAULT_MAX_FAILED_TESTS, \
+    DEFAULT_MAX_SLOWEST_TESTS, DEFAULT_REPORT_FILE_PATTERN, aggregate_junit_reports, \
+    find_junit_reports
+
+DEFAULT_CONFIG = {
+    'report-dirs': ['target/surefire-reports', 'target/failsafe-reports'],
+    'report-file-pattern': DEFAULT_REPORT_FILE_PATTERN
+}
+
+REQUIRED_CONFIG_KEYS = [
+    'report-dirs',
+    'report-file-pattern'
+]
+
+DEFAULT_TEST_SOURCE_DIRS = ['src/test/java']
+DEFAULT_MAIN_SOURCE_DIRS = ['src/main/java']
+TESTS_PLACEHOLDER = '{tests}'
+REPORTS_DIR_PLACEHOLDER = '{reports-dir}'
+SHARD_PLACEHOLDER = '{shard}'
+TIMING_DB_FILE_NAME = 'test-timings.json'
+IMPACT_INDEX_FILE_NAME = 'test-impact-index.json'
 
 class JUnit(StepImplementer):
     """
@@ -74,7 +242,7 @@ class JUnit(StepImplementer):
         dict
             Default values to use for step configuration values.
         """
-        return {}
+        return DEFAULT_CONFIG
 
     @staticmethod
     def required_runtime_step_config_keys():
@@ -90,7 +258,51 @@ class JUnit(StepImplementer):
         array_list
             Array of configuration keys that are required before running the step.
         """
-        return []
+        return REQUIRED_CONFIG_KEYS
+
+    def _validate_runtime_step_config(self, runtime_step_config):
+        """
+        Validates the given `runtime_step_config` against the required step configuration keys.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+
+        Raises
+        ------
+        AssertionError
+            If the given `runtime_step_config` is not valid with a message as to why.
+        """
+        super()._validate_runtime_step_config(runtime_step_config) #pylint: disable=protected-access
+
+        # NOTE: values given with --step-config are always strings
+        shards = runtime_step_config.get('shards', 1)
+        assert JUnit.__is_int(shards) and int(shards) >= 1, \
+            'Shards ({shards}) must be a positive integer'.format(shards=shards)
+
+        shard_index = runtime_step_config.get('shard-index')
+        assert shard_index is None or \
+            (JUnit.__is_int(shard_index) and 0 <= int(shard_index) < int(shards)), \
+            'Shard index ({shard_index}) must be from 0 to one less then shards ({shards})'.format(
+                shard_index=shard_index,
+                shards=shards)
+
+        max_parallel_shards = runtime_step_config.get('max-parallel-shards')
+        assert max_parallel_shards is None or \
+            (JUnit.__is_int(max_parallel_shards) and int(max_parallel_shards) >= 1), \
+            'Max parallel shards ({max_parallel_shards}) must be a positive integer'.format(
+                max_parallel_shards=max_parallel_shards)
+
+        test_command = JUnit.__test_command(runtime_step_config)
+        if test_command and (JUnit.__is_sharded(runtime_step_config) or
+                             runtime_step_config.get('test-impact-base-ref')):
+            assert any(TESTS_PLACEHOLDER in arg for arg in test_command), \
+                'Test command ({test_command}) must have a {placeholder} argument ' \
+                'to run shards or only the affected tests'.format(
+                    test_command=test_command,
+                    placeholder=TESTS_PLACEHOLDER)
 
     def _run_step(self, runtime_step_config):
         """
@@ -107,8 +319,347 @@ class JUnit(StepImplementer):
         dict
             Results of running this step.
         """
-        results = {}
+        timing_db = TimingDatabase(runtime_step_config.get(
+            'timing-db-file',
+            os.path.join(self.work_dir_path, self.step_name(), TIMING_DB_FILE_NAME)))
+
+        # None to run all of the test classes
+        test_classes = None
+        impact_index = None
+        impact_results = None
+        if runtime_step_config.get('test-impact-base-ref'):
+            with self.trace_span('select-affected-tests'):
+                impact_index, test_classes, impact_results = self.__select_affected_tests(
+                    runtime_step_config,
+                    JUnit.__discover_test_classes(runtime_step_config))
+
+        shard_plan = None
+        if JUnit.__is_sharded(runtime_step_config):
+            with self.trace_span('plan-test-shards'):
+                if test_classes is None:
+                    test_classes = JUnit.__discover_test_classes(runtime_step_config)
+                shard_plan = plan_shards(
+                    test_classes,
+                    timing_db.durations,
+                    int(runtime_step_config.get('shards', 1)))
+
+            if JUnit.__is_shard_plan_only(runtime_step_config):
+                results = {
+                    'shard-plan': shard_plan
+                }
+                if impact_results is not None:
+                    results['test-impact'] = impact_results
+                return results
+
+            if runtime_step_config.get('shard-index') is not None:
+                shard_plan = [shard_plan[int(runtime_step_config['shard-index'])]]
+
+        shard_results = None
+        run_start_time = None
+        test_command = JUnit.__test_command(runtime_step_config)
+        if test_command:
+            # whole seconds for file systems that only record the modification time in seconds
+            run_start_time = math.floor(time.time())
+            shard_results = self.__run_test_shards(
+                runtime_step_config,
+                test_command,
+                shard_plan or [{'shard': 0, 'test-classes': test_classes, 'estimated-time': None}])
+
+            if impact_index is not None:
+                impact_index.record_run(impact_results['full-run'])
+
+        with self.trace_span('find-junit-reports'):
+            report_files = find_junit_reports(
+                JUnit.__report_dirs(runtime_step_config, shard_results),
+                runtime_step_config['report-file-pattern'],
+                modified_since=run_start_time)
+
+        with self.trace_span('aggregate-junit-reports', report_files=len(report_files)):
+            results = aggregate_junit_reports(
+                report_files,
+                max_workers=runtime_step_config.get('max-parse-workers'),
+                max_slowest_tests=runtime_step_config.get(
+                    'max-slowest-tests', DEFAULT_MAX_SLOWEST_TESTS),
+                max_failed_tests=runtime_step_config.get(
+                    'max-failed-tests', DEFAULT_MAX_FAILED_TESTS))
+
+        test_class_times = results.pop('test-class-times')
+        if test_class_times:
+            timing_db.update(test_class_times)
+
+        if impact_results is not None:
+            results['test-impact'] = impact_results
+
+        if shard_results is not None:
+            results['shards'] = shard_results
+            failed_shards = [
+                shard_result for shard_result in shard_results if not shard_result['passed']
+            ]
+            if failed_shards:
+                raise RuntimeError('Error running tests, see: ' + ', '.join(
+                    shard_result['log-file'] for shard_result in failed_shards))
+
         return results
 
+    def __select_affected_tests(self, runtime_step_config, test_classes):
+        """
+        Selects the given test classes affected by the files changed since the
+        `test-impact-base-ref`.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+        test_classes : list
+            Fully qualified names of all of the test classes.
+
+        Returns
+        -------
+        tuple
+            (index of the imports of the sources, to record the run in, sorted names of the
+            affected test classes, or None if all of the test classes are to be run,
+            the `test-impact` results)
+        """
+        base_ref = runtime_step_config['test-impact-base-ref']
+        repo_root = runtime_step_config.get('repo-root', './')
+        full_run_interval = runtime_step_config.get(
+            'test-impact-full-run-interval', DEFAULT_FULL_RUN_INTERVAL)
+
+        impact_index = ImpactIndex(runtime_step_config.get(
+            'test-impact-index-file',
+            os.path.join(self.work_dir_path, self.step_name(), IMPACT_INDEX_FILE_NAME)))
+        impact_index.update(
+            repo_root,
+            runtime_step_config.get('main-source-dirs', DEFAULT_MAIN_SOURCE_DIRS) +
+            runtime_step_config.get('test-source-dirs', DEFAULT_TEST_SOURCE_DIRS))
+
+        changed_files = None
+        affected_test_classes = None
+        try:
+            changed_files = find_changed_files(repo_root, base_ref)
+        except Exception as error: # pylint: disable=broad-except
+            full_run_reason = 'could not find the files changed since {base_ref}: {error}'.format(
+                base_ref=base_ref,
+                error=str(error).strip())
+        else:
+            if impact_index.runs_since_full_run >= full_run_interval:
+                full_run_reason = 'all tests are run after {interval} runs of only the ' \
+                    'affected tests'.format(interval=full_run_interval)
+            else:
+                affected_test_classes, full_run_reason = impact_index.select_tests(
+                    test_classes,
+                    changed_files,
+                    runtime_step_config.get(
+                        'test-impact-ignore-patterns', DEFAULT_IGNORE_PATTERNS))
+
+        print('Running {count} of {total} test classes{reason}'.format(
+            count=len(test_classes if affected_test_classes is None else affected_test_classes),
+            total=len(test_classes),
+            reason='' if full_run_reason is None else ', ' + full_run_reason))
+
+        return impact_index, affected_test_classes, {
+            'base-ref': base_ref,
+            'changed-files': None if changed_files is None else len(changed_files),
+            'full-run': affected_test_classes is None,
+            'full-run-reason': full_run_reason,
+            'test-class-count': len(
+                test_classes if affected_test_classes is None else affected_test_classes)
+        }
+
+    def __run_test_shards(self, runtime_step_config, test_command, shard_plan):
+        """
+        Runs the test command for each of the given shards at the same time, up to
+        `max-parallel-shards`.
+
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+        test_command : list
+            Arguments of the command to run the tests with.
+        shard_plan : list
+            Shards to run, see `tssc.step_implementers.utils.sharding.plan_shards`, with
+            `test-classes` of None to run the whole test suite.
+
+        Returns
+        -------
+        list
+            The `shard` index, `test-class-count`, `estimated-time`, `run-time`, `passed`,
+            `log-file`, and `reports-dir` of each of the given shards.
+        """
+        max_parallel_shards = int(
+            runtime_step_config.get('max-parallel-shards') or os.cpu_count() or 1)
+        with self.trace_span('run-test-shards', shards=len(shard_plan)):
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max(1, min(len(shard_plan), max_parallel_shards))) as executor:
+                shard_runs = [
+                    executor.submit(self.__run_test_shard, test_command, shard)
+                    for shard in shard_plan
+                ]
+                return [shard_run.result() for shard_run in shard_runs]
+
+    def __run_test_shard(self, test_command, shard):
+        """
+        Runs the test command for the given shard, writing its output to a log file in the
+        working directory of this step.
+
+        Parameters
+        ----------
+        test_command : list
+            Arguments of the command to run the tests with.
+        shard : dict
+            Shard to run, see `tssc.step_implementers.utils.sharding.plan_shards`, with
+            `test-classes` of None to run the whole test suite.
+
+        Returns
+        -------
+        dict
+            The `shard` index, `test-class-count`, `estimated-time`, `run-time`, `passed`,
+            `log-file`, and `reports-dir` of the given shard.
+        """
+        test_classes = shard['test-classes']
+        shard_name = 'test-shard-' + str(shard['shard'])
+        shard_result = {
+            'shard': shard['shard'],
+            'test-class-count': None if test_classes is None else len(test_classes),
+            'estimated-time': shard['estimated-time'],
+            'run-time': 0.0,
+            'passed': True,
+            'log-file': self.write_temp_file(shard_name + '.log', b''),
+            'reports-dir': None
+        }
+
+        # reports of a previous run must not be aggregated with the reports of this run
+        if any(REPORTS_DIR_PLACEHOLDER in arg for arg in test_command):
+            shard_result['reports-dir'] = os.path.join(
+                os.path.dirname(shard_result['log-file']), shard_name + '-reports')
+            shutil.rmtree(shard_result['reports-dir'], ignore_errors=True)
+            os.makedirs(shard_result['reports-dir'])
+
+        # more shards then test classes, or no affected test classes
+        if test_classes == []:
+            return shard_result
+
+        if test_classes is None:
+            args = [arg for arg in test_command if TESTS_PLACEHOLDER not in arg]
+        else:
+            args = [arg.replace(TESTS_PLACEHOLDER, ','.join(test_classes)) for arg in test_command]
+        args = [
+            arg.replace(SHARD_PLACEHOLDER, str(shard['shard'])).replace(
+                REPORTS_DIR_PLACEHOLDER, shard_result['reports-dir'] or '')
+            for arg in args
+        ]
+
+        start_time = time.perf_counter()
+        with open(shard_result['log-file'], 'w') as log_file:
+            try:
+                with self.trace_span(
+                        'test shard ' + str(shard['shard']), SUBPROCESS_CATEGORY):
+                    sh.Command(args[0])(
+                        *args[1:],
+                        _out=log_file,
+                        _err_to_out=True
+                    )
+            except sh.ErrorReturnCode:  # pylint: disable=undefined-variable
+                shard_result['passed'] = False
+        shard_result['run-time'] = round(time.perf_counter() - start_time, 3)
+
+        print('Test shard {shard} {status} in {run_time}s, see: {log_file}'.format(
+            shard=shard['shard'],
+            status='passed' if shard_result['passed'] else 'failed',
+            run_time=shard_result['run-time'],
+            log_file=shard_result['log-file']))
+
+        return shard_result
+
+    @staticmethod
+    def __report_dirs(runtime_step_config, shard_results):
+        """
+        Parameters
+        ----------
+        runtime_step_config : dict
+            Step configuration to use when the StepImplementer runs the step with all of the
+            various static, runtime, defaults, and environment configuration munged together.
+        shard_results : list
+            Results of the shards run by this step, or None if the tests were not run by
+            this step.
+
+        Returns
+        -------
+        list
+            Directories to aggregate the reports in, the `reports-dir` of each of the given
+            shards if they have one, otherwise the `report-dirs`.
+        """
+        if shard_results and all(shard_result['reports-dir'] for shard_result in shard_results):
+            return [shard_result['reports-dir'] for shard_result in shard_results]
+
+        report_dirs = runtime_step_config['report-dirs']
+        if isinstance(report_dirs, str):
+            report_dirs = [report_dirs]
+        return report_dirs
+
+    @staticmethod
+    def __test_command(runtime_step_config):
+        """
+        Returns
+        -------
+        list
+            Arguments of the configured command to run the tests with, or None if the tests are
+            not run by this step.
+        """
+        test_command = runtime_step_config.get('test-command')
+        if isinstance(test_command, str):
+            test_command = test_command.split()
+        return test_command or None
+
+    @staticmethod
+    def __discover_test_classes(runtime_step_config):
+        """
+        Returns
+        -------
+        list
+            Fully qualified names of all of the test classes in the `test-source-dirs`.
+        """
+        return discover_test_classes(
+            runtime_step_config.get('test-source-dirs', DEFAULT_TEST_SOURCE_DIRS),
+            runtime_step_config.get('test-class-patterns', DEFAULT_TEST_CLASS_PATTERNS))
+
+    @staticmethod
+    def __is_sharded(runtime_step_config):
+        """
+        Returns
+        -------
+        bool
+            True if the test classes are to be split into shards, False otherwise.
+        """
+        return int(runtime_step_config.get('shards', 1)) > 1 or \
+            runtime_step_config.get('shard-index') is not None or \
+            JUnit.__is_shard_plan_only(runtime_step_config)
+
+    @staticmethod
+    def __is_shard_plan_only(runtime_step_config):
+        """
+        Returns
+        -------
+        bool
+            True if the shards are only to be planned rather then run, False otherwise.
+        """
+        return str(runtime_step_config.get('shard-plan-only', False)).lower() == 'true'
+
+    @staticmethod
+    def __is_int(value):
+        """
+        Returns
+        -------
+        bool
+            True if the given config value, which may be a string, is an integer, False otherwise.
+        """
+        try:
+            return int(value) == float(value)
+        except (TypeError, ValueError):
+            return False
+
 # register step implementer
 TSSCFactory.register_step_implementer(JUnit)
@@ -5,5 +5,12 @@ Shared utitlities used by more then one StepImplementer.
 from .xml import *
 
 __all__ = [
-    'xml'
+    'build_context',
+    'cucumber',
+    'impact_analysis',
+    'junit',
+    'sharding',
+    'xml',
+    'maven',
+    'maven_repository'
 ]
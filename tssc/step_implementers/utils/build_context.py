@@ -0,0 +1,247 @@
+"""
+Shared utils for steps that build container images from a build context.
+"""
+
+import concurrent.futures
+import hashlib
+import os
+import posixpath
+import re
+import stat
+
+from tssc.step_cache import hash_file
+
+DOCKERIGNORE_FILE_NAME = '.dockerignore'
+DEFAULT_MAX_HASH_WORKERS = 16
+
+class DockerIgnore:
+    """
+    Patterns of the paths in a build context that are not sent to the container image build,
+    with the same semantics as a `.dockerignore` file.
+
+    Each pattern is matched against the path of a file, relative to the root of the build
+    context, and against each of the directories that file is in. `*` matches any sequence of
+    characters other then `/`, `?` matches any single character other then `/`, `**` matches
+    any number of directories, and `[...]` matches a character class. Patterns starting with
+    `!` re-include paths excluded by earlier patterns, and the last pattern matching a path
+    decides if it is ignored.
+
+    Parameters
+    ----------
+    patterns : list
+        Lines of a `.dockerignore` file, blank lines and `#` comments are skipped.
+    """
+
+    def __init__(self, patterns):
+        self.__patterns = []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith('#'):
+                continue
+
+            negated = pattern.startswith('!')
+            if negated:
+                pattern = pattern[1:].strip()
+
+            pattern = posixpath.normpath(pattern).lstrip('/')
+            if not pattern:
+                continue
+            self.__patterns.append((negated, _translate_pattern(pattern)))
+
+    @staticmethod
+    def from_context(context):
+        """
+        Reads the `.dockerignore` file of the given build context.
+
+        Parameters
+        ----------
+        context : str
+            Path to the root of the build context.
+
+        Returns
+        -------
+        DockerIgnore
+            Patterns of the `.dockerignore` file of the given build context, or no patterns if
+            it does not have one.
+        """
+        try:
+            with open(os.path.join(context, DOCKERIGNORE_FILE_NAME), 'r') as dockerignore_file:
+                return DockerIgnore(dockerignore_file.read().splitlines())
+        except FileNotFoundError:
+            return DockerIgnore([])
+
+    @property
+    def has_negated_patterns(self):
+        """
+        Returns
+        -------
+        bool
+            True if any of the patterns re-include paths, in which case paths in ignored
+            directories may still be included, False otherwise.
+        """
+        return any(negated for negated, _ in self.__patterns)
+
+    def is_ignored(self, relative_path):
+        """
+        Parameters
+        ----------
+        relative_path : str
+            `/` separated path relative to the root of the build context.
+
+        Returns
+        -------
+        bool
+            True if the given path is not sent to the container image build, False otherwise.
+        """
+        path_parts = relative_path.split('/')
+        paths = ['/'.join(path_parts[:index]) for index in range(1, len(path_parts) + 1)]
+
+        ignored = False
+        for negated, pattern in self.__patterns:
+            if any(pattern.match(path) for path in paths):
+                ignored = not negated
+
+        return ignored
+
+def get_build_context_files(context, docker_ignore=None, exclude_paths=None):
+    """
+    Gets the files in the given build context that are sent to the container image build.
+
+    Parameters
+    ----------
+    context : str
+        Path to the root of the build context.
+    docker_ignore : DockerIgnore, optional
+        Patterns of the paths to leave out of the build context,
+        by default the `.dockerignore` file of the build context.
+    exclude_paths : list, optional
+        Paths to files or directories in the build context to also leave out.
+
+    Returns
+    -------
+    list
+        Sorted `/` separated paths, relative to the root of the build context, of the files
+        in the build context.
+    """
+    if docker_ignore is None:
+        docker_ignore = DockerIgnore.from_context(context)
+    exclude_paths = {os.path.abspath(exclude_path) for exclude_path in exclude_paths or []}
+    prune_ignored_dirs = not docker_ignore.has_negated_patterns
+
+    context_files = []
+    for dir_path, dir_names, file_names in os.walk(context):
+        relative_dir_path = os.path.relpath(dir_path, context)
+        relative_dir_path = '' if relative_dir_path == '.' else \
+            relative_dir_path.replace(os.sep, '/') + '/'
+
+        dir_names[:] = [
+            dir_name for dir_name in dir_names
+            if os.path.abspath(os.path.join(dir_path, dir_name)) not in exclude_paths and not (
+                prune_ignored_dirs and docker_ignore.is_ignored(relative_dir_path + dir_name))
+        ]
+
+        for file_name in file_names:
+            if os.path.abspath(os.path.join(dir_path, file_name)) in exclude_paths or \
+                    docker_ignore.is_ignored(relative_dir_path + file_name):
+                continue
+            context_files.append(relative_dir_path + file_name)
+
+    return sorted(context_files)
+
+def hash_build_context(
+        context,
+        image_spec_file,
+        exclude_paths=None,
+        max_workers=DEFAULT_MAX_HASH_WORKERS):
+    """
+    Fingerprints a container image build context.
+
+    The fingerprint is the hash of the image specification file, the `.dockerignore` file, and
+    the relative path, executable bit, and content of every file in the build context that is
+    not ignored by the `.dockerignore` file, with the files hashed in parallel, so it only
+    changes if what the container image build would be given changes.
+
+    Parameters
+    ----------
+    context : str
+        Path to the root of the build context.
+    image_spec_file : str
+        Path to the file defining the container image.
+    exclude_paths : list, optional
+        Paths to files or directories in the build context to leave out of the fingerprint,
+        such as files written by the build itself.
+    max_workers : int, optional
+        Maximum number of files to hash at the same time.
+
+    Returns
+    -------
+    str
+        Hex sha256 digest fingerprinting the given build context.
+    """
+    context_files = get_build_context_files(context, exclude_paths=exclude_paths)
+
+    def hash_context_file(context_file):
+        file_path = os.path.join(context, *context_file.split('/'))
+        file_mode = os.stat(file_path).st_mode
+        return bool(file_mode & stat.S_IXUSR), hash_file(file_path)
+
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, min(len(context_files), max_workers))) as executor:
+        context_file_hashes = list(executor.map(hash_context_file, context_files))
+
+    context_hash = hashlib.sha256()
+    for special_file in [image_spec_file, os.path.join(context, DOCKERIGNORE_FILE_NAME)]:
+        context_hash.update(
+            (hash_file(special_file) if os.path.isfile(special_file) else '').encode('ascii'))
+        context_hash.update(b'\0')
+
+    for context_file, (executable, file_hash) in zip(context_files, context_file_hashes):
+        context_hash.update(context_file.encode('utf-8'))
+        context_hash.update(b'\0')
+        context_hash.update(b'x' if executable else b'-')
+        context_hash.update(file_hash.encode('ascii'))
+        context_hash.update(b'\0')
+
+    return context_hash.hexdigest()
+
+def _translate_pattern(pattern):
+    """
+    Parameters
+    ----------
+    pattern : str
+        `.dockerignore` pattern, without a leading `!` or `/`.
+
+    Returns
+    -------
+    re.Pattern
+        Regular expression matching the same `/` separated paths as the given pattern.
+    """
+    regex = ''
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith('**/', index):
+            regex += '(.*/)?'
+            index += 2
+        elif pattern.startswith('**', index):
+            regex += '.*'
+            index += 1
+        elif char == '*':
+            regex += '[^/]*'
+        elif char == '?':
+            regex += '[^/]'
+        elif char == '[' and pattern.find(']', index + 1) != -1:
+            class_end = pattern.find(']', index + 1)
+            char_class = pattern[index + 1:class_end].replace('\\', '\\\\')
+            if char_class.startswith('!'):
+                char_class = '^' + char_class[1:]
+            regex += '[' + char_class + ']'
+            index = class_end
+        elif char == '\\' and index + 1 < len(pattern):
+            index += 1
+            regex += re.escape(pattern[index])
+        else:
+            regex += re.escape(char)
+        index += 1
+
+    return re.compile(regex + r'\Z')
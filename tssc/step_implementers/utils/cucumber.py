@@ -0,0 +1,289 @@
+"""
+Shared utils for steps that deal with Cucumber feature files and Cucumber JSON reports.
+
+Reports are parsed incrementally, decoding one feature of the top level JSON array at a time,
+so the memory used to parse a report grows with the size of its largest feature rather then
+the size of the report.
+"""
+
+import json
+import os
+import re
+
+FEATURE_FILE_EXTENSION = '.feature'
+DEFAULT_MAX_FAILED_SCENARIOS = 100
+MAX_ERROR_MESSAGE_LENGTH = 2000
+
+# cucumber reports durations in nanoseconds
+_NANOSECONDS_PER_SECOND = 1000000000
+
+_READ_SIZE = 64 * 1024
+_SCENARIO_PATTERN = re.compile(
+    r'^\s*(Scenario|Scenario Outline|Scenario Template|Example)\s*:', re.IGNORECASE)
+_FILE_URI_PREFIX = 'file:'
+_PASSED_STATUS = 'passed'
+_FAILED_STATUS = 'failed'
+
+def find_feature_files(features_dirs):
+    """
+    Finds the feature files in the given directories.
+
+    Parameters
+    ----------
+    features_dirs : list
+        Paths to the directories to find the feature files in, and in all of the directories
+        in them. Directories that do not exist are skipped.
+
+    Returns
+    -------
+    list
+        Sorted paths to the feature files.
+    """
+    feature_files = []
+    for features_dir in features_dirs:
+        for dir_path, _, file_names in os.walk(features_dir):
+            feature_files += [
+                os.path.join(dir_path, file_name)
+                for file_name in file_names if file_name.endswith(FEATURE_FILE_EXTENSION)
+            ]
+
+    return sorted(feature_files)
+
+def find_scenarios(feature_file):
+    """
+    Finds the scenarios of the given feature file.
+
+    Parameters
+    ----------
+    feature_file : str
+        Path to the feature file to find the scenarios of.
+
+    Returns
+    -------
+    list
+        Locations, `{feature file}:{line}`, of the scenarios and scenario outlines of the
+        given feature file, which cucumber accepts in place of a feature file to run only
+        that scenario.
+    """
+    with open(feature_file, 'r', errors='replace') as feature:
+        return [
+            '{feature_file}:{line}'.format(feature_file=feature_file, line=line_number)
+            for line_number, line in enumerate(feature, start=1)
+            if _SCENARIO_PATTERN.match(line)
+        ]
+
+def iter_json_array(report_file):
+    """
+    Decodes the elements of the top level JSON array of the given file one at a time.
+
+    Parameters
+    ----------
+    report_file : str
+        Path to the JSON file to decode.
+
+    Raises
+    ------
+    ValueError
+        If the given file is not a well formed JSON array.
+
+    Yields
+    ------
+    object
+        Each of the decoded elements of the array.
+    """
+    decoder = json.JSONDecoder()
+    with open(report_file, 'r') as report:
+        buffer = report.read(_READ_SIZE).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError('Expected a JSON array')
+        position = 1
+        end_of_file = False
+
+        while True:
+            while position < len(buffer) and \
+                    (buffer[position].isspace() or buffer[position] == ','):
+                position += 1
+
+            if position < len(buffer) and buffer[position] == ']':
+                return
+
+            try:
+                if position == len(buffer):
+                    raise json.JSONDecodeError('Expecting value', buffer, position)
+                element, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if end_of_file:
+                    raise
+
+                # read at least as much again as is buffered, so large elements are not decoded
+                # over and over again
+                buffer = buffer[position:]
+                position = 0
+                more = report.read(max(_READ_SIZE, len(buffer)))
+                end_of_file = not more
+                buffer += more
+                continue
+
+            yield element
+
+def parse_cucumber_report(report_file, max_failed_scenarios=DEFAULT_MAX_FAILED_SCENARIOS):
+    """
+    Summarizes the scenarios of the given Cucumber JSON report.
+
+    Parameters
+    ----------
+    report_file : str
+        Path to the Cucumber JSON report to summarize.
+    max_failed_scenarios : int, optional
+        Maximum number of failed scenarios to include the failure details of.
+
+    Raises
+    ------
+    ValueError
+        If the given report is not a well formed JSON array.
+
+    Returns
+    -------
+    dict
+        Summary of the given report with the keys
+
+        * `report-files` - number of reports summarized
+        * `scenarios` - number of scenarios
+        * `passed` - number of scenarios that passed
+        * `failed` - number of scenarios that failed
+        * `skipped` - number of scenarios that neither passed nor failed, such as scenarios
+          with pending or undefined steps
+        * `time` - total seconds spent running the scenarios
+        * `failed-scenarios` - `feature`, `name`, `location`, `step`, and `message` of the
+          scenarios that failed, in the order of the reports
+        * `failed-locations` - locations of all of the scenarios that failed,
+          see `find_scenarios`
+    """
+    summary = empty_cucumber_summary()
+    try:
+        for feature in iter_json_array(report_file):
+            uri = feature.get('uri', '')
+            if uri.startswith(_FILE_URI_PREFIX):
+                uri = uri[len(_FILE_URI_PREFIX):]
+
+            background = None
+            for element in feature.get('elements', []):
+                # the steps of a background run before, and are reported apart from, each of
+                # the scenarios after it
+                if element.get('type') == 'background':
+                    background = element
+                    continue
+
+                scenario = _summarize_scenario(feature, uri, element, background)
+                summary['scenarios'] += 1
+                summary[scenario['result']] += 1
+                summary['time'] += scenario['time']
+                failure = scenario['failure']
+                if failure is not None:
+                    summary['failed-locations'].append(failure['location'])
+                    if len(summary['failed-scenarios']) < max_failed_scenarios:
+                        summary['failed-scenarios'].append(failure)
+    except (ValueError, AttributeError) as error:
+        raise ValueError(
+            'Error parsing Cucumber report ({report_file}): {error}'.format(
+                report_file=report_file,
+                error=error))
+
+    summary['report-files'] = 1
+    summary['time'] = round(summary['time'], 3)
+    return summary
+
+def merge_cucumber_summaries(summaries, max_failed_scenarios=DEFAULT_MAX_FAILED_SCENARIOS):
+    """
+    Merges summaries of Cucumber JSON reports into one summary.
+
+    Parameters
+    ----------
+    summaries : list
+        Summaries to merge, see `parse_cucumber_report`.
+    max_failed_scenarios : int, optional
+        Maximum number of failed scenarios to include the failure details of.
+
+    Returns
+    -------
+    dict
+        Summary of all of the given summaries.
+    """
+    merged_summary = empty_cucumber_summary()
+    for summary in summaries:
+        for count_key in ['report-files', 'scenarios', 'passed', 'failed', 'skipped', 'time']:
+            merged_summary[count_key] += summary[count_key]
+        merged_summary['failed-scenarios'] += summary['failed-scenarios'][
+            :max_failed_scenarios - len(merged_summary['failed-scenarios'])]
+        merged_summary['failed-locations'] += summary['failed-locations']
+
+    merged_summary['time'] = round(merged_summary['time'], 3)
+    return merged_summary
+
+def empty_cucumber_summary():
+    """
+    Returns
+    -------
+    dict
+        Summary of no scenarios, see `parse_cucumber_report`.
+    """
+    return {
+        'report-files': 0,
+        'scenarios': 0,
+        'passed': 0,
+        'failed': 0,
+        'skipped': 0,
+        'time': 0.0,
+        'failed-scenarios': [],
+        'failed-locations': []
+    }
+
+def _summarize_scenario(feature, uri, scenario, background):
+    """
+    Parameters
+    ----------
+    feature : dict
+        Decoded feature the scenario is in.
+    uri : str
+        Path to the feature file of the feature.
+    scenario : dict
+        Decoded scenario to summarize.
+    background : dict
+        Decoded background of the feature that ran before the scenario, or None.
+
+    Returns
+    -------
+    dict
+        The `time`, `result` (the summary count the scenario adds to), and the `failure`
+        details if it failed, of the scenario.
+    """
+    steps = [
+        step for step in
+        scenario.get('before', []) + (background or {}).get('steps', []) +
+        scenario.get('steps', []) + scenario.get('after', [])
+        if isinstance(step, dict)
+    ]
+
+    summary = {
+        'time': 0.0,
+        'result': _PASSED_STATUS if steps else 'skipped',
+        'failure': None
+    }
+    for step in steps:
+        result = step.get('result', {})
+        summary['time'] += (result.get('duration') or 0) / _NANOSECONDS_PER_SECOND
+
+        status = result.get('status')
+        if status == _FAILED_STATUS and summary['failure'] is None:
+            summary['result'] = _FAILED_STATUS
+            summary['failure'] = {
+                'feature': feature.get('name', ''),
+                'name': scenario.get('name', ''),
+                'location': '{uri}:{line}'.format(uri=uri, line=scenario.get('line', 0)),
+                'step': (step.get('keyword', '') + step.get('name', '')).strip(),
+                'message': (result.get('error_message') or '').strip()[:MAX_ERROR_MESSAGE_LENGTH]
+            }
+        elif status != _PASSED_STATUS and summary['result'] == _PASSED_STATUS:
+            summary['result'] = 'skipped'
+
+    return summary
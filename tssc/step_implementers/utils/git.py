@@ -0,0 +1,168 @@
+"""
+Shared utils for steps that deal with Git repositories.
+"""
+
+import os.path
+import re
+
+_OBJECT_NAME_PATTERN = re.compile(r'^[0-9a-f]{40}([0-9a-f]{24})?$')
+_SYMBOLIC_REF_PREFIX = 'ref: '
+_GIT_DIR_PREFIX = 'gitdir: '
+_BRANCH_REF_PREFIX = 'refs/heads/'
+
+# maximum depth of symbolic refs to other symbolic refs that are followed
+_MAX_SYMBOLIC_REF_DEPTH = 5
+
+def read_git_head(repo_root):
+    """
+    Reads the branch and commit checked out in the given Git repository directly from the files
+    in the `.git` directory, which is much faster than importing gitpython and creating a `Repo`.
+
+    Supports `.git` directories, `.git` files pointing to the Git directory as used by worktrees
+    and submodules, loose refs, and `packed-refs`.
+
+    Parameters
+    ----------
+    repo_root : str
+        Path to the root of the working tree of the Git repository.
+
+    Returns
+    -------
+    tuple
+        (branch name, or None if the head is detached, commit hash, or None if the branch has no
+        commits) checked out in the given Git repository, or None if the repository has a
+        layout that is not supported, or is not a Git repository, in which case the caller
+        should fall back to gitpython.
+    """
+    git_dir = _find_git_dir(repo_root)
+    if git_dir is None:
+        return None
+
+    common_dir = git_dir
+    commondir_file_content = _read_file(os.path.join(git_dir, 'commondir'))
+    if commondir_file_content is not None:
+        common_dir = os.path.normpath(os.path.join(git_dir, commondir_file_content))
+
+    head = _read_file(os.path.join(git_dir, 'HEAD'))
+    if head is None:
+        return None
+
+    if _OBJECT_NAME_PATTERN.match(head):
+        return None, head
+
+    if not head.startswith(_SYMBOLIC_REF_PREFIX):
+        return None
+
+    branch_ref = head[len(_SYMBOLIC_REF_PREFIX):].strip()
+    if not branch_ref.startswith(_BRANCH_REF_PREFIX):
+        return None
+
+    ref = branch_ref
+    for _ in range(_MAX_SYMBOLIC_REF_DEPTH):
+        ref_value = _read_ref(git_dir, common_dir, ref)
+        if ref_value is None or _OBJECT_NAME_PATTERN.match(ref_value):
+            return branch_ref[len(_BRANCH_REF_PREFIX):], ref_value
+
+        if not ref_value.startswith(_SYMBOLIC_REF_PREFIX):
+            return None
+        ref = ref_value[len(_SYMBOLIC_REF_PREFIX):].strip()
+
+    return None
+
+def find_changed_files(repo_root, base_ref):
+    """
+    Finds the files changed on the commits checked out in the given Git repository since they
+    branched off of the given base ref.
+
+    Parameters
+    ----------
+    repo_root : str
+        Path to the root of the working tree of the Git repository.
+    base_ref : str
+        Branch, tag, or commit the checked out commits branched off of, such as `origin/master`.
+
+    Raises
+    ------
+    git.InvalidGitRepositoryError
+        If the given directory is not a Git repository.
+    git.GitCommandError
+        If the given base ref does not exist or has no commits in common with the head.
+
+    Returns
+    -------
+    list
+        Sorted paths, relative to the root of the working tree and separated by `/`, of the
+        files added, modified, or deleted since the merge base of the given base ref and the
+        head, with both the old and new paths of renamed files.
+    """
+    # NOTE: gitpython is slow to import, so only import it when it is needed
+    from git import Repo # pylint: disable=import-outside-toplevel
+
+    changed_files = Repo(repo_root).git.diff(
+        '--name-only',
+        '--no-renames',
+        '-z',
+        base_ref + '...HEAD'
+    )
+    return sorted({changed_file for changed_file in changed_files.split('\0') if changed_file})
+
+def _find_git_dir(repo_root):
+    """
+    Returns
+    -------
+    str
+        Path to the Git directory of the working tree at the given path, or None if there is no
+        `.git` directory or `.git` file pointing to one.
+    """
+    dot_git_path = os.path.join(repo_root, '.git')
+    if os.path.isdir(dot_git_path):
+        return dot_git_path
+
+    dot_git_file_content = _read_file(dot_git_path)
+    if dot_git_file_content is None or not dot_git_file_content.startswith(_GIT_DIR_PREFIX):
+        return None
+
+    git_dir = os.path.normpath(
+        os.path.join(repo_root, dot_git_file_content[len(_GIT_DIR_PREFIX):].strip()))
+    return git_dir if os.path.isdir(git_dir) else None
+
+def _read_ref(git_dir, common_dir, ref):
+    """
+    Returns
+    -------
+    str
+        Value of the given ref, either an object name or a symbolic ref, from the loose refs of
+        the given Git directory or common directory or from the packed refs of the common
+        directory, or None if the ref does not exist.
+    """
+    for refs_dir in [git_dir, common_dir]:
+        ref_value = _read_file(os.path.join(refs_dir, *ref.split('/')))
+        if ref_value:
+            return ref_value
+
+    try:
+        with open(os.path.join(common_dir, 'packed-refs'), 'r') as packed_refs_file:
+            for line in packed_refs_file:
+                if line.startswith('#') or line.startswith('^'):
+                    continue
+
+                packed_ref = line.split()
+                if len(packed_ref) == 2 and packed_ref[1] == ref:
+                    return packed_ref[0]
+    except FileNotFoundError:
+        pass
+
+    return None
+
+def _read_file(file_path):
+    """
+    Returns
+    -------
+    str
+        Stripped content of the given file, or None if it is not a readable file.
+    """
+    try:
+        with open(file_path, 'r') as file:
+            return file.read().strip()
+    except (IsADirectoryError, NotADirectoryError, FileNotFoundError, PermissionError):
+        return None
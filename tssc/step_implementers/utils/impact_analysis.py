@@ -0,0 +1,248 @@
+"""
+Shared utils for steps that run only the tests affected by the files changed since a base ref.
+
+The Java sources of a project are indexed by the classes they import, and a test class is
+affected by a change to any source it depends on, directly or through other sources. A class
+depends on every class it imports, on every class of the packages it imports with `*`, and on
+every other class of its own package, since those need no import.
+"""
+
+import fnmatch
+import json
+import os
+import re
+import tempfile
+
+# changed files that do not affect which tests to run
+DEFAULT_IGNORE_PATTERNS = ['*.md', '*.adoc', '*.txt', 'docs/*', 'LICENSE', '.gitignore']
+
+# number of runs after which all tests are run, even if only some of them are affected
+DEFAULT_FULL_RUN_INTERVAL = 10
+
+JAVA_SOURCE_EXTENSION = '.java'
+
+_JAVA_PACKAGE_PATTERN = re.compile(r'^\s*package\s+([\w.]+)\s*;', re.MULTILINE)
+_JAVA_IMPORT_PATTERN = re.compile(r'^\s*import\s+(static\s+)?([\w.]+(\.\*)?)\s*;', re.MULTILINE)
+
+class ImpactIndex:
+    """
+    Local index of the classes each Java source imports, kept between runs so only the sources
+    that changed since the previous run have to be read again, along with how many runs there
+    have been since all of the tests were last run.
+
+    Parameters
+    ----------
+    index_file : str
+        Path to the JSON file to store the index in.
+    """
+
+    def __init__(self, index_file):
+        self.__index_file = index_file
+
+        try:
+            with open(index_file, 'r') as index:
+                index_content = json.load(index)
+        except (OSError, ValueError):
+            index_content = {}
+        if not isinstance(index_content, dict):
+            index_content = {}
+
+        self.__runs_since_full_run = index_content.get('runs-since-full-run', 0)
+        self.__sources = index_content.get('sources', {})
+
+    @property
+    def runs_since_full_run(self):
+        """
+        Returns
+        -------
+        int
+            Number of runs since all of the tests were last run.
+        """
+        return self.__runs_since_full_run
+
+    @property
+    def sources(self):
+        """
+        Returns
+        -------
+        dict
+            The `class`, `imports`, and `modified` time and `size` the imports were read at of
+            each indexed source, by path relative to the repository root separated by `/`.
+        """
+        return self.__sources
+
+    def update(self, repo_root, source_dirs):
+        """
+        Indexes the Java sources in the given source directories, reading only the sources that
+        are new or changed since they were last indexed, and dropping the sources that no longer
+        exist.
+
+        Parameters
+        ----------
+        repo_root : str
+            Path to the root of the repository the source directories are in.
+        source_dirs : list
+            Paths to the source roots to index, such as `src/main/java` and `src/test/java`.
+            Directories that do not exist are skipped.
+        """
+        sources = {}
+        for source_dir in source_dirs:
+            for dir_path, _, file_names in os.walk(source_dir):
+                for file_name in file_names:
+                    if not file_name.endswith(JAVA_SOURCE_EXTENSION):
+                        continue
+
+                    source_file = os.path.join(dir_path, file_name)
+                    source_path = os.path.relpath(source_file, repo_root).replace(os.sep, '/')
+                    source_stat = os.stat(source_file)
+
+                    source = self.__sources.get(source_path)
+                    if source is None or \
+                            source['modified'] != source_stat.st_mtime_ns or \
+                            source['size'] != source_stat.st_size:
+                        source = _index_java_source(source_file)
+                        source['modified'] = source_stat.st_mtime_ns
+                        source['size'] = source_stat.st_size
+                    sources[source_path] = source
+
+        self.__sources = sources
+
+    def select_tests(self, test_classes, changed_files, ignore_patterns=None):
+        """
+        Selects the given test classes that are affected by the given changed files.
+
+        Parameters
+        ----------
+        test_classes : list
+            Fully qualified names of the test classes to select from.
+        changed_files : list
+            Paths, relative to the repository root and separated by `/`, of the changed files.
+        ignore_patterns : list, optional
+            Glob patterns of changed files that do not affect any tests,
+            by default `DEFAULT_IGNORE_PATTERNS`.
+
+        Returns
+        -------
+        tuple
+            (sorted names of the affected test classes, or None if all of the tests have to be
+            run, reason all of the tests have to be run, or None if they do not). All of the
+            tests have to be run when a changed file is not an indexed source and is not ignored,
+            since there is no telling what it affects.
+        """
+        if ignore_patterns is None:
+            ignore_patterns = DEFAULT_IGNORE_PATTERNS
+
+        for changed_file in changed_files:
+            if changed_file not in self.__sources and \
+                    not any(fnmatch.fnmatch(changed_file, pattern) for pattern in ignore_patterns):
+                return None, 'changed file ({changed_file}) is not an indexed source'.format(
+                    changed_file=changed_file)
+
+        dependents = self.__dependents()
+        affected_sources = set()
+        unvisited_sources = [
+            changed_file for changed_file in changed_files if changed_file in self.__sources
+        ]
+        while unvisited_sources:
+            source_path = unvisited_sources.pop()
+            if source_path in affected_sources:
+                continue
+
+            affected_sources.add(source_path)
+            unvisited_sources.extend(dependents.get(source_path, ()))
+
+        affected_classes = {
+            self.__sources[source_path]['class'] for source_path in affected_sources
+        }
+        return sorted(set(test_classes) & affected_classes), None
+
+    def record_run(self, full_run):
+        """
+        Records a run of the tests and saves the index.
+
+        Parameters
+        ----------
+        full_run : bool
+            True if all of the tests were run, False if only the affected tests were.
+        """
+        self.__runs_since_full_run = 0 if full_run else self.__runs_since_full_run + 1
+
+        index_dir = os.path.dirname(os.path.abspath(self.__index_file))
+        os.makedirs(index_dir, exist_ok=True)
+
+        # write to a temporary file and rename so readers never see a partial index
+        index_descriptor, index_temp_file = tempfile.mkstemp(dir=index_dir)
+        with os.fdopen(index_descriptor, 'w') as index:
+            json.dump(
+                {
+                    'runs-since-full-run': self.__runs_since_full_run,
+                    'sources': self.__sources
+                },
+                index,
+                sort_keys=True)
+        os.replace(index_temp_file, self.__index_file)
+
+    def __dependents(self):
+        """
+        Returns
+        -------
+        dict
+            Paths of the sources that depend on each source, by path.
+        """
+        sources_by_class = {}
+        sources_by_package = {}
+        for source_path, source in self.__sources.items():
+            sources_by_class.setdefault(source['class'], []).append(source_path)
+            sources_by_package.setdefault(_package_name(source['class']), []).append(source_path)
+
+        dependents = {}
+        for source_path, source in self.__sources.items():
+            dependencies = set(sources_by_package.get(_package_name(source['class']), ()))
+            for imported_name in source['imports']:
+                if imported_name.endswith('.*'):
+                    imported_name = imported_name[:-2]
+                    dependencies.update(sources_by_package.get(imported_name, ()))
+
+                # imports of nested classes and static members depend on the outer class
+                while imported_name not in sources_by_class and '.' in imported_name:
+                    imported_name = imported_name.rsplit('.', 1)[0]
+                dependencies.update(sources_by_class.get(imported_name, ()))
+
+            dependencies.discard(source_path)
+            for dependency in dependencies:
+                dependents.setdefault(dependency, []).append(source_path)
+
+        return dependents
+
+def _index_java_source(source_file):
+    """
+    Returns
+    -------
+    dict
+        The fully qualified `class` name declared by the given Java source, going by its package
+        and file name, and the sorted names it `imports`.
+    """
+    with open(source_file, 'r', errors='replace') as source:
+        source_content = source.read()
+
+    package_match = _JAVA_PACKAGE_PATTERN.search(source_content)
+    class_name = os.path.splitext(os.path.basename(source_file))[0]
+    if package_match:
+        class_name = package_match.group(1) + '.' + class_name
+
+    return {
+        'class': class_name,
+        'imports': sorted({
+            import_match.group(2) for import_match in _JAVA_IMPORT_PATTERN.finditer(source_content)
+        })
+    }
+
+def _package_name(class_name):
+    """
+    Returns
+    -------
+    str
+        Name of the package of the given fully qualified class name, empty for the default
+        package.
+    """
+    return class_name.rsplit('.', 1)[0] if '.' in class_name else ''
@@ -0,0 +1,338 @@
+"""
+Shared utils for steps that deal with JUnit XML test reports, such as the reports written by the
+Maven surefire and failsafe plugins.
+
+Reports are parsed incrementally with `xml.etree.ElementTree.iterparse`, discarding each
+`<testcase>` once it has been counted, so the memory used to parse a report does not grow with
+the size of the report, and many reports are parsed in parallel across a pool of processes.
+"""
+
+import concurrent.futures
+import fnmatch
+import heapq
+import multiprocessing
+import os
+from xml.etree import ElementTree
+
+DEFAULT_REPORT_FILE_PATTERN = 'TEST-*.xml'
+DEFAULT_MAX_SLOWEST_TESTS = 10
+DEFAULT_MAX_FAILED_TESTS = 100
+MAX_FAILURE_DETAILS_LENGTH = 2000
+
+# reports are handed to the process pool in chunks of this many reports at most
+_MAX_REPORTS_PER_CHUNK = 64
+
+def find_junit_reports(
+        report_dirs,
+        report_file_pattern=DEFAULT_REPORT_FILE_PATTERN,
+        modified_since=None):
+    """
+    Finds the JUnit XML reports in the given directories.
+
+    Parameters
+    ----------
+    report_dirs : list
+        Paths to the directories to find the reports in. Directories that do not exist
+        are skipped.
+    report_file_pattern : str, optional
+        Glob pattern the names of the report files match.
+    modified_since : float, optional
+        Time, in seconds since the epoch, that reports modified before are skipped, such as
+        the reports of tests that were not run by the last test run, or None for all reports.
+
+    Returns
+    -------
+    list
+        Sorted paths to the report files directly in the given directories.
+    """
+    report_files = []
+    for report_dir in report_dirs:
+        if not os.path.isdir(report_dir):
+            continue
+
+        for entry in os.scandir(report_dir):
+            if entry.is_file() and fnmatch.fnmatch(entry.name, report_file_pattern) and \
+                    (modified_since is None or entry.stat().st_mtime >= modified_since):
+                report_files.append(entry.path)
+
+    return sorted(report_files)
+
+def parse_junit_report(
+        report_file,
+        max_slowest_tests=DEFAULT_MAX_SLOWEST_TESTS,
+        max_failed_tests=DEFAULT_MAX_FAILED_TESTS):
+    """
+    Summarizes the test cases of the given JUnit XML report.
+
+    The counts are of the `<testcase>` elements, rather then the attributes of the `<testsuite>`
+    elements, so reports with nested test suites are not counted twice.
+
+    Parameters
+    ----------
+    report_file : str
+        Path to the JUnit XML report to summarize.
+    max_slowest_tests : int, optional
+        Maximum number of the slowest tests to include.
+    max_failed_tests : int, optional
+        Maximum number of failed tests to include the failure details of.
+
+    Raises
+    ------
+    ValueError
+        If the given report is not well formed XML.
+
+    Returns
+    -------
+    dict
+        Summary of the given report, see `aggregate_junit_reports`.
+    """
+    summary = _empty_summary()
+    slowest_tests = []
+
+    elements = []
+    try:
+        for event, element in ElementTree.iterparse(report_file, events=('start', 'end')):
+            if event == 'start':
+                elements.append(element)
+                continue
+
+            elements.pop()
+            if _local_name(element.tag) != 'testcase':
+                continue
+
+            test = _summarize_test_case(element, report_file)
+            summary['tests'] += 1
+            summary['time'] += test['time']
+            summary['test-class-times'][test['classname']] = \
+                summary['test-class-times'].get(test['classname'], 0.0) + test['time']
+            if test['result'] != 'passed':
+                summary[test['result']] += 1
+            if test['result'] in ('failures', 'errors') and \
+                    len(summary['failed-tests']) < max_failed_tests:
+                summary['failed-tests'].append(test['failure'])
+
+            slowest_test = (test['time'], test['classname'], test['name'])
+            if len(slowest_tests) < max_slowest_tests:
+                heapq.heappush(slowest_tests, slowest_test)
+            elif max_slowest_tests > 0:
+                heapq.heappushpop(slowest_tests, slowest_test)
+
+            # drop the parsed test case so memory use does not grow with the size of the report
+            element.clear()
+            if elements:
+                elements[-1].remove(element)
+    except ElementTree.ParseError as error:
+        raise ValueError(
+            'Error parsing JUnit report ({report_file}): {error}'.format(
+                report_file=report_file,
+                error=error))
+
+    summary['report-files'] = 1
+    summary['slowest-tests'] = _slowest_tests(slowest_tests, max_slowest_tests)
+    return summary
+
+def aggregate_junit_reports(
+        report_files,
+        max_workers=None,
+        max_slowest_tests=DEFAULT_MAX_SLOWEST_TESTS,
+        max_failed_tests=DEFAULT_MAX_FAILED_TESTS):
+    """
+    Summarizes the test cases of all of the given JUnit XML reports.
+
+    The reports are parsed in parallel across a pool of spawned, rather then forked, processes,
+    unless there is only one report or only one worker, so that it is safe to call from any
+    thread of a process running other threads.
+
+    Parameters
+    ----------
+    report_files : list
+        Paths to the JUnit XML reports to summarize.
+    max_workers : int, optional
+        Maximum number of processes to parse reports with, by default the number of CPUs.
+    max_slowest_tests : int, optional
+        Maximum number of the slowest tests to include.
+    max_failed_tests : int, optional
+        Maximum number of failed tests to include the failure details of.
+
+    Raises
+    ------
+    ValueError
+        If any of the given reports is not well formed XML.
+
+    Returns
+    -------
+    dict
+        Summary of the given reports with the keys
+
+        * `report-files` - number of reports summarized
+        * `tests` - number of test cases
+        * `failures` - number of test cases that failed
+        * `errors` - number of test cases that errored
+        * `skipped` - number of test cases that were skipped
+        * `time` - total seconds spent running the test cases
+        * `slowest-tests` - `classname`, `name`, and `time` of the slowest test cases,
+          slowest first
+        * `failed-tests` - `classname`, `name`, `type` (`failure` or `error`), `message`,
+          `details`, and `report-file` of the test cases that failed or errored, in the order
+          of the reports
+        * `test-class-times` - total seconds spent running the test cases of each test class
+          by class name
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(len(report_files), max_workers))
+
+    parse_args = (max_slowest_tests, max_failed_tests)
+    if max_workers == 1:
+        report_summaries = [
+            parse_junit_report(report_file, *parse_args) for report_file in report_files
+        ]
+    else:
+        # forked workers can deadlock on locks held by other threads at the time of the fork,
+        # such as those of steps run at the same time, so the workers are spawned instead
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn')) as executor:
+            report_summaries = list(executor.map(
+                parse_junit_report,
+                report_files,
+                *[[parse_arg] * len(report_files) for parse_arg in parse_args],
+                chunksize=max(1, min(
+                    _MAX_REPORTS_PER_CHUNK, len(report_files) // (max_workers * 4)))))
+
+    return merge_junit_summaries(report_summaries, max_slowest_tests, max_failed_tests)
+
+def merge_junit_summaries(
+        summaries,
+        max_slowest_tests=DEFAULT_MAX_SLOWEST_TESTS,
+        max_failed_tests=DEFAULT_MAX_FAILED_TESTS):
+    """
+    Merges summaries of JUnit XML reports into one summary.
+
+    Parameters
+    ----------
+    summaries : list
+        Summaries to merge, see `aggregate_junit_reports`.
+    max_slowest_tests : int, optional
+        Maximum number of the slowest tests to include.
+    max_failed_tests : int, optional
+        Maximum number of failed tests to include the failure details of.
+
+    Returns
+    -------
+    dict
+        Summary of all of the given summaries.
+    """
+    merged_summary = _empty_summary()
+    slowest_tests = []
+    for summary in summaries:
+        for count_key in ['report-files', 'tests', 'failures', 'errors', 'skipped', 'time']:
+            merged_summary[count_key] += summary[count_key]
+        merged_summary['failed-tests'] += \
+            summary['failed-tests'][:max_failed_tests - len(merged_summary['failed-tests'])]
+        slowest_tests += [
+            (test['time'], test['classname'], test['name']) for test in summary['slowest-tests']
+        ]
+        for classname, class_time in summary['test-class-times'].items():
+            merged_summary['test-class-times'][classname] = \
+                merged_summary['test-class-times'].get(classname, 0.0) + class_time
+
+    merged_summary['time'] = round(merged_summary['time'], 3)
+    for classname, class_time in merged_summary['test-class-times'].items():
+        merged_summary['test-class-times'][classname] = round(class_time, 3)
+    merged_summary['slowest-tests'] = _slowest_tests(slowest_tests, max_slowest_tests)
+    return merged_summary
+
+def _empty_summary():
+    """
+    Returns
+    -------
+    dict
+        Summary of no test cases.
+    """
+    return {
+        'report-files': 0,
+        'tests': 0,
+        'failures': 0,
+        'errors': 0,
+        'skipped': 0,
+        'time': 0.0,
+        'slowest-tests': [],
+        'failed-tests': [],
+        'test-class-times': {}
+    }
+
+def _slowest_tests(slowest_tests, max_slowest_tests):
+    """
+    Parameters
+    ----------
+    slowest_tests : list
+        (time, classname, name) of test cases.
+    max_slowest_tests : int
+        Maximum number of the slowest tests to return.
+
+    Returns
+    -------
+    list
+        `classname`, `name`, and `time` of the slowest of the given test cases, slowest first.
+    """
+    return [
+        {'classname': classname, 'name': name, 'time': test_time}
+        for test_time, classname, name in heapq.nlargest(max_slowest_tests, slowest_tests)
+    ]
+
+def _summarize_test_case(test_case, report_file):
+    """
+    Parameters
+    ----------
+    test_case : xml.etree.ElementTree.Element
+        Parsed `<testcase>` element.
+    report_file : str
+        Path to the report the test case is from.
+
+    Returns
+    -------
+    dict
+        The `classname`, `name`, `time`, `result` (the summary count the test case adds to,
+        or `passed`), and the `failure` details if it failed or errored, of the test case.
+    """
+    classname = test_case.get('classname', '')
+    name = test_case.get('name', '')
+    try:
+        test_time = float(test_case.get('time') or 0)
+    except ValueError:
+        test_time = 0.0
+
+    test = {
+        'classname': classname,
+        'name': name,
+        'time': test_time,
+        'result': 'passed',
+        'failure': None
+    }
+    for child in test_case:
+        child_name = _local_name(child.tag)
+        if child_name in ('failure', 'error'):
+            test['result'] = child_name + 's'
+            test['failure'] = {
+                'classname': classname,
+                'name': name,
+                'type': child_name,
+                'message': child.get('message', ''),
+                'details': (child.text or '').strip()[:MAX_FAILURE_DETAILS_LENGTH],
+                'report-file': report_file
+            }
+            break
+        if child_name == 'skipped':
+            test['result'] = 'skipped'
+
+    return test
+
+def _local_name(tag):
+    """
+    Returns
+    -------
+    str
+        The given element tag without its namespace.
+    """
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
@@ -0,0 +1,371 @@
+"""
+Shared utils for steps that deal with Maven projects.
+"""
+
+import re
+import os.path
+
+from .xml import parse_xml_file
+
+_PROPERTY_REFERENCE_PATTERN = re.compile(r'\$\{([^}]+)\}')
+
+# maximum depth of property references to other property references that are resolved
+_MAX_PROPERTY_REFERENCE_DEPTH = 10
+
+class MavenPom:
+    """
+    Model of a Maven pom file with the coordinates of the project it builds resolved.
+
+    `${property}` references are resolved against the `<properties>` of the pom and of its
+    parents as well as the `project.*` properties, for instance `${revision}` for CI friendly
+    versions, and the `groupId` and `version` are inherited from the `<parent>` if the pom does
+    not declare its own. The parent pom is looked for at the `<relativePath>` of the `<parent>`,
+    `../pom.xml` by default.
+
+    Use `get_maven_pom` rather than creating a MavenPom directly, so that each pom file is only
+    parsed once.
+
+    Parameters
+    ----------
+    pom_file : str
+        Path to the pom file.
+    pom_root : xml.etree.ElementTree.Element
+        Root element of the parsed pom file.
+    pom_namespace : str
+        Namespace of the root element of the pom file as '{namespace}', or ''.
+    parent : MavenPom
+        Model of the parent pom file if it could be found locally, or None.
+    """
+
+    def __init__(self, pom_file, pom_root, pom_namespace, parent):
+        self.__pom_file = pom_file
+        self.__pom_root = pom_root
+        self.__pom_namespace = pom_namespace
+        self.__parent = parent
+
+        self.__properties = dict(parent.properties) if parent is not None else {}
+        properties_element = self.__find('properties')
+        if properties_element is not None:
+            for property_element in properties_element:
+                self.__properties[self.__local_name(property_element.tag)] = \
+                    (property_element.text or '').strip()
+
+        parent_group_id = self.__find_text('parent/groupId')
+        parent_artifact_id = self.__find_text('parent/artifactId')
+        parent_version = self.__find_text('parent/version')
+        self.__properties.update({
+            'project.groupId': self.__find_text('groupId') or parent_group_id,
+            'project.artifactId': self.__find_text('artifactId'),
+            'project.version': self.__find_text('version') or parent_version,
+            'project.packaging':
+                self.__find_text('packaging') or self.__find_text('package') or 'jar',
+            'project.parent.groupId': parent_group_id,
+            'project.parent.artifactId': parent_artifact_id,
+            'project.parent.version': parent_version,
+            'project.basedir': os.path.dirname(os.path.abspath(pom_file))
+        })
+        for project_property in ['groupId', 'artifactId', 'version', 'packaging']:
+            self.__properties['pom.' + project_property] = \
+                self.__properties['project.' + project_property]
+
+    @property
+    def pom_file(self):
+        """
+        Returns
+        -------
+        str
+            Path to the pom file.
+        """
+        return self.__pom_file
+
+    @property
+    def parent(self):
+        """
+        Returns
+        -------
+        MavenPom
+            Model of the parent pom file if it could be found locally, or None.
+        """
+        return self.__parent
+
+    @property
+    def properties(self):
+        """
+        Returns
+        -------
+        dict
+            Unresolved properties of the pom, including the properties of its parents and
+            the `project.*` properties.
+        """
+        return self.__properties
+
+    @property
+    def group_id(self):
+        """
+        Returns
+        -------
+        str
+            Resolved `groupId` of the pom, or of its parent, or None if neither declares one.
+        """
+        return self.resolve(self.__properties['project.groupId'])
+
+    @property
+    def artifact_id(self):
+        """
+        Returns
+        -------
+        str
+            Resolved `artifactId` of the pom, or None if it does not declare one.
+        """
+        return self.resolve(self.__properties['project.artifactId'])
+
+    @property
+    def version(self):
+        """
+        Returns
+        -------
+        str
+            Resolved `version` of the pom, or of its parent, or None if neither declares one.
+        """
+        return self.resolve(self.__properties['project.version'])
+
+    @property
+    def packaging(self):
+        """
+        Returns
+        -------
+        str
+            Resolved `packaging` of the pom, 'jar' if it does not declare one.
+        """
+        return self.resolve(self.__properties['project.packaging'])
+
+    @property
+    def modules(self):
+        """
+        Returns
+        -------
+        list
+            Paths to the pom files of the `<modules>` of the pom, in the order they are declared.
+        """
+        module_pom_files = []
+        modules_element = self.__find('modules')
+        if modules_element is None:
+            return module_pom_files
+
+        for module in modules_element.findall(self.__pom_namespace + 'module'):
+            if not module.text or not module.text.strip():
+                continue
+
+            module_pom_file = os.path.normpath(
+                os.path.join(os.path.dirname(self.__pom_file), self.resolve(module.text.strip())))
+            if os.path.isdir(module_pom_file):
+                module_pom_file = os.path.join(module_pom_file, 'pom.xml')
+            module_pom_files.append(module_pom_file)
+
+        return module_pom_files
+
+    def resolve(self, value):
+        """
+        Resolves the `${property}` references in the given value.
+
+        References to properties that are not defined are left as they are.
+
+        Parameters
+        ----------
+        value : str
+            Value to resolve the property references in.
+
+        Returns
+        -------
+        str
+            The given value with its property references resolved.
+        """
+        if value is None:
+            return None
+
+        def resolve_property_reference(match):
+            property_value = self.__properties.get(match.group(1))
+            return match.group(0) if property_value is None else property_value
+
+        for _ in range(_MAX_PROPERTY_REFERENCE_DEPTH):
+            resolved_value = _PROPERTY_REFERENCE_PATTERN.sub(resolve_property_reference, value)
+            if resolved_value == value:
+                break
+            value = resolved_value
+
+        return value
+
+    def __find(self, element_path):
+        """
+        Returns
+        -------
+        xml.etree.ElementTree.Element
+            Element at the given path, of '/' separated element names, relative to the root of
+            the pom, or None.
+        """
+        return self.__pom_root.find(
+            './' + '/'.join(self.__pom_namespace + name for name in element_path.split('/')))
+
+    def __find_text(self, element_path):
+        """
+        Returns
+        -------
+        str
+            Stripped text of the element at the given path relative to the root of the pom,
+            or None if there is no such element or it is empty.
+        """
+        element = self.__find(element_path)
+        if element is None or not element.text or not element.text.strip():
+            return None
+
+        return element.text.strip()
+
+    def __local_name(self, tag):
+        """
+        Returns
+        -------
+        str
+            The given element tag without the pom namespace.
+        """
+        return tag[len(self.__pom_namespace):] if tag.startswith(self.__pom_namespace) else tag
+
+def get_maven_pom(pom_file):
+    """
+    Gets the model of the given pom file.
+
+    Pom files are only parsed again if they have changed since they were last parsed,
+    see `tssc.step_implementers.utils.xml.parse_xml_file`, so all of the Maven step
+    implementers in a process share the work of parsing the same pom files.
+
+    Parameters
+    ----------
+    pom_file : str
+        Path to the pom file to get the model of.
+
+    Raises
+    ------
+    ValueError
+        If the given pom file does not exist.
+
+    Returns
+    -------
+    MavenPom
+        Model of the given pom file.
+    """
+    return _get_maven_pom(pom_file, [])
+
+def _get_maven_pom(pom_file, child_pom_files):
+    """
+    Parameters
+    ----------
+    pom_file : str
+        Path to the pom file to get the model of.
+    child_pom_files : list
+        Absolute paths to the pom files the given pom file is the parent of, so that a cycle of
+        parent poms is not followed.
+
+    Returns
+    -------
+    MavenPom
+        Model of the given pom file.
+    """
+    if not os.path.exists(pom_file):
+        raise ValueError('Given pom file does not exist: ' + pom_file)
+
+    pom_root, pom_namespace = parse_xml_file(pom_file)
+
+    parent = None
+    parent_element = pom_root.find('./' + pom_namespace + 'parent')
+    if parent_element is not None:
+        relative_path_element = parent_element.find(pom_namespace + 'relativePath')
+        if relative_path_element is None:
+            relative_path = '../pom.xml'
+        else:
+            relative_path = (relative_path_element.text or '').strip()
+
+        parent_pom_file = None
+        if relative_path:
+            parent_pom_file = os.path.normpath(
+                os.path.join(os.path.dirname(os.path.abspath(pom_file)), relative_path))
+            if os.path.isdir(parent_pom_file):
+                parent_pom_file = os.path.join(parent_pom_file, 'pom.xml')
+
+        child_pom_files = child_pom_files + [os.path.abspath(pom_file)]
+        if parent_pom_file is not None and os.path.isfile(parent_pom_file) and \
+                parent_pom_file not in child_pom_files:
+            parent = _get_maven_pom(parent_pom_file, child_pom_files)
+
+            # the pom at the relative path is only the parent if it is the declared parent
+            parent_artifact_id_element = parent_element.find(pom_namespace + 'artifactId')
+            if parent_artifact_id_element is None or \
+                    parent.artifact_id != (parent_artifact_id_element.text or '').strip():
+                parent = None
+
+    return MavenPom(pom_file, pom_root, pom_namespace, parent)
+
+def get_maven_modules(pom_file):
+    """
+    Gets the modules of the Maven reactor built by the given pom file.
+
+    The given pom file and the poms of its `<modules>` are each parsed once, recursively, with
+    modules that do not declare their own `groupId` inheriting the `groupId` of their
+    `<parent>`, see `MavenPom`.
+
+    Parameters
+    ----------
+    pom_file : str
+        Path to the pom file to get the reactor modules of.
+
+    Raises
+    ------
+    ValueError
+        If the given pom file, or the pom file of one of its modules, does not exist.
+        If the given pom file, or the pom file of one of its modules, has no `artifactId`
+        or no `groupId` of its own or of its parent.
+
+    Returns
+    -------
+    list
+        Dictionaries with the `pom-path`, `group-id`, `artifact-id`, `version`, and
+        `package-type` of the given pom file and each of its modules, in the order they are
+        declared, parents before their modules.
+    """
+    modules = []
+    _add_maven_modules(pom_file, modules, set())
+    return modules
+
+def _add_maven_modules(pom_file, modules, seen_pom_files):
+    """
+    Adds the module of the given pom file and then of each of its modules to the given modules.
+
+    Parameters
+    ----------
+    pom_file : str
+        Path to the pom file to add the modules of.
+    modules : list
+        Modules to add to.
+    seen_pom_files : set
+        Absolute paths to the pom files already added, so that a module is only added once.
+    """
+    pom = get_maven_pom(pom_file)
+
+    absolute_pom_file = os.path.abspath(pom_file)
+    if absolute_pom_file in seen_pom_files:
+        return
+    seen_pom_files.add(absolute_pom_file)
+
+    if pom.artifact_id is None or pom.group_id is None:
+        raise ValueError(
+            'Given pom file (' + pom_file + ') does not have ./artifactId and ./groupId or ' +
+            './parent/groupId elements')
+
+    modules.append({
+        'pom-path': pom_file,
+        'group-id': pom.group_id,
+        'artifact-id': pom.artifact_id,
+        'version': pom.version,
+        'package-type': pom.packaging
+    })
+
+    for module_pom_file in pom.modules:
+        _add_maven_modules(module_pom_file, modules, seen_pom_files)
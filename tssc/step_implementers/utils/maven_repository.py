@@ -0,0 +1,425 @@
+"""
+Uploading artifacts directly to a Maven repository over HTTP.
+
+Uploads the same files to the same Maven repository layout as `mvn deploy:deploy-file` with a
+generated POM, without starting a JVM per artifact:
+
+    {repository url}/{group id as path}/{artifact id}/{version}/{artifact id}-{version}.{type}
+    {repository url}/{group id as path}/{artifact id}/{version}/{artifact id}-{version}.pom
+
+along with `.md5` and `.sha1` checksum files for each. Artifacts with a classifier, such as the
+`sources` or `javadoc` jar of a module, are uploaded beside the main artifact of the module
+without a POM of their own:
+
+    {repository url}/{group id as path}/{artifact id}/{version}/\
+{artifact id}-{version}-{classifier}.{extension}
+
+Notes
+-----
+Unlike `mvn deploy:deploy-file` the `maven-metadata.xml` of the artifact is not updated,
+which release repositories such as Nexus and Artifactory maintain themselves.
+"""
+
+import base64
+import concurrent.futures
+import hashlib
+import http.client
+import io
+import os
+import queue
+import re
+import threading
+import urllib.parse
+from xml.sax.saxutils import escape
+
+DEFAULT_MAX_CONNECTIONS = 4
+DEFAULT_TIMEOUT = 60
+
+_HASH_BUFFER_SIZE = 1024 * 1024
+
+# errors from sending a request on a keep-alive connection the server already closed
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError
+)
+
+POM_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0" \
+xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" \
+xsi:schemaLocation="http://maven.apache.org/POM/4.0.0 \
+http://maven.apache.org/xsd/maven-4.0.0.xsd">
+  <modelVersion>4.0.0</modelVersion>
+  <groupId>{group_id}</groupId>
+  <artifactId>{artifact_id}</artifactId>
+  <version>{version}</version>
+  <packaging>{package_type}</packaging>
+  <description>POM was created by tssc</description>
+</project>
+'''
+
+def maven_repository_path(group_id, artifact_id, version, extension, classifier=None):
+    """
+    Gets the path of an artifact file in the Maven repository layout.
+
+    Parameters
+    ----------
+    group_id : str
+        Maven group ID of the artifact.
+    artifact_id : str
+        Maven artifact ID of the artifact.
+    version : str
+        Version of the artifact.
+    extension : str
+        Extension of the artifact file, such as the package type or 'pom'.
+    classifier : str, optional
+        Classifier of the artifact, such as 'sources', or None for the main artifact.
+
+    Returns
+    -------
+    str
+        Path of the artifact file relative to the root of the Maven repository.
+    """
+    return re.sub(r'\.', '/', group_id) + '/' + \
+        artifact_id + '/' + \
+        version + '/' + \
+        artifact_id + '-' + \
+        version + \
+        ('-' + classifier if classifier else '') + '.' + \
+        extension
+
+def artifact_extension(artifact):
+    """
+    Gets the extension to push the given artifact with.
+
+    Parameters
+    ----------
+    artifact : dict
+        Artifact from the package step results.
+
+    Returns
+    -------
+    str
+        The `package-type` of the given artifact if it is the main artifact of its module,
+        otherwise the extension of its file, since for instance the `sources` artifact of a
+        `war` module is a jar.
+    """
+    if artifact.get('classifier'):
+        return os.path.splitext(artifact['path'])[1][1:]
+
+    return artifact['package-type']
+
+def generate_pom(group_id, artifact_id, version, package_type):
+    """
+    Generates a minimal POM for an artifact the same as `mvn deploy:deploy-file` does.
+
+    Parameters
+    ----------
+    group_id : str
+        Maven group ID of the artifact.
+    artifact_id : str
+        Maven artifact ID of the artifact.
+    version : str
+        Version of the artifact.
+    package_type : str
+        Maven packaging of the artifact.
+
+    Returns
+    -------
+    bytes
+        The POM for the given artifact.
+    """
+    return POM_TEMPLATE.format(
+        group_id=escape(group_id),
+        artifact_id=escape(artifact_id),
+        version=escape(version),
+        package_type=escape(package_type)
+    ).encode('utf-8')
+
+def _file_checksums(file_path):
+    """
+    Parameters
+    ----------
+    file_path : str
+        Path to the file to get the checksums of.
+
+    Returns
+    -------
+    tuple
+        Hex (md5, sha1) digests of the content of the given file.
+    """
+    md5_hash = hashlib.md5() # nosec - maven repository checksum, not used for security
+    sha1_hash = hashlib.sha1() # nosec - maven repository checksum, not used for security
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(_HASH_BUFFER_SIZE), b''):
+            md5_hash.update(chunk)
+            sha1_hash.update(chunk)
+
+    return md5_hash.hexdigest(), sha1_hash.hexdigest()
+
+class MavenRepositoryUploader:
+    """
+    Uploads artifacts to a Maven repository with HTTP PUT requests sent concurrently over a pool
+    of keep-alive connections.
+
+    Parameters
+    ----------
+    repository_url : str
+        URL to the root of the Maven repository to upload to.
+    user : str, optional
+        User to authenticate with the Maven repository.
+    password : str, optional
+        Password to authenticate with the Maven repository.
+    max_connections : int, optional
+        Maximum number of uploads to run at the same time, each on its own connection.
+    timeout : float, optional
+        Seconds to wait on the Maven repository before giving up on an upload.
+
+    Raises
+    ------
+    ValueError
+        If the given repository URL is not a http or https URL.
+    """
+
+    def __init__( # pylint: disable=too-many-arguments
+            self,
+            repository_url,
+            user=None,
+            password=None,
+            max_connections=DEFAULT_MAX_CONNECTIONS,
+            timeout=DEFAULT_TIMEOUT):
+        split_repository_url = urllib.parse.urlsplit(repository_url)
+        if split_repository_url.scheme == 'https':
+            self.__connection_class = http.client.HTTPSConnection
+        elif split_repository_url.scheme == 'http':
+            self.__connection_class = http.client.HTTPConnection
+        else:
+            raise ValueError(
+                'Maven repository url must be a http or https url: ' + repository_url)
+
+        self.__host = split_repository_url.netloc
+        self.__base_path = split_repository_url.path.rstrip('/')
+        self.__max_connections = max_connections
+        self.__timeout = timeout
+
+        self.__headers = {}
+        if user and password:
+            self.__headers['Authorization'] = 'Basic ' + base64.b64encode(
+                (user + ':' + password).encode('utf-8')).decode('ascii')
+
+        self.__idle_connections = queue.LifoQueue()
+        self.__connection_count = 0
+        self.__connection_count_lock = threading.Lock()
+
+    @property
+    def connection_count(self):
+        """
+        Returns
+        -------
+        int
+            Number of connections opened to the Maven repository so far.
+        """
+        return self.__connection_count
+
+    def upload_artifacts(self, artifacts):
+        """
+        Uploads the given artifacts, each with a generated POM and the checksums of both.
+
+        All of the files of all of the given artifacts are uploaded concurrently.
+
+        Parameters
+        ----------
+        artifacts : list
+            Dictionaries with the `path`, `group-id`, `artifact-id`, `version`,
+            `package-type`, and optionally `classifier` of each artifact to upload.
+
+        Raises
+        ------
+        RuntimeError
+            If the Maven repository could not be reached or refused any of the uploads.
+        """
+        uploads = []
+        for artifact in artifacts:
+            uploads += self.__artifact_uploads(artifact)
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.__max_connections) as executor:
+                for upload in [executor.submit(self.__upload, *upload) for upload in uploads]:
+                    upload.result()
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Closes the idle connections to the Maven repository.
+        """
+        while True:
+            try:
+                self.__idle_connections.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __artifact_uploads(self, artifact):
+        """
+        Parameters
+        ----------
+        artifact : dict
+            Artifact to get the uploads of.
+
+        Returns
+        -------
+        list
+            (repository path, function opening the content to upload, content length) of each
+            file to upload for the given artifact.
+        """
+        artifact_path = artifact['path']
+        group_id = artifact['group-id']
+        artifact_id = artifact['artifact-id']
+        version = artifact['version']
+        package_type = artifact['package-type']
+
+        artifact_repository_path = maven_repository_path(
+            group_id, artifact_id, version, artifact_extension(artifact),
+            artifact.get('classifier'))
+
+        with open(artifact_path, 'rb') as artifact_file:
+            artifact_file.seek(0, io.SEEK_END)
+            artifact_size = artifact_file.tell()
+        artifact_md5, artifact_sha1 = _file_checksums(artifact_path)
+
+        uploads = [
+            (artifact_repository_path, lambda: open(artifact_path, 'rb'), artifact_size),
+            _bytes_upload(artifact_repository_path + '.md5', artifact_md5.encode('ascii')),
+            _bytes_upload(artifact_repository_path + '.sha1', artifact_sha1.encode('ascii'))
+        ]
+
+        # the POM is uploaded with the main artifact of the module only
+        if artifact.get('classifier'):
+            return uploads
+
+        pom_repository_path = maven_repository_path(group_id, artifact_id, version, 'pom')
+        pom = generate_pom(group_id, artifact_id, version, package_type)
+        pom_md5 = hashlib.md5(pom).hexdigest() # nosec - maven repository checksum
+        pom_sha1 = hashlib.sha1(pom).hexdigest() # nosec - maven repository checksum
+
+        return uploads + [
+            _bytes_upload(pom_repository_path, pom),
+            _bytes_upload(pom_repository_path + '.md5', pom_md5.encode('ascii')),
+            _bytes_upload(pom_repository_path + '.sha1', pom_sha1.encode('ascii'))
+        ]
+
+    def __upload(self, repository_path, open_content, content_length):
+        """
+        PUTs the given content to the given path in the Maven repository.
+
+        Parameters
+        ----------
+        repository_path : str
+            Path relative to the root of the Maven repository to upload to.
+        open_content : callable
+            Function opening the content to upload as a binary file.
+        content_length : int
+            Length in bytes of the content to upload.
+
+        Raises
+        ------
+        RuntimeError
+            If the Maven repository could not be reached or refused the upload.
+        """
+        request_path = self.__base_path + '/' + urllib.parse.quote(repository_path)
+        headers = {
+            **self.__headers,
+            'Content-Length': str(content_length),
+            'Content-Type': 'application/octet-stream'
+        }
+
+        connection, reused = self.__get_connection()
+        try:
+            try:
+                response = self.__put(connection, request_path, open_content, headers)
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+
+                # the server closed the idle keep-alive connection, retry on a new connection
+                connection.close()
+                connection = self.__new_connection()
+                response = self.__put(connection, request_path, open_content, headers)
+        except (OSError, http.client.HTTPException) as error:
+            connection.close()
+            raise RuntimeError(
+                'Error uploading to maven repository ({url}): {error}'.format(
+                    url=self.__url(request_path),
+                    error=error))
+
+        if response.will_close:
+            connection.close()
+        else:
+            self.__idle_connections.put(connection)
+
+        if not 200 <= response.status < 300:
+            raise RuntimeError(
+                'Error uploading to maven repository ({url}): {status} {reason}'.format(
+                    url=self.__url(request_path),
+                    status=response.status,
+                    reason=response.reason))
+
+    @staticmethod
+    def __put(connection, request_path, open_content, headers):
+        """
+        Returns
+        -------
+        http.client.HTTPResponse
+            Fully read response to PUTing the given content to the given path.
+        """
+        with open_content() as content:
+            connection.request('PUT', request_path, body=content, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response
+
+    def __get_connection(self):
+        """
+        Returns
+        -------
+        tuple
+            (connection, True if the connection has been used before) of an idle connection if
+            there is one, otherwise a new connection.
+        """
+        try:
+            return self.__idle_connections.get_nowait(), True
+        except queue.Empty:
+            return self.__new_connection(), False
+
+    def __new_connection(self):
+        """
+        Returns
+        -------
+        http.client.HTTPConnection
+            New connection to the Maven repository.
+        """
+        with self.__connection_count_lock:
+            self.__connection_count += 1
+
+        return self.__connection_class(self.__host, timeout=self.__timeout)
+
+    def __url(self, request_path):
+        """
+        Returns
+        -------
+        str
+            URL to the given request path, without credentials.
+        """
+        scheme = 'https' if self.__connection_class is http.client.HTTPSConnection else 'http'
+        return scheme + '://' + self.__host + request_path
+
+def _bytes_upload(repository_path, content):
+    """
+    Returns
+    -------
+    tuple
+        (repository path, function opening the given content, content length) upload of the
+        given content.
+    """
+    return (repository_path, lambda: io.BytesIO(content), len(content))
@@ -0,0 +1,161 @@
+"""
+Shared utils for steps that split a test suite into shards balanced by how long each test class
+took to run in previous runs.
+"""
+
+import fnmatch
+import heapq
+import json
+import os
+import tempfile
+
+# surefire's default includes
+DEFAULT_TEST_CLASS_PATTERNS = ['Test*.java', '*Test.java', '*Tests.java', '*TestCase.java']
+
+# weight of the latest duration of a test class against its previous durations
+DEFAULT_TIMING_SMOOTHING = 0.5
+
+# seconds assumed for a test class when no test class has a recorded duration
+DEFAULT_TEST_CLASS_DURATION = 1.0
+
+class TimingDatabase:
+    """
+    Local database of how long each test class took to run, as an exponential moving average
+    of its durations across runs so a single slow run does not skew the shards for long.
+
+    Parameters
+    ----------
+    timing_db_file : str
+        Path to the JSON file to store the durations in.
+    smoothing : float, optional
+        Weight, from 0 to 1, of the latest duration of a test class against its
+        previous durations.
+    """
+
+    def __init__(self, timing_db_file, smoothing=DEFAULT_TIMING_SMOOTHING):
+        self.__timing_db_file = timing_db_file
+        self.__smoothing = smoothing
+
+        try:
+            with open(timing_db_file, 'r') as timing_db:
+                durations = json.load(timing_db)
+        except (OSError, ValueError):
+            durations = {}
+        self.__durations = durations if isinstance(durations, dict) else {}
+
+    @property
+    def durations(self):
+        """
+        Returns
+        -------
+        dict
+            Recorded duration in seconds of each test class by class name.
+        """
+        return self.__durations
+
+    def update(self, durations):
+        """
+        Records the given durations of a run and saves the database.
+
+        Parameters
+        ----------
+        durations : dict
+            Seconds each test class took to run by class name.
+        """
+        for class_name, duration in durations.items():
+            previous_duration = self.__durations.get(class_name)
+            if previous_duration is None:
+                self.__durations[class_name] = duration
+            else:
+                self.__durations[class_name] = round(
+                    self.__smoothing * duration + (1 - self.__smoothing) * previous_duration, 3)
+
+        timing_db_dir = os.path.dirname(os.path.abspath(self.__timing_db_file))
+        os.makedirs(timing_db_dir, exist_ok=True)
+
+        # write to a temporary file and rename so readers never see a partial database
+        timing_db_descriptor, timing_db_temp_file = tempfile.mkstemp(dir=timing_db_dir)
+        with os.fdopen(timing_db_descriptor, 'w') as timing_db:
+            json.dump(self.__durations, timing_db, indent=2, sort_keys=True)
+        os.replace(timing_db_temp_file, self.__timing_db_file)
+
+def discover_test_classes(test_source_dirs, test_class_patterns=None):
+    """
+    Finds the test classes in the given test source directories.
+
+    Parameters
+    ----------
+    test_source_dirs : list
+        Paths to the test source roots to find test classes in, such as `src/test/java`.
+        Directories that do not exist are skipped.
+    test_class_patterns : list, optional
+        Glob patterns the names of test class source files match,
+        by default the same as the surefire default includes.
+
+    Returns
+    -------
+    list
+        Sorted fully qualified names of the test classes.
+    """
+    if test_class_patterns is None:
+        test_class_patterns = DEFAULT_TEST_CLASS_PATTERNS
+
+    test_classes = set()
+    for test_source_dir in test_source_dirs:
+        for dir_path, _, file_names in os.walk(test_source_dir):
+            for file_name in file_names:
+                if not any(fnmatch.fnmatch(file_name, pattern) for pattern in test_class_patterns):
+                    continue
+
+                class_path = os.path.relpath(
+                    os.path.join(dir_path, os.path.splitext(file_name)[0]), test_source_dir)
+                test_classes.add(class_path.replace(os.sep, '.'))
+
+    return sorted(test_classes)
+
+def plan_shards(test_classes, durations, shards):
+    """
+    Splits the given test classes into shards with about the same total duration.
+
+    Test classes are assigned longest first to the shard with the least total duration so far.
+    Test classes without a recorded duration are assumed to take the average duration of the
+    test classes that have one.
+
+    Parameters
+    ----------
+    test_classes : list
+        Names of the test classes to split.
+    durations : dict
+        Recorded duration in seconds of test classes by class name.
+    shards : int
+        Number of shards to split the test classes into.
+
+    Returns
+    -------
+    list
+        For each shard, a dictionary with the `shard` index, the sorted `test-classes` in the
+        shard, and the `estimated-time` in seconds to run them.
+    """
+    known_durations = [
+        durations[test_class] for test_class in test_classes if test_class in durations
+    ]
+    default_duration = sum(known_durations) / len(known_durations) if known_durations else \
+        DEFAULT_TEST_CLASS_DURATION
+
+    shard_plan = [
+        {'shard': shard, 'test-classes': [], 'estimated-time': 0.0} for shard in range(shards)
+    ]
+    shard_heap = [(0.0, shard) for shard in range(shards)]
+    for duration, test_class in sorted(
+            ((durations.get(test_class, default_duration), test_class)
+             for test_class in test_classes),
+            key=lambda test_class_duration: (-test_class_duration[0], test_class_duration[1])):
+        estimated_time, shard = heapq.heappop(shard_heap)
+        shard_plan[shard]['test-classes'].append(test_class)
+        heapq.heappush(shard_heap, (estimated_time + duration, shard))
+
+    for estimated_time, shard in shard_heap:
+        shard_plan[shard]['test-classes'].sort()
+        shard_plan[shard]['estimated-time'] = round(estimated_time, 3)
+
+    return shard_plan
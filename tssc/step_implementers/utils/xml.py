@@ -4,8 +4,64 @@ Shared utils for steps that deal with XML.
 
 import re
 import os.path
+import threading
 from xml.etree import ElementTree
 
+_XML_NAMESPACE_PATTERN = re.compile(r'\{.*}')
+
+# parsed xml files by absolute path, see parse_xml_file
+_XML_FILE_CACHE = {}
+_XML_FILE_CACHE_LOCK = threading.Lock()
+
+
+def parse_xml_file(xml_file):
+    """ Parses a given xml file, or gets the result of having already parsed it.
+
+    Parsed xml files are cached for the life of the process by path, modification time, and
+    size, so an xml file is only parsed again if it has changed.
+
+    .. Important::
+
+        The returned Element is shared by every caller parsing the same xml file
+        and must not be modified.
+
+    Raises
+    ------
+    ValueError
+        If the given xml_file does not exist.
+
+    Returns
+    -------
+    tuple
+        (root Element, namespace of the root Element as '{namespace}' or '' if none)
+        of the given xml file.
+    """
+
+    try:
+        xml_file_stat = os.stat(xml_file)
+    except FileNotFoundError:
+        raise ValueError('Given xml file does not exist: ' + xml_file)
+
+    xml_file_path = os.path.abspath(xml_file)
+    xml_file_key = (xml_file_stat.st_mtime_ns, xml_file_stat.st_size)
+    with _XML_FILE_CACHE_LOCK:
+        cached_xml_file = _XML_FILE_CACHE.get(xml_file_path)
+    if cached_xml_file is not None and cached_xml_file[0] == xml_file_key:
+        return cached_xml_file[1]
+
+    # parse the xml file and figure out the namespace if there is one
+    xml_root = ElementTree.parse(xml_file).getroot()
+    xml_namespace_match = _XML_NAMESPACE_PATTERN.match(str(xml_root.tag))
+    xml_namespace = ''
+    if xml_namespace_match:
+        xml_namespace = xml_namespace_match.group(0)
+
+    with _XML_FILE_CACHE_LOCK:
+        _XML_FILE_CACHE[xml_file_path] = (xml_file_key, (xml_root, xml_namespace))
+
+    return xml_root, xml_namespace
+
+
 def get_xml_element(xml_file, element_name):
     """ Gets a given element from a given xml file.
 
@@ -25,24 +81,15 @@ def get_xml_element(xml_file, element_name):
     if not os.path.exists(xml_file):
         raise ValueError('Given xml file does not exist: ' + xml_file)
 
-    # parse the xml file and figure out the namespace if there is one
-    xml_xml = ElementTree.parse(xml_file)
-    xml_root = xml_xml.getroot()
-    xml_namespace_match = re.match(r'\{.*}', str(xml_root.tag))
-    xml_namespace = ''
-    if xml_namespace_match:
-        xml_namespace = xml_namespace_match.group(0)
+    xml_root, xml_namespace = parse_xml_file(xml_file)
 
     # extract needed information from the xml file
-    xml_element = xml_xml.getroot().find('./' + xml_namespace + element_name)
+    xml_element = xml_root.find('./' + xml_namespace + element_name)
 
     # verify information from xml file
     if xml_element is None:
-        raise ValueError('Given xml file (' + \
-             xml_file + \
-             ') does not have ./' + \
-             element_name + \
-             ' element' \
+        raise ValueError(
+            'Given xml file (' + xml_file + ') does not have ./' + element_name + ' element'
         )
 
     return xml_element
@@ -0,0 +1,294 @@
+"""
+Tracing of where the time of a TSSC run is spent.
+
+A Tracer records a span for each piece of work done while running a step, such as merging the
+step configuration, running the step implementation, each subprocess the step runs, and reading
+and writing the step results. Each span records
+
+    * wall time
+    * CPU time of the thread doing the work
+    * CPU time of the child processes waited on while doing the work, such as mvn or buildah
+
+Spans can be written to a trace file in the Chrome trace event format, which can be viewed
+with chrome://tracing or https://ui.perfetto.dev, and summarized per span name so the time spent
+in subprocesses can be compared to the time spent in tssc itself.
+
+Notes
+-----
+Child process CPU time is only available for the process as a whole, so when steps run at the
+same time (see `run-workflow`) the child CPU time of a span can include the CPU time of
+subprocesses run by other steps that finished during that span.
+"""
+
+import contextlib
+import json
+import os
+import resource
+import threading
+import time
+
+# pseudo step the trace summary of each sub step is written to the TSSC results under
+TRACE_SUMMARY_STEP_NAME = 'trace-summary'
+
+# category of the spans of work done by tssc itself
+TSSC_CATEGORY = 'tssc'
+
+# category of the spans of work done by subprocesses, such as mvn or buildah
+SUBPROCESS_CATEGORY = 'subprocess'
+
+# NOTE: time.thread_time is only available from python 3.7, fall back to the process CPU time
+_thread_time = getattr(time, 'thread_time', time.process_time)
+
+
+class Span: # pylint: disable=too-many-instance-attributes
+    """
+    A timed piece of work.
+
+    Parameters
+    ----------
+    name : str
+        Name of the work.
+    category : str
+        Category of the work, for instance 'tssc' for work done by tssc itself or 'subprocess'
+        for work done by a subprocess.
+    parent : Span
+        Span of the work this work is part of, or None.
+    args : dict
+        Additional information about the work.
+    """
+
+    def __init__(self, name, category, parent, args):
+        self.name = name
+        self.category = category
+        self.parent = parent
+        self.args = args
+        self.thread_id = threading.get_ident()
+
+        self.start_time = None
+        self.wall_time = None
+        self.cpu_time = None
+        self.child_cpu_time = None
+
+        self.__start_perf_counter = None
+        self.__start_thread_time = None
+        self.__start_child_cpu_time = None
+
+    def start(self):
+        """
+        Starts timing the work.
+        """
+        self.start_time = time.time()
+        self.__start_child_cpu_time = _child_cpu_time()
+        self.__start_thread_time = _thread_time()
+        self.__start_perf_counter = time.perf_counter()
+
+    def finish(self):
+        """
+        Finishes timing the work.
+        """
+        self.wall_time = time.perf_counter() - self.__start_perf_counter
+        self.cpu_time = _thread_time() - self.__start_thread_time
+        self.child_cpu_time = _child_cpu_time() - self.__start_child_cpu_time
+
+    def is_part_of(self, span):
+        """
+        Parameters
+        ----------
+        span : Span
+            Span to check if this span is part of.
+
+        Returns
+        -------
+        bool
+            True if this span is the given span or is part of the work of the given span,
+            False otherwise.
+        """
+        part_of = self
+        while part_of is not None:
+            if part_of is span:
+                return True
+            part_of = part_of.parent
+
+        return False
+
+    def to_trace_event(self):
+        """
+        Returns
+        -------
+        dict
+            This span as a Chrome trace complete event.
+        """
+        return {
+            'name': self.name,
+            'cat': self.category,
+            'ph': 'X',
+            'ts': int(self.start_time * 1000000),
+            'dur': int(self.wall_time * 1000000),
+            'pid': os.getpid(),
+            'tid': self.thread_id,
+            'args': {
+                **self.args,
+                'cpu-time': self.cpu_time,
+                'child-cpu-time': self.child_cpu_time
+            }
+        }
+
+
+class Tracer:
+    """
+    Records spans for the work done during a TSSC run.
+
+    The tracer is safe to share between threads running steps concurrently, spans started on a
+    thread while another span is open on that thread are recorded as part of the open span.
+    """
+
+    def __init__(self):
+        self.__spans = []
+        self.__lock = threading.Lock()
+        self.__open_spans = threading.local()
+
+    @property
+    def spans(self):
+        """
+        Returns
+        -------
+        list
+            The finished spans in the order they finished.
+        """
+        with self.__lock:
+            return list(self.__spans)
+
+    @contextlib.contextmanager
+    def span(self, name, category=TSSC_CATEGORY, **args):
+        """
+        Times the work done in the context.
+
+        Parameters
+        ----------
+        name : str
+            Name of the work.
+        category : str, optional
+            Category of the work.
+        args
+            Additional information about the work.
+
+        Yields
+        ------
+        Span
+            The span timing the work.
+        """
+        open_spans = self.__get_open_spans()
+        span = Span(name, category, open_spans[-1] if open_spans else None, args)
+
+        open_spans.append(span)
+        span.start()
+        try:
+            yield span
+        finally:
+            span.finish()
+            open_spans.pop()
+            with self.__lock:
+                self.__spans.append(span)
+
+    def summarize(self, span):
+        """
+        Summarizes the work done as part of the given span by span name.
+
+        Parameters
+        ----------
+        span : Span
+            Finished span to summarize.
+
+        Returns
+        -------
+        dict
+            Times of the given span, the wall time of the given span spent waiting on
+            subprocesses, and the count and total times of each span name that was part of the
+            given span.
+        """
+        subprocess_wall_time = 0.0
+        span_summaries = {}
+        for part in self.spans:
+            if part is span or not part.is_part_of(span):
+                continue
+
+            span_summary = span_summaries.setdefault(part.name, {
+                'category': part.category,
+                'count': 0,
+                'wall-time': 0.0,
+                'cpu-time': 0.0,
+                'child-cpu-time': 0.0
+            })
+            span_summary['count'] += 1
+            span_summary['wall-time'] += part.wall_time
+            span_summary['cpu-time'] += part.cpu_time
+            span_summary['child-cpu-time'] += part.child_cpu_time
+
+            if part.category == SUBPROCESS_CATEGORY:
+                subprocess_wall_time += part.wall_time
+
+        return {
+            'wall-time': span.wall_time,
+            'cpu-time': span.cpu_time,
+            'child-cpu-time': span.child_cpu_time,
+            'subprocess-wall-time': subprocess_wall_time,
+            'spans': span_summaries
+        }
+
+    def write_trace_file(self, trace_file_path):
+        """
+        Appends the finished spans to the given trace file in the Chrome trace JSON array format.
+
+        The closing bracket of the JSON array is optional in the Chrome trace format, which
+        allows the spans of the separate tssc processes running each step to be appended to the
+        same trace file.
+
+        Parameters
+        ----------
+        trace_file_path : str
+            Path to the trace file to append the spans to.
+        """
+        trace_dir_path = os.path.dirname(trace_file_path)
+        if trace_dir_path and not os.path.exists(trace_dir_path):
+            os.makedirs(trace_dir_path)
+
+        with open(trace_file_path, 'a') as trace_file:
+            if trace_file.tell() == 0:
+                trace_file.write('[\n')
+            for span in self.spans:
+                trace_file.write(json.dumps(span.to_trace_event(), default=str) + ',\n')
+
+    def __get_open_spans(self):
+        """
+        Returns
+        -------
+        list
+            The spans open on the current thread, innermost last.
+        """
+        if not hasattr(self.__open_spans, 'spans'):
+            self.__open_spans.spans = []
+
+        return self.__open_spans.spans
+
+
+@contextlib.contextmanager
+def untraced_span():
+    """
+    Context manager for work that is not being traced.
+
+    Yields
+    ------
+    None
+    """
+    yield None
+
+
+def _child_cpu_time():
+    """
+    Returns
+    -------
+    float
+        Total user and system CPU time of the finished child processes of this process.
+    """
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return child_usage.ru_utime + child_usage.ru_stime
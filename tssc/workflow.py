@@ -0,0 +1,305 @@
+"""
+Dependencies between TSSC workflow steps and running a whole TSSC workflow.
+
+A step depends on the steps whose results it requires (see the "Expected Previous Step Results"
+of the step implementers) and on the steps that must have happened before it in the
+DefaultSteps order for it to make sense to run, for instance the container image can not be
+built before the artifact it contains is packaged, the unit tests can not be run while the
+package build rewrites the test reports, and nothing should be deployed before it has passed
+all of the static analysis, tests, and scans.
+
+Steps that do not depend on each other, such as the static code analysis steps and the
+package build, can run at the same time. The output of steps run at the same time is buffered
+per step and written out once each step is done, see `StepOutput`, so it is not interleaved.
+"""
+
+import concurrent.futures
+import contextlib
+import shutil
+import tempfile
+import threading
+
+from .exceptions import TSSCException
+from .step_implementer import DefaultSteps
+
+DEFAULT_STEPS = [
+    DefaultSteps.GENERATE_METADATA,
+    DefaultSteps.TAG_SOURCE,
+    DefaultSteps.SECURITY_STATIC_CODE_ANALYSIS,
+    DefaultSteps.LINTING_STATIC_CODE_ANALYSIS,
+    DefaultSteps.PACKAGE,
+    DefaultSteps.UNIT_TEST,
+    DefaultSteps.PUSH_ARTIFACTS,
+    DefaultSteps.CREATE_CONTAINER_IMAGE,
+    DefaultSteps.PUSH_CONTAINER_IMAGE,
+    DefaultSteps.CONTAINER_IMAGE_UNIT_TEST,
+    DefaultSteps.CONTAINER_IMAGE_STATIC_COMPLIANCE_SCAN,
+    DefaultSteps.CONTAINER_IMAGE_STATIC_VULNERABILITY_SCAN,
+    DefaultSteps.CREATE_DEPLOYMENT_ENVIRONMENT,
+    DefaultSteps.DEPLOY,
+    DefaultSteps.UAT,
+    DefaultSteps.RUNTIME_VULNERABILITY_SCAN,
+    DefaultSteps.CANARY_TEST,
+    DefaultSteps.PUBLISH_WROKFLOW_RESULTS
+]
+
+# step results required by each step as {step name}.{result key}
+DEFAULT_STEP_RESULT_DEPENDENCIES = {
+    DefaultSteps.TAG_SOURCE: [
+        DefaultSteps.GENERATE_METADATA + '.version'
+    ],
+    DefaultSteps.PUSH_ARTIFACTS: [
+        DefaultSteps.GENERATE_METADATA + '.version',
+        DefaultSteps.PACKAGE + '.artifacts'
+    ],
+    DefaultSteps.CREATE_CONTAINER_IMAGE: [
+        DefaultSteps.GENERATE_METADATA + '.image-tag'
+    ],
+    DefaultSteps.PUSH_CONTAINER_IMAGE: [
+        DefaultSteps.GENERATE_METADATA + '.image-tag',
+        DefaultSteps.CREATE_CONTAINER_IMAGE + '.image-tar-file',
+        DefaultSteps.CREATE_CONTAINER_IMAGE + '.image-ref'
+    ]
+}
+
+# steps that must be run before each step other then the ones it requires the results of
+DEFAULT_STEP_ORDER_DEPENDENCIES = {
+    DefaultSteps.SECURITY_STATIC_CODE_ANALYSIS: [DefaultSteps.GENERATE_METADATA],
+    DefaultSteps.LINTING_STATIC_CODE_ANALYSIS: [DefaultSteps.GENERATE_METADATA],
+    DefaultSteps.PACKAGE: [DefaultSteps.GENERATE_METADATA],
+    # package builds, such as mvn clean install, delete and rewrite the test reports unit-test
+    # aggregates, and running the tests in the same build directory at the same time clashes
+    DefaultSteps.UNIT_TEST: [DefaultSteps.PACKAGE],
+    DefaultSteps.CREATE_CONTAINER_IMAGE: [DefaultSteps.PACKAGE],
+    DefaultSteps.CONTAINER_IMAGE_UNIT_TEST: [DefaultSteps.CREATE_CONTAINER_IMAGE],
+    DefaultSteps.CONTAINER_IMAGE_STATIC_COMPLIANCE_SCAN: [DefaultSteps.CREATE_CONTAINER_IMAGE],
+    DefaultSteps.CONTAINER_IMAGE_STATIC_VULNERABILITY_SCAN: [DefaultSteps.CREATE_CONTAINER_IMAGE],
+    DefaultSteps.CREATE_DEPLOYMENT_ENVIRONMENT: [DefaultSteps.GENERATE_METADATA],
+    DefaultSteps.DEPLOY: [
+        DefaultSteps.TAG_SOURCE,
+        DefaultSteps.SECURITY_STATIC_CODE_ANALYSIS,
+        DefaultSteps.LINTING_STATIC_CODE_ANALYSIS,
+        DefaultSteps.UNIT_TEST,
+        DefaultSteps.PUSH_ARTIFACTS,
+        DefaultSteps.PUSH_CONTAINER_IMAGE,
+        DefaultSteps.CONTAINER_IMAGE_UNIT_TEST,
+        DefaultSteps.CONTAINER_IMAGE_STATIC_COMPLIANCE_SCAN,
+        DefaultSteps.CONTAINER_IMAGE_STATIC_VULNERABILITY_SCAN,
+        DefaultSteps.CREATE_DEPLOYMENT_ENVIRONMENT
+    ],
+    DefaultSteps.UAT: [DefaultSteps.DEPLOY],
+    DefaultSteps.RUNTIME_VULNERABILITY_SCAN: [DefaultSteps.DEPLOY],
+    DefaultSteps.CANARY_TEST: [DefaultSteps.DEPLOY],
+    DefaultSteps.PUBLISH_WROKFLOW_RESULTS: [
+        DefaultSteps.UAT,
+        DefaultSteps.RUNTIME_VULNERABILITY_SCAN,
+        DefaultSteps.CANARY_TEST
+    ]
+}
+
+
+def get_step_dependencies(step_name):
+    """
+    Gets the steps the given step directly depends on.
+
+    Parameters
+    ----------
+    step_name : str
+        TSSC step name to get the dependencies of.
+
+    Returns
+    -------
+    set
+        Names of the steps the given step depends on, either because it requires their results
+        or because they must have been run before it.
+    """
+    step_dependencies = set(DEFAULT_STEP_ORDER_DEPENDENCIES.get(step_name, []))
+    for step_result in DEFAULT_STEP_RESULT_DEPENDENCIES.get(step_name, []):
+        step_dependencies.add(step_result.split('.', 1)[0])
+
+    return step_dependencies
+
+
+def create_step_dependency_graph(step_names):
+    """
+    Creates the dependency graph between the given steps.
+
+    If a step depends on a step that is not one of the given steps then it depends on the
+    dependencies of that step instead so that the order between the given steps is kept.
+
+    Steps that are not DefaultSteps are run after all of the DefaultSteps, one after the other,
+    in the given order.
+
+    Parameters
+    ----------
+    step_names : list
+        TSSC step names to create the dependency graph for.
+
+    Returns
+    -------
+    dict
+        Dictionary of the given step names to the set of step names they depend on, in the order
+        the steps would be run if they were run one at a time.
+    """
+    def resolve_step_dependencies(step_name):
+        resolved_step_dependencies = set()
+        for step_dependency in get_step_dependencies(step_name):
+            if step_dependency in step_names:
+                resolved_step_dependencies.add(step_dependency)
+            else:
+                resolved_step_dependencies |= resolve_step_dependencies(step_dependency)
+
+        return resolved_step_dependencies
+
+    step_dependency_graph = {}
+    for step_name in DEFAULT_STEPS:
+        if step_name in step_names:
+            step_dependency_graph[step_name] = resolve_step_dependencies(step_name)
+
+    for step_name in step_names:
+        if step_name not in step_dependency_graph:
+            step_dependency_graph[step_name] = set(step_dependency_graph)
+
+    return step_dependency_graph
+
+
+def run_step_dependency_graph(step_dependency_graph, run_step, max_workers):
+    """
+    Runs the steps of the given step dependency graph, running steps whose dependencies have all
+    been run at the same time on a bounded pool of workers.
+
+    Once a step fails no more steps are started, the steps already running are left to finish
+    and then the error of the first step to fail is raised.
+
+    Parameters
+    ----------
+    step_dependency_graph : dict
+        Dictionary of step names to the set of step names they depend on.
+    run_step : callable
+        Function to run a step given the step name.
+    max_workers : int
+        Maximum number of steps to run at the same time.
+
+    Raises
+    ------
+    TSSCException
+        If the given step dependency graph has steps whose dependencies can never be run.
+    Exception
+        Error raised by the first step to fail.
+    """
+    steps_to_run = dict(step_dependency_graph)
+    steps_run = set()
+    step_errors = []
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running_steps = {}
+        while (steps_to_run and not step_errors) or running_steps:
+            if not step_errors:
+                for step_name, step_dependencies in list(steps_to_run.items()):
+                    if step_dependencies <= steps_run:
+                        del steps_to_run[step_name]
+                        running_steps[executor.submit(run_step, step_name)] = step_name
+
+                if not running_steps:
+                    raise TSSCException(
+                        'Steps (' + str(list(steps_to_run)) + ') depend on steps that can not'
+                        + ' be run: ' + str(steps_to_run)
+                    )
+
+            done, _ = concurrent.futures.wait(
+                running_steps,
+                return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                step_name = running_steps.pop(future)
+                if future.exception() is not None:
+                    step_errors.append(future.exception())
+                else:
+                    steps_run.add(step_name)
+
+    if step_errors:
+        raise step_errors[0]
+
+
+class StepOutput:
+    """
+    Stand in for `sys.stdout` while steps run at the same time that buffers the output of each
+    step and writes it to the actual stdout in one piece once the step is done.
+
+    The output of a step is buffered in a temporary file of its own, both what it prints and the
+    output of the commands it runs with `_out=sys.stdout`, which write to the file directly
+    through its file descriptor, so the output of the step keeps its order.
+
+    Output written by threads other then the ones running a step, including threads a step
+    starts itself, is written straight through to the actual stdout.
+
+    Parameters
+    ----------
+    stdout : file
+        Actual stdout to write the output of the steps to.
+    """
+
+    def __init__(self, stdout):
+        self.__stdout = stdout
+        self.__stdout_lock = threading.Lock()
+        self.__local = threading.local()
+
+    @contextlib.contextmanager
+    def buffered(self):
+        """
+        Buffers the output written by the current thread until the context is exited.
+        """
+        with tempfile.TemporaryFile('a+', encoding='utf-8') as step_output:
+            self.__local.output = step_output
+            try:
+                yield
+            finally:
+                self.__local.output = None
+                step_output.flush()
+                step_output.seek(0)
+                with self.__stdout_lock:
+                    shutil.copyfileobj(step_output, self.__stdout)
+                    self.__stdout.flush()
+
+    def write(self, text):
+        """
+        Writes the given text to the output of the step run by the current thread.
+
+        Returns
+        -------
+        int
+            Number of characters written.
+        """
+        output = self.__output()
+        written = output.write(text)
+        # commands the step runs write to the buffer file directly
+        if output is not self.__stdout:
+            output.flush()
+        return written
+
+    def flush(self):
+        """
+        Flushes the output of the step run by the current thread.
+        """
+        self.__output().flush()
+
+    def fileno(self):
+        """
+        Returns
+        -------
+        int
+            File descriptor of the output of the step run by the current thread, for the
+            commands the step runs to write to.
+        """
+        return self.__output().fileno()
+
+    def __getattr__(self, name):
+        return getattr(self.__output(), name)
+
+    def __output(self):
+        """
+        Returns
+        -------
+        file
+            Output of the step run by the current thread, or the actual stdout.
+        """
+        return getattr(self.__local, 'output', None) or self.__stdout
@@ -0,0 +1,63 @@
+"""
+Loading and dumping of the yaml TSSC configuration and results.
+
+When PyYAML was built with libyaml the C implementations of the safe loader and dumper are used,
+which parse and emit large results files several times faster then the pure python ones.
+Otherwise the pure python safe loader and dumper are used, which accept and produce the same yaml.
+
+Which implementation is used is reported as the `yaml` argument of the `run-step` span of the
+trace of each step, see `tssc.trace`.
+"""
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+    YAML_IMPLEMENTATION = 'libyaml'
+except ImportError:  # pragma: no cover
+    # NOTE: PyYAML was built without libyaml
+    from yaml import SafeLoader, SafeDumper
+    YAML_IMPLEMENTATION = 'python'
+
+# errors raised by safe_load for invalid yaml, by either implementation
+YAML_PARSE_ERRORS = (yaml.scanner.ScannerError, yaml.parser.ParserError, ValueError)
+
+
+def safe_load(stream, loader=SafeLoader):
+    """
+    Parses the given yaml into python objects, like `yaml.safe_load`.
+
+    Parameters
+    ----------
+    stream : str or file
+        Yaml to parse.
+    loader : type, optional
+        Loader class to parse with, the fastest available safe loader by default.
+
+    Returns
+    -------
+    object
+        Python objects parsed from the given yaml.
+    """
+    return yaml.load(stream, Loader=loader)
+
+
+def safe_dump(data, stream=None, dumper=SafeDumper):
+    """
+    Dumps the given python objects as yaml, like `yaml.safe_dump`.
+
+    Parameters
+    ----------
+    data : object
+        Python objects to dump, only standard yaml types can be dumped.
+    stream : file, optional
+        File to write the yaml to.
+    dumper : type, optional
+        Dumper class to dump with, the fastest available safe dumper by default.
+
+    Returns
+    -------
+    str
+        The yaml if no stream was given, None otherwise.
+    """
+    return yaml.dump(data, stream, Dumper=dumper)